@@ -1,6 +1,8 @@
 from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
 from core.settings import settings
 from datetime import datetime
+from shared import metrics
 
 index_router = APIRouter(tags=["Index"])
 
@@ -15,4 +17,8 @@ async def health() -> dict[str, str]:
         "status": "healthy",
         "version": settings.PROJECT.VERSION,
         "timestamp": datetime.now().isoformat()
-    }
\ No newline at end of file
+    }
+
+@index_router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def prometheus_metrics() -> PlainTextResponse:
+    return PlainTextResponse(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
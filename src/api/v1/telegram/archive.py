@@ -0,0 +1,92 @@
+from datetime import date, datetime, timezone
+from typing import Any
+
+from loguru import logger
+
+from api.v1.telegram.repositories import AsyncTelegramMessageRepository
+from api.v1.telegram.schema import WebhookMessageReceived
+from core.settings import settings
+from core.settings.base import ArchiveSettings
+from shared.group_commit import GroupCommitter
+from shared.utils_dates import get_app_current_time
+
+
+class MessageArchive:
+    """
+    Guarda cada mensaje recibido en `telegram_messages` para consultar el
+    historial de un chat. Con el outbox activo el archivo se escribe en la
+    misma transacción que la fila del outbox; sin él, las escrituras
+    concurrentes se agrupan en un solo INSERT.
+
+    Las tablas se particionan por mes sobre `date` en UTC. Antes de cada
+    escritura se revisa si cambió el mes: un proceso que vive más allá de
+    `PARTITION_MONTHS_AHEAD` crea las particiones siguientes antes de que
+    sus filas caigan en la DEFAULT (de donde ya no se pueden mover).
+    """
+
+    def __init__(self, config: ArchiveSettings):
+        self.config = config
+        self._committer: GroupCommitter[dict[str, Any]] = GroupCommitter(self._write, config.BATCH_SIZE)
+        # Mes (UTC) desde el que ya están creadas las particiones
+        self._partitions_month: date | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.config.ENABLED
+
+    @staticmethod
+    def row(message: WebhookMessageReceived) -> dict[str, Any]:
+        return {
+            "connector_id": message.connector_id,
+            "chat_id": message.chat_id,
+            # Naive en UTC: la partición es el mes UTC del mensaje. Una fecha
+            # naive es hora local del sistema (`datetime.fromtimestamp`)
+            "date": message.date.astimezone(timezone.utc).replace(tzinfo=None),
+            "message_id": message.message_id,
+            "user_id": message.user_id,
+            "payload": message.model_dump(mode="json"),
+            "received_at": get_app_current_time().replace(tzinfo=None),
+        }
+
+    async def add(self, message: WebhookMessageReceived) -> None:
+        await self._committer.submit(self.row(message))
+
+    async def _write(self, rows: list[dict[str, Any]]) -> None:
+        await self.ensure_partitions()
+        await AsyncTelegramMessageRepository.add_many(rows)
+
+    async def start(self) -> None:
+        await self.ensure_partitions()
+
+    async def ensure_partitions(self) -> None:
+        """
+        Crea por adelantado las particiones del mes UTC en curso y los
+        siguientes. Solo consulta la base al arrancar y cuando cambia el mes:
+        en Lambda no hay lifespan y esto corre antes de cada escritura.
+        """
+        month = datetime.now(timezone.utc).date().replace(day=1)
+        if self._partitions_month == month:
+            return
+        # Se marca antes de esperar para que las escrituras concurrentes no repitan el trabajo
+        previous, self._partitions_month = self._partitions_month, month
+        try:
+            _, created = await AsyncTelegramMessageRepository.ensure_partitions(
+                month, self.config.PARTITION_MONTHS_AHEAD
+            )
+        except Exception as e:  # noqa: BLE001
+            # Sin particiones mensuales los mensajes caen en la DEFAULT
+            self._partitions_month = previous
+            logger.error(f"No se pudieron preparar las particiones del archivo: {type(e).__name__}: {e}")
+            return
+        if created:
+            logger.info(f"Particiones de telegram_messages creadas: {', '.join(created)}")
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "written": self._committer.written,
+            "write_batches": self._committer.batches,
+        }
+
+
+message_archive = MessageArchive(settings.ARCHIVE)
@@ -0,0 +1,179 @@
+import asyncio
+import os
+from collections import OrderedDict
+from datetime import datetime
+from enum import StrEnum
+from uuid import UUID, uuid4
+
+import httpx
+from loguru import logger
+
+from api.v1.telegram.client import TelegramClient
+from api.v1.telegram.schema import BroadcastJobOut, BroadcastRecipientOut
+from core.settings import settings
+from core.settings.base import BroadcastSettings
+from shared.utils_dates import get_app_current_time
+
+
+class RecipientStatus(StrEnum):
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+
+
+class JobStatus(StrEnum):
+    RUNNING = "running"
+    COMPLETED = "completed"
+    CANCELLED = "cancelled"
+
+
+class BroadcastRecipient:
+    __slots__ = ("chat_id", "text", "status", "telegram_message_id", "error")
+
+    def __init__(self, chat_id: int, text: str):
+        self.chat_id = chat_id
+        self.text = text
+        self.status = RecipientStatus.PENDING
+        self.telegram_message_id: int | None = None
+        self.error: str | None = None
+
+
+class BroadcastJob:
+    def __init__(self, connector_id: UUID, user_id: UUID, recipients: list[BroadcastRecipient]):
+        self.id = uuid4()
+        self.connector_id = connector_id
+        self.user_id = user_id
+        self.recipients = recipients
+        self.status = JobStatus.RUNNING
+        self.sent = 0
+        self.failed = 0
+        self.created_at: datetime = get_app_current_time()
+        self.finished_at: datetime | None = None
+
+    @property
+    def pending(self) -> int:
+        return len(self.recipients) - self.sent - self.failed
+
+    def to_schema(self, offset: int = 0, limit: int | None = None) -> BroadcastJobOut:
+        results = None
+        if limit is not None:
+            results = [
+                BroadcastRecipientOut(
+                    chat_id=recipient.chat_id,
+                    status=recipient.status,
+                    telegram_message_id=recipient.telegram_message_id,
+                    error=recipient.error
+                )
+                for recipient in self.recipients[offset:offset + limit]
+            ]
+        return BroadcastJobOut(
+            job_id=self.id,
+            connector_id=self.connector_id,
+            status=self.status,
+            total=len(self.recipients),
+            sent=self.sent,
+            failed=self.failed,
+            pending=self.pending,
+            created_at=self.created_at,
+            finished_at=self.finished_at,
+            results=results
+        )
+
+
+class BroadcastScheduler:
+    """
+    Ejecuta difusiones en segundo plano dentro del proceso.
+
+    Los jobs no sobreviven al proceso, así que no se aceptan en Lambda
+    (`available`). Cada job se reparte entre `CONCURRENCY` workers; el ritmo por bot y por
+    chat (y los reintentos ante 429) los aplica `TelegramClient.send`; si aun así llega un
+    429, el worker espera su `retry_after` y reintenta el mismo destinatario
+    (hasta `MAX_RATE_LIMIT_WAITS` veces). Los jobs terminados se conservan
+    (hasta `MAX_JOBS`) para consultar su progreso y resultados.
+    """
+
+    def __init__(self, config: BroadcastSettings):
+        self.config = config
+        self._jobs: OrderedDict[UUID, BroadcastJob] = OrderedDict()
+        self._tasks: dict[UUID, asyncio.Task[None]] = {}
+
+    @property
+    def available(self) -> bool:
+        return self.config.IN_PROCESS and not os.environ.get("AWS_LAMBDA_FUNCTION_NAME")
+
+    def submit(self, job: BroadcastJob, bot_token: str) -> BroadcastJob:
+        self._jobs[job.id] = job
+        self._evict_finished()
+        task = asyncio.create_task(self._run(job, bot_token), name=f"broadcast-{job.id}")
+        self._tasks[job.id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job.id, None))
+        logger.info(f"Broadcast {job.id} creado con {len(job.recipients)} destinatarios")
+        return job
+
+    def get(self, job_id: UUID) -> BroadcastJob | None:
+        return self._jobs.get(job_id)
+
+    def _evict_finished(self) -> None:
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self.config.MAX_JOBS:
+                break
+            if self._jobs[job_id].status != JobStatus.RUNNING:
+                del self._jobs[job_id]
+
+    async def stop(self) -> None:
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self, job: BroadcastJob, bot_token: str) -> None:
+        recipients = iter(job.recipients)
+
+        async def worker() -> None:
+            for recipient in recipients:
+                await self._send(job, recipient, bot_token)
+
+        workers = min(self.config.CONCURRENCY, len(job.recipients))
+        try:
+            await asyncio.gather(*(worker() for _ in range(workers)))
+            job.status = JobStatus.COMPLETED
+        except asyncio.CancelledError:
+            job.status = JobStatus.CANCELLED
+            raise
+        finally:
+            job.finished_at = get_app_current_time()
+            logger.info(f"Broadcast {job.id} {job.status}: sent={job.sent} failed={job.failed}")
+
+    async def _send(self, job: BroadcastJob, recipient: BroadcastRecipient, bot_token: str) -> None:
+        waits = 0
+        while True:
+            try:
+                resp = await TelegramClient.send(
+                    job.connector_id,
+                    bot_token,
+                    "sendMessage",
+                    {"chat_id": recipient.chat_id, "text": recipient.text},
+                    chat_id=recipient.chat_id
+                )
+                data = resp.json()
+            except (httpx.HTTPError, ValueError) as e:
+                data = {"ok": False, "description": type(e).__name__}
+                break
+            # Un 429 (de Telegram o el local del rate limiter) no es un fallo del
+            # destinatario: el worker espera el retry_after y lo reintenta
+            if resp.status_code != 429 or waits >= self.config.MAX_RATE_LIMIT_WAITS:
+                break
+            waits += 1
+            await asyncio.sleep(TelegramClient.retry_after(resp) or 1.0)
+
+        if data.get("ok"):
+            recipient.status = RecipientStatus.SENT
+            recipient.telegram_message_id = data["result"]["message_id"]
+            job.sent += 1
+        else:
+            recipient.status = RecipientStatus.FAILED
+            recipient.error = data.get("description", "Unknown error")
+            job.failed += 1
+
+
+broadcast_scheduler = BroadcastScheduler(settings.BROADCAST)
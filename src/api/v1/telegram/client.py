@@ -0,0 +1,194 @@
+import asyncio
+import time
+from typing import Any
+
+import httpx
+from loguru import logger
+
+from api.v1.telegram.rate_limit import RateLimitExceeded, telegram_rate_limiter
+from core.settings import settings
+from shared.metrics import telegram_errors, telegram_request_duration, telegram_requests_in_flight
+from shared.tracing import tracer
+
+
+class TelegramClient:
+    """
+    Cliente asíncrono compartido para la Bot API de Telegram.
+
+    Mantiene un único `httpx.AsyncClient` por event loop con conexiones
+    keep-alive, de modo que las llamadas a Telegram no bloquean el loop ni
+    pagan un handshake TCP+TLS por petición. Como el cliente solo habla con
+    `TELEGRAM.API_BASE_URL`, los límites del pool son límites por host.
+    """
+
+    _http_client: httpx.AsyncClient | None = None
+    _loop: asyncio.AbstractEventLoop | None = None
+    rate_limited_responses = 0
+    retries = 0
+    retries_exhausted = 0
+
+    @staticmethod
+    def get_http_client() -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if TelegramClient._http_client is None or TelegramClient._loop is not loop:
+            # Un AsyncClient no puede reutilizar conexiones de otro loop
+            TelegramClient._http_client = TelegramClient._build_http_client()
+            TelegramClient._loop = loop
+        return TelegramClient._http_client
+
+    @staticmethod
+    def _build_http_client() -> httpx.AsyncClient:
+        config = settings.TELEGRAM
+        return httpx.AsyncClient(
+            base_url=config.API_BASE_URL,
+            http2=config.HTTP2,
+            timeout=httpx.Timeout(
+                connect=config.CONNECT_TIMEOUT,
+                read=config.READ_TIMEOUT,
+                write=config.WRITE_TIMEOUT,
+                pool=config.POOL_TIMEOUT,
+            ),
+            limits=httpx.Limits(
+                max_connections=config.MAX_CONNECTIONS,
+                max_keepalive_connections=config.MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=config.KEEPALIVE_EXPIRY,
+            ),
+        )
+
+    @staticmethod
+    async def close() -> None:
+        client = TelegramClient._http_client
+        TelegramClient._http_client = None
+        TelegramClient._loop = None
+        if client is not None:
+            await client.aclose()
+            logger.info("Telegram HTTP client closed")
+
+    @staticmethod
+    def method_path(bot_token: str, method: str) -> str:
+        return f"/bot{bot_token}/{method}"
+
+    @staticmethod
+    def file_path(bot_token: str, file_path: str) -> str:
+        """Ruta de descarga de un `file_path` devuelto por `getFile`."""
+        return f"/file/bot{bot_token}/{file_path}"
+
+    @staticmethod
+    async def post(
+        bot_token: str,
+        method: str,
+        payload: dict[str, Any] | None = None,
+        timeout: float | None = None,
+        files: dict[str, Any] | None = None
+    ) -> httpx.Response:
+        """
+        Con `files` la petición va como multipart/form-data: httpx lee cada
+        archivo por bloques, así que no se carga completo en memoria.
+        """
+        client = TelegramClient.get_http_client()
+        if files:
+            body: dict[str, Any] = {"data": {k: str(v) for k, v in (payload or {}).items()}, "files": files}
+        else:
+            body = {"json": payload or {}}
+        start = time.perf_counter()
+        outcome = "error"
+        telegram_requests_in_flight.inc()
+        try:
+            # Nunca logues la URL completa: contiene el token del bot
+            with tracer.span(f"telegram.{method}") as span:
+                response = await client.post(
+                    TelegramClient.method_path(bot_token, method),
+                    **body,
+                    timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT,
+                )
+                if span is not None:
+                    span.set("status", response.status_code)
+        except httpx.HTTPError as e:
+            telegram_errors.inc(method, type(e).__name__)
+            raise
+        finally:
+            telegram_requests_in_flight.dec()
+        if response.status_code == 200:
+            outcome = "ok"
+        elif response.status_code == 429:
+            outcome = "rate_limited"
+            telegram_errors.inc(method, "429")
+        else:
+            telegram_errors.inc(method, response.status_code)
+        telegram_request_duration.observe(time.perf_counter() - start, method, outcome)
+        return response
+
+    @staticmethod
+    def retry_after(response: httpx.Response) -> float | None:
+        """Segundos de `parameters.retry_after` si la respuesta es un 429 de flood control."""
+        if response.status_code != 429:
+            return None
+        try:
+            return float(response.json()["parameters"]["retry_after"])
+        except (ValueError, KeyError, TypeError):
+            pass
+        try:
+            return float(response.headers.get("Retry-After", 1))
+        except (ValueError, TypeError):
+            return 1.0
+
+    @staticmethod
+    async def send(
+        bot_key: Any,
+        bot_token: str,
+        method: str,
+        payload: dict[str, Any] | None = None,
+        chat_id: Any = None,
+        files: dict[str, Any] | None = None
+    ) -> httpx.Response:
+        """
+        `post` con rate limiting por bot (`bot_key`) y por chat. Ante un 429
+        espera `retry_after`, frena al resto de envíos del mismo bot y
+        reintenta hasta `TELEGRAM.MAX_RETRIES` veces; si se agotan, devuelve
+        el último 429 al llamador. Si el turno de envío llegaría después de
+        `TELEGRAM.MAX_RETRY_AFTER` no se espera: se devuelve un 429 local con
+        el `retry_after` estimado. Los archivos de `files` se releen desde el
+        inicio en cada reintento.
+        """
+        config = settings.TELEGRAM
+        attempt = 0
+        while True:
+            try:
+                await telegram_rate_limiter.acquire(bot_key, chat_id)
+            except RateLimitExceeded as e:
+                logger.warning(f"Telegram {method}: bot frenado por flood control (retry_after={e.retry_after:.0f})")
+                return TelegramClient._local_429(e.retry_after)
+            response = await TelegramClient.post(bot_token, method, payload, files=files)
+            retry_after = TelegramClient.retry_after(response)
+            if retry_after is None:
+                return response
+
+            TelegramClient.rate_limited_responses += 1
+            telegram_rate_limiter.penalize(bot_key, retry_after, chat_id)
+            if attempt >= config.MAX_RETRIES or retry_after > config.MAX_RETRY_AFTER:
+                TelegramClient.retries_exhausted += 1
+                logger.warning(f"Telegram {method}: 429 sin reintentos disponibles (retry_after={retry_after})")
+                return response
+            attempt += 1
+            TelegramClient.retries += 1
+            logger.warning(f"Telegram {method}: 429, reintento {attempt} en {retry_after}s")
+
+    @staticmethod
+    def _local_429(retry_after: float) -> httpx.Response:
+        """Un 429 con la forma de los de Telegram, para que el llamador lo trate igual."""
+        seconds = max(1, int(retry_after + 0.999))
+        return httpx.Response(429, json={
+            "ok": False,
+            "error_code": 429,
+            "description": f"Too Many Requests: retry after {seconds}",
+            "parameters": {"retry_after": seconds}
+        })
+
+    @staticmethod
+    def stats() -> dict[str, Any]:
+        return {
+            **telegram_rate_limiter.stats(),
+            "rate_limited_responses": TelegramClient.rate_limited_responses,
+            "retries": TelegramClient.retries,
+            "retries_exhausted": TelegramClient.retries_exhausted,
+        }
@@ -0,0 +1,177 @@
+import asyncio
+import re
+from collections import OrderedDict
+from typing import Any
+
+from loguru import logger
+
+from core.settings import settings
+from core.settings.base import DedupeBackend, DedupeSettings
+from shared.metrics import webhook_duplicate_updates
+
+# Telegram serializa `update_id` como primera llave del Update
+_UPDATE_ID_PREFIX = re.compile(rb'\A\s*\{\s*"update_id"\s*:\s*(\d{1,20})\s*[,}]')
+
+
+def extract_update_id(body: bytes) -> int | None:
+    """
+    Lee el `update_id` de los primeros bytes del cuerpo sin parsear el JSON.
+    Si el cuerpo no empieza así devuelve `None` y el llamador debe parsearlo.
+    """
+    match = _UPDATE_ID_PREFIX.match(body, 0, 64)
+    return int(match.group(1)) if match else None
+
+
+class MemoryUpdateWindow:
+    """
+    Ventana acotada de `update_id` ya procesados por conector. Cada ventana
+    es un dict en orden de inserción: comprobar, marcar y expulsar el más
+    viejo son O(1). Los conectores se expulsan por LRU.
+    """
+
+    def __init__(self, window_size: int, max_connectors: int):
+        self.window_size = window_size
+        self.max_connectors = max_connectors
+        self._windows: OrderedDict[str, dict[int, None]] = OrderedDict()
+
+    def claim(self, connector_id: str, update_id: int) -> bool:
+        window = self._windows.get(connector_id)
+        if window is None:
+            window = self._windows[connector_id] = {}
+            while len(self._windows) > self.max_connectors:
+                self._windows.popitem(last=False)
+        else:
+            self._windows.move_to_end(connector_id)
+        if update_id in window:
+            return False
+        window[update_id] = None
+        if len(window) > self.window_size:
+            del window[next(iter(window))]
+        return True
+
+    def release(self, connector_id: str, update_id: int) -> None:
+        window = self._windows.get(connector_id)
+        if window is not None:
+            window.pop(update_id, None)
+
+    def size(self) -> int:
+        return sum(len(window) for window in self._windows.values())
+
+
+class RedisUpdateWindow:
+    """
+    Ventana compartida entre instancias: `SET NX EX` por update_id. El
+    cliente se crea por event loop, igual que el de Telegram.
+    """
+
+    KEY_PREFIX = "telegram:update"
+
+    def __init__(self, url: str, ttl_seconds: int):
+        self.url = url
+        self.ttl_seconds = ttl_seconds
+        self._client: Any = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def get_client(self) -> Any:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            # redis solo se importa si se configura este backend
+            from redis.asyncio import Redis
+
+            self._client = Redis.from_url(self.url)
+            self._loop = loop
+        return self._client
+
+    def key(self, connector_id: str, update_id: int) -> str:
+        return f"{self.KEY_PREFIX}:{connector_id}:{update_id}"
+
+    async def claim(self, connector_id: str, update_id: int) -> bool:
+        claimed = await self.get_client().set(
+            self.key(connector_id, update_id), 1, nx=True, ex=self.ttl_seconds
+        )
+        return bool(claimed)
+
+    async def release(self, connector_id: str, update_id: int) -> None:
+        await self.get_client().delete(self.key(connector_id, update_id))
+
+    async def close(self) -> None:
+        client, self._client, self._loop = self._client, None, None
+        if client is not None:
+            await client.aclose()
+
+
+class UpdateDeduplicator:
+    """
+    Descarta los `update_id` que Telegram reenvía cuando el webhook tardó o
+    falló. Un update se reclama antes de procesarlo y se libera si el
+    procesamiento falla, para que el reintento de Telegram sí se procese.
+
+    Con `BACKEND=redis` la ventana se comparte entre instancias; si Redis
+    falla se usa la ventana en memoria en lugar de rechazar el webhook.
+    """
+
+    def __init__(self, config: DedupeSettings, redis_url: str | None = None):
+        self.config = config
+        self.memory = MemoryUpdateWindow(config.WINDOW_SIZE, config.MAX_CONNECTORS)
+        self.redis: RedisUpdateWindow | None = None
+        if config.BACKEND == DedupeBackend.REDIS:
+            if not redis_url:
+                raise ValueError("DEDUPE__BACKEND=redis requiere REDIS_URL")
+            self.redis = RedisUpdateWindow(redis_url, config.TTL_SECONDS)
+        self.duplicates = 0
+        self.backend_errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.config.ENABLED and self.config.WINDOW_SIZE > 0
+
+    async def claim(self, connector_id: Any, update_id: int) -> bool:
+        """`True` si el update es nuevo y debe procesarse; `False` si es un duplicado."""
+        if not self.enabled:
+            return True
+        key = str(connector_id)
+        if self.redis is not None:
+            try:
+                claimed = await self.redis.claim(key, update_id)
+            except Exception as e:  # noqa: BLE001
+                self.backend_errors += 1
+                logger.warning(f"Dedupe en Redis no disponible, se usa la ventana en memoria: {type(e).__name__}")
+                claimed = self.memory.claim(key, update_id)
+        else:
+            claimed = self.memory.claim(key, update_id)
+        if not claimed:
+            self.duplicates += 1
+            webhook_duplicate_updates.inc()
+        return claimed
+
+    async def release(self, connector_id: Any, update_id: int) -> None:
+        if not self.enabled:
+            return
+        key = str(connector_id)
+        self.memory.release(key, update_id)
+        if self.redis is not None:
+            try:
+                await self.redis.release(key, update_id)
+            except Exception as e:  # noqa: BLE001
+                self.backend_errors += 1
+                logger.warning(f"No se pudo liberar el update_id en Redis: {type(e).__name__}")
+
+    async def close(self) -> None:
+        if self.redis is not None:
+            await self.redis.close()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "backend": str(self.config.BACKEND),
+            "window_size": self.config.WINDOW_SIZE,
+            "tracked": self.memory.size(),
+            "duplicates": self.duplicates,
+            "backend_errors": self.backend_errors,
+        }
+
+
+update_deduplicator = UpdateDeduplicator(
+    settings.DEDUPE,
+    settings.REDIS_URL.unicode_string() if settings.REDIS_URL else None,
+)
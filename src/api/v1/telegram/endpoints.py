@@ -1,9 +1,10 @@
 # endpoints.py
 from uuid import UUID
-from fastapi import Request, Header, APIRouter
+from fastapi import Request, Header, APIRouter, Query
 from shared.base_responses import EnvelopeResponse
-from api.v1.telegram.schema import SendMessageIn, SendMessageOut, RequestTelegramConnectorCreateSchema
-from api.v1.telegram.services import ConnectTelegramService, TelegramWebhookService, SendMessageService
+from api.v1.telegram.uploads import MediaKind
+from api.v1.telegram.schema import SendMessageIn, SendMessageOut, SendMediaOut, RequestTelegramConnectorCreateSchema, BroadcastIn, BroadcastJobOut, OutboxEntryOut, OutboxRedriveIn, OutboxRedriveOut, ChatHistoryOut, ConnectorPageOut
+from api.v1.telegram.services import ConnectTelegramService, TelegramWebhookService, SendMessageService, SendMediaService, StatsService, BroadcastService, OutboxService, HistoryService, ListConnectorsService
 
 router = APIRouter(prefix="/telegram", tags=["Telegram"])
 
@@ -14,6 +15,14 @@ async def connect_telegram(
 ) -> EnvelopeResponse:
     return await ConnectTelegramService.connect(payload, request)
 
+@router.get("/connectors", response_model=ConnectorPageOut, summary="Conectores del usuario")
+async def list_connectors(
+    request: Request,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: str | None = Query(None, description="`next_cursor` de la página anterior")
+) -> EnvelopeResponse:
+    return await ListConnectorsService.list_connectors(request, limit=limit, cursor=cursor)
+
 @router.post("/webhook/{telegram_connector_id}")
 async def telegram_webhook(
         request: Request,
@@ -29,3 +38,96 @@ async def send_message(
     request: Request
 ) -> EnvelopeResponse:
     return await SendMessageService.send(telegram_connector_id, payload, request)
+
+SEND_MEDIA_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {
+                        "photo|document|voice": {"type": "string", "format": "binary"},
+                        "chat_id": {"type": "integer"},
+                        "caption": {"type": "string"},
+                    },
+                }
+            },
+            "application/octet-stream": {"schema": {"type": "string", "format": "binary"}},
+        },
+    }
+}
+
+@router.post(
+    "/send/{telegram_connector_id}/{kind}",
+    response_model=SendMediaOut,
+    summary="Enviar una foto, documento o nota de voz",
+    openapi_extra=SEND_MEDIA_BODY
+)
+async def send_media(
+    telegram_connector_id: UUID,
+    kind: MediaKind,
+    request: Request,
+    chat_id: int | None = Query(None, description="Requerido si no va en el formulario"),
+    caption: str | None = Query(None),
+    filename: str | None = Query(None, description="Nombre del archivo cuando el cuerpo es el archivo tal cual")
+) -> EnvelopeResponse:
+    return await SendMediaService.send(telegram_connector_id, kind, request, chat_id=chat_id, caption=caption, filename=filename)
+
+BROADCAST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {"schema": BroadcastIn.model_json_schema()},
+            "application/x-ndjson": {"schema": SendMessageIn.model_json_schema()},
+        },
+    }
+}
+
+@router.post(
+    "/broadcast/{telegram_connector_id}",
+    status_code=202,
+    response_model=BroadcastJobOut,
+    summary="Difundir un mensaje a muchos chats",
+    openapi_extra=BROADCAST_BODY
+)
+async def broadcast(
+    telegram_connector_id: UUID,
+    request: Request
+) -> EnvelopeResponse:
+    return await BroadcastService.create(telegram_connector_id, request)
+
+@router.get("/broadcast/jobs/{job_id}", response_model=BroadcastJobOut, summary="Progreso de una difusión")
+async def broadcast_status(
+    job_id: UUID,
+    request: Request,
+    offset: int = Query(0, ge=0),
+    limit: int | None = Query(None, ge=1, le=1000, description="Incluye hasta `limit` resultados por destinatario")
+) -> EnvelopeResponse:
+    return await BroadcastService.status(job_id, request, offset=offset, limit=limit)
+
+@router.get("/outbox/dead", response_model=list[OutboxEntryOut], summary="Mensajes que agotaron sus reintentos")
+async def outbox_dead(
+    request: Request,
+    limit: int = Query(100, ge=1, le=1000),
+    after_id: int | None = Query(None, description="Último id de la página anterior")
+) -> EnvelopeResponse:
+    return await OutboxService.dead(request, limit=limit, after_id=after_id)
+
+@router.post("/outbox/redrive", response_model=OutboxRedriveOut, summary="Reencolar mensajes del dead letter")
+async def outbox_redrive(payload: OutboxRedriveIn, request: Request) -> EnvelopeResponse:
+    return await OutboxService.redrive(payload, request)
+
+@router.get("/history/{telegram_connector_id}/{chat_id}", response_model=ChatHistoryOut, summary="Historial de un chat")
+async def chat_history(
+    telegram_connector_id: UUID,
+    chat_id: int,
+    request: Request,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str | None = Query(None, description="`next_cursor` de la página anterior")
+) -> EnvelopeResponse:
+    return await HistoryService.history(telegram_connector_id, chat_id, request, limit=limit, cursor=cursor)
+
+@router.get("/stats", summary="Estadísticas internas del conector")
+async def stats(request: Request) -> EnvelopeResponse:
+    return await StatsService.stats(request)
@@ -0,0 +1,296 @@
+import asyncio
+import time
+from collections import deque
+from collections.abc import Iterable, Sequence
+from typing import Any
+
+import httpx
+from loguru import logger
+
+from api.v1.telegram.media import media_relay
+from api.v1.telegram.schema import WebhookMessageReceived
+from core.settings import settings
+from core.settings.base import ForwarderSettings
+from shared.log import hot_logger
+from shared.metrics import (
+    forward_duration,
+    forward_messages,
+    forward_queue_depth,
+    forward_requests_in_flight
+)
+from shared.tracing import TraceContext, tracer
+
+
+# (payload, X-User-Id, instante de encolado, traza de la petición)
+QueueItem = tuple[dict[str, Any], str, float, TraceContext | None]
+
+
+class MessageForwarder:
+    """
+    Cola acotada en memoria que reenvía los mensajes recibidos a
+    `WEBHOOK_MESSAGE_RECEIVED` con un pool de workers.
+
+    El webhook solo encola y responde; la entrega ocurre en segundo plano.
+    Con `WORKERS=0` la entrega se hace en línea (p. ej. en Lambda, donde no
+    hay tareas vivas después de responder).
+
+    Con `BATCH_MAX_SIZE > 1` cada worker junta hasta ese número de mensajes
+    o espera como mucho `BATCH_MAX_WAIT` segundos, y los entrega agrupados
+    por `X-User-Id` en un solo POST cuyo cuerpo es un arreglo JSON.
+
+    Cada mensaje guarda la traza de la petición que lo encoló; la entrega
+    registra en ella el span `forward` y reenvía el trace id en `X-Trace-Id`
+    (separados por comas si el lote junta varias trazas).
+    """
+
+    SAMPLES = 2048
+
+    def __init__(self, config: ForwarderSettings, url: str):
+        self.config = config
+        self.url = url
+        self._queue: asyncio.Queue[QueueItem] | None = None
+        self._workers: list[asyncio.Task[None]] = []
+        self._http_client: httpx.AsyncClient | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self.enqueued = 0
+        self.delivered = 0
+        self.failed = 0
+        self.dropped = 0
+        self.requests = 0
+        # Muestras recientes (ventana acotada) para percentiles
+        self._latencies: deque[float] = deque(maxlen=self.SAMPLES)
+        self._batch_sizes: deque[int] = deque(maxlen=self.SAMPLES)
+
+    # ---------- ciclo de vida ---------- #
+
+    @property
+    def inline(self) -> bool:
+        return self.config.WORKERS <= 0
+
+    @property
+    def batching(self) -> bool:
+        return self.config.BATCH_MAX_SIZE > 1
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(
+                timeout=self.config.TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=self.config.MAX_CONNECTIONS,
+                    max_keepalive_connections=self.config.MAX_CONNECTIONS,
+                ),
+            )
+        return self._http_client
+
+    async def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            self._restart_dead_workers()
+            return
+        # Estado de otro loop (p. ej. tests) no es reutilizable
+        self._queue = None
+        self._workers = []
+        self._http_client = None
+        self._loop = loop
+        if self.inline:
+            logger.info("Forwarder en modo en línea (WORKERS=0)")
+            return
+        self._queue = asyncio.Queue(maxsize=self.config.QUEUE_MAX_SIZE)
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"forwarder-worker-{i}")
+            for i in range(self.config.WORKERS)
+        ]
+        logger.info(f"Forwarder iniciado con {self.config.WORKERS} workers")
+
+    def _restart_dead_workers(self) -> None:
+        for i, worker in enumerate(self._workers):
+            if worker.done() and not worker.cancelled():
+                logger.error(f"Worker {worker.get_name()} terminado inesperadamente, se reinicia")
+                self._workers[i] = asyncio.create_task(self._worker(), name=worker.get_name())
+
+    async def stop(self) -> None:
+        if self._loop is None:
+            return
+        if self._queue is not None:
+            # join también espera los lotes que un worker ya sacó de la cola
+            if not self._queue.empty():
+                logger.info(f"Drenando {self._queue.qsize()} mensajes pendientes")
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=self.config.SHUTDOWN_TIMEOUT)
+            except asyncio.TimeoutError:
+                logger.error(f"Forwarder detenido con {self._queue.qsize()} mensajes sin entregar")
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        if self._http_client is not None:
+            await self._http_client.aclose()
+        self._queue = None
+        self._workers = []
+        self._http_client = None
+        self._loop = None
+        logger.info("Forwarder detenido")
+
+    # ---------- encolado y entrega ---------- #
+
+    async def enqueue(self, message: WebhookMessageReceived) -> bool:
+        payload = message.model_dump(mode="json")
+        user_id = str(message.user_id)
+        trace = tracer.current()
+        await self.start()
+        if self._queue is None:
+            return await self.deliver(payload, user_id, [time.monotonic()], traces=[trace])
+        try:
+            self._queue.put_nowait((payload, user_id, time.monotonic(), trace))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            forward_messages.inc("dropped")
+            logger.error(f"Cola de reenvío llena, mensaje descartado message_id={message.message_id}")
+            return False
+        self.enqueued += 1
+        return True
+
+    async def _worker(self) -> None:
+        assert self._queue is not None
+        while True:
+            item = await self._queue.get()
+            if not self.batching:
+                payload, user_id, enqueued_at, trace = item
+                try:
+                    await self._deliver_safely(payload, user_id, [enqueued_at], [trace])
+                finally:
+                    self._queue.task_done()
+                continue
+
+            batch = [item]
+            try:
+                await self._fill_batch(batch)
+                await self._deliver_batch(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _fill_batch(self, batch: list[QueueItem]) -> None:
+        """Completa el lote hasta `BATCH_MAX_SIZE` o hasta agotar `BATCH_MAX_WAIT`."""
+        assert self._queue is not None
+        deadline = time.monotonic() + self.config.BATCH_MAX_WAIT
+        while len(batch) < self.config.BATCH_MAX_SIZE:
+            try:
+                # Lo que ya está en la cola se toma sin esperar
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                return
+
+    async def _deliver_batch(self, batch: list[QueueItem]) -> None:
+        self._batch_sizes.append(len(batch))
+        groups: dict[str, tuple[list[dict[str, Any]], list[float], list[TraceContext | None]]] = {}
+        for payload, user_id, enqueued_at, trace in batch:
+            payloads, enqueued, traces = groups.setdefault(user_id, ([], [], []))
+            payloads.append(payload)
+            enqueued.append(enqueued_at)
+            traces.append(trace)
+        await asyncio.gather(*(
+            self._deliver_safely(payloads, user_id, enqueued, traces)
+            for user_id, (payloads, enqueued, traces) in groups.items()
+        ))
+
+    async def _deliver_safely(
+        self,
+        payload: dict[str, Any] | list[dict[str, Any]],
+        user_id: str,
+        enqueued_at: list[float],
+        traces: Sequence[TraceContext | None]
+    ) -> bool:
+        """`deliver` para los workers: un error inesperado cuenta como fallo en vez de terminar el worker."""
+        start = time.perf_counter()
+        try:
+            return await self.deliver(payload, user_id, enqueued_at, traces=traces)
+        except Exception:
+            self._record_failure(len(enqueued_at), start)
+            logger.exception(f"Error inesperado al reenviar {len(enqueued_at)} mensajes")
+            return False
+
+    async def deliver(
+        self,
+        payload: dict[str, Any] | list[dict[str, Any]],
+        user_id: str,
+        enqueued_at: list[float],
+        traces: Sequence[TraceContext | None] = ()
+    ) -> bool:
+        """Un POST a `WEBHOOK_MESSAGE_RECEIVED`; también lo usa el outbox."""
+        await media_relay.attach(payload)
+        count = len(enqueued_at)
+        self.requests += 1
+        headers = {"X-User-Id": user_id}
+        trace_ids = list(dict.fromkeys(trace[0] for trace in traces if trace is not None))
+        if trace_ids:
+            headers[settings.TRACING.HEADER] = ",".join(trace_ids)
+        start = time.perf_counter()
+        forward_requests_in_flight.inc()
+        try:
+            with tracer.fan_out("forward", traces, messages=count) as spans:
+                resp = await self._get_http_client().post(self.url, json=payload, headers=headers)
+                for span in spans or ():
+                    span.set("status", resp.status_code)
+        except httpx.HTTPError as e:
+            self._record_failure(count, start)
+            logger.error(f"Error al enviar webhook: {type(e).__name__}")
+            return False
+        finally:
+            forward_requests_in_flight.dec()
+        if resp.status_code != 200:
+            self._record_failure(count, start)
+            logger.error(f"Error al enviar webhook: {resp.text}")
+            return False
+        forward_duration.observe(time.perf_counter() - start, "ok")
+        forward_messages.inc("ok", amount=count)
+        self.delivered += count
+        now = time.monotonic()
+        self._latencies.extend(now - t for t in enqueued_at)
+        hot_logger.info("Webhook entregado correctamente ({} mensajes)", count)
+        return True
+
+    def _record_failure(self, count: int, start: float) -> None:
+        self.failed += count
+        forward_duration.observe(time.perf_counter() - start, "error")
+        forward_messages.inc("error", amount=count)
+
+    # ---------- métricas ---------- #
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "workers": len(self._workers),
+            "queue_depth": self.queue_depth(),
+            "queue_max_size": self.config.QUEUE_MAX_SIZE,
+            "enqueued": self.enqueued,
+            "delivered": self.delivered,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "requests": self.requests,
+            "batch_max_size": self.config.BATCH_MAX_SIZE,
+            "batch_size": _percentiles(self._batch_sizes),
+            "latency_ms": _percentiles(latency * 1000 for latency in self._latencies),
+        }
+
+
+def _percentiles(samples: Iterable[float]) -> dict[str, float]:
+    values = sorted(samples)
+    if not values:
+        return {}
+    def at(q: float) -> float:
+        return round(values[min(len(values) - 1, int(q * len(values)))], 3)
+    return {"p50": at(0.50), "p95": at(0.95), "p99": at(0.99), "max": round(values[-1], 3)}
+
+
+message_forwarder = MessageForwarder(settings.FORWARDER, settings.WEBHOOK_MESSAGE_RECEIVED)
+forward_queue_depth.set_function(message_forwarder.queue_depth)
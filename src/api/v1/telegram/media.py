@@ -0,0 +1,211 @@
+import asyncio
+from collections.abc import AsyncIterator
+from typing import Any
+
+import httpx
+from loguru import logger
+
+from api.v1.telegram.client import TelegramClient
+from api.v1.telegram.repositories import AsyncTelegramConnectorRepository
+from core.settings import settings
+from core.settings.base import MediaSettings
+from shared.cache import AsyncTTLCache
+from shared.metrics import media_bytes, media_files
+
+
+class MediaRelayError(Exception):
+    pass
+
+
+def media_files_of(payload: dict[str, Any]) -> list[tuple[str, dict[str, Any]]]:
+    """
+    Archivos de un mensaje a retransmitir: de la foto solo el tamaño mayor
+    (el último), más el documento y el sticker si los hay.
+    """
+    files: list[tuple[str, dict[str, Any]]] = []
+    if payload.get("photo"):
+        files.append(("photo", payload["photo"][-1]))
+    for kind in ("document", "sticker"):
+        if payload.get(kind):
+            files.append((kind, payload[kind]))
+    return files
+
+
+class MediaRelay:
+    """
+    Copia los archivos de los mensajes de Telegram a `MEDIA.RELAY_URL` para
+    que el backend destino no tenga que descargarlos. Corre en la entrega
+    del forwarder (y del outbox), no en el webhook.
+
+    - `getFile` se llama una vez por `file_id` mientras su `file_path` siga
+      vigente (`FILE_PATH_TTL_SECONDS`).
+    - Cada archivo se retransmite una sola vez por usuario y proceso: las
+      peticiones concurrentes del mismo archivo esperan a la primera. El
+      `file_unique_id` es el mismo en todos los bots, así que la caché y la
+      ruta del objeto van por `(user_id, file_unique_id)`.
+    - La descarga y la subida van en streaming por bloques de `CHUNK_SIZE`;
+      nunca hay un archivo completo en memoria.
+
+    Si un archivo falla, por el motivo que sea, el mensaje se reenvía igual
+    sin él en `media` y el backend puede descargarlo con su `file_id`.
+    """
+
+    def __init__(self, config: MediaSettings):
+        if config.ENABLED and not config.RELAY_URL:
+            raise ValueError("MEDIA__ENABLED requiere MEDIA__RELAY_URL")
+        self.config = config
+        self.relay_url = (config.RELAY_URL or "").rstrip("/")
+        self.file_paths: AsyncTTLCache[str, str] = AsyncTTLCache(
+            max_size=config.FILE_PATH_CACHE_SIZE,
+            ttl_seconds=config.FILE_PATH_TTL_SECONDS
+        )
+        self.relayed: AsyncTTLCache[tuple[str, str], dict[str, Any]] = AsyncTTLCache(
+            max_size=config.RELAYED_CACHE_SIZE,
+            ttl_seconds=config.RELAYED_TTL_SECONDS
+        )
+        self._http_client: httpx.AsyncClient | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self.files = 0
+        self.bytes = 0
+        self.skipped = 0
+        self.errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.config.ENABLED
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._http_client is None or self._loop is not loop:
+            self._http_client = httpx.AsyncClient(timeout=self.config.TIMEOUT)
+            self._loop = loop
+        return self._http_client
+
+    async def close(self) -> None:
+        client, self._http_client, self._loop = self._http_client, None, None
+        if client is not None:
+            await client.aclose()
+
+    # ---------- mensajes ---------- #
+
+    async def attach(self, payload: dict[str, Any] | list[dict[str, Any]]) -> None:
+        """Retransmite los archivos de uno o varios mensajes y los agrega en `media`."""
+        if not self.enabled:
+            return
+        payloads = payload if isinstance(payload, list) else [payload]
+        await asyncio.gather(*(self._attach_one(item) for item in payloads if media_files_of(item)))
+
+    async def _attach_one(self, payload: dict[str, Any]) -> None:
+        try:
+            _, connector = await AsyncTelegramConnectorRepository.get_by_id_cached(payload["connector_id"])
+        except Exception as e:
+            self.errors += 1
+            media_files.inc("error")
+            logger.error(f"No se pudo obtener el conector para retransmitir archivos: {type(e).__name__}: {e}")
+            return
+        if connector is None:
+            return
+        results = await asyncio.gather(*(
+            self.relay(connector.bot_token, payload["user_id"], kind, file)
+            for kind, file in media_files_of(payload)
+        ))
+        payload["media"] = [media for media in results if media is not None]
+
+    # ---------- archivos ---------- #
+
+    async def relay(self, bot_token: str, user_id: str, kind: str, file: dict[str, Any]) -> dict[str, Any] | None:
+        if (file.get("file_size") or 0) > self.config.MAX_FILE_SIZE:
+            self.skipped += 1
+            media_files.inc("skipped")
+            return None
+        loaded = False
+
+        async def load() -> dict[str, Any]:
+            nonlocal loaded
+            loaded = True
+            return await self._relay(bot_token, user_id, kind, file)
+
+        try:
+            media = await self.relayed.get_or_load((user_id, file["file_unique_id"]), load)
+        except Exception as e:
+            # Incluye respuestas inesperadas de Telegram (sin JSON, sin `file_path`)
+            self.errors += 1
+            media_files.inc("error")
+            logger.error(f"No se pudo retransmitir {kind} {file.get('file_unique_id')}: {type(e).__name__}: {e}")
+            return None
+        if not loaded:
+            media_files.inc("deduplicated")
+        return media
+
+    async def resolve_file_path(self, bot_token: str, file_id: str) -> str:
+        async def load() -> str:
+            response = await TelegramClient.post(bot_token, "getFile", {"file_id": file_id})
+            data = response.json()
+            if not data.get("ok"):
+                raise MediaRelayError(f"getFile: {data.get('description', response.status_code)}")
+            return data["result"]["file_path"]
+
+        file_path = await self.file_paths.get_or_load(file_id, load)
+        assert file_path is not None
+        return file_path
+
+    async def _relay(self, bot_token: str, user_id: str, kind: str, file: dict[str, Any]) -> dict[str, Any]:
+        url = f"{self.relay_url}/{user_id}/{file['file_unique_id']}"
+        mime_type = file.get("mime_type") or ("image/jpeg" if kind == "photo" else None)
+        for attempt in range(2):
+            file_path = await self.resolve_file_path(bot_token, file["file_id"])
+            async with TelegramClient.get_http_client().stream("GET", TelegramClient.file_path(bot_token, file_path)) as download:
+                if download.status_code == 404 and attempt == 0:
+                    # El enlace venció antes que la caché: se pide otro `file_path`
+                    self.file_paths.invalidate(file["file_id"])
+                    continue
+                if download.status_code != 200:
+                    raise MediaRelayError(f"descarga: HTTP {download.status_code}")
+                size = await self._upload(url, download, user_id, mime_type)
+            break
+        self.files += 1
+        self.bytes += size
+        media_files.inc("relayed")
+        media_bytes.inc(amount=size)
+        return {
+            "kind": kind,
+            "file_id": file["file_id"],
+            "file_unique_id": file["file_unique_id"],
+            "url": url,
+            "size": size,
+            "mime_type": mime_type,
+        }
+
+    async def _upload(self, url: str, download: httpx.Response, user_id: str, mime_type: str | None) -> int:
+        """PUT con el cuerpo de la descarga, bloque a bloque. Devuelve los bytes enviados."""
+        size = 0
+
+        async def body() -> AsyncIterator[bytes]:
+            nonlocal size
+            async for chunk in download.aiter_bytes(self.config.CHUNK_SIZE):
+                size += len(chunk)
+                yield chunk
+
+        headers = {"X-User-Id": user_id, "Content-Type": mime_type or "application/octet-stream"}
+        if "content-length" in download.headers:
+            headers["Content-Length"] = download.headers["content-length"]
+        response = await self._get_http_client().put(url, content=body(), headers=headers)
+        if response.status_code >= 300:
+            raise MediaRelayError(f"subida: HTTP {response.status_code}")
+        return size
+
+    # ---------- métricas ---------- #
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "files": self.files,
+            "bytes": self.bytes,
+            "skipped": self.skipped,
+            "errors": self.errors,
+            "file_paths": self.file_paths.stats(),
+            "relayed": self.relayed.stats(),
+        }
+
+
+media_relay = MediaRelay(settings.MEDIA)
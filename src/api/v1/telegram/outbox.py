@@ -0,0 +1,214 @@
+import asyncio
+import time
+from typing import Any
+
+from loguru import logger
+from sqlalchemy import Row
+
+from api.v1.telegram.archive import message_archive
+from api.v1.telegram.forwarder import message_forwarder
+from api.v1.telegram.repositories import AsyncForwardOutboxRepository
+from api.v1.telegram.schema import WebhookMessageReceived
+from core.settings import settings
+from core.settings.base import OutboxSettings
+from db.posgresql.connection import dispose_engines
+from shared.group_commit import GroupCommitter
+from shared.metrics import outbox_messages
+
+# Entrada del outbox y, si el archivo está activo, su fila en `telegram_messages`
+OutboxWrite = tuple[dict[str, Any], dict[str, Any] | None]
+
+
+class OutboxWorker:
+    """
+    Entrega durable a `WEBHOOK_MESSAGE_RECEIVED` a través de la tabla
+    `forward_outbox`. El webhook inserta el mensaje y responde; los workers
+    reclaman lotes con `FOR UPDATE SKIP LOCKED` (varios workers y varias
+    instancias drenan sin pisarse), los entregan con el mismo cliente que el
+    forwarder y en una sola sentencia borran los entregados o reprograman
+    los fallidos con backoff exponencial. Tras `MAX_ATTEMPTS` la fila queda
+    en `dead` hasta que se reencola con el API de redrive.
+
+    Entrega al menos una vez: si un worker muere tras entregar y antes de
+    confirmar, el lease vence y el mensaje se reenvía.
+    """
+
+    def __init__(self, config: OutboxSettings):
+        self.config = config
+        self._workers: list[asyncio.Task[None]] = []
+        self._wake: asyncio.Event | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._committer: GroupCommitter[OutboxWrite] = GroupCommitter(self._write, config.BATCH_SIZE)
+        self.delivered = 0
+        self.retried = 0
+        self.dead = 0
+        self.errors = 0
+
+    # ---------- ciclo de vida ---------- #
+
+    async def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self._wake = asyncio.Event()
+        await message_forwarder.start()
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"outbox-worker-{i}")
+            for i in range(self.config.WORKERS)
+        ]
+        logger.info(f"Outbox iniciado con {self.config.WORKERS} workers")
+
+    async def stop(self) -> None:
+        if self._loop is None:
+            return
+        # Lo que no se confirme vuelve a estar disponible al vencer el lease
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._wake = None
+        self._loop = None
+        logger.info("Outbox detenido")
+
+    # ---------- escritura ---------- #
+
+    async def enqueue(self, message: WebhookMessageReceived) -> bool:
+        """
+        Persiste el mensaje y regresa cuando su fila está confirmada. Los
+        webhooks concurrentes se agrupan (group commit), así que el costo
+        del commit se reparte entre todos.
+        """
+        entry = {
+            "user_id": message.user_id,
+            "connector_id": message.connector_id,
+            "payload": message.model_dump(mode="json"),
+        }
+        await self._committer.submit((entry, message_archive.row(message) if message_archive.enabled else None))
+        return True
+
+    async def _write(self, batch: list[OutboxWrite]) -> None:
+        archive = [row for _, row in batch if row is not None]
+        if archive:
+            await message_archive.ensure_partitions()
+        await AsyncForwardOutboxRepository.add_many([entry for entry, _ in batch], archive=archive)
+        outbox_messages.inc("enqueued", amount=len(batch))
+        if self._wake is not None and self._loop is asyncio.get_running_loop():
+            self._wake.set()
+
+    # ---------- drenado ---------- #
+
+    async def _worker(self) -> None:
+        assert self._wake is not None
+        while True:
+            try:
+                claimed = await self.drain_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:  # noqa: BLE001
+                self.errors += 1
+                logger.error(f"Error drenando el outbox: {type(e).__name__}: {e}")
+                await asyncio.sleep(self.config.POLL_INTERVAL)
+                continue
+            if claimed < self.config.BATCH_SIZE:
+                # Sin trabajo acumulado: espera un insert local o el siguiente sondeo
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=self.config.POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def drain_once(self) -> int:
+        """Reclama, entrega y confirma un lote. Devuelve cuántas filas reclamó."""
+        _, claimed = await AsyncForwardOutboxRepository.claim(
+            self.config.BATCH_SIZE, self.config.LEASE_SECONDS, self.config.MAX_ATTEMPTS
+        )
+        rows = [row for row in claimed if not row.exhausted]
+        expired = len(claimed) - len(rows)
+        if expired:
+            self.dead += expired
+            outbox_messages.inc("dead", amount=expired)
+            logger.error(f"{expired} mensajes del outbox agotaron sus intentos sin confirmarse y pasaron a dead letter")
+        if not rows:
+            return 0
+
+        delivered, failed = await self._deliver(rows)
+        if delivered:
+            await AsyncForwardOutboxRepository.complete(delivered)
+            self.delivered += len(delivered)
+            outbox_messages.inc("delivered", amount=len(delivered))
+        if failed:
+            _, dead = await AsyncForwardOutboxRepository.fail(
+                failed,
+                "delivery failed",
+                self.config.MAX_ATTEMPTS,
+                self.config.BACKOFF_BASE,
+                self.config.BACKOFF_MAX
+            )
+            self.retried += len(failed) - dead
+            self.dead += dead
+            outbox_messages.inc("retried", amount=len(failed) - dead)
+            if dead:
+                outbox_messages.inc("dead", amount=dead)
+                logger.error(f"{dead} mensajes del outbox agotaron sus intentos y pasaron a dead letter")
+        return len(rows)
+
+    async def _deliver(self, rows: list[Row]) -> tuple[list[int], list[int]]:
+        """Entrega el lote agrupado por usuario si el forwarder agrupa, o mensaje a mensaje."""
+        now = time.monotonic()
+        groups: list[tuple[str, list[Row]]] = []
+        if message_forwarder.batching:
+            by_user: dict[str, list[Row]] = {}
+            for row in rows:
+                by_user.setdefault(str(row.user_id), []).append(row)
+            groups = list(by_user.items())
+        else:
+            groups = [(str(row.user_id), [row]) for row in rows]
+
+        async def deliver(user_id: str, group: list[Row]) -> bool:
+            payload: Any = [row.payload for row in group] if message_forwarder.batching else group[0].payload
+            try:
+                return await message_forwarder.deliver(payload, user_id, [now] * len(group))
+            except Exception as e:
+                # Sin esto el lote entero quedaría sin confirmar hasta que venza el lease
+                logger.error(f"Error inesperado entregando {len(group)} mensajes del outbox: {type(e).__name__}: {e}")
+                return False
+
+        results = await asyncio.gather(*(deliver(user_id, group) for user_id, group in groups))
+        delivered: list[int] = []
+        failed: list[int] = []
+        for (_, group), ok in zip(groups, results):
+            (delivered if ok else failed).extend(row.id for row in group)
+        return delivered, failed
+
+    # ---------- métricas ---------- #
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "enabled": self.config.ENABLED,
+            "workers": sum(1 for worker in self._workers if not worker.done()),
+            "enqueued": self._committer.written,
+            "write_batches": self._committer.batches,
+            "delivered": self.delivered,
+            "retried": self.retried,
+            "dead": self.dead,
+            "errors": self.errors,
+        }
+
+
+outbox_worker = OutboxWorker(settings.OUTBOX)
+
+
+async def run_outbox() -> None:
+    """Worker dedicado que drena el outbox (p. ej. junto a una API en Lambda)."""
+    await outbox_worker.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await outbox_worker.stop()
+        await message_forwarder.stop()
+        await dispose_engines()
+
+
+if __name__ == "__main__":
+    asyncio.run(run_outbox())
@@ -0,0 +1,220 @@
+import asyncio
+from typing import Any
+from uuid import UUID
+
+import httpx
+from loguru import logger
+
+from api.v1.telegram.client import TelegramClient
+from api.v1.telegram.forwarder import message_forwarder
+from api.v1.telegram.repositories import AsyncTelegramConnectorRepository
+from api.v1.telegram.updates import ALLOWED_UPDATES, process_update
+from core.settings import settings
+from core.settings.base import PollingSettings
+from db.posgresql.connection import dispose_engines
+from db.posgresql.models.public import TelegramConnector
+
+
+class TelegramPollingError(Exception):
+    pass
+
+
+class LongPollingEngine:
+    """
+    Ingesta de updates por `getUpdates` (long polling) para muchos conectores
+    en un mismo proceso: una tarea por conector, cada una con su `offset`.
+
+    Cada ronda trae hasta `LIMIT` updates y los pasa por `process_update`, el
+    mismo camino que el webhook. El `offset` solo avanza en memoria y tras
+    procesar el update: Telegram confirma los updates en la siguiente
+    llamada, así que tras un reinicio se reciben de nuevo los no confirmados
+    (entrega al menos una vez). Un update que falla `MAX_UPDATE_ATTEMPTS`
+    veces se descarta (se loguea y cuenta en `dropped`) para no atascar al
+    conector.
+
+    La lista de conectores se sincroniza con la base cada `SYNC_INTERVAL`
+    segundos. Con HTTP/2 todas las esperas comparten pocas conexiones; con
+    HTTP/1.1 `TELEGRAM.MAX_CONNECTIONS` debe superar el número de conectores.
+    """
+
+    def __init__(self, config: PollingSettings):
+        self.config = config
+        self._tasks: dict[UUID, asyncio.Task[None]] = {}
+        self._offsets: dict[UUID, int] = {}
+        self._sync_task: asyncio.Task[None] | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self.polls = 0
+        self.updates = 0
+        self.errors = 0
+        self.dropped = 0
+
+    # ---------- ciclo de vida ---------- #
+
+    async def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._tasks = {}
+        self._loop = loop
+        self._sync_task = asyncio.create_task(self._sync_loop(), name="polling-sync")
+        logger.info("Motor de long polling iniciado")
+
+    async def stop(self) -> None:
+        if self._loop is None:
+            return
+        tasks = list(self._tasks.values())
+        if self._sync_task is not None:
+            tasks.append(self._sync_task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = {}
+        self._sync_task = None
+        self._loop = None
+        logger.info("Motor de long polling detenido")
+
+    def add(self, connector: TelegramConnector) -> None:
+        task = self._tasks.get(connector.id)
+        if task is not None and not task.done():
+            return
+        self._tasks[connector.id] = asyncio.create_task(self._poll(connector), name=f"polling-{connector.id}")
+        logger.info(f"Polling iniciado para el conector {connector.id}")
+
+    def remove(self, connector_id: UUID) -> None:
+        task = self._tasks.pop(connector_id, None)
+        self._offsets.pop(connector_id, None)
+        if task is not None:
+            task.cancel()
+            logger.info(f"Polling detenido para el conector {connector_id}")
+
+    async def sync(self) -> None:
+        """Alinea las tareas con los conectores activos en la base."""
+        _, connectors = await AsyncTelegramConnectorRepository.get_all()
+        active = {connector.id: connector for connector in connectors}
+        for connector_id in set(self._tasks) - set(active):
+            self.remove(connector_id)
+        for connector in active.values():
+            self.add(connector)
+
+    async def _sync_loop(self) -> None:
+        while True:
+            try:
+                await self.sync()
+            except Exception as e:
+                logger.error(f"Error al sincronizar conectores de polling: {type(e).__name__}")
+            await asyncio.sleep(self.config.SYNC_INTERVAL)
+
+    # ---------- polling ---------- #
+
+    async def _poll(self, connector: TelegramConnector) -> None:
+        backoff = 1.0
+        webhook_deleted = False
+        while True:
+            try:
+                if not webhook_deleted:
+                    # getUpdates responde 409 mientras el bot tenga un webhook
+                    result = await self._call(connector, "deleteWebhook", {"drop_pending_updates": False})
+                    webhook_deleted = result is not None
+                updates = await self.fetch(connector)
+            except (httpx.HTTPError, TelegramPollingError, ValueError) as e:
+                self.errors += 1
+                logger.error(f"Error de polling en el conector {connector.id}: {e}; reintento en {backoff}s")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.config.MAX_BACKOFF)
+                continue
+            backoff = 1.0
+
+            for update in updates:
+                await self._process(connector, update)
+                self._offsets[connector.id] = update["update_id"] + 1
+
+    async def _process(self, connector: TelegramConnector, update: dict[str, Any]) -> None:
+        """`process_update` con reintentos; agotados, el update se descarta."""
+        backoff = min(1.0, self.config.MAX_BACKOFF)
+        for attempt in range(1, self.config.MAX_UPDATE_ATTEMPTS + 1):
+            try:
+                await process_update(connector, update)
+                return
+            except Exception as e:
+                self.errors += 1
+                if attempt >= self.config.MAX_UPDATE_ATTEMPTS:
+                    self.dropped += 1
+                    logger.error(
+                        f"Update descartado update_id={update['update_id']} tras {attempt} intentos: "
+                        f"{type(e).__name__}"
+                    )
+                    return
+                logger.warning(
+                    f"Error al procesar update_id={update['update_id']}: {type(e).__name__}; reintento en {backoff}s"
+                )
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.config.MAX_BACKOFF)
+
+    async def fetch(self, connector: TelegramConnector) -> list[dict[str, Any]]:
+        payload: dict[str, Any] = {
+            "timeout": self.config.TIMEOUT,
+            "limit": self.config.LIMIT,
+            "allowed_updates": ALLOWED_UPDATES,
+        }
+        offset = self._offsets.get(connector.id)
+        if offset is not None:
+            payload["offset"] = offset
+        updates = await self._call(
+            connector,
+            "getUpdates",
+            payload,
+            timeout=self.config.TIMEOUT + settings.TELEGRAM.READ_TIMEOUT
+        )
+        updates = updates or []
+        self.polls += 1
+        self.updates += len(updates)
+        return updates
+
+    @staticmethod
+    async def _call(
+        connector: TelegramConnector,
+        method: str,
+        payload: dict[str, Any],
+        timeout: float | None = None
+    ) -> Any:
+        resp = await TelegramClient.post(connector.bot_token, method, payload, timeout=timeout)
+        retry_after = TelegramClient.retry_after(resp)
+        if retry_after is not None:
+            await asyncio.sleep(retry_after)
+            return None
+        data = resp.json()
+        if not data.get("ok"):
+            raise TelegramPollingError(f"{method}: {data.get('description', 'Unknown error')}")
+        return data["result"]
+
+    # ---------- métricas ---------- #
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "enabled": self.config.ENABLED,
+            "connectors": sum(1 for task in self._tasks.values() if not task.done()),
+            "polls": self.polls,
+            "updates": self.updates,
+            "errors": self.errors,
+            "dropped": self.dropped,
+        }
+
+
+polling_engine = LongPollingEngine(settings.POLLING)
+
+
+async def run_polling() -> None:
+    """Worker dedicado de long polling, sin servidor HTTP público."""
+    await message_forwarder.start()
+    await polling_engine.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await polling_engine.stop()
+        await message_forwarder.stop()
+        await TelegramClient.close()
+        await dispose_engines()
+
+
+if __name__ == "__main__":
+    asyncio.run(run_polling())
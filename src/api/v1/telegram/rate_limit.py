@@ -0,0 +1,157 @@
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any
+
+from core.settings import settings
+
+
+class TokenBucket:
+    """
+    Token bucket sin locks para un único event loop.
+
+    `reserve` consume un token aunque el saldo quede negativo y devuelve
+    cuánto hay que esperar; así los llamadores quedan en orden de llegada
+    sin necesidad de un lock.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def reserve(self) -> float:
+        self._refill(time.monotonic())
+        self.tokens -= 1
+        return max(0.0, -self.tokens / self.rate)
+
+    def wait_time(self) -> float:
+        """Lo que esperaría `reserve` ahora, sin consumir el token."""
+        self._refill(time.monotonic())
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+    async def acquire(self) -> float:
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+
+class RateLimitExceeded(Exception):
+    """El turno de envío llegaría después de `max_wait`; no se espera."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"retry after {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+class TelegramRateLimiter:
+    """
+    Limita los envíos a los límites de la Bot API: global por bot y por chat.
+    Los buckets por chat se guardan en un LRU acotado.
+
+    Con `max_wait` ningún envío espera más que eso: `acquire` lanza
+    `RateLimitExceeded` en lugar de dormir, y una penalización de Telegram
+    se acota a `max_wait` segundos.
+    """
+
+    def __init__(
+        self,
+        bot_rate: float,
+        chat_rate: float,
+        max_chat_buckets: int = 100_000,
+        max_wait: float | None = None
+    ):
+        self.bot_rate = bot_rate
+        self.chat_rate = chat_rate
+        self.max_chat_buckets = max_chat_buckets
+        self.max_wait = max_wait
+        self._bots: dict[Hashable, TokenBucket] = {}
+        self._chats: OrderedDict[tuple[Hashable, Hashable], TokenBucket] = OrderedDict()
+        self.acquired = 0
+        self.throttled = 0
+        self.throttled_seconds = 0.0
+        self.penalties = 0
+        self.rejected = 0
+
+    def _bot_bucket(self, bot_key: Hashable) -> TokenBucket:
+        bucket = self._bots.get(bot_key)
+        if bucket is None:
+            bucket = self._bots[bot_key] = TokenBucket(self.bot_rate, self.bot_rate)
+        return bucket
+
+    def _chat_bucket(self, bot_key: Hashable, chat_id: Hashable) -> TokenBucket:
+        key = (bot_key, chat_id)
+        bucket = self._chats.get(key)
+        if bucket is None:
+            bucket = self._chats[key] = TokenBucket(self.chat_rate, 1)
+            if len(self._chats) > self.max_chat_buckets:
+                self._chats.popitem(last=False)
+        else:
+            self._chats.move_to_end(key)
+        return bucket
+
+    async def acquire(self, bot_key: Hashable, chat_id: Hashable | None = None) -> float:
+        """Espera turno para un envío y devuelve los segundos esperados."""
+        if self.max_wait is not None:
+            # Se revisa antes de reservar: un envío rechazado no retrasa a los demás
+            wait = self._bot_bucket(bot_key).wait_time()
+            if chat_id is not None:
+                wait = max(wait, self._chat_bucket(bot_key, chat_id).wait_time())
+            if wait > self.max_wait:
+                self.rejected += 1
+                raise RateLimitExceeded(wait)
+        waited = 0.0
+        if chat_id is not None:
+            # Primero el chat: no reservar un turno del bot mientras se espera al chat
+            waited += await self._chat_bucket(bot_key, chat_id).acquire()
+        waited += await self._bot_bucket(bot_key).acquire()
+        self.acquired += 1
+        if waited > 0:
+            self.throttled += 1
+            self.throttled_seconds += waited
+        return waited
+
+    def penalize(self, bot_key: Hashable, seconds: float, chat_id: Hashable | None = None) -> None:
+        """
+        Aplica un `retry_after` de Telegram: vacía el bucket para que ningún
+        envío de ese bot (o de ese chat) salga antes de `seconds` (como
+        mucho `max_wait`).
+        """
+        if self.max_wait is not None:
+            seconds = min(seconds, self.max_wait)
+        self.penalties += 1
+        buckets = [self._bot_bucket(bot_key)]
+        if chat_id is not None:
+            buckets.append(self._chat_bucket(bot_key, chat_id))
+        now = time.monotonic()
+        for bucket in buckets:
+            bucket._refill(now)
+            # El siguiente `reserve` espera justo `seconds`
+            bucket.tokens = min(bucket.tokens, 1 - seconds * bucket.rate)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "bot_messages_per_second": self.bot_rate,
+            "chat_messages_per_second": self.chat_rate,
+            "bots": len(self._bots),
+            "chats": len(self._chats),
+            "acquired": self.acquired,
+            "throttled": self.throttled,
+            "throttled_seconds": round(self.throttled_seconds, 3),
+            "penalties": self.penalties,
+            "rejected": self.rejected,
+        }
+
+
+telegram_rate_limiter = TelegramRateLimiter(
+    bot_rate=settings.TELEGRAM.BOT_MESSAGES_PER_SECOND,
+    chat_rate=settings.TELEGRAM.CHAT_MESSAGES_PER_SECOND,
+    max_wait=settings.TELEGRAM.MAX_RETRY_AFTER,
+)
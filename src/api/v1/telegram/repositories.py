@@ -1,49 +1,481 @@
-from db.posgresql import get_db_context
-from db.posgresql.models.public import TelegramConnector
+from db.posgresql import get_db_context, get_async_db_context
+from db.posgresql.models.public import ForwardOutbox, OutboxStatus, TelegramConnector, TelegramMessage
 from api.v1.telegram.schema import TelegramConnectorCreateSchema
+from core.settings import settings
+from shared.cache import AsyncTTLCache
+from shared.metrics import db_query_duration
+from db.posgresql.base import default_column_datetime
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import DBAPIError, IntegrityError
 from sqlalchemy.orm import selectinload
-from sqlalchemy import select
+from sqlalchemy import Row, Select, delete, func, insert, select, text, tuple_, update
+from collections.abc import AsyncIterator, Iterator
+from datetime import date, datetime
+from loguru import logger
+from typing import Any
 from uuid import UUID
 
+connector_cache: AsyncTTLCache[UUID, TelegramConnector] = AsyncTTLCache(
+    max_size=settings.CONNECTOR_CACHE.MAX_SIZE,
+    ttl_seconds=settings.CONNECTOR_CACHE.TTL_SECONDS
+)
+
+
+def active_connectors():
+    """Consulta base: los conectores con `deleted_at` quedan fuera de todas las lecturas."""
+    return select(TelegramConnector).where(TelegramConnector.deleted_at.is_(None))
+
+
+# Columnas de los listados: `bot_token` y `bot_token_secret` nunca salen de la base
+CONNECTOR_LISTING_COLUMNS = (
+    TelegramConnector.id,
+    TelegramConnector.user_id,
+    TelegramConnector.bot_user_name,
+    TelegramConnector.created_at,
+    TelegramConnector.updated_at,
+)
+
+
+def connector_listing(user_id: UUID | None = None, after: tuple[datetime, UUID] | None = None) -> Select:
+    """
+    Conectores activos en orden `(created_at, id)`, solo con las columnas de
+    `CONNECTOR_LISTING_COLUMNS`. `after` es la llave de la última fila de la
+    página anterior (keyset): cada página cuesta lo mismo sin importar cuántas
+    haya antes. Usa los índices parciales `(created_at, id)` y
+    `(user_id, created_at, id)` sobre los conectores activos.
+    """
+    query = select(*CONNECTOR_LISTING_COLUMNS).where(TelegramConnector.deleted_at.is_(None))
+    if user_id is not None:
+        query = query.where(TelegramConnector.user_id == user_id)
+    if after is not None:
+        query = query.where(tuple_(TelegramConnector.created_at, TelegramConnector.id) > tuple_(*after))
+    return query.order_by(TelegramConnector.created_at, TelegramConnector.id)
+
+
+# SQLSTATE de PostgreSQL para unique_violation
+UNIQUE_VIOLATION = "23505"
+
+
+def _is_unique_violation(error: IntegrityError) -> bool:
+    # psycopg2 y el adaptador de asyncpg de SQLAlchemy exponen `pgcode`
+    return getattr(error.orig, "pgcode", None) == UNIQUE_VIOLATION
+
+
 class TelegramConnectorRepository:
 
     @staticmethod
+    @db_query_duration.timed("TelegramConnectorRepository", "get_all")
     def get_all() -> tuple[bool, list[TelegramConnector]]:
         with get_db_context() as session:
-            telegram_connectors = session.scalars(select(TelegramConnector)).all()
+            telegram_connectors = session.scalars(active_connectors()).all()
             return True, telegram_connectors
     
     @staticmethod
+    @db_query_duration.timed("TelegramConnectorRepository", "get_by_user_id")
     def get_by_user_id(user_id: UUID) -> tuple[bool, list[TelegramConnector]]:
         with get_db_context() as session:
-            telegram_connectors = session.scalars(select(TelegramConnector).where(TelegramConnector.user_id == user_id)).all()
+            telegram_connectors = session.scalars(active_connectors().where(TelegramConnector.user_id == user_id)).all()
             return True, telegram_connectors
+
+    @staticmethod
+    @db_query_duration.timed("TelegramConnectorRepository", "get_page")
+    def get_page(
+        limit: int,
+        user_id: UUID | None = None,
+        after: tuple[datetime, UUID] | None = None
+    ) -> tuple[bool, list[Row]]:
+        with get_db_context() as session:
+            rows = session.execute(connector_listing(user_id, after).limit(limit)).all()
+            return True, list(rows)
+
+    @staticmethod
+    def iter_listing(user_id: UUID | None = None, batch_size: int = 1000) -> Iterator[Row]:
+        """
+        Recorre los conectores con un cursor del servidor (`yield_per`): en
+        memoria solo hay `batch_size` filas a la vez. Para jobs en segundo
+        plano; la sesión queda abierta mientras se consume el iterador.
+        """
+        with get_db_context() as session:
+            result = session.execute(connector_listing(user_id), execution_options={"yield_per": batch_size})
+            yield from result
     
     @staticmethod
+    @db_query_duration.timed("TelegramConnectorRepository", "get_by_id")
     def get_by_id(telegram_connector_id: UUID) -> tuple[bool, TelegramConnector]:
         with get_db_context() as session:
-            telegram_connector = session.scalars(select(TelegramConnector).where(TelegramConnector.id == telegram_connector_id)).first()
+            telegram_connector = session.scalars(active_connectors().where(TelegramConnector.id == telegram_connector_id)).first()
             return True, telegram_connector
 
     @staticmethod
-    def create(telegram_connector_create: TelegramConnectorCreateSchema) -> tuple[bool, TelegramConnector]:
+    @db_query_duration.timed("TelegramConnectorRepository", "create")
+    def create(telegram_connector_create: TelegramConnectorCreateSchema) -> tuple[bool, TelegramConnector | None]:
         with get_db_context() as session:
             new_telegram_connector = TelegramConnector(**telegram_connector_create.model_dump())
             session.add(new_telegram_connector)
-            session.commit()
+            try:
+                session.commit()
+            except IntegrityError as e:
+                session.rollback()
+                # Solo un duplicado es "ya existe un conector activo para este bot";
+                # una FK o un NOT NULL violados son errores de verdad
+                if not _is_unique_violation(e):
+                    raise
+                return False, None
             session.refresh(new_telegram_connector)
+            connector_cache.invalidate(new_telegram_connector.id)
             return True, new_telegram_connector
 
 
     @staticmethod
+    @db_query_duration.timed("TelegramConnectorRepository", "delete")
     def delete(bot_user_name: str) -> tuple[bool, None]:
         with get_db_context() as session:
-            telegram_connector = session.scalars(select(TelegramConnector).where(TelegramConnector.bot_user_name == bot_user_name)).first()
+            telegram_connector = session.scalars(active_connectors().where(TelegramConnector.bot_user_name == bot_user_name)).first()
             if not telegram_connector:
                 return False, None
-            session.delete(telegram_connector)
+            # Borrado lógico: libera el bot_user_name en el índice único parcial
+            telegram_connector.deleted_at = default_column_datetime()
             session.commit()
+            connector_cache.invalidate(telegram_connector.id)
+            return True, None
+
+
+class AsyncTelegramConnectorRepository:
+    """Mismas operaciones que `TelegramConnectorRepository` sobre `AsyncSession` (asyncpg)."""
+
+    @staticmethod
+    @db_query_duration.timed("AsyncTelegramConnectorRepository", "get_all")
+    async def get_all() -> tuple[bool, list[TelegramConnector]]:
+        async with get_async_db_context() as session:
+            telegram_connectors = (await session.scalars(active_connectors())).all()
+            return True, list(telegram_connectors)
+
+    @staticmethod
+    @db_query_duration.timed("AsyncTelegramConnectorRepository", "get_by_user_id")
+    async def get_by_user_id(user_id: UUID) -> tuple[bool, list[TelegramConnector]]:
+        async with get_async_db_context() as session:
+            telegram_connectors = (await session.scalars(active_connectors().where(TelegramConnector.user_id == user_id))).all()
+            return True, list(telegram_connectors)
+
+    @staticmethod
+    @db_query_duration.timed("AsyncTelegramConnectorRepository", "get_page")
+    async def get_page(
+        limit: int,
+        user_id: UUID | None = None,
+        after: tuple[datetime, UUID] | None = None
+    ) -> tuple[bool, list[Row]]:
+        async with get_async_db_context() as session:
+            rows = (await session.execute(connector_listing(user_id, after).limit(limit))).all()
+            return True, list(rows)
+
+    @staticmethod
+    async def stream_listing(user_id: UUID | None = None, batch_size: int = 1000) -> AsyncIterator[Row]:
+        """Igual que `TelegramConnectorRepository.iter_listing` sobre `AsyncSession.stream`."""
+        async with get_async_db_context() as session:
+            result = await session.stream(connector_listing(user_id).execution_options(yield_per=batch_size))
+            async for row in result:
+                yield row
+
+    @staticmethod
+    @db_query_duration.timed("AsyncTelegramConnectorRepository", "get_by_id")
+    async def get_by_id(telegram_connector_id: UUID) -> tuple[bool, TelegramConnector | None]:
+        async with get_async_db_context() as session:
+            telegram_connector = (await session.scalars(active_connectors().where(TelegramConnector.id == telegram_connector_id))).first()
+            return True, telegram_connector
+
+    @staticmethod
+    async def get_by_id_cached(telegram_connector_id: UUID | str) -> tuple[bool, TelegramConnector | None]:
+        """Igual que `get_by_id`, pero servido desde `connector_cache`."""
+        try:
+            key = telegram_connector_id if isinstance(telegram_connector_id, UUID) else UUID(telegram_connector_id)
+        except ValueError:
+            return True, None
+
+        async def load() -> TelegramConnector | None:
+            _, telegram_connector = await AsyncTelegramConnectorRepository.get_by_id(key)
+            return telegram_connector
+
+        return True, await connector_cache.get_or_load(key, load)
+
+    @staticmethod
+    @db_query_duration.timed("AsyncTelegramConnectorRepository", "create")
+    async def create(telegram_connector_create: TelegramConnectorCreateSchema) -> tuple[bool, TelegramConnector | None]:
+        async with get_async_db_context() as session:
+            new_telegram_connector = TelegramConnector(**telegram_connector_create.model_dump())
+            session.add(new_telegram_connector)
+            try:
+                await session.commit()
+            except IntegrityError as e:
+                await session.rollback()
+                # Solo un duplicado es "ya existe un conector activo para este bot";
+                # una FK o un NOT NULL violados son errores de verdad
+                if not _is_unique_violation(e):
+                    raise
+                return False, None
+            await session.refresh(new_telegram_connector)
+            connector_cache.invalidate(new_telegram_connector.id)
+            return True, new_telegram_connector
+
+    @staticmethod
+    @db_query_duration.timed("AsyncTelegramConnectorRepository", "delete")
+    async def delete(bot_user_name: str) -> tuple[bool, None]:
+        async with get_async_db_context() as session:
+            telegram_connector = (await session.scalars(active_connectors().where(TelegramConnector.bot_user_name == bot_user_name))).first()
+            if not telegram_connector:
+                return False, None
+            # Borrado lógico: libera el bot_user_name en el índice único parcial
+            telegram_connector.deleted_at = default_column_datetime()
+            await session.commit()
+            connector_cache.invalidate(telegram_connector.id)
             return True, None
-        
 
-   
\ No newline at end of file
+
+class AsyncForwardOutboxRepository:
+    """
+    Operaciones del outbox de reenvío. Los workers reclaman lotes con
+    `FOR UPDATE SKIP LOCKED` y un lease: la fila reclamada queda invisible
+    hasta `available_at`, así que la transacción del reclamo se confirma de
+    inmediato y un worker caído no deja filas bloqueadas.
+    """
+
+    # `attempts` sube al reclamar. Una fila que vuelve a estar disponible con
+    # los intentos agotados es un lease vencido (el worker cayó o el lote
+    # falló sin llegar a `FAIL`): pasa a `dead` en vez de reclamarse otra vez
+    # y se devuelve con `exhausted` para contarla
+    CLAIM = text("""
+        WITH exhausted AS (
+            UPDATE public.forward_outbox
+            SET status = 'dead',
+                last_error = coalesce(last_error, 'lease expired')
+            WHERE status = 'pending'
+              AND available_at <= timezone('utc', now())
+              AND attempts >= :max_attempts
+            RETURNING id
+        ),
+        batch AS (
+            SELECT id FROM public.forward_outbox
+            WHERE status = 'pending'
+              AND available_at <= timezone('utc', now())
+              AND attempts < :max_attempts
+            ORDER BY available_at, id
+            LIMIT :limit
+            FOR UPDATE SKIP LOCKED
+        ),
+        claimed AS (
+            UPDATE public.forward_outbox AS outbox
+            SET attempts = outbox.attempts + 1,
+                available_at = timezone('utc', now()) + :lease_seconds * interval '1 second'
+            FROM batch
+            WHERE outbox.id = batch.id
+            RETURNING outbox.id, outbox.user_id, outbox.payload, outbox.attempts
+        )
+        SELECT id, user_id, payload, attempts, false AS exhausted FROM claimed
+        UNION ALL
+        SELECT id, NULL, NULL, NULL, true FROM exhausted
+    """)
+
+    # Backoff exponencial con jitter; agotados los intentos pasa a `dead`
+    FAIL = text("""
+        UPDATE public.forward_outbox
+        SET status = CASE WHEN attempts >= :max_attempts THEN 'dead' ELSE 'pending' END,
+            available_at = timezone('utc', now())
+                + least(:backoff_max, :backoff_base * power(2, attempts - 1))
+                * (0.5 + random() / 2) * interval '1 second',
+            last_error = :error
+        WHERE id = ANY(:ids)
+        RETURNING status
+    """)
+
+    @staticmethod
+    @db_query_duration.timed("AsyncForwardOutboxRepository", "add")
+    async def add(user_id: UUID, connector_id: UUID | None, payload: dict[str, Any]) -> tuple[bool, int]:
+        async with get_async_db_context() as session:
+            outbox_id = await session.scalar(
+                insert(ForwardOutbox)
+                .values(user_id=user_id, connector_id=connector_id, payload=payload)
+                .returning(ForwardOutbox.id)
+            )
+            await session.commit()
+            return True, outbox_id
+
+    @staticmethod
+    @db_query_duration.timed("AsyncForwardOutboxRepository", "add_many")
+    async def add_many(
+        entries: list[dict[str, Any]],
+        archive: list[dict[str, Any]] | None = None
+    ) -> tuple[bool, list[int]]:
+        """
+        Inserta varias entradas (`user_id`, `connector_id`, `payload`) en una
+        sola sentencia. Con `archive` los mensajes se archivan en la misma
+        transacción: o quedan ambos o ninguno.
+        """
+        async with get_async_db_context() as session:
+            outbox_ids = (await session.scalars(
+                insert(ForwardOutbox).values(entries).returning(ForwardOutbox.id)
+            )).all()
+            if archive:
+                await session.execute(AsyncTelegramMessageRepository.upsert(archive))
+            await session.commit()
+            return True, list(outbox_ids)
+
+    @staticmethod
+    @db_query_duration.timed("AsyncForwardOutboxRepository", "claim")
+    async def claim(limit: int, lease_seconds: float, max_attempts: int) -> tuple[bool, list[Row]]:
+        """Filas reclamadas, más las que pasaron a `dead` por lease vencido (`exhausted`)."""
+        async with get_async_db_context() as session:
+            rows = (await session.execute(
+                AsyncForwardOutboxRepository.CLAIM,
+                {"limit": limit, "lease_seconds": lease_seconds, "max_attempts": max_attempts}
+            )).all()
+            await session.commit()
+            return True, list(rows)
+
+    @staticmethod
+    @db_query_duration.timed("AsyncForwardOutboxRepository", "complete")
+    async def complete(ids: list[int]) -> tuple[bool, int]:
+        async with get_async_db_context() as session:
+            result = await session.execute(
+                delete(ForwardOutbox).where(ForwardOutbox.id.in_(ids)),
+                execution_options={"synchronize_session": False}
+            )
+            await session.commit()
+            return True, result.rowcount
+
+    @staticmethod
+    @db_query_duration.timed("AsyncForwardOutboxRepository", "fail")
+    async def fail(
+        ids: list[int],
+        error: str,
+        max_attempts: int,
+        backoff_base: float,
+        backoff_max: float
+    ) -> tuple[bool, int]:
+        """Reprograma los envíos fallidos y devuelve cuántos pasaron a `dead`."""
+        async with get_async_db_context() as session:
+            statuses = (await session.scalars(AsyncForwardOutboxRepository.FAIL, {
+                "ids": ids,
+                "error": error,
+                "max_attempts": max_attempts,
+                "backoff_base": backoff_base,
+                "backoff_max": backoff_max,
+            })).all()
+            await session.commit()
+            return True, sum(1 for status in statuses if status == OutboxStatus.DEAD)
+
+    @staticmethod
+    @db_query_duration.timed("AsyncForwardOutboxRepository", "get_dead")
+    async def get_dead(user_id: UUID, limit: int, after_id: int | None = None) -> tuple[bool, list[ForwardOutbox]]:
+        query = select(ForwardOutbox).where(
+            ForwardOutbox.status == OutboxStatus.DEAD,
+            ForwardOutbox.user_id == user_id
+        )
+        if after_id is not None:
+            query = query.where(ForwardOutbox.id > after_id)
+        async with get_async_db_context() as session:
+            entries = (await session.scalars(query.order_by(ForwardOutbox.id).limit(limit))).all()
+            return True, list(entries)
+
+    @staticmethod
+    @db_query_duration.timed("AsyncForwardOutboxRepository", "redrive")
+    async def redrive(user_id: UUID, ids: list[int] | None = None) -> tuple[bool, int]:
+        """Devuelve al estado `pending` las entradas muertas del usuario (todas o `ids`)."""
+        query = (
+            update(ForwardOutbox)
+            .where(ForwardOutbox.status == OutboxStatus.DEAD, ForwardOutbox.user_id == user_id)
+            .values(
+                status=OutboxStatus.PENDING,
+                attempts=0,
+                available_at=func.timezone("utc", func.now()),
+                last_error=None
+            )
+        )
+        if ids is not None:
+            query = query.where(ForwardOutbox.id.in_(ids))
+        async with get_async_db_context() as session:
+            result = await session.execute(query, execution_options={"synchronize_session": False})
+            await session.commit()
+            return True, result.rowcount
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class AsyncTelegramMessageRepository:
+    """
+    Archivo de mensajes recibidos (`telegram_messages`). Solo se inserta; un
+    `edited_message` conserva la fecha original y reemplaza el payload.
+    """
+
+    @staticmethod
+    def upsert(rows: list[dict[str, Any]]):
+        """
+        INSERT de varias filas. Una misma llave no puede aparecer dos veces en
+        un `ON CONFLICT DO UPDATE`, así que dentro del lote gana la última.
+        """
+        unique = {
+            (row["connector_id"], row["chat_id"], row["date"], row["message_id"]): row
+            for row in rows
+        }
+        statement = pg_insert(TelegramMessage).values(list(unique.values()))
+        return statement.on_conflict_do_update(
+            constraint="pk_telegram_messages",
+            set_={"payload": statement.excluded.payload, "received_at": statement.excluded.received_at}
+        )
+
+    @staticmethod
+    @db_query_duration.timed("AsyncTelegramMessageRepository", "add_many")
+    async def add_many(rows: list[dict[str, Any]]) -> tuple[bool, int]:
+        async with get_async_db_context() as session:
+            await session.execute(AsyncTelegramMessageRepository.upsert(rows))
+            await session.commit()
+            return True, len(rows)
+
+    @staticmethod
+    @db_query_duration.timed("AsyncTelegramMessageRepository", "get_history")
+    async def get_history(
+        connector_id: UUID,
+        chat_id: int,
+        limit: int,
+        before: tuple[datetime, int] | None = None
+    ) -> tuple[bool, list[Row]]:
+        """Mensajes del chat del más reciente al más antiguo, a partir de `before` (exclusivo)."""
+        query = select(TelegramMessage.date, TelegramMessage.message_id, TelegramMessage.payload).where(
+            TelegramMessage.connector_id == connector_id,
+            TelegramMessage.chat_id == chat_id
+        )
+        if before is not None:
+            query = query.where(tuple_(TelegramMessage.date, TelegramMessage.message_id) < tuple_(*before))
+        query = query.order_by(TelegramMessage.date.desc(), TelegramMessage.message_id.desc()).limit(limit)
+        async with get_async_db_context() as session:
+            rows = (await session.execute(query)).all()
+            return True, list(rows)
+
+    @staticmethod
+    async def ensure_partitions(start: date, months: int) -> tuple[bool, list[str]]:
+        """
+        Crea las particiones mensuales que falten desde el mes de `start`.
+        Solo toma el lock de la tabla padre cuando la partición no existe.
+        """
+        created: list[str] = []
+        first = start.replace(day=1)
+        for offset in range(months + 1):
+            lower, upper = _add_months(first, offset), _add_months(first, offset + 1)
+            name = f"telegram_messages_p{lower:%Y%m}"
+            async with get_async_db_context() as session:
+                if await session.scalar(text("SELECT to_regclass(:name)"), {"name": f"public.{name}"}):
+                    continue
+                try:
+                    await session.execute(text(
+                        f"CREATE TABLE IF NOT EXISTS public.{name} PARTITION OF public.telegram_messages "
+                        f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+                    ))
+                    await session.commit()
+                except DBAPIError as e:
+                    # P. ej. la partición DEFAULT ya tiene filas de ese mes
+                    await session.rollback()
+                    logger.warning(f"No se pudo crear la partición {name}: {type(e.orig).__name__}")
+                    continue
+            created.append(name)
+        return True, created
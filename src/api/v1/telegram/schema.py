@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field, ConfigDict, field_serializer
-from uuid import UUID
+from uuid import UUID, uuid4
 from datetime import datetime
+from typing import Any
 
 # ---------- 1. DTO de conexión ----------
 class RequestTelegramConnectorCreateSchema(BaseModel):
@@ -9,6 +10,8 @@ class RequestTelegramConnectorCreateSchema(BaseModel):
 
 
 class TelegramConnectorCreateSchema(BaseModel):
+    # El id se genera antes de insertar para derivar el secret del webhook
+    id: UUID = Field(default_factory=uuid4)
     user_id: UUID
     bot_user_name: str
     bot_token: str
@@ -39,6 +42,10 @@ class TelegramConnectorCreateResponseSchema(BaseModel):
     def serialize_updated_at(self, v: datetime, _info):
         return v.isoformat()
 
+class ConnectorPageOut(BaseModel):
+    connectors: list[TelegramConnectorCreateResponseSchema]
+    next_cursor: str | None = Field(None, description="Pásalo como `cursor` para la siguiente página; `null` en la última")
+
 
 # ---------- 1A. DTO de envío ----------
 class SendMessageIn(BaseModel):
@@ -49,14 +56,61 @@ class SendMessageOut(BaseModel):
     telegram_message_id: int
     status: str = "sent"
 
+class SendMediaIn(BaseModel):
+    chat_id: int               = Field(..., description="ID del chat destino")
+    caption: str | None        = Field(None, max_length=1024)
+
+class SendMediaOut(BaseModel):
+    telegram_message_id: int
+    file_id: str
+    uploaded: bool             = Field(..., description="False si se reutilizó el `file_id` de un envío anterior")
+    status: str = "sent"
+
+# Objetos de archivo de la Bot API; los campos que no se usan se ignoran
+class PhotoSize(BaseModel):
+    file_id: str
+    file_unique_id: str
+    width: int
+    height: int
+    file_size: int | None = None
+
+class Document(BaseModel):
+    file_id: str
+    file_unique_id: str
+    file_name: str | None = None
+    mime_type: str | None = None
+    file_size: int | None = None
+
+class Sticker(BaseModel):
+    file_id: str
+    file_unique_id: str
+    width: int
+    height: int
+    is_animated: bool = False
+    is_video: bool = False
+    emoji: str | None = None
+    file_size: int | None = None
+
+class RelayedMedia(BaseModel):
+    kind: str
+    file_id: str
+    file_unique_id: str
+    url: str
+    size: int
+    mime_type: str | None = None
+
 class WebhookMessageReceived(BaseModel):
     date: datetime
     message_id: int
     chat_id: int
     text: str | None = None
     caption: str | None = None
-    photo: list[str] | None = None
-    sticker: str | None = None
+    # Telegram manda la foto en varios tamaños, del menor al mayor
+    photo: list[PhotoSize] | None = None
+    document: Document | None = None
+    sticker: Sticker | None = None
+    # Archivos ya retransmitidos a MEDIA.RELAY_URL
+    media: list[RelayedMedia] | None = None
     
     user_id: UUID
     bot_user_name: str
@@ -70,4 +124,57 @@ class WebhookMessageReceived(BaseModel):
     
     @field_serializer('connector_id')
     def serialize_connector_id(self, v: UUID, _info):
-        return str(v)
\ No newline at end of file
+        return str(v)
+
+# ---------- 1B. DTO de difusión (broadcast) ----------
+class BroadcastIn(BaseModel):
+    chat_ids: list[int]        = Field(..., min_length=1, description="IDs de los chats destino")
+    text:     str              = Field(..., min_length=1, max_length=4096)
+
+class BroadcastRecipientOut(BaseModel):
+    chat_id: int
+    status: str
+    telegram_message_id: int | None = None
+    error: str | None = None
+
+class BroadcastJobOut(BaseModel):
+    job_id: UUID
+    connector_id: UUID
+    status: str
+    total: int
+    sent: int
+    failed: int
+    pending: int
+    created_at: datetime
+    finished_at: datetime | None = None
+    results: list[BroadcastRecipientOut] | None = None
+
+    @field_serializer('job_id')
+    def serialize_job_id(self, v: UUID, _info):
+        return str(v)
+
+    @field_serializer('connector_id')
+    def serialize_connector_id(self, v: UUID, _info):
+        return str(v)
+
+
+# ---------- 1C. DTO del outbox de reenvío ----------
+class OutboxEntryOut(BaseModel):
+    id: int
+    connector_id: UUID | None = None
+    attempts: int
+    last_error: str | None = None
+    created_at: datetime
+    payload: dict[str, Any]
+
+class OutboxRedriveIn(BaseModel):
+    ids: list[int] | None = Field(None, min_length=1, description="Entradas a reencolar; todas si se omite")
+
+class OutboxRedriveOut(BaseModel):
+    redriven: int
+
+
+# ---------- 1D. DTO del historial de mensajes ----------
+class ChatHistoryOut(BaseModel):
+    messages: list[WebhookMessageReceived]
+    next_cursor: str | None = Field(None, description="Pásalo como `cursor` para la página anterior; `null` al llegar al inicio")
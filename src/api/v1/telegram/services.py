@@ -1,22 +1,63 @@
 from __future__ import annotations
-from uuid import UUID
+from uuid import UUID, uuid4
 from fastapi import Request, HTTPException, status
 from core.settings import settings
 from api.v1.telegram.schema import (
     SendMessageIn,
     SendMessageOut,
+    SendMediaIn,
+    SendMediaOut,
     RequestTelegramConnectorCreateSchema,
     TelegramConnectorCreateSchema,
-    WebhookMessageReceived,
-    TelegramConnectorCreateResponseSchema
+    TelegramConnectorCreateResponseSchema,
+    BroadcastIn,
+    OutboxEntryOut,
+    OutboxRedriveIn,
+    OutboxRedriveOut,
+    ChatHistoryOut,
+    ConnectorPageOut,
+    WebhookMessageReceived
 )
-import requests
+from pydantic import ValidationError
+import httpx
+import hmac
 import secrets
-from api.v1.telegram.repositories import TelegramConnectorRepository
+from api.v1.telegram.broadcast import BroadcastJob, BroadcastRecipient, broadcast_scheduler
+from api.v1.telegram.client import TelegramClient
+from api.v1.telegram.dedupe import extract_update_id, update_deduplicator
+from api.v1.telegram.forwarder import message_forwarder
+from api.v1.telegram.media import media_relay
+from api.v1.telegram.outbox import outbox_worker
+from api.v1.telegram.polling import polling_engine
+from api.v1.telegram.archive import message_archive
+from api.v1.telegram.repositories import (
+    AsyncForwardOutboxRepository,
+    AsyncTelegramConnectorRepository,
+    AsyncTelegramMessageRepository,
+    connector_cache
+)
+from api.v1.telegram.updates import process_update
+from api.v1.telegram.uploads import (
+    SEND_METHODS,
+    MediaKind,
+    MediaSender,
+    SpooledUpload,
+    UploadError,
+    media_sender,
+    read_multipart,
+    read_raw
+)
+from api.v1.telegram.webhook_secret import SecretCheck, check_secret, derive_secret
 from shared.base_responses import create_response_for_fast_api, EnvelopeResponse
-from datetime import datetime
+from shared.log import hot_logger
+from shared.metrics import outbox_messages
+from shared.startup import startup_timer
+from shared.tracing import tracer
 from loguru import logger
-from typing import Any
+from typing import Any, NoReturn
+from datetime import datetime
+import base64
+import logging
 
 # --- Utilidades internas seguras ---
 
@@ -28,6 +69,8 @@ def _get_header(headers: dict[str, Any], key: str, required_msg: str) -> str:
     return value
 
 def _log_connector(connector: Any, context: str = "") -> None:
+    if not hot_logger.enabled(logging.INFO):
+        return
     safe = {
         "id": connector.id,
         "user_id": connector.user_id,
@@ -35,12 +78,81 @@ def _log_connector(connector: Any, context: str = "") -> None:
         "created_at": str(connector.created_at),
         "updated_at": str(connector.updated_at)
     }
-    logger.info(f"{context}Connector info: {safe}")
+    hot_logger.info("{}Connector info: {}", context, safe)
 
-def _raise_and_log(detail: str, status_code: int = 400) -> None:
+def _raise_and_log(detail: str, status_code: int = 400) -> NoReturn:
     logger.error(detail)
     raise HTTPException(status_code=status_code, detail=detail)
 
+def _check_api_key(headers: dict[str, Any]) -> None:
+    api_key = _get_header(headers, "X-Api-Key", "API Key is required")
+    if api_key != settings.API_KEY:
+        _raise_and_log("Invalid API Key", status.HTTP_400_BAD_REQUEST)
+
+def _get_user_id(headers: dict[str, Any]) -> UUID:
+    user_id = _get_header(headers, "X-User-Id", "User ID is required")
+    try:
+        return UUID(user_id)
+    except ValueError:
+        _raise_and_log("Invalid User ID", status.HTTP_400_BAD_REQUEST)
+
+async def _get_owned_connector(telegram_connector_id: UUID, headers: dict[str, Any], context: str = "") -> Any:
+    """Valida API key y `X-User-Id` y devuelve el conector si pertenece a ese usuario."""
+    _check_api_key(headers)
+    user_id = _get_header(headers, "X-User-Id", "User ID is required")
+
+    exists, telegram_connector = await AsyncTelegramConnectorRepository.get_by_id_cached(telegram_connector_id)
+    if not exists or telegram_connector is None:
+        _raise_and_log("Telegram connector not found", status.HTTP_404_NOT_FOUND)
+    _log_connector(telegram_connector, context=context)
+
+    if str(telegram_connector.user_id) != user_id:
+        _raise_and_log("Telegram message not found", status.HTTP_403_FORBIDDEN)
+    return telegram_connector
+
+def _connector_response(telegram_connector: Any) -> TelegramConnectorCreateResponseSchema:
+    return TelegramConnectorCreateResponseSchema(
+        id=telegram_connector.id,
+        user_id=telegram_connector.user_id,
+        bot_user_name=telegram_connector.bot_user_name,
+        created_at=telegram_connector.created_at,
+        updated_at=telegram_connector.updated_at
+    )
+
+def _encode_cursor(*key: Any) -> str:
+    """Cursor opaco con la llave de la última fila de una página."""
+    raw = "|".join(part.isoformat() if isinstance(part, datetime) else str(part) for part in key)
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def _decode_cursor(cursor: str, *types: type) -> tuple[Any, ...]:
+    try:
+        parts = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        if len(parts) != len(types):
+            raise ValueError("Cursor length mismatch")
+        return tuple(
+            datetime.fromisoformat(part) if kind is datetime else kind(part)
+            for kind, part in zip(types, parts)
+        )
+    except ValueError:
+        _raise_and_log("Invalid cursor", status.HTTP_400_BAD_REQUEST)
+
+
+class ListConnectorsService:
+    @staticmethod
+    async def list_connectors(request: Request, limit: int = 100, cursor: str | None = None) -> EnvelopeResponse:
+        """Conectores del usuario en orden de creación, paginados por llave `(created_at, id)`."""
+        _check_api_key(request.headers)
+        user_id = _get_user_id(request.headers)
+        after = _decode_cursor(cursor, datetime, UUID) if cursor else None
+
+        _, rows = await AsyncTelegramConnectorRepository.get_page(limit + 1, user_id=user_id, after=after)
+        next_cursor = _encode_cursor(rows[limit - 1].created_at, rows[limit - 1].id) if len(rows) > limit else None
+        return create_response_for_fast_api(data=ConnectorPageOut(
+            connectors=[TelegramConnectorCreateResponseSchema.model_validate(row, from_attributes=True) for row in rows[:limit]],
+            next_cursor=next_cursor
+        ))
+
+
 class ConnectTelegramService:
     @staticmethod
     async def connect(
@@ -55,10 +167,16 @@ class ConnectTelegramService:
 
         user_id = _get_header(headers, "X-User-Id", "User ID is required")
 
-        # Crea el secret SIN loguear el valor
-        secret_token = secrets.token_urlsafe(192)
-        created, telegram_connector = TelegramConnectorRepository.create(
+        # Crea el secret SIN loguear el valor; con WEBHOOK_SECRET_KEY se deriva
+        # del id para verificarlo en el webhook sin consultar la base
+        telegram_connector_id = uuid4()
+        if settings.WEBHOOK_SECRET_KEY:
+            secret_token = derive_secret(telegram_connector_id)
+        else:
+            secret_token = secrets.token_urlsafe(192)
+        created, telegram_connector = await AsyncTelegramConnectorRepository.create(
             TelegramConnectorCreateSchema(
+                id=telegram_connector_id,
                 user_id=user_id,
                 bot_user_name=payload.bot_user_name,
                 bot_token=payload.bot_token,
@@ -66,31 +184,37 @@ class ConnectTelegramService:
             )
         )
         if not created:
-            _raise_and_log("Error al crear el conector de Telegram", status.HTTP_500_INTERNAL_SERVER_ERROR)
+            _raise_and_log("El bot ya tiene un conector de Telegram activo", status.HTTP_409_CONFLICT)
         _log_connector(telegram_connector, context="[Create] ")
 
+        if settings.POLLING.ENABLED:
+            # Ingesta por getUpdates: no se registra webhook. Un worker
+            # dedicado (IN_PROCESS=False) lo toma en su siguiente sincronización
+            if settings.POLLING.IN_PROCESS:
+                polling_engine.add(telegram_connector)
+            return create_response_for_fast_api(data=_connector_response(telegram_connector))
+
         # Nunca logues el token, solo la operación
-        url = f"https://api.telegram.org/bot{payload.bot_token}/setWebhook"
         webhook_url = f"{settings.HOST}/v1/telegram/webhook/{telegram_connector.id}"
         data = {
             "url": webhook_url,
             "secret_token": secret_token
         }
         logger.info("Registrando webhook en Telegram...")
-        resp = requests.post(url, json=data)
-        if resp.status_code != 200:
-            logger.error(f"Telegram setWebhook error: {resp.text}")
+        try:
+            resp = await TelegramClient.post(payload.bot_token, "setWebhook", data)
+        except httpx.HTTPError as e:
+            logger.error(f"Telegram setWebhook error: {type(e).__name__}")
+            resp = None
+        if resp is None or resp.status_code != 200:
+            if resp is not None:
+                logger.error(f"Telegram setWebhook error: {resp.text}")
+            # Sin webhook el conector no sirve: se libera el bot para reintentar
+            await AsyncTelegramConnectorRepository.delete(payload.bot_user_name)
             raise HTTPException(status_code=500, detail="Error al conectar con Telegram")
         logger.info("Webhook registrado en Telegram correctamente.")
 
-        data_response = TelegramConnectorCreateResponseSchema(
-            id=telegram_connector.id,
-            user_id=telegram_connector.user_id,
-            bot_user_name=telegram_connector.bot_user_name,
-            created_at=telegram_connector.created_at,
-            updated_at=telegram_connector.updated_at
-        )
-        return create_response_for_fast_api(data=data_response.model_dump(mode="json"))
+        return create_response_for_fast_api(data=_connector_response(telegram_connector))
 
 class TelegramWebhookService:
     @staticmethod
@@ -99,60 +223,74 @@ class TelegramWebhookService:
         telegram_connector_id: str,
         x_telegram_bot_api_secret_token: str | None
     ) -> dict[str, str]:
-        logger.info("📥 Webhook recibido")
-        logger.info(f"ID recibido: {telegram_connector_id}")
+        hot_logger.info("📥 Webhook recibido, ID: {}", telegram_connector_id)
+
+        # Nunca logues secretos ni tokens completos. Los secrets inválidos se
+        # rechazan antes de cualquier consulta a la base
+        with tracer.span("webhook.secret_check"):
+            secret_check = check_secret(telegram_connector_id, x_telegram_bot_api_secret_token)
+        if secret_check == SecretCheck.INVALID:
+            logger.warning("Token inválido en webhook (NO SE MUESTRA POR SEGURIDAD)")
+            raise HTTPException(status_code=403, detail="Invalid secret")
 
-        exists, telegram_connector = TelegramConnectorRepository.get_by_id(telegram_connector_id)
+        with tracer.span("webhook.connector_lookup"):
+            exists, telegram_connector = await AsyncTelegramConnectorRepository.get_by_id_cached(telegram_connector_id)
         if not exists or telegram_connector is None:
             _raise_and_log("Telegram connector not found", status.HTTP_404_NOT_FOUND)
         _log_connector(telegram_connector, context="[Webhook] ")
 
-        # Nunca logues secretos ni tokens completos
-        if x_telegram_bot_api_secret_token != telegram_connector.bot_token_secret:
+        if secret_check == SecretCheck.LEGACY and not hmac.compare_digest(
+            x_telegram_bot_api_secret_token.encode(), telegram_connector.bot_token_secret.encode()
+        ):
             logger.warning("Token inválido en webhook (NO SE MUESTRA POR SEGURIDAD)")
             raise HTTPException(status_code=403, detail="Invalid secret")
-        logger.info("Token válido (secreto verificado)")
-
-        message_received = await request.json()
-        logger.debug(f"message_received: {str(message_received)[:500]}")  # Loguea máx 500 chars
-
-        message = message_received.get("message") or message_received.get("edited_message")
-        if not message:
-            logger.info("⚠️ Update ignorado - no es un mensaje")
-            return {"status": "ignored"}
-
-        # Procesa y loguea solo IDs/textos, nunca attachments
-        chat_id = message.get("chat", {}).get("id")
-        webhook_message_received = WebhookMessageReceived(
-            user_id=telegram_connector.user_id,
-            bot_user_name=telegram_connector.bot_user_name,
-            message_id=message.get("message_id"),
-            date=datetime.fromtimestamp(message.get("date", 0)),
-            text=message.get("text"),
-            caption=message.get("caption"),
-            photo=message.get("photo"),
-            sticker=message.get("sticker"),
-            connector_id=telegram_connector.id,
-            chat_id=chat_id
-        )
+        hot_logger.info("Token válido (secreto verificado, {})", secret_check)
 
-        logger.info(f"Recibido message_id={webhook_message_received.message_id} chat_id={chat_id} user_id={webhook_message_received.user_id}")
+        # Los reintentos de Telegram traen el mismo update_id: se descartan
+        # antes de parsear el cuerpo completo y de reenviar nada
+        with tracer.span("webhook.parse"):
+            update_id = extract_update_id(await request.body())
+            if update_id is None:
+                parsed = await request.json()
+                update_id = parsed.get("update_id") if isinstance(parsed, dict) else None
+        if update_id is not None:
+            with tracer.span("webhook.dedupe"):
+                claimed = await update_deduplicator.claim(telegram_connector.id, update_id)
+            if not claimed:
+                hot_logger.info("Update duplicado descartado update_id={}", update_id)
+                return {"status": "duplicate"}
 
-        # Dispara webhook
-        headers = {"X-User-Id": str(webhook_message_received.user_id)}
-        logger.info(f"Enviando mensaje recibido a backend destino")
-        resp = requests.post(
-            settings.WEBHOOK_MESSAGE_RECEIVED,
-            json=webhook_message_received.model_dump(mode="json"),
-            headers=headers,
-            timeout=5
-        )
-        if resp.status_code != 200:
-            logger.error(f"Error al enviar webhook: {resp.text}")
-        else:
-            logger.info("Webhook entregado correctamente")
+        with tracer.span("webhook.parse_body"):
+            message_received = await request.json()
+        if hot_logger.enabled(logging.DEBUG):
+            hot_logger.debug("message_received: {}", str(message_received)[:500])  # Loguea máx 500 chars
+
+        try:
+            with tracer.span("webhook.process"):
+                return await process_update(telegram_connector, message_received)
+        except Exception:
+            # Sin liberar, el reintento de Telegram se descartaría como duplicado
+            if update_id is not None:
+                await update_deduplicator.release(telegram_connector.id, update_id)
+            raise
+
+def _telegram_result(response: httpx.Response) -> dict[str, Any]:
+    """JSON de una respuesta de envío; un 429 o un error de Telegram se vuelven HTTPException."""
+    data = response.json()
+    logger.debug(f"Respuesta de Telegram: {str(data)[:400]}")  # Nunca logues texto completo si hay attachments
 
-        return {"status": "ok"}
+    retry_after = TelegramClient.retry_after(response)
+    if retry_after is not None:
+        logger.error(f"Telegram flood control, retry_after={retry_after}")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=data.get("description"),
+            headers={"Retry-After": str(int(retry_after))}
+        )
+    if not data.get("ok"):
+        logger.error(f"Telegram error: {data.get('description', 'Unknown error')}")
+        raise HTTPException(status_code=502, detail=data.get("description"))
+    return data
 
 class SendMessageService:
     @staticmethod
@@ -161,40 +299,253 @@ class SendMessageService:
         payload: SendMessageIn,
         request: Request
     ) -> EnvelopeResponse:
-        headers = request.headers
+        telegram_connector = await _get_owned_connector(telegram_connector_id, request.headers, context="[Send] ")
 
-        api_key = _get_header(headers, "X-Api-Key", "API Key is required")
-        if api_key != settings.API_KEY:
-            _raise_and_log("Invalid API Key", status.HTTP_400_BAD_REQUEST)
+        logger.info(f"Enviando mensaje a chat_id={payload.chat_id} con el bot {telegram_connector.bot_user_name}")
+        try:
+            r = await TelegramClient.send(
+                telegram_connector.id,
+                telegram_connector.bot_token,
+                "sendMessage",
+                {"chat_id": payload.chat_id, "text": payload.text},
+                chat_id=payload.chat_id
+            )
+        except httpx.HTTPError as e:
+            logger.error(f"Telegram sendMessage error: {type(e).__name__}")
+            raise HTTPException(status_code=502, detail="Error al conectar con Telegram")
+        data = _telegram_result(r)
 
-        user_id = _get_header(headers, "X-User-Id", "User ID is required")
+        logger.info(f"Mensaje enviado correctamente, message_id={data['result']['message_id']}")
+        data_response = SendMessageOut(
+            telegram_message_id=data["result"]["message_id"],
+            status="sent"
+        )
+        return create_response_for_fast_api(data=data_response)
 
-        exists, telegram_connector = TelegramConnectorRepository.get_by_id(telegram_connector_id)
-        if not exists or telegram_connector is None:
-            _raise_and_log("Telegram connector not found", status.HTTP_404_NOT_FOUND)
-        _log_connector(telegram_connector, context="[Send] ")
 
-        user_id_message = str(telegram_connector.user_id)
-        if user_id_message != user_id:
-            _raise_and_log("Telegram message not found", status.HTTP_403_FORBIDDEN)
+async def _read_upload(request: Request, kind: str, filename: str | None) -> SpooledUpload:
+    """
+    Lee el archivo del cuerpo: multipart/form-data con el archivo en el
+    campo `kind`, o el archivo tal cual con su Content-Type. En ambos casos
+    se procesa a medida que llega y solo el primer MB queda en memoria.
+    """
+    config = settings.UPLOAD
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > config.MAX_SIZE:
+        _raise_and_log(f"File too large (max {config.MAX_SIZE} bytes)", status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
 
-        logger.info(f"Enviando mensaje a chat_id={payload.chat_id} con el bot {telegram_connector.bot_user_name}")
-        TG_API = f"https://api.telegram.org/bot{telegram_connector.bot_token}"
-        r = requests.post(
-            f"{TG_API}/sendMessage",
-            json={"chat_id": payload.chat_id, "text": payload.text},
-            timeout=10
-        )
-        data = r.json()
-        logger.debug(f"Respuesta de Telegram: {str(data)[:400]}")  # Nunca logues texto completo si hay attachments
+    upload = SpooledUpload(config)
+    content_type = request.headers.get("content-type", "")
+    try:
+        if content_type.startswith("multipart/form-data"):
+            await read_multipart(request.stream(), content_type, upload, kind)
+        else:
+            upload.filename = filename
+            upload.content_type = content_type or None
+            await read_raw(request.stream(), upload)
+        if upload.size == 0:
+            raise UploadError("El archivo está vacío")
+    except UploadError as e:
+        upload.close()
+        _raise_and_log(e.detail, e.status_code)
+    except BaseException:
+        upload.close()
+        raise
+    return upload
+
+class SendMediaService:
+    @staticmethod
+    async def send(
+        telegram_connector_id: UUID,
+        kind: MediaKind,
+        request: Request,
+        chat_id: int | None = None,
+        caption: str | None = None,
+        filename: str | None = None
+    ) -> EnvelopeResponse:
+        telegram_connector = await _get_owned_connector(telegram_connector_id, request.headers, context="[SendMedia] ")
 
-        if not data.get("ok"):
-            logger.error(f"Telegram error: {data.get('description', 'Unknown error')}")
-            raise HTTPException(status_code=502, detail=data.get("description"))
+        upload = await _read_upload(request, kind, filename)
+        try:
+            # Los campos del formulario tienen prioridad sobre los query params
+            query = {key: value for key, value in {"chat_id": chat_id, "caption": caption}.items() if value is not None}
+            try:
+                payload = SendMediaIn.model_validate({**query, **upload.fields})
+            except ValidationError as e:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=e.errors(include_url=False, include_context=False))
 
-        logger.info(f"Mensaje enviado correctamente, message_id={data['result']['message_id']}")
-        data_response = SendMessageOut(
+            logger.info(f"Enviando {kind} de {upload.size} bytes a chat_id={payload.chat_id} con el bot {telegram_connector.bot_user_name}")
+            try:
+                r, uploaded = await media_sender.send(telegram_connector, kind, payload.chat_id, payload.caption, upload)
+            except httpx.HTTPError as e:
+                logger.error(f"Telegram {SEND_METHODS[kind]} error: {type(e).__name__}")
+                raise HTTPException(status_code=502, detail="Error al conectar con Telegram")
+        finally:
+            upload.close()
+        data = _telegram_result(r)
+
+        logger.info(f"{kind} enviado, message_id={data['result']['message_id']}, uploaded={uploaded}")
+        data_response = SendMediaOut(
             telegram_message_id=data["result"]["message_id"],
+            file_id=MediaSender.file_id_of(kind, data["result"]),
+            uploaded=uploaded,
             status="sent"
         )
-        return create_response_for_fast_api(data=data_response.model_dump(mode="json"))
+        return create_response_for_fast_api(data=data_response)
+
+
+class BroadcastService:
+    @staticmethod
+    async def create(telegram_connector_id: UUID, request: Request) -> EnvelopeResponse:
+        telegram_connector = await _get_owned_connector(telegram_connector_id, request.headers, context="[Broadcast] ")
+        if not broadcast_scheduler.available:
+            _raise_and_log("Broadcasts are not available in this deployment", status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        recipients = await _read_broadcast_recipients(request)
+        job = broadcast_scheduler.submit(
+            BroadcastJob(
+                connector_id=telegram_connector.id,
+                user_id=telegram_connector.user_id,
+                recipients=recipients
+            ),
+            bot_token=telegram_connector.bot_token
+        )
+        return create_response_for_fast_api(
+            status_code_http=status.HTTP_202_ACCEPTED,
+            data=job.to_schema()
+        )
+
+    @staticmethod
+    async def status(job_id: UUID, request: Request, offset: int = 0, limit: int | None = None) -> EnvelopeResponse:
+        _check_api_key(request.headers)
+        user_id = _get_header(request.headers, "X-User-Id", "User ID is required")
+
+        job = broadcast_scheduler.get(job_id)
+        # Un job de otro usuario se reporta igual que uno inexistente
+        if job is None or str(job.user_id) != user_id:
+            _raise_and_log("Broadcast job not found", status.HTTP_404_NOT_FOUND)
+        return create_response_for_fast_api(data=job.to_schema(offset=offset, limit=limit))
+
+
+class OutboxService:
+    @staticmethod
+    async def dead(request: Request, limit: int = 100, after_id: int | None = None) -> EnvelopeResponse:
+        """Mensajes del usuario que agotaron sus intentos, paginados por id."""
+        _check_api_key(request.headers)
+        user_id = _get_user_id(request.headers)
+
+        _, entries = await AsyncForwardOutboxRepository.get_dead(user_id, limit, after_id)
+        return create_response_for_fast_api(data=[OutboxEntryOut.model_validate(entry, from_attributes=True) for entry in entries])
+
+    @staticmethod
+    async def redrive(payload: OutboxRedriveIn, request: Request) -> EnvelopeResponse:
+        _check_api_key(request.headers)
+        user_id = _get_user_id(request.headers)
+
+        _, redriven = await AsyncForwardOutboxRepository.redrive(user_id, payload.ids)
+        logger.info(f"[Outbox] {redriven} mensajes reencolados desde dead letter")
+        outbox_messages.inc("redriven", amount=redriven)
+        return create_response_for_fast_api(data=OutboxRedriveOut(redriven=redriven))
+
+
+async def _read_broadcast_recipients(request: Request) -> list[BroadcastRecipient]:
+    """
+    Lee los destinatarios del cuerpo. Acepta JSON (`BroadcastIn`) o NDJSON
+    (`application/x-ndjson`, una línea `SendMessageIn` por destinatario) que
+    se procesa a medida que llega, sin cargar el cuerpo completo; una línea
+    mayor a `MAX_LINE_SIZE` se rechaza con 413.
+    """
+    max_recipients = settings.BROADCAST.MAX_RECIPIENTS
+    max_line_size = settings.BROADCAST.MAX_LINE_SIZE
+    content_type = request.headers.get("content-type", "")
+
+    if not content_type.startswith("application/x-ndjson"):
+        try:
+            payload = BroadcastIn.model_validate_json(await request.body())
+        except ValidationError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=e.errors(include_url=False, include_context=False))
+        if len(payload.chat_ids) > max_recipients:
+            _raise_and_log(f"Too many recipients (max {max_recipients})", status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        return [BroadcastRecipient(chat_id, payload.text) for chat_id in payload.chat_ids]
+
+    recipients: list[BroadcastRecipient] = []
+    line_number = 0
+
+    def parse(line: bytes) -> None:
+        nonlocal line_number
+        line_number += 1
+        if len(line) > max_line_size:
+            _raise_and_log(f"Line {line_number} too long (max {max_line_size} bytes)", status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        if not line.strip():
+            return
+        try:
+            message = SendMessageIn.model_validate_json(line)
+        except ValidationError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={"line": line_number, "errors": e.errors(include_url=False, include_context=False)}
+            )
+        if len(recipients) >= max_recipients:
+            _raise_and_log(f"Too many recipients (max {max_recipients})", status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        recipients.append(BroadcastRecipient(message.chat_id, message.text))
+
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            parse(line)
+        if len(buffer) > max_line_size:
+            # Línea sin terminar que ya excede el límite: no se sigue acumulando
+            parse(buffer)
+    parse(buffer)
+
+    if not recipients:
+        _raise_and_log("At least one recipient is required", status.HTTP_400_BAD_REQUEST)
+    return recipients
+
+
+class HistoryService:
+    @staticmethod
+    async def history(
+        telegram_connector_id: UUID,
+        chat_id: int,
+        request: Request,
+        limit: int = 50,
+        cursor: str | None = None
+    ) -> EnvelopeResponse:
+        """
+        Mensajes archivados del chat, del más reciente al más antiguo. La
+        paginación es por llave (`date`, `message_id`): cada página cuesta lo
+        mismo sin importar qué tan atrás esté.
+        """
+        telegram_connector = await _get_owned_connector(telegram_connector_id, request.headers, context="[History] ")
+        before = _decode_cursor(cursor, datetime, int) if cursor else None
+
+        # Una fila de más indica si hay otra página sin un COUNT
+        _, rows = await AsyncTelegramMessageRepository.get_history(telegram_connector.id, chat_id, limit + 1, before)
+        next_cursor = _encode_cursor(rows[limit - 1].date, rows[limit - 1].message_id) if len(rows) > limit else None
+        return create_response_for_fast_api(data=ChatHistoryOut(
+            messages=[WebhookMessageReceived.model_validate(row.payload) for row in rows[:limit]],
+            next_cursor=next_cursor
+        ))
+
+
+class StatsService:
+    @staticmethod
+    async def stats(request: Request) -> EnvelopeResponse:
+        _check_api_key(request.headers)
+
+        return create_response_for_fast_api(data={
+            "forwarder": message_forwarder.stats(),
+            "connector_cache": connector_cache.stats(),
+            "telegram": TelegramClient.stats(),
+            "polling": polling_engine.stats(),
+            "dedupe": update_deduplicator.stats(),
+            "outbox": outbox_worker.stats(),
+            "archive": message_archive.stats(),
+            "media": media_relay.stats(),
+            "uploads": media_sender.stats(),
+            "tracing": tracer.stats(),
+            "startup": startup_timer.report()
+        })
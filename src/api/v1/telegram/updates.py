@@ -0,0 +1,65 @@
+from datetime import datetime
+from typing import Any
+
+from fastapi import HTTPException, status
+
+from api.v1.telegram.archive import message_archive
+from api.v1.telegram.forwarder import message_forwarder
+from api.v1.telegram.outbox import outbox_worker
+from api.v1.telegram.schema import WebhookMessageReceived
+from core.settings import settings
+from db.posgresql.models.public import TelegramConnector
+from shared.log import hot_logger
+
+# Tipos de update que procesa el conector (webhook y long polling)
+ALLOWED_UPDATES = ["message", "edited_message"]
+
+
+async def process_update(telegram_connector: TelegramConnector, update: dict[str, Any]) -> dict[str, str]:
+    """
+    Procesa un `Update` de Telegram ya autenticado, llegue por webhook o por
+    `getUpdates`, y encola el reenvío del mensaje al backend destino.
+    """
+    message = update.get("message") or update.get("edited_message")
+    if not message:
+        hot_logger.info("⚠️ Update ignorado - no es un mensaje")
+        return {"status": "ignored"}
+
+    # Procesa y loguea solo IDs/textos, nunca attachments
+    chat_id = message.get("chat", {}).get("id")
+    webhook_message_received = WebhookMessageReceived(
+        user_id=telegram_connector.user_id,
+        bot_user_name=telegram_connector.bot_user_name,
+        message_id=message.get("message_id"),
+        date=datetime.fromtimestamp(message.get("date", 0)),
+        text=message.get("text"),
+        caption=message.get("caption"),
+        photo=message.get("photo"),
+        document=message.get("document"),
+        sticker=message.get("sticker"),
+        connector_id=telegram_connector.id,
+        chat_id=chat_id
+    )
+
+    hot_logger.info(
+        "Recibido message_id={} chat_id={} user_id={}",
+        webhook_message_received.message_id, chat_id, webhook_message_received.user_id
+    )
+
+    # Encola el reenvío; la entrega al backend destino ocurre en segundo plano.
+    # Con el outbox el mensaje queda en PostgreSQL (y en el archivo, en la
+    # misma transacción) antes de responder a Telegram
+    if settings.OUTBOX.ENABLED:
+        await outbox_worker.enqueue(webhook_message_received)
+    else:
+        if message_archive.enabled:
+            await message_archive.add(webhook_message_received)
+        # Sin encolar (cola llena o entrega en línea fallida) se responde 503:
+        # el webhook libera el update_id y Telegram lo reintenta
+        if not await message_forwarder.enqueue(webhook_message_received):
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Mensaje no encolado para reenvío, reintentar más tarde"
+            )
+
+    return {"status": "ok"}
@@ -0,0 +1,247 @@
+import hashlib
+import io
+import tempfile
+from collections.abc import AsyncIterator
+from email.message import Message
+from typing import Any, BinaryIO, Literal
+from uuid import UUID
+
+import httpx
+from starlette.concurrency import run_in_threadpool
+
+from api.v1.telegram.client import TelegramClient
+from core.settings import settings
+from core.settings.base import UploadSettings
+from shared.cache import AsyncTTLCache
+from shared.metrics import media_upload_bytes, media_uploads
+
+MediaKind = Literal["photo", "document", "voice"]
+
+SEND_METHODS: dict[str, str] = {
+    "photo": "sendPhoto",
+    "document": "sendDocument",
+    "voice": "sendVoice",
+}
+
+
+class UploadError(Exception):
+    def __init__(self, detail: str, status_code: int = 400):
+        super().__init__(detail)
+        self.detail = detail
+        self.status_code = status_code
+
+
+def _header_params(name: str, value: str) -> Message:
+    """Usa el parser de `email` para los parámetros de Content-Type y Content-Disposition."""
+    message = Message()
+    message[name] = value
+    return message
+
+
+class SpooledUpload:
+    """
+    Archivo recibido en una petición de envío. Queda en memoria hasta
+    `SPOOL_MAX_MEMORY` bytes y pasa a un archivo temporal a partir de ahí;
+    el SHA-256 se calcula mientras llega, sin releerlo.
+    """
+
+    def __init__(self, config: UploadSettings):
+        self.config = config
+        # Buffer en memoria hasta pasar a archivo temporal; `file` es el que esté en uso
+        self._buffer: io.BytesIO | None = io.BytesIO()
+        self.file: BinaryIO = self._buffer
+        self.size = 0
+        self.filename: str | None = None
+        self.content_type: str | None = None
+        self.fields: dict[str, str] = {}
+        self._sha256 = hashlib.sha256()
+
+    @property
+    def in_memory(self) -> bool:
+        return self._buffer is not None
+
+    @property
+    def sha256(self) -> str:
+        return self._sha256.hexdigest()
+
+    async def write(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        if self.size > self.config.MAX_SIZE:
+            raise UploadError(f"El archivo supera {self.config.MAX_SIZE} bytes", 413)
+        self._sha256.update(chunk)
+        if self._buffer is not None and self.size > self.config.SPOOL_MAX_MEMORY:
+            spooled = tempfile.TemporaryFile()
+            spooled.write(self._buffer.getvalue())
+            self._buffer.close()
+            self.file, self._buffer = spooled, None
+        if self._buffer is not None:
+            self._buffer.write(chunk)
+        else:
+            await run_in_threadpool(self.file.write, chunk)
+
+    def close(self) -> None:
+        self.file.close()
+
+
+async def read_raw(stream: AsyncIterator[bytes], upload: SpooledUpload) -> None:
+    async for chunk in stream:
+        await upload.write(chunk)
+
+
+async def read_multipart(stream: AsyncIterator[bytes], content_type: str, upload: SpooledUpload, file_field: str) -> None:
+    """
+    Lee un cuerpo multipart/form-data a medida que llega: el campo
+    `file_field` se escribe directo en `upload` y los demás campos (cortos)
+    quedan en `upload.fields`.
+    """
+    boundary = _header_params("Content-Type", content_type).get_param("boundary")
+    if not isinstance(boundary, str) or not boundary:
+        raise UploadError("multipart/form-data sin boundary")
+    delimiter = b"\r\n--" + boundary.encode()
+    keep = len(delimiter) - 1
+    # El primer delimitador no va precedido de CRLF
+    buffer = b"\r\n"
+    state = "preamble"
+    name: str | None = None
+    value = bytearray()
+    found_file = False
+
+    async def emit(data: bytes) -> None:
+        if name == file_field:
+            await upload.write(data)
+            return
+        value.extend(data)
+        if len(value) > upload.config.MAX_FIELD_SIZE:
+            raise UploadError(f"El campo {name!r} supera {upload.config.MAX_FIELD_SIZE} bytes", 413)
+
+    async for chunk in stream:
+        if state == "done":
+            # Se descarta el epílogo
+            continue
+        buffer += chunk
+        while True:
+            if state in ("preamble", "body"):
+                index = buffer.find(delimiter)
+                if index == -1:
+                    if state == "body" and len(buffer) > keep:
+                        await emit(buffer[:-keep])
+                    buffer = buffer[-keep:]
+                    break
+                if state == "body":
+                    await emit(buffer[:index])
+                    if name != file_field and name is not None:
+                        upload.fields[name] = value.decode(errors="replace")
+                buffer = buffer[index + len(delimiter):]
+                state = "delimiter"
+            elif state == "delimiter":
+                if len(buffer) < 2:
+                    break
+                if buffer.startswith(b"--"):
+                    state, buffer = "done", b""
+                    break
+                if not buffer.startswith(b"\r\n"):
+                    raise UploadError("multipart/form-data mal formado")
+                buffer = buffer[2:]
+                state = "headers"
+            elif state == "headers":
+                index = buffer.find(b"\r\n\r\n")
+                if index == -1:
+                    if len(buffer) > upload.config.MAX_FIELD_SIZE:
+                        raise UploadError("Encabezados de multipart demasiado largos", 413)
+                    break
+                headers: dict[str, str] = {}
+                for line in buffer[:index].decode("latin-1").split("\r\n"):
+                    header, _, header_value = line.partition(":")
+                    headers[header.strip().lower()] = header_value.strip()
+                disposition = _header_params("Content-Disposition", headers.get("content-disposition", ""))
+                name = disposition.get_param("name", header="content-disposition")  # type: ignore[assignment]
+                if name == file_field:
+                    if found_file:
+                        raise UploadError(f"El campo {file_field!r} aparece más de una vez")
+                    found_file = True
+                    upload.filename = disposition.get_filename()
+                    upload.content_type = headers.get("content-type")
+                value = bytearray()
+                buffer = buffer[index + 4:]
+                state = "body"
+
+    if state != "done":
+        raise UploadError("multipart/form-data incompleto")
+    if not found_file:
+        raise UploadError(f"Falta el campo {file_field!r}")
+
+
+class MediaSender:
+    """
+    Envía fotos, documentos y notas de voz a Telegram. Tras una subida
+    guarda el `file_id` que devuelve Telegram por (conector, tipo, SHA-256):
+    reenviar el mismo archivo con el mismo bot ya no lo sube de nuevo. Si
+    Telegram rechaza un `file_id` guardado, el archivo se sube otra vez.
+    """
+
+    def __init__(self, config: UploadSettings):
+        self.config = config
+        self.file_ids: AsyncTTLCache[tuple[UUID, str, str], str] = AsyncTTLCache(
+            max_size=config.FILE_ID_CACHE_SIZE,
+            ttl_seconds=config.FILE_ID_TTL_SECONDS
+        )
+        self.uploaded = 0
+        self.uploaded_bytes = 0
+        self.reused = 0
+
+    @staticmethod
+    def file_id_of(kind: str, result: dict[str, Any]) -> str:
+        media = result[kind]
+        # De una foto Telegram devuelve todos los tamaños; el último es el original
+        return (media[-1] if kind == "photo" else media)["file_id"]
+
+    async def send(
+        self,
+        connector: Any,
+        kind: str,
+        chat_id: int,
+        caption: str | None,
+        upload: SpooledUpload
+    ) -> tuple[httpx.Response, bool]:
+        """Devuelve la respuesta de Telegram y si el archivo se subió (o se reutilizó su `file_id`)."""
+        method = SEND_METHODS[kind]
+        payload: dict[str, Any] = {"chat_id": chat_id}
+        if caption:
+            payload["caption"] = caption
+        key = (connector.id, kind, upload.sha256)
+
+        file_id = self.file_ids.get(key)
+        if file_id is not None:
+            response = await TelegramClient.send(
+                connector.id, connector.bot_token, method, {**payload, kind: file_id}, chat_id=chat_id
+            )
+            if response.status_code != 400:
+                self.reused += 1
+                media_uploads.inc("reused")
+                return response, False
+            self.file_ids.invalidate(key)
+
+        files = {kind: (upload.filename or kind, upload.file, upload.content_type or "application/octet-stream")}
+        response = await TelegramClient.send(
+            connector.id, connector.bot_token, method, payload, chat_id=chat_id, files=files
+        )
+        if response.status_code == 200:
+            self.uploaded += 1
+            self.uploaded_bytes += upload.size
+            media_uploads.inc("uploaded")
+            media_upload_bytes.inc(amount=upload.size)
+            data = response.json()
+            if data.get("ok"):
+                self.file_ids.set(key, self.file_id_of(kind, data["result"]))
+        return response, True
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "uploaded": self.uploaded,
+            "uploaded_bytes": self.uploaded_bytes,
+            "reused": self.reused,
+            "file_ids": self.file_ids.stats(),
+        }
+
+
+media_sender = MediaSender(settings.UPLOAD)
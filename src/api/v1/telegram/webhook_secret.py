@@ -0,0 +1,48 @@
+import base64
+import hashlib
+import hmac
+import re
+from enum import StrEnum
+from uuid import UUID
+
+from core.settings import settings
+
+# Secret derivado: prefijo de versión + HMAC-SHA256 en base64url sin padding
+DERIVED_PREFIX = "v1_"
+DERIVED_LENGTH = len(DERIVED_PREFIX) + 43
+# Formato de `secrets.token_urlsafe(192)`, usado antes de los secrets derivados
+LEGACY_SECRET = re.compile(r"[A-Za-z0-9_-]{256}")
+
+
+class SecretCheck(StrEnum):
+    VALID = "valid"      # secret derivado y verificado, no hace falta leer la columna
+    LEGACY = "legacy"    # formato válido, se compara contra `bot_token_secret`
+    INVALID = "invalid"  # se rechaza sin tocar la base
+
+
+def derive_secret(telegram_connector_id: UUID) -> str:
+    """Secret del webhook de un conector, reproducible con `WEBHOOK_SECRET_KEY`."""
+    if not settings.WEBHOOK_SECRET_KEY:
+        raise RuntimeError("WEBHOOK_SECRET_KEY is not configured")
+    digest = hmac.new(settings.WEBHOOK_SECRET_KEY.encode(), telegram_connector_id.bytes, hashlib.sha256).digest()
+    return DERIVED_PREFIX + base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+def check_secret(telegram_connector_id: str, secret_token: str | None) -> SecretCheck:
+    """
+    Verifica el header `X-Telegram-Bot-Api-Secret-Token` sin I/O. La
+    comparación del HMAC es de tiempo constante.
+    """
+    if not secret_token:
+        return SecretCheck.INVALID
+    if len(secret_token) == DERIVED_LENGTH and secret_token.startswith(DERIVED_PREFIX):
+        if not settings.WEBHOOK_SECRET_KEY:
+            return SecretCheck.INVALID
+        try:
+            expected = derive_secret(UUID(telegram_connector_id))
+        except ValueError:
+            return SecretCheck.INVALID
+        return SecretCheck.VALID if hmac.compare_digest(expected, secret_token) else SecretCheck.INVALID
+    if settings.WEBHOOK_LEGACY_SECRETS and LEGACY_SECRET.fullmatch(secret_token):
+        return SecretCheck.LEGACY
+    return SecretCheck.INVALID
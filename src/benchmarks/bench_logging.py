@@ -0,0 +1,144 @@
+"""
+Microbenchmark del costo de los logs por petición del webhook.
+
+Emite la misma secuencia de logs que un webhook aceptado (recepción,
+conector, secreto, cuerpo en debug, mensaje recibido y entrega) con cada
+configuración de `LOG`, escribiendo a /dev/null. "JSON vía loguru" pasa
+todos los logs por loguru hacia el sink JSON; "hot_logger, JSON" es el
+modo `LOG.MODE=json`, donde los info van directo a la cola del sink. Con
+el sink JSON el tiempo incluye vaciar la cola al final de cada ronda.
+
+    cd src && python -m benchmarks.bench_logging --requests 20000
+"""
+import argparse
+import logging
+import os
+import statistics
+import time
+import uuid
+from collections.abc import Callable
+from datetime import datetime
+
+from loguru import logger
+
+from shared.base_contextvars import ctx_log_sampled
+from shared.log import AsyncJsonSink, hot_logger, sample
+
+CONNECTOR = {
+    "id": uuid.uuid4(),
+    "user_id": uuid.uuid4(),
+    "bot_user_name": "bench_bot",
+    "created_at": datetime(2024, 1, 1),
+    "updated_at": datetime(2024, 1, 1),
+}
+UPDATE = {
+    "update_id": 1,
+    "message": {"message_id": 1, "date": 1704067200, "chat": {"id": 1, "type": "private"}, "text": "hola " * 20},
+}
+
+
+def legacy_logs() -> None:
+    """Los logs del webhook antes de `hot_logger`: f-strings que se formatean siempre."""
+    logger.info("📥 Webhook recibido")
+    logger.info(f"ID recibido: {CONNECTOR['id']}")
+    safe = {key: str(value) if key.endswith("_at") else value for key, value in CONNECTOR.items()}
+    logger.info(f"[Webhook] Connector info: {safe}")
+    logger.info("Token válido (secreto verificado, derived)")
+    logger.debug(f"message_received: {str(UPDATE)[:500]}")
+    logger.info(f"Recibido message_id=1 chat_id=1 user_id={CONNECTOR['user_id']}")
+    logger.info(f"Webhook entregado correctamente ({1} mensajes)")
+
+
+def hot_logs() -> None:
+    hot_logger.info("📥 Webhook recibido, ID: {}", CONNECTOR["id"])
+    if hot_logger.enabled(logging.INFO):
+        safe = {key: str(value) if key.endswith("_at") else value for key, value in CONNECTOR.items()}
+        hot_logger.info("{}Connector info: {}", "[Webhook] ", safe)
+    hot_logger.info("Token válido (secreto verificado, {})", "derived")
+    if hot_logger.enabled(logging.DEBUG):
+        hot_logger.debug("message_received: {}", str(UPDATE)[:500])
+    hot_logger.info("Recibido message_id={} chat_id={} user_id={}", 1, 1, CONNECTOR["user_id"])
+    hot_logger.info("Webhook entregado correctamente ({} mensajes)", 1)
+
+
+class Variant:
+    def __init__(self, logs: Callable[[], None], sink: str, level: int = logging.INFO, sample_rate: float = 1.0):
+        self.logs = logs
+        self.sink = sink
+        self.level = level
+        self.sample_rate = sample_rate
+        self._stop: Callable[[], None] = lambda: None
+
+    def setup(self) -> None:
+        logger.remove()
+        hot_logger.min_level = self.level
+        hot_logger.sink = None
+        if self.sink in ("json", "json-loguru"):
+            sink = AsyncJsonSink(open(os.devnull, "wb"))
+            logger.add(sink, level=self.level, format="{message}")
+            if self.sink == "json":
+                hot_logger.sink = sink
+            self._stop = sink.stop
+        else:
+            logger.add(open(os.devnull, "w"), level=self.level)
+            self._stop = lambda: None
+
+    def request(self) -> None:
+        token = ctx_log_sampled.set(sample(self.sample_rate))
+        try:
+            self.logs()
+        finally:
+            ctx_log_sampled.reset(token)
+
+    def teardown(self) -> None:
+        self._stop()
+        logger.remove()
+        hot_logger.sink = None
+
+
+VARIANTS: dict[str, Variant] = {
+    "sin logs (WARNING)": Variant(hot_logs, "text", level=logging.WARNING),
+    "antes: f-strings": Variant(legacy_logs, "text"),
+    "hot_logger, texto": Variant(hot_logs, "text"),
+    "JSON vía loguru": Variant(hot_logs, "json-loguru"),
+    "hot_logger, JSON": Variant(hot_logs, "json"),
+    "JSON, muestreo 1%": Variant(hot_logs, "json", sample_rate=0.01),
+}
+
+
+def measure(variant: Variant, requests: int) -> float:
+    """Devuelve microsegundos por petición."""
+    variant.setup()
+    for _ in range(min(1000, requests)):
+        variant.request()
+    start = time.perf_counter()
+    for _ in range(requests):
+        variant.request()
+    variant.teardown()
+    return (time.perf_counter() - start) / requests * 1_000_000
+
+
+def run(requests: int, rounds: int) -> dict[str, float]:
+    results: dict[str, list[float]] = {name: [] for name in VARIANTS}
+    # Rondas intercaladas para repartir el ruido entre variantes
+    for _ in range(rounds):
+        for name, variant in VARIANTS.items():
+            results[name].append(measure(variant, requests))
+    return {name: statistics.median(samples) for name, samples in results.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    results = run(args.requests, args.rounds)
+    baseline = results["sin logs (WARNING)"]
+    print(f"{'variante':<22}{'us/petición':>14}{'overhead us':>14}")
+    for name, micros in results.items():
+        print(f"{name:<22}{micros:>14.1f}{micros - baseline:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+Microbenchmark del costo por observación de `shared.metrics`.
+
+    cd src && python -m benchmarks.bench_metrics --observations 1000000
+"""
+import argparse
+import time
+
+from shared.metrics import MetricsRegistry
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--observations", type=int, default=500000)
+    args = parser.parse_args()
+
+    registry = MetricsRegistry()
+    histogram = registry.histogram("bench_seconds", "bench", ("method", "outcome"))
+    counter = registry.counter("bench_total", "bench", ("method",))
+    values = [(i % 1000) / 1000 for i in range(1000)]
+
+    start = time.perf_counter()
+    for i in range(args.observations):
+        histogram.observe(values[i % 1000], "sendMessage", "ok")
+    histogram_ns = (time.perf_counter() - start) / args.observations * 1e9
+
+    start = time.perf_counter()
+    for _ in range(args.observations):
+        counter.inc("sendMessage")
+    counter_ns = (time.perf_counter() - start) / args.observations * 1e9
+
+    print(f"Histogram.observe: {histogram_ns:.0f} ns/observación")
+    print(f"Counter.inc:       {counter_ns:.0f} ns/observación")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Microbenchmark del overhead por petición de `CatcherExceptions`.
+
+Compara la app sin middleware, la implementación anterior sobre
+`BaseHTTPMiddleware` y la implementación ASGI pura, llamando a la app ASGI
+directamente (sin red ni cliente HTTP) para aislar el costo del middleware.
+
+    cd src && python -m benchmarks.bench_middleware --requests 20000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from collections.abc import Callable
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.types import ASGIApp, Message
+
+from shared.middlewares import CatcherExceptions
+from shared.middlewares.catcher_exceptions import exception_to_response
+
+
+class LegacyCatcherExceptions(BaseHTTPMiddleware):
+    """Implementación anterior, conservada solo como referencia de medición."""
+
+    async def dispatch(self, request: Request, call_next):
+        try:
+            return await call_next(request)
+        except Exception as e:  # noqa: BLE001
+            return exception_to_response(e)
+
+
+async def webhook(_: Request) -> JSONResponse:
+    return JSONResponse({"status": "ok"})
+
+
+def build_app(middleware: list[Middleware]) -> ASGIApp:
+    return Starlette(routes=[Route("/webhook", webhook, methods=["POST"])], middleware=middleware)
+
+
+VARIANTS: dict[str, Callable[[], ASGIApp]] = {
+    "sin middleware": lambda: build_app([]),
+    "BaseHTTPMiddleware": lambda: build_app([Middleware(LegacyCatcherExceptions)]),
+    "ASGI puro": lambda: build_app([Middleware(CatcherExceptions)]),
+}
+
+BODY = b'{"update_id": 1, "message": {"message_id": 1, "chat": {"id": 1}, "text": "hola"}}'
+
+
+async def call(app: ASGIApp) -> None:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "https",
+        "path": "/webhook",
+        "raw_path": b"/webhook",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("testserver", 443),
+    }
+    sent = False
+
+    async def receive() -> Message:
+        nonlocal sent
+        if sent:
+            return {"type": "http.disconnect"}
+        sent = True
+        return {"type": "http.request", "body": BODY, "more_body": False}
+
+    async def send(message: Message) -> None:
+        pass
+
+    await app(scope, receive, send)
+
+
+async def measure(app: ASGIApp, requests: int) -> float:
+    """Devuelve microsegundos por petición."""
+    for _ in range(min(1000, requests)):
+        await call(app)
+    start = time.perf_counter()
+    for _ in range(requests):
+        await call(app)
+    return (time.perf_counter() - start) / requests * 1_000_000
+
+
+async def run(requests: int, rounds: int) -> dict[str, float]:
+    results: dict[str, list[float]] = {name: [] for name in VARIANTS}
+    apps = {name: factory() for name, factory in VARIANTS.items()}
+    # Rondas intercaladas para repartir el ruido entre variantes
+    for _ in range(rounds):
+        for name, app in apps.items():
+            results[name].append(await measure(app, requests))
+    return {name: statistics.median(samples) for name, samples in results.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.requests, args.rounds))
+    baseline = results["sin middleware"]
+    print(f"{'variante':<22}{'us/petición':>14}{'overhead us':>14}")
+    for name, micros in results.items():
+        print(f"{name:<22}{micros:>14.1f}{micros - baseline:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
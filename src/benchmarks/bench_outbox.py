@@ -0,0 +1,100 @@
+"""
+Throughput del outbox de reenvío contra una PostgreSQL real: inserciones
+concurrentes (lo que hace el webhook) y drenado con N workers. La entrega
+HTTP se sustituye por una espera fija para medir solo el costo del outbox.
+
+    cd src && ENVIRONMENT=testing POSTGRESQL_URL=postgresql://... \\
+        python -m benchmarks.bench_outbox --messages 20000 --workers 4
+
+Usa la tabla `forward_outbox` de esa base y la vacía al terminar.
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime
+from unittest.mock import patch
+
+from sqlalchemy import text
+
+from api.v1.telegram.forwarder import message_forwarder
+from api.v1.telegram.outbox import OutboxWorker
+from api.v1.telegram.schema import WebhookMessageReceived
+from core.settings.base import OutboxSettings
+from db.posgresql.connection import dispose_engines, get_async_db_context
+
+
+async def truncate() -> None:
+    async with get_async_db_context() as session:
+        await session.execute(text("TRUNCATE TABLE public.forward_outbox"))
+        await session.commit()
+
+
+async def bench_enqueue(messages: int, concurrency: int, batch_size: int) -> float:
+    """Cada tarea simula un webhook que espera a que su mensaje quede confirmado."""
+    worker = OutboxWorker(OutboxSettings(ENABLED=True, BATCH_SIZE=batch_size))
+    user_ids = [uuid.uuid4() for _ in range(100)]
+    connector_id = uuid.uuid4()
+    counter = iter(range(messages))
+
+    async def writer() -> None:
+        for i in counter:
+            await worker.enqueue(WebhookMessageReceived(
+                user_id=user_ids[i % 100],
+                bot_user_name="bench_bot",
+                message_id=i,
+                date=datetime.now(),
+                text="hola",
+                chat_id=i % 1000,
+                connector_id=connector_id,
+            ))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(writer() for _ in range(concurrency)))
+    return messages / (time.perf_counter() - start)
+
+
+async def bench_drain(messages: int, args: argparse.Namespace) -> float:
+    worker = OutboxWorker(OutboxSettings(ENABLED=True, WORKERS=args.workers, BATCH_SIZE=args.batch_size))
+
+    async def deliver(*_: object) -> bool:
+        await asyncio.sleep(args.delivery_ms / 1000)
+        return True
+
+    async def drain() -> None:
+        while await worker.drain_once():
+            pass
+
+    start = time.perf_counter()
+    with patch.object(message_forwarder, "deliver", deliver):
+        await asyncio.gather(*(drain() for _ in range(args.workers)))
+    elapsed = time.perf_counter() - start
+    if worker.delivered != messages:
+        raise RuntimeError(f"Se entregaron {worker.delivered} de {messages} mensajes")
+    return messages / elapsed
+
+
+async def run(args: argparse.Namespace) -> None:
+    await truncate()
+    try:
+        enqueue_rate = await bench_enqueue(args.messages, args.concurrency, args.batch_size)
+        drain_rate = await bench_drain(args.messages, args)
+    finally:
+        await truncate()
+        await dispose_engines()
+    print(f"enqueue ({args.concurrency} webhooks concurrentes): {enqueue_rate:,.0f} msg/s")
+    print(f"drain   ({args.workers} workers, lotes de {args.batch_size}): {drain_rate:,.0f} msg/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=200, help="webhooks concurrentes")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--delivery-ms", type=float, default=1.0, help="latencia simulada por POST")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Colector de spans falso, en lugar de un backend de trazas real.
+
+    cd src && python -m uvicorn benchmarks.fake_collector:app --port 8083
+
+Con `TRACING__ENABLED=true TRACING__EXPORT_URL=http://localhost:8083/v1/spans`
+el conector le envía sus spans en lotes. Guarda los últimos `MAX_SPANS` en
+memoria y permite ver una traza completa o qué tramos son los más lentos:
+
+    GET /traces/{trace_id}     spans de una traza, ordenados por inicio
+    GET /__fake__/slowest      p50/p95/max por nombre de span, del más lento al más rápido
+"""
+import os
+from collections import defaultdict, deque
+from typing import Any
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+MAX_SPANS = int(os.environ.get("FAKE_COLLECTOR_MAX_SPANS", "100000"))
+
+spans: deque[dict[str, Any]] = deque(maxlen=MAX_SPANS)
+received = {"batches": 0, "spans": 0}
+
+
+async def collect(request: Request) -> JSONResponse:
+    body = await request.json()
+    batch = body.get("spans", [])
+    for span in batch:
+        span["service"] = body.get("service")
+    spans.extend(batch)
+    received["batches"] += 1
+    received["spans"] += len(batch)
+    return JSONResponse({"accepted": len(batch)})
+
+
+async def trace(request: Request) -> JSONResponse:
+    trace_id = request.path_params["trace_id"]
+    found = sorted((span for span in spans if span["trace_id"] == trace_id), key=lambda span: span["start"])
+    if not found:
+        return JSONResponse({"detail": "trace not found"}, status_code=404)
+    return JSONResponse({"trace_id": trace_id, "spans": found})
+
+
+def _at(values: list[float], q: float) -> float:
+    return round(values[min(len(values) - 1, int(q * len(values)))], 3)
+
+
+async def slowest(_: Request) -> JSONResponse:
+    durations: dict[str, list[float]] = defaultdict(list)
+    for span in spans:
+        durations[span["name"]].append(span["duration_ms"])
+    summary = []
+    for name, values in durations.items():
+        values.sort()
+        summary.append({"name": name, "count": len(values), "p50": _at(values, 0.5), "p95": _at(values, 0.95), "max": values[-1]})
+    summary.sort(key=lambda entry: entry["p95"], reverse=True)
+    return JSONResponse(summary)
+
+
+async def stats(_: Request) -> JSONResponse:
+    return JSONResponse({**received, "stored": len(spans)})
+
+
+app = Starlette(routes=[
+    Route("/v1/spans", collect, methods=["POST"]),
+    Route("/traces/{trace_id}", trace),
+    Route("/__fake__/slowest", slowest),
+    Route("/__fake__/stats", stats),
+    Route("/__fake__/health", stats),
+])
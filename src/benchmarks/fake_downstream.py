@@ -0,0 +1,40 @@
+"""
+Backend destino falso que recibe los reenvíos de `WEBHOOK_MESSAGE_RECEIVED`.
+
+    cd src && python -m uvicorn benchmarks.fake_downstream:app --port 8082
+
+Variables de entorno:
+    FAKE_DOWNSTREAM_LATENCY_MS  latencia fija por petición (default 0)
+"""
+import asyncio
+import os
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+LATENCY_MS = float(os.environ.get("FAKE_DOWNSTREAM_LATENCY_MS", "0"))
+
+received = {"requests": 0, "messages": 0}
+
+
+async def message_received(request: Request) -> JSONResponse:
+    payload = await request.json()
+    received["requests"] += 1
+    # En modo batch el cuerpo es un arreglo de mensajes
+    received["messages"] += len(payload) if isinstance(payload, list) else 1
+    if LATENCY_MS:
+        await asyncio.sleep(LATENCY_MS / 1000)
+    return JSONResponse({"status": "ok"})
+
+
+async def stats(_: Request) -> JSONResponse:
+    return JSONResponse(received)
+
+
+app = Starlette(routes=[
+    Route("/webhook/message-received", message_received, methods=["POST"]),
+    Route("/__fake__/stats", stats),
+    Route("/__fake__/health", stats),
+])
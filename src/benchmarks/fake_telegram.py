@@ -0,0 +1,447 @@
+"""
+Bot API de Telegram falsa para pruebas y pruebas de carga sin red.
+
+Implementa `setWebhook`, `deleteWebhook`, `getWebhookInfo`, `getMe`,
+`sendMessage`, `sendPhoto`, `sendDocument`, `sendVoice` (JSON o
+multipart/form-data), `getUpdates` y `getFile` (más la descarga en
+`/file/bot{token}/{file_path}`), con latencia configurable, respuestas 429
+de flood control y ráfagas de 5xx. También puede empujar updates
+sintéticos al webhook registrado (o a la cola de `getUpdates`) a un ritmo
+objetivo.
+
+    cd src && python -m uvicorn benchmarks.fake_telegram:app --port 8081
+    # la API apunta a ella con
+    TELEGRAM__API_BASE_URL=http://127.0.0.1:8081
+
+Configuración inicial por variables de entorno (también en caliente con
+`POST /__fake__/config`):
+
+    FAKE_TELEGRAM_LATENCY          fixed:MS | uniform:MIN,MAX | exponential:MEDIA | lognormal:MEDIANA,SIGMA
+    FAKE_TELEGRAM_429_PROBABILITY  probabilidad de responder 429 (default 0)
+    FAKE_TELEGRAM_RETRY_AFTER      retry_after de los 429 en segundos (default 1)
+    FAKE_TELEGRAM_5XX_PROBABILITY  probabilidad de iniciar una ráfaga de 5xx (default 0)
+    FAKE_TELEGRAM_5XX_BURST        respuestas consecutivas de cada ráfaga (default 1)
+
+Updates sintéticos:
+
+    POST /__fake__/push {"bot_token": "...", "rate": 100, "count": 1000, "chats": 50}
+"""
+import asyncio
+import itertools
+import math
+import os
+import random
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, fields
+from email import policy
+from email.parser import BytesParser
+from typing import Any
+
+import httpx
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+
+# ---------- latencia y fallos ---------- #
+
+def parse_latency(spec: str) -> tuple[str, tuple[float, ...]]:
+    kind, _, raw = spec.partition(":")
+    params = tuple(float(p) for p in raw.split(",") if p)
+    expected = {"fixed": 1, "uniform": 2, "exponential": 1, "lognormal": 2}
+    if kind not in expected or len(params) != expected[kind]:
+        raise ValueError(f"Distribución de latencia inválida: {spec!r}")
+    return kind, params
+
+
+def sample_latency_ms(spec: str, rng: random.Random) -> float:
+    kind, params = parse_latency(spec)
+    if kind == "fixed":
+        return params[0]
+    if kind == "uniform":
+        return rng.uniform(*params)
+    if kind == "exponential":
+        return rng.expovariate(1 / params[0]) if params[0] > 0 else 0.0
+    median, sigma = params
+    return rng.lognormvariate(math.log(median), sigma) if median > 0 else 0.0
+
+
+@dataclass
+class FaultConfig:
+    latency: str = "fixed:0"
+    rate_limit_probability: float = 0.0
+    retry_after: int = 1
+    error_probability: float = 0.0
+    error_burst: int = 1
+    error_status: int = 502
+
+    @classmethod
+    def from_env(cls) -> "FaultConfig":
+        return cls(
+            latency=os.environ.get("FAKE_TELEGRAM_LATENCY", "fixed:0"),
+            rate_limit_probability=float(os.environ.get("FAKE_TELEGRAM_429_PROBABILITY", "0")),
+            retry_after=int(os.environ.get("FAKE_TELEGRAM_RETRY_AFTER", "1")),
+            error_probability=float(os.environ.get("FAKE_TELEGRAM_5XX_PROBABILITY", "0")),
+            error_burst=int(os.environ.get("FAKE_TELEGRAM_5XX_BURST", "1")),
+        )
+
+    def update(self, values: dict[str, Any]) -> None:
+        """Aplica los valores recibidos; si alguno es inválido no cambia nada."""
+        parsed = {
+            field.name: type(getattr(self, field.name))(values[field.name])
+            for field in fields(self) if field.name in values
+        }
+        parse_latency(parsed.get("latency", self.latency))
+        for name, value in parsed.items():
+            setattr(self, name, value)
+
+
+# ---------- estado por bot ---------- #
+
+class FakeBot:
+    def __init__(self, token: str):
+        self.token = token
+        self.webhook_url = ""
+        self.secret_token = ""
+        self.updates: deque[dict[str, Any]] = deque()
+        self.new_updates = asyncio.Event()
+        self.files: dict[str, dict[str, Any]] = {}
+
+    @property
+    def id(self) -> int:
+        prefix = self.token.split(":", 1)[0]
+        return int(prefix) if prefix.isdigit() else 1
+
+
+class FakeTelegram:
+    """Estado en memoria de la API falsa; un proceso representa a todos los bots."""
+
+    MAX_PENDING_UPDATES = 100_000
+
+    def __init__(self, config: FaultConfig, seed: int | None = None):
+        self.config = config
+        self.rng = random.Random(seed)
+        self.bots: dict[str, FakeBot] = {}
+        self._ids = itertools.count(1)
+        self._error_burst_left = 0
+        self._pushers: set[asyncio.Task[None]] = set()
+        self.stats: dict[str, Any] = {"calls": {}, "rate_limited": 0, "errors": 0, "pushed": 0, "push_failed": 0, "uploaded_bytes": 0}
+
+    def bot(self, token: str) -> FakeBot:
+        bot = self.bots.get(token)
+        if bot is None:
+            bot = self.bots[token] = FakeBot(token)
+        return bot
+
+    def next_id(self) -> int:
+        return next(self._ids)
+
+    # ---------- inyección de fallos ---------- #
+
+    async def inject(self) -> JSONResponse | None:
+        """Aplica latencia y, según la configuración, devuelve un 429 o un 5xx."""
+        delay = sample_latency_ms(self.config.latency, self.rng)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        if self._error_burst_left > 0 or self.rng.random() < self.config.error_probability:
+            if self._error_burst_left == 0:
+                self._error_burst_left = self.config.error_burst
+            self._error_burst_left -= 1
+            self.stats["errors"] += 1
+            status = self.config.error_status
+            return JSONResponse({"ok": False, "error_code": status, "description": "Bad Gateway"}, status_code=status)
+        if self.rng.random() < self.config.rate_limit_probability:
+            self.stats["rate_limited"] += 1
+            retry_after = self.config.retry_after
+            return JSONResponse(
+                {
+                    "ok": False,
+                    "error_code": 429,
+                    "description": f"Too Many Requests: retry after {retry_after}",
+                    "parameters": {"retry_after": retry_after},
+                },
+                status_code=429,
+                headers={"Retry-After": str(retry_after)},
+            )
+        return None
+
+    # ---------- updates sintéticos ---------- #
+
+    def synthetic_update(self, chat_id: int) -> dict[str, Any]:
+        update_id = self.next_id()
+        return {
+            "update_id": update_id,
+            "message": {
+                "message_id": update_id,
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "from": {"id": chat_id, "is_bot": False, "first_name": "Load"},
+                "text": f"mensaje sintético {update_id}",
+            },
+        }
+
+    def enqueue_update(self, bot: FakeBot, update: dict[str, Any]) -> None:
+        bot.updates.append(update)
+        while len(bot.updates) > self.MAX_PENDING_UPDATES:
+            bot.updates.popleft()
+        bot.new_updates.set()
+
+    async def push(self, token: str, rate: float, count: int, chats: int) -> None:
+        """Entrega `count` updates a `rate` por segundo al webhook del bot o a su cola."""
+        bot = self.bot(token)
+        start = time.monotonic()
+        async with httpx.AsyncClient(timeout=30) as client:
+            pending: set[asyncio.Task[None]] = set()
+            for i in range(count):
+                delay = start + i / rate - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                update = self.synthetic_update(1000 + i % max(chats, 1))
+                if not bot.webhook_url:
+                    self.enqueue_update(bot, update)
+                    self.stats["pushed"] += 1
+                    continue
+                task = asyncio.create_task(self._deliver(client, bot, update))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            await asyncio.gather(*pending)
+
+    async def _deliver(self, client: httpx.AsyncClient, bot: FakeBot, update: dict[str, Any]) -> None:
+        try:
+            response = await client.post(
+                bot.webhook_url,
+                json=update,
+                headers={"X-Telegram-Bot-Api-Secret-Token": bot.secret_token},
+            )
+            ok = response.status_code == 200
+        except httpx.HTTPError:
+            ok = False
+        self.stats["pushed" if ok else "push_failed"] += 1
+
+    def start_push(self, token: str, rate: float, count: int, chats: int) -> None:
+        task = asyncio.create_task(self.push(token, rate, count, chats))
+        self._pushers.add(task)
+        task.add_done_callback(self._pushers.discard)
+
+
+# ---------- métodos de la Bot API ---------- #
+
+def ok(result: Any) -> JSONResponse:
+    return JSONResponse({"ok": True, "result": result})
+
+
+def error(status: int, description: str) -> JSONResponse:
+    return JSONResponse({"ok": False, "error_code": status, "description": description}, status_code=status)
+
+
+async def set_webhook(fake: FakeTelegram, bot: FakeBot, payload: dict[str, Any]) -> JSONResponse:
+    bot.webhook_url = payload.get("url", "")
+    bot.secret_token = payload.get("secret_token", "")
+    return ok(True)
+
+
+async def delete_webhook(fake: FakeTelegram, bot: FakeBot, payload: dict[str, Any]) -> JSONResponse:
+    bot.webhook_url = ""
+    bot.secret_token = ""
+    if payload.get("drop_pending_updates"):
+        bot.updates.clear()
+    return ok(True)
+
+
+async def get_webhook_info(fake: FakeTelegram, bot: FakeBot, payload: dict[str, Any]) -> JSONResponse:
+    return ok({
+        "url": bot.webhook_url,
+        "has_custom_certificate": False,
+        "pending_update_count": len(bot.updates),
+    })
+
+
+async def get_me(fake: FakeTelegram, bot: FakeBot, payload: dict[str, Any]) -> JSONResponse:
+    return ok({"id": bot.id, "is_bot": True, "first_name": "Fake", "username": f"fake_{bot.id}_bot"})
+
+
+async def send_message(fake: FakeTelegram, bot: FakeBot, payload: dict[str, Any]) -> JSONResponse:
+    if not payload.get("chat_id"):
+        return error(400, "Bad Request: chat_id is empty")
+    if not payload.get("text"):
+        return error(400, "Bad Request: message text is empty")
+    return ok({
+        "message_id": fake.next_id(),
+        "date": int(time.time()),
+        "chat": {"id": payload["chat_id"], "type": "private"},
+        "text": payload["text"],
+    })
+
+
+def parse_form(body: bytes, content_type: str) -> dict[str, Any]:
+    """Campos de un multipart/form-data; los archivos quedan como bytes."""
+    message = BytesParser(policy=policy.HTTP).parsebytes(b"Content-Type: " + content_type.encode() + b"\r\n\r\n" + body)
+    form: dict[str, Any] = {}
+    for part in message.iter_parts():
+        name = part.get_param("name", header="content-disposition")
+        value = part.get_payload(decode=True) or b""
+        form[name] = value if part.get_filename() else value.decode()
+    return form
+
+
+def send_media(kind: str):
+    async def handler(fake: FakeTelegram, bot: FakeBot, payload: dict[str, Any]) -> JSONResponse:
+        if not payload.get("chat_id"):
+            return error(400, "Bad Request: chat_id is empty")
+        media = payload.get(kind)
+        if isinstance(media, bytes):
+            file_id = f"{kind}-{fake.next_id()}"
+            info = bot.files[file_id] = {
+                "file_id": file_id,
+                "file_unique_id": f"u{abs(hash(media)) % 10**10}",
+                "file_size": len(media),
+                "file_path": f"{kind}s/{file_id}.bin",
+            }
+            fake.stats["uploaded_bytes"] += len(media)
+        elif isinstance(media, str) and media in bot.files:
+            info = bot.files[media]
+        elif media:
+            return error(400, "Bad Request: wrong file identifier/HTTP URL specified")
+        else:
+            return error(400, f"Bad Request: there is no {kind} in the request")
+        result = {
+            "message_id": fake.next_id(),
+            "date": int(time.time()),
+            "chat": {"id": int(payload["chat_id"]), "type": "private"},
+            kind: [info] if kind == "photo" else info,
+        }
+        if payload.get("caption"):
+            result["caption"] = payload["caption"]
+        return ok(result)
+
+    return handler
+
+
+async def get_updates(fake: FakeTelegram, bot: FakeBot, payload: dict[str, Any]) -> JSONResponse:
+    if bot.webhook_url:
+        return error(409, "Conflict: can't use getUpdates method while webhook is active; use deleteWebhook to delete the webhook first")
+    offset = int(payload.get("offset", 0))
+    limit = min(max(int(payload.get("limit", 100)), 1), 100)
+    timeout = float(payload.get("timeout", 0))
+
+    # Un offset confirma (y descarta) todos los updates anteriores
+    while bot.updates and bot.updates[0]["update_id"] < offset:
+        bot.updates.popleft()
+    if not bot.updates and timeout > 0:
+        bot.new_updates.clear()
+        try:
+            await asyncio.wait_for(bot.new_updates.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+    return ok(list(itertools.islice(bot.updates, limit)))
+
+
+async def get_file(fake: FakeTelegram, bot: FakeBot, payload: dict[str, Any]) -> JSONResponse:
+    file_id = payload.get("file_id")
+    if not file_id:
+        return error(400, "Bad Request: file_id is empty")
+    info = bot.files.get(file_id)
+    if info is None:
+        # Archivo determinista por file_id para poder descargarlo después
+        size = 1024 + (sum(file_id.encode()) % 64) * 1024
+        info = bot.files[file_id] = {
+            "file_id": file_id,
+            "file_unique_id": f"u{abs(hash(file_id)) % 10**10}",
+            "file_size": size,
+            "file_path": f"documents/{file_id}.bin",
+        }
+    return ok(info)
+
+
+METHODS = {
+    "setWebhook": set_webhook,
+    "deleteWebhook": delete_webhook,
+    "getWebhookInfo": get_webhook_info,
+    "getMe": get_me,
+    "sendMessage": send_message,
+    "getUpdates": get_updates,
+    "getFile": get_file,
+    "sendPhoto": send_media("photo"),
+    "sendDocument": send_media("document"),
+    "sendVoice": send_media("voice"),
+}
+
+
+# ---------- app ---------- #
+
+def create_app(config: FaultConfig | None = None, seed: int | None = None) -> Starlette:
+    fake = FakeTelegram(config or FaultConfig.from_env(), seed=seed)
+
+    async def bot_method(request: Request) -> Response:
+        method = request.path_params["method"]
+        handler = METHODS.get(method)
+        if handler is None:
+            return error(404, "Not Found")
+        body = await request.body()
+        content_type = request.headers.get("content-type", "")
+        if content_type.startswith("multipart/form-data"):
+            payload = parse_form(body, content_type)
+        else:
+            payload = await request.json() if body else dict(request.query_params)
+        fake.stats["calls"][method] = fake.stats["calls"].get(method, 0) + 1
+        injected = await fake.inject()
+        if injected is not None:
+            return injected
+        return await handler(fake, fake.bot(request.path_params["token"]), payload)
+
+    async def download_file(request: Request) -> Response:
+        bot = fake.bot(request.path_params["token"])
+        file_path = request.path_params["file_path"]
+        info = next((f for f in bot.files.values() if f["file_path"] == file_path), None)
+        if info is None:
+            return error(404, "Not Found")
+        seed = info["file_unique_id"].encode()
+        return Response((seed * (info["file_size"] // len(seed) + 1))[:info["file_size"]], media_type="application/octet-stream")
+
+    async def config(request: Request) -> JSONResponse:
+        if request.method == "POST":
+            try:
+                fake.config.update(await request.json())
+            except (TypeError, ValueError) as e:
+                return JSONResponse({"error": str(e)}, status_code=400)
+        return JSONResponse(asdict(fake.config))
+
+    async def push(request: Request) -> JSONResponse:
+        data = await request.json()
+        fake.start_push(
+            data["bot_token"],
+            rate=float(data.get("rate", 10)),
+            count=int(data.get("count", 100)),
+            chats=int(data.get("chats", 1)),
+        )
+        return JSONResponse({"status": "started"}, status_code=202)
+
+    async def webhooks(_: Request) -> JSONResponse:
+        """Webhooks registrados, para que el generador de carga conozca los secrets."""
+        return JSONResponse({
+            token: {"url": bot.webhook_url, "secret_token": bot.secret_token}
+            for token, bot in fake.bots.items() if bot.webhook_url
+        })
+
+    async def stats(_: Request) -> JSONResponse:
+        return JSONResponse(fake.stats)
+
+    async def health(_: Request) -> JSONResponse:
+        return JSONResponse({"status": "ok"})
+
+    app = Starlette(routes=[
+        Route("/bot{token}/{method}", bot_method, methods=["GET", "POST"]),
+        Route("/file/bot{token}/{file_path:path}", download_file),
+        Route("/__fake__/config", config, methods=["GET", "POST"]),
+        Route("/__fake__/push", push, methods=["POST"]),
+        Route("/__fake__/webhooks", webhooks),
+        Route("/__fake__/stats", stats),
+        Route("/__fake__/health", health),
+    ])
+    app.state.fake = fake
+    return app
+
+
+app = create_app()
@@ -1,11 +1,11 @@
 from typing import ClassVar
 
-import sentry_sdk
 from loguru import logger
 
-from core.settings.base import Settings
+from core.settings.base import LogMode, Settings
 from shared.path import APP_ENVIRONMENT
 from shared.environment import AppEnvironment
+from shared.log import AsyncJsonSink, hot_logger
 from core.settings.development import DevelopmentSettings
 from core.settings.local import LocalSettings
 from core.settings.production import ProductionSettings
@@ -38,6 +38,12 @@ class SettingsManager:
         self._initialize_logger()
 
     def _show_project_info(self) -> None:
+        if self.settings.STARTUP.LEAN:
+            logger.info(
+                f"{self.settings.PROJECT.NAME} {self.settings.PROJECT.VERSION} "
+                f"({self.settings.ENVIRONMENT})"
+            )
+            return
         logger.info(f"ENVIRONMENT: {self.settings.ENVIRONMENT}")
         logger.info(f"PROJECT: {self.settings.PROJECT.NAME}")
         logger.info(f"DESCRIPTION: {self.settings.PROJECT.DESCRIPTION}")
@@ -58,6 +64,13 @@ class SettingsManager:
 
         logger.remove()
         level = logging.DEBUG if self.settings.LOG.DEBUG else logging.INFO
+        hot_logger.min_level = level
+        hot_logger.sink = None
+        if self.settings.LOG.MODE == LogMode.JSON:
+            sink = AsyncJsonSink(max_queue_size=self.settings.LOG.JSON_QUEUE_SIZE)
+            logger.add(sink=sink, level=level, format="{message}")
+            hot_logger.sink = sink
+            return
         logger.add(
             sink=sys.stdout,
             level=level,
@@ -68,10 +81,15 @@ class SettingsManager:
 
 
     def _sentry_setup(self) -> None:
+        # Importar sentry_sdk cuesta ~0.3s: solo se paga donde se usa
+        import sentry_sdk
+
         sentry_sdk.init(
             dsn=self.settings.SENTRY_DSN,
             environment=self.settings.ENVIRONMENT,
             traces_sample_rate=0,
+            # En modo lean no se importan las integraciones de cada librería instalada
+            auto_enabling_integrations=not self.settings.STARTUP.LEAN,
         )
 
     def _get_settings(self) -> Settings:
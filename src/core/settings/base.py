@@ -1,3 +1,4 @@
+from enum import StrEnum
 from pydantic import BaseModel
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field, PostgresDsn, RedisDsn, MongoDsn
@@ -11,11 +12,181 @@ class ProjectSettings(BaseModel):
     AUTHORS: str
     LOGO_URL: str = "https://davidronihdz99.pythonanywhere.com/media/fotosPerfil/roni_3dqmEf6.jpg"
 
+class LogMode(StrEnum):
+    TEXT = "text"
+    # Una línea JSON por log (orjson), escrita desde un hilo aparte
+    JSON = "json"
+
 class LogSettings(BaseModel):
     DEBUG: bool = False
     COLORIZE: bool = False  
     SERIALIZE: bool = False
     ENQUEUE: bool = False
+    # Con JSON se ignoran COLORIZE, SERIALIZE y ENQUEUE
+    MODE: LogMode = LogMode.TEXT
+    JSON_QUEUE_SIZE: int = 10000
+    # Fracción de peticiones que emiten sus logs debug/info, por prefijo de
+    # ruta (p. ej. {"/v1/telegram/webhook": 0.01}); warning y error siempre
+    SAMPLE_RATES: dict[str, float] = {}
+
+class TracingSettings(BaseModel):
+    ENABLED: bool = False
+    # Se acepta el trace id entrante en este header y se devuelve en la respuesta
+    HEADER: str = "X-Trace-Id"
+    # Colector que recibe POST {"service": ..., "spans": [...]}; sin él los
+    # spans solo quedan en memoria (los últimos RECENT_SIZE)
+    EXPORT_URL: str | None = None
+    EXPORT_BATCH_SIZE: int = 200
+    EXPORT_INTERVAL: float = 1.0
+    EXPORT_TIMEOUT: float = 5.0
+    QUEUE_SIZE: int = 10000
+    RECENT_SIZE: int = 1000
+
+class StartupSettings(BaseModel):
+    # Arranque mínimo para Lambda: Sentry sin integraciones auto-detectadas
+    # y una sola línea de log con la información del proyecto
+    LEAN: bool = False
+    # Loguea la duración de cada fase del arranque
+    REPORT: bool = True
+
+class TelegramSettings(BaseModel):
+    API_BASE_URL: str = "https://api.telegram.org"
+    HTTP2: bool = True
+    CONNECT_TIMEOUT: float = 5.0
+    READ_TIMEOUT: float = 10.0
+    WRITE_TIMEOUT: float = 10.0
+    POOL_TIMEOUT: float = 5.0
+    MAX_CONNECTIONS: int = 100
+    MAX_KEEPALIVE_CONNECTIONS: int = 20
+    KEEPALIVE_EXPIRY: float = 30.0
+    # Límites de envío de la Bot API (~30 msg/s por bot, ~1 msg/s por chat)
+    BOT_MESSAGES_PER_SECOND: float = 30.0
+    CHAT_MESSAGES_PER_SECOND: float = 1.0
+    # Reintentos ante 429 (flood control); un retry_after mayor no se espera
+    MAX_RETRIES: int = 3
+    MAX_RETRY_AFTER: float = 30.0
+
+class BroadcastSettings(BaseModel):
+    # Los jobs viven en la memoria del proceso: en Lambda la tarea se congela
+    # al responder y otra invocación no ve el job. Con False (y siempre en
+    # Lambda) los broadcasts se rechazan con 503
+    IN_PROCESS: bool = True
+    CONCURRENCY: int = 10
+    MAX_RECIPIENTS: int = 100000
+    MAX_JOBS: int = 1000
+    # Bytes por línea NDJSON (un texto de 4096 caracteres escapado cabe)
+    MAX_LINE_SIZE: int = 32768
+    # Veces que un destinatario espera el retry_after de un 429 antes de
+    # marcarse como fallido (los 429 de flood control no pierden mensajes)
+    MAX_RATE_LIMIT_WAITS: int = 10
+
+class PollingSettings(BaseModel):
+    # Con ENABLED los conectores reciben updates por getUpdates en vez de webhook
+    ENABLED: bool = False
+    # Si el proceso de la API corre el motor; False cuando hay un worker dedicado
+    IN_PROCESS: bool = True
+    TIMEOUT: int = 25
+    LIMIT: int = 100
+    MAX_BACKOFF: float = 60.0
+    SYNC_INTERVAL: float = 60.0
+    # Intentos de procesar un update antes de descartarlo y avanzar el offset
+    MAX_UPDATE_ATTEMPTS: int = 5
+
+class ForwarderSettings(BaseModel):
+    WORKERS: int = 4
+    QUEUE_MAX_SIZE: int = 10000
+    TIMEOUT: float = 5.0
+    MAX_CONNECTIONS: int = 50
+    SHUTDOWN_TIMEOUT: float = 10.0
+    # Micro-batching: con BATCH_MAX_SIZE > 1 se envían arreglos por X-User-Id
+    BATCH_MAX_SIZE: int = 1
+    BATCH_MAX_WAIT: float = 0.05
+
+class OutboxSettings(BaseModel):
+    # Con ENABLED el webhook escribe en `forward_outbox` en lugar de la cola en memoria
+    ENABLED: bool = False
+    # Workers dentro de la API; False para drenar con `python -m api.v1.telegram.outbox`
+    IN_PROCESS: bool = True
+    WORKERS: int = 2
+    BATCH_SIZE: int = 200
+    POLL_INTERVAL: float = 0.5
+    # Tiempo que una fila reclamada queda invisible para otros workers
+    LEASE_SECONDS: float = 60.0
+    MAX_ATTEMPTS: int = 10
+    BACKOFF_BASE: float = 1.0
+    BACKOFF_MAX: float = 300.0
+
+class ArchiveSettings(BaseModel):
+    # Guarda cada mensaje recibido en `telegram_messages` para el historial
+    ENABLED: bool = False
+    # Particiones mensuales (UTC) que se crean por adelantado al arrancar y al cambiar de mes
+    PARTITION_MONTHS_AHEAD: int = 2
+    # Filas por INSERT cuando se agrupan escrituras concurrentes
+    BATCH_SIZE: int = 200
+
+class MediaSettings(BaseModel):
+    # Retransmite fotos, documentos y stickers a RELAY_URL antes de reenviar
+    # el mensaje: PUT {RELAY_URL}/{user_id}/{file_unique_id} con el cuerpo en streaming
+    ENABLED: bool = False
+    RELAY_URL: str | None = None
+    CHUNK_SIZE: int = 65536
+    TIMEOUT: float = 60.0
+    # Telegram garantiza el enlace de `getFile` al menos una hora
+    FILE_PATH_TTL_SECONDS: float = 3300.0
+    FILE_PATH_CACHE_SIZE: int = 10000
+    # Archivos ya retransmitidos, por `file_unique_id`
+    RELAYED_TTL_SECONDS: float = 86400.0
+    RELAYED_CACHE_SIZE: int = 10000
+    # La Bot API no entrega con `getFile` archivos de más de 20 MB
+    MAX_FILE_SIZE: int = 20 * 1024 * 1024
+
+class UploadSettings(BaseModel):
+    # Límite de la Bot API para archivos subidos por un bot
+    MAX_SIZE: int = 50 * 1024 * 1024
+    # Hasta este tamaño el archivo recibido queda en memoria; después, en disco
+    SPOOL_MAX_MEMORY: int = 1024 * 1024
+    MAX_FIELD_SIZE: int = 4096
+    # `file_id` de archivos ya subidos, por conector, tipo y SHA-256
+    FILE_ID_TTL_SECONDS: float = 7 * 86400.0
+    FILE_ID_CACHE_SIZE: int = 10000
+
+class ConnectorCacheSettings(BaseModel):
+    MAX_SIZE: int = 10000
+    TTL_SECONDS: float = 300.0
+
+class PoolMode(StrEnum):
+    QUEUE = "queue"
+    NULL = "null"
+
+class DedupeBackend(StrEnum):
+    MEMORY = "memory"
+    REDIS = "redis"
+
+class DedupeSettings(BaseModel):
+    ENABLED: bool = True
+    # `memory` es por instancia; `redis` comparte la ventana (requiere REDIS_URL)
+    BACKEND: DedupeBackend = DedupeBackend.MEMORY
+    # update_ids recordados por conector y conectores recordados (en memoria)
+    WINDOW_SIZE: int = 1000
+    MAX_CONNECTORS: int = 10000
+    # Vida de cada update_id en Redis; Telegram deja de reintentar tras 24 h
+    TTL_SECONDS: int = 86400
+
+class MongoSettings(BaseModel):
+    # Escrituras en lote: se vacía al juntar BULK_FLUSH_SIZE documentos o
+    # cuando el más viejo del buffer cumple BULK_FLUSH_INTERVAL segundos
+    BULK_FLUSH_SIZE: int = 500
+    BULK_FLUSH_INTERVAL: float = 1.0
+    # Documentos por viaje al servidor al iterar un `find`
+    FIND_BATCH_SIZE: int = 500
+
+class DatabaseSettings(BaseModel):
+    POOL_MODE: PoolMode = PoolMode.QUEUE
+    POOL_SIZE: int = 5
+    MAX_OVERFLOW: int = 10
+    POOL_RECYCLE: int = 1800
+    POOL_PRE_PING: bool = True
+    POOL_TIMEOUT: float = 30.0
 
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(
@@ -62,16 +233,39 @@ class Settings(BaseSettings):
         SERIALIZE=False,
         ENQUEUE=False
     )
+    STARTUP: StartupSettings = StartupSettings()
+    TRACING: TracingSettings = TracingSettings()
 
     # Database settings
     # ----------------------------------------------------------------
 
     POSTGRESQL_URL: PostgresDsn
-    # MONGO_URL: MongoDsn
-    #REDIS_URL: RedisDsn
+    DATABASE: DatabaseSettings = DatabaseSettings()
+    CONNECTOR_CACHE: ConnectorCacheSettings = ConnectorCacheSettings()
+    MONGO_URL: MongoDsn | None = None
+    MONGO: MongoSettings = MongoSettings()
+    REDIS_URL: RedisDsn | None = None
+
+
+    # Telegram Bot API
+    # ----------------------------------------------------------------
 
+    TELEGRAM: TelegramSettings = TelegramSettings()
+    BROADCAST: BroadcastSettings = BroadcastSettings()
+    POLLING: PollingSettings = PollingSettings()
 
     # Webhook
     # ----------------------------------------------------------------
 
-    WEBHOOK_MESSAGE_RECEIVED: str 
\ No newline at end of file
+    WEBHOOK_MESSAGE_RECEIVED: str
+    # Llave para derivar el secret de cada webhook (HMAC del id del conector)
+    WEBHOOK_SECRET_KEY: str | None = None
+    # Acepta los secrets aleatorios de conectores creados antes de la llave
+    WEBHOOK_LEGACY_SECRETS: bool = True
+    # Descarta los updates que Telegram reenvía (mismo update_id)
+    DEDUPE: DedupeSettings = DedupeSettings()
+    FORWARDER: ForwarderSettings = ForwarderSettings()
+    OUTBOX: OutboxSettings = OutboxSettings()
+    ARCHIVE: ArchiveSettings = ArchiveSettings()
+    MEDIA: MediaSettings = MediaSettings()
+    UPLOAD: UploadSettings = UploadSettings()
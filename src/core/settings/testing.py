@@ -1,5 +1,5 @@
 from core.settings.base import Settings
-from core.settings.base import ProjectSettings
+from core.settings.base import ProjectSettings, DatabaseSettings, PoolMode
 from pydantic import Field
 
 class TestingSettings(Settings):
@@ -17,5 +17,7 @@ class TestingSettings(Settings):
     HOST: str = "https://fake-host/dev"
     WEBHOOK_MESSAGE_RECEIVED: str = "https://fake-host/dev/webhook/message-received"
     API_KEY : str = "fake-api-key"
-    
+    WEBHOOK_SECRET_KEY: str | None = "fake-webhook-secret-key"
 
+    # Cada test corre en su propio event loop: sin pool de conexiones
+    DATABASE: DatabaseSettings = DatabaseSettings(POOL_MODE=PoolMode.NULL)
@@ -2,6 +2,7 @@ from sqlalchemy import create_engine
 from sqlalchemy.pool import NullPool
 from core.settings import settings
 from db.posgresql.base import Base
+from db.posgresql.migrations import run_migrations
 from db.posgresql.models.public import TelegramConnector 
 from loguru import logger
 
@@ -23,10 +24,15 @@ def prepare_specific_tables(models: list):
     create_specific_tables(engine, tables)
     logger.info(f"Tables created")
 
+
+def migrate(target_version: int | None = None) -> list[int]:
+    logger.info(f"Running migrations")
+    engine = create_engine(settings.POSTGRESQL_URL.unicode_string(), poolclass=NullPool)
+    applied = run_migrations(engine, target_version=target_version)
+    logger.info(f"Migrations applied: {applied}")
+    engine.dispose()
+    return applied
+
 if __name__ == "__main__":
-    logger.info(f"Creating tables")
-    prepare_specific_tables(
-        models=[
-            TelegramConnector
-        ]
-    )
+    # Las tablas y sus índices se versionan en db/posgresql/migrations/versions
+    migrate()
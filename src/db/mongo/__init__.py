@@ -1,4 +1,13 @@
-from .base import BaseMongoDocument, MongoAbstractRepository
-from .connection import MongoDBConnection
+from .base import AsyncMongoAbstractRepository, BaseMongoDocument, MongoAbstractRepository
+from .bulk import AsyncMongoBulkWriter, MongoBulkWriter
+from .connection import AsyncMongoDBConnection, MongoDBConnection
 
-__all__ = ["MongoDBConnection", "BaseMongoDocument", "MongoAbstractRepository"]
+__all__ = [
+    "MongoDBConnection",
+    "AsyncMongoDBConnection",
+    "BaseMongoDocument",
+    "MongoAbstractRepository",
+    "AsyncMongoAbstractRepository",
+    "MongoBulkWriter",
+    "AsyncMongoBulkWriter",
+]
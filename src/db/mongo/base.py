@@ -1,13 +1,18 @@
 import uuid
 from abc import ABC
+from collections.abc import AsyncIterator, Iterable, Iterator, Sequence
 from datetime import datetime
+from functools import lru_cache
+from typing import Any
 from uuid import UUID
 
-from pydantic import BaseModel, Field, ConfigDict, field_serializer
+from pydantic import BaseModel, Field, ConfigDict, create_model, field_serializer
 
+from core.settings import settings
 from shared.utils_dates import get_app_current_time
 
-from .connection import MongoDBConnection
+from .bulk import AsyncMongoBulkWriter, MongoBulkWriter
+from .connection import AsyncMongoDBConnection, MongoDBConnection
 
 
 def default_mongodb_id():
@@ -31,25 +36,166 @@ class BaseMongoDocument(BaseModel):
     def serialize_id(self, v: UUID, _info):
         return str(v)
 
-
-class MongoAbstractRepository(ABC):
+    def to_mongo(self) -> dict[str, Any]:
+        """Document as stored: `id` goes to `_id`, so re-inserting it is a duplicate."""
+        return self.model_dump(mode="json", by_alias=True)
+
+
+@lru_cache(maxsize=256)
+def projection_model(document_model: type[BaseMongoDocument], fields: frozenset[str]) -> type[BaseMongoDocument]:
+    """
+    Subclass of `document_model` where the fields left out of a projection
+    are optional, so partial documents are still validated (and are still
+    instances of `document_model`).
+    """
+    unknown = fields - document_model.model_fields.keys()
+    if unknown:
+        raise ValueError(f"Unknown fields for {document_model.__name__}: {sorted(unknown)}")
+    omitted = {
+        name: (field.annotation | None, Field(default=None, alias=field.alias))
+        for name, field in document_model.model_fields.items()
+        if name not in fields and name != "id"
+    }
+    if not omitted:
+        return document_model
+    return create_model(f"{document_model.__name__}Projection", __base__=document_model, **omitted)  # type: ignore[call-overload]
+
+
+class _MongoRepositoryMixin:
     collection_name: str
     document_model: type[BaseMongoDocument]
 
-    def __init__(self):
-        self._validate_attributes()
-        self._init_collection()
-
-    def _init_collection(self):
-        self.collection = MongoDBConnection.get_collection(self.collection_name)
-
     def _validate_attributes(self):
         if not self.collection_name:
             raise ValueError("Collection name is required")
         if not self.document_model:
             raise ValueError("Document model is required")
 
-    def add(self, data: BaseMongoDocument) -> BaseMongoDocument:
+    def _check_type(self, data: BaseMongoDocument) -> None:
         if not isinstance(data, self.document_model):
             raise TypeError(f"Expected {self.document_model}, got {type(data)}")
-        self.collection.insert_one(data.model_dump(mode="json"))
+
+    def _find_args(
+        self,
+        filter: dict[str, Any] | None,
+        projection: Iterable[str] | None,
+        batch_size: int | None,
+    ) -> tuple[type[BaseMongoDocument], dict[str, Any]]:
+        """Model to validate with and the keyword arguments for `collection.find`."""
+        kwargs: dict[str, Any] = {
+            "filter": filter or {},
+            "batch_size": batch_size or settings.MONGO.FIND_BATCH_SIZE,
+        }
+        if projection is None:
+            return self.document_model, kwargs
+        fields = frozenset(projection)
+        model = projection_model(self.document_model, fields)
+        kwargs["projection"] = {
+            field.alias or name: 1
+            for name, field in model.model_fields.items()
+            if name in fields
+        }
+        return model, kwargs
+
+
+class MongoAbstractRepository(_MongoRepositoryMixin, ABC):
+
+    def __init__(self):
+        self._validate_attributes()
+        self._init_collection()
+
+    def _init_collection(self):
+        self.collection = MongoDBConnection.get_collection(self.collection_name)
+
+    def add(self, data: BaseMongoDocument) -> BaseMongoDocument:
+        self._check_type(data)
+        self.collection.insert_one(data.to_mongo())
+        return data
+
+    def add_many(self, data: Sequence[BaseMongoDocument]) -> int:
+        """Unordered `insert_many`: one round trip for the whole sequence."""
+        for document in data:
+            self._check_type(document)
+        if not data:
+            return 0
+        result = self.collection.insert_many([document.to_mongo() for document in data], ordered=False)
+        return len(result.inserted_ids)
+
+    def bulk_writer(self, flush_size: int | None = None, flush_interval: float | None = None) -> MongoBulkWriter:
+        return MongoBulkWriter(
+            self.collection,
+            self.document_model,
+            flush_size or settings.MONGO.BULK_FLUSH_SIZE,
+            settings.MONGO.BULK_FLUSH_INTERVAL if flush_interval is None else flush_interval,
+        )
+
+    def find(
+        self,
+        filter: dict[str, Any] | None = None,
+        projection: Iterable[str] | None = None,
+        sort: list[tuple[str, int]] | None = None,
+        limit: int = 0,
+        batch_size: int | None = None,
+    ) -> Iterator[BaseMongoDocument]:
+        """
+        Validated documents, fetched lazily `batch_size` at a time. With a
+        projection only those fields travel over the wire (`_id` always does).
+        """
+        model, kwargs = self._find_args(filter, projection, batch_size)
+        cursor = self.collection.find(sort=sort, limit=limit, **kwargs)
+        try:
+            for document in cursor:
+                yield model.model_validate(document)
+        finally:
+            cursor.close()
+
+
+class AsyncMongoAbstractRepository(_MongoRepositoryMixin, ABC):
+    """
+    `MongoAbstractRepository` over `AsyncMongoClient`. The collection is
+    resolved on each use because the client is bound to the running loop.
+    """
+
+    def __init__(self):
+        self._validate_attributes()
+
+    @property
+    def collection(self):
+        return AsyncMongoDBConnection.get_collection(self.collection_name)
+
+    async def add(self, data: BaseMongoDocument) -> BaseMongoDocument:
+        self._check_type(data)
+        await self.collection.insert_one(data.to_mongo())
+        return data
+
+    async def add_many(self, data: Sequence[BaseMongoDocument]) -> int:
+        for document in data:
+            self._check_type(document)
+        if not data:
+            return 0
+        result = await self.collection.insert_many([document.to_mongo() for document in data], ordered=False)
+        return len(result.inserted_ids)
+
+    def bulk_writer(self, flush_size: int | None = None, flush_interval: float | None = None) -> AsyncMongoBulkWriter:
+        return AsyncMongoBulkWriter(
+            self.collection,
+            self.document_model,
+            flush_size or settings.MONGO.BULK_FLUSH_SIZE,
+            settings.MONGO.BULK_FLUSH_INTERVAL if flush_interval is None else flush_interval,
+        )
+
+    async def find(
+        self,
+        filter: dict[str, Any] | None = None,
+        projection: Iterable[str] | None = None,
+        sort: list[tuple[str, int]] | None = None,
+        limit: int = 0,
+        batch_size: int | None = None,
+    ) -> AsyncIterator[BaseMongoDocument]:
+        model, kwargs = self._find_args(filter, projection, batch_size)
+        cursor = self.collection.find(sort=sort, limit=limit, **kwargs)
+        try:
+            async for document in cursor:
+                yield model.model_validate(document)
+        finally:
+            await cursor.close()
@@ -0,0 +1,175 @@
+import asyncio
+import time
+from typing import TYPE_CHECKING
+
+from loguru import logger
+from pymongo import InsertOne
+from pymongo.errors import BulkWriteError
+
+if TYPE_CHECKING:
+    from .base import BaseMongoDocument
+
+DUPLICATE_KEY_ERROR = 11000
+
+
+class _BulkBuffer:
+    """
+    Buffer of pending inserts shared by the sync and async writers. Writes
+    are unordered: one bad document does not stop the rest of the batch,
+    and duplicate `_id`s (an already archived document) are counted, not
+    raised, so re-archiving is idempotent.
+    """
+
+    def __init__(self, document_model: type["BaseMongoDocument"], flush_size: int, flush_interval: float):
+        if flush_size < 1:
+            raise ValueError("flush_size must be at least 1")
+        self.document_model = document_model
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._operations: list[InsertOne] = []
+        self._first_buffered_at: float | None = None
+        self.written = 0
+        self.duplicates = 0
+        self.flushes = 0
+
+    def __len__(self) -> int:
+        return len(self._operations)
+
+    def _buffer(self, data: "BaseMongoDocument") -> None:
+        if not isinstance(data, self.document_model):
+            raise TypeError(f"Expected {self.document_model}, got {type(data)}")
+        if not self._operations:
+            self._first_buffered_at = time.monotonic()
+        self._operations.append(InsertOne(data.to_mongo()))
+
+    def _should_flush(self) -> bool:
+        if len(self._operations) >= self.flush_size:
+            return True
+        return (
+            self._first_buffered_at is not None
+            and time.monotonic() - self._first_buffered_at >= self.flush_interval
+        )
+
+    def _take(self) -> list[InsertOne]:
+        operations, self._operations = self._operations, []
+        self._first_buffered_at = None
+        return operations
+
+    def _record(self, operations: list[InsertOne], error: BulkWriteError | None = None) -> None:
+        self.flushes += 1
+        if error is None:
+            self.written += len(operations)
+            return
+        details = error.details
+        failures = details.get("writeErrors", [])
+        duplicates = sum(1 for failure in failures if failure.get("code") == DUPLICATE_KEY_ERROR)
+        self.written += details.get("nInserted", 0)
+        self.duplicates += duplicates
+        if duplicates != len(failures) or details.get("writeConcernErrors"):
+            raise error
+        logger.debug(f"Bulk insert skipped {duplicates} duplicated documents")
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "buffered": len(self._operations),
+            "written": self.written,
+            "duplicates": self.duplicates,
+            "flushes": self.flushes,
+        }
+
+
+class MongoBulkWriter(_BulkBuffer):
+    """
+    Buffered unordered `bulk_write` for a sync collection. Flushes when the buffer
+    reaches `flush_size` or, on the next `add`, when the oldest buffered
+    document is older than `flush_interval`. Use it as a context manager so
+    the remainder is flushed on exit.
+    """
+
+    def __init__(self, collection, document_model: type["BaseMongoDocument"], flush_size: int, flush_interval: float):
+        super().__init__(document_model, flush_size, flush_interval)
+        self.collection = collection
+
+    def add(self, data: "BaseMongoDocument") -> None:
+        self._buffer(data)
+        if self._should_flush():
+            self.flush()
+
+    def flush(self) -> None:
+        operations = self._take()
+        if not operations:
+            return
+        try:
+            self.collection.bulk_write(operations, ordered=False)
+        except BulkWriteError as error:
+            self._record(operations, error)
+        else:
+            self._record(operations)
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self) -> "MongoBulkWriter":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+
+class AsyncMongoBulkWriter(_BulkBuffer):
+    """
+    Buffered `bulk_write` for an `AsyncMongoClient` collection. Besides the
+    size trigger, a timer flushes whatever is buffered `flush_interval`
+    seconds after the first document arrives, so a trickle of messages is
+    not held indefinitely. Concurrent `add` calls keep filling a new buffer
+    while the previous one is being written.
+    """
+
+    def __init__(self, collection, document_model: type["BaseMongoDocument"], flush_size: int, flush_interval: float):
+        super().__init__(document_model, flush_size, flush_interval)
+        self.collection = collection
+        self._timer: asyncio.Task[None] | None = None
+        self._timer_flushing = False
+
+    async def add(self, data: "BaseMongoDocument") -> None:
+        self._buffer(data)
+        if len(self) >= self.flush_size:
+            await self.flush()
+        elif self._timer is None or self._timer.done():
+            self._timer = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.flush_interval)
+        self._timer_flushing = True
+        try:
+            await self.flush()
+        except Exception as e:  # noqa: BLE001
+            logger.error(f"Scheduled bulk insert failed: {type(e).__name__}: {e}")
+        finally:
+            self._timer_flushing = False
+
+    async def flush(self) -> None:
+        operations = self._take()
+        if not operations:
+            return
+        try:
+            await self.collection.bulk_write(operations, ordered=False)
+        except BulkWriteError as error:
+            self._record(operations, error)
+        else:
+            self._record(operations)
+
+    async def close(self) -> None:
+        timer, self._timer = self._timer, None
+        if timer is not None and timer is not asyncio.current_task():
+            # Only the wait is cancelled; a flush already in progress is awaited
+            if not self._timer_flushing:
+                timer.cancel()
+            await asyncio.gather(timer, return_exceptions=True)
+        await self.flush()
+
+    async def __aenter__(self) -> "AsyncMongoBulkWriter":
+        return self
+
+    async def __aexit__(self, *_: object) -> None:
+        await self.close()
@@ -1,8 +1,22 @@
+import asyncio
+
 import certifi
-from pymongo import MongoClient
+from pymongo import AsyncMongoClient, MongoClient
 
 from core.settings import settings
-from shared.environment import Environment
+from shared.environment import AppEnvironment
+
+
+def get_mongo_url() -> str:
+    if settings.MONGO_URL is None:
+        raise ValueError("MONGO_URL is required to use MongoDB")
+    return settings.MONGO_URL.unicode_string()
+
+
+def get_client_options() -> dict:
+    if settings.ENVIRONMENT != AppEnvironment.LOCAL:
+        return {"tlsCAFile": certifi.where()}
+    return {}
 
 
 class MongoDBConnection:
@@ -19,8 +33,7 @@ class MongoDBConnection:
         """
 
         if mongo_url is None:
-            # mongo_url = settings.MONGO_URL.unicode_string()
-            mongo_url = settings.MONGO_URL
+            mongo_url = get_mongo_url()
         if MongoDBConnection._db is None or force_update:
             # Create MongoDB client
             MongoDBConnection._client = MongoDBConnection.get_mongo_client(mongo_url)
@@ -35,9 +48,39 @@ class MongoDBConnection:
 
     @staticmethod
     def get_mongo_client(mongo_url: str):
-        if settings.ENVIRONMENT != Environment.LOCAL:
-            ca = certifi.where()
-            client = MongoClient(mongo_url, tlsCAFile=ca)
-        else:
-            client = MongoClient(mongo_url)
-        return client
+        return MongoClient(mongo_url, **get_client_options())
+
+
+class AsyncMongoDBConnection:
+    """
+    Same as `MongoDBConnection` but with the driver's native `AsyncMongoClient`.
+    The client is bound to the event loop that created it, so a new one is
+    created when the loop changes (tests, Mangum).
+    """
+
+    _client: AsyncMongoClient | None = None
+    _loop: asyncio.AbstractEventLoop | None = None
+
+    @staticmethod
+    def get_client() -> AsyncMongoClient:
+        loop = asyncio.get_running_loop()
+        if AsyncMongoDBConnection._client is None or AsyncMongoDBConnection._loop is not loop:
+            AsyncMongoDBConnection._client = AsyncMongoClient(get_mongo_url(), **get_client_options())
+            AsyncMongoDBConnection._loop = loop
+        return AsyncMongoDBConnection._client
+
+    @staticmethod
+    def get_db():
+        return AsyncMongoDBConnection.get_client().get_database()
+
+    @staticmethod
+    def get_collection(collection_name: str):
+        return AsyncMongoDBConnection.get_db()[collection_name]
+
+    @staticmethod
+    async def close() -> None:
+        client = AsyncMongoDBConnection._client
+        AsyncMongoDBConnection._client = None
+        AsyncMongoDBConnection._loop = None
+        if client is not None:
+            await client.close()
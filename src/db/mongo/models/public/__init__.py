@@ -1,4 +1,5 @@
 from .books import (
+    AsyncBookMongoRepository,
     BookMongoRepository,
 )
 from .schemas import (
@@ -10,6 +11,7 @@ from .constants import (
 
 __all__ = [
     "BookMongoRepository",
+    "AsyncBookMongoRepository",
     "BookDocument",
     "BookType",
 ]
@@ -1,4 +1,4 @@
-from db.mongo.base import MongoAbstractRepository
+from db.mongo.base import AsyncMongoAbstractRepository, MongoAbstractRepository
 
 from .schemas import (
     BookDocument,
@@ -9,3 +9,7 @@ class BookMongoRepository(MongoAbstractRepository):
     collection_name = "books"
     document_model = BookDocument
 
+
+class AsyncBookMongoRepository(AsyncMongoAbstractRepository):
+    collection_name = "books"
+    document_model = BookDocument
@@ -1,8 +1,9 @@
-from .connection import get_db_context
+from .connection import get_db_context, get_async_db_context
 from .base import BaseModel, Base
 
 __all__ = [
     "get_db_context",
+    "get_async_db_context",
     "BaseModel",
     "Base",
 ]
@@ -9,6 +9,11 @@ from shared.utils_dates import get_app_current_time
 Base = declarative_base()
 
 
+def default_column_datetime():
+    # Columnas TIMESTAMP WITHOUT TIME ZONE: hora local de la app sin tzinfo (asyncpg no acepta tz-aware)
+    return get_app_current_time().replace(tzinfo=None)
+
+
 class BaseModel:
     @declared_attr
     def id(cls):
@@ -16,11 +21,11 @@ class BaseModel:
 
     @declared_attr
     def created_at(cls):
-        return Column(DateTime, default=get_app_current_time)
+        return Column(DateTime, default=default_column_datetime)
 
     @declared_attr
     def updated_at(cls):
-        return Column(DateTime, default=get_app_current_time, onupdate=get_app_current_time)
+        return Column(DateTime, default=default_column_datetime, onupdate=default_column_datetime)
 
     @declared_attr
     def deleted_at(cls):
@@ -1,23 +1,112 @@
-from contextlib import contextmanager
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any
 
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.pool import NullPool
 
 from core.settings import settings
+from core.settings.base import PoolMode
 
 
 application_name = settings.PROJECT.NAME.replace(" ", "-").lower()
-engine = create_engine(
-    settings.POSTGRESQL_URL.unicode_string(), connect_args={"application_name": application_name}, poolclass=NullPool
-)
-SessionLocal = sessionmaker(autocommit=False, bind=engine)
+
+
+def get_pool_options() -> dict[str, Any]:
+    """
+    Opciones de pool según `DATABASE.POOL_MODE`.
+
+    - `queue`: pool dimensionado para servidores de larga vida.
+    - `null`: sin pool (Lambda), cada sesión abre y cierra su conexión.
+    """
+    config = settings.DATABASE
+    if config.POOL_MODE == PoolMode.NULL:
+        return {"poolclass": NullPool}
+    return {
+        "pool_size": config.POOL_SIZE,
+        "max_overflow": config.MAX_OVERFLOW,
+        "pool_recycle": config.POOL_RECYCLE,
+        "pool_pre_ping": config.POOL_PRE_PING,
+        "pool_timeout": config.POOL_TIMEOUT,
+    }
+
+
+def get_async_url() -> URL:
+    url = make_url(settings.POSTGRESQL_URL.unicode_string()).set(drivername="postgresql+asyncpg")
+    # asyncpg no entiende `sslmode`, usa `ssl`
+    sslmode = url.query.get("sslmode")
+    if sslmode is not None:
+        url = url.difference_update_query(["sslmode"]).update_query_dict({"ssl": sslmode})
+    return url
+
+
+_engine: Engine | None = None
+_SessionLocal: sessionmaker[Session] | None = None
+
+
+def get_engine() -> Engine:
+    """
+    El engine síncrono también se crea en el primer uso: crearlo importa
+    psycopg2 y el dialecto, algo que en Lambda se pagaba en cada cold start
+    aunque la invocación no tocara la base de datos.
+    """
+    global _engine, _SessionLocal
+    if _engine is None:
+        _engine = create_engine(
+            settings.POSTGRESQL_URL.unicode_string(),
+            connect_args={"application_name": application_name},
+            **get_pool_options()
+        )
+        _SessionLocal = sessionmaker(autocommit=False, bind=_engine)
+    return _engine
 
 
 @contextmanager
 def get_db_context():
-    db = SessionLocal()
+    get_engine()
+    assert _SessionLocal is not None
+    db = _SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+# ---------- Variante asíncrona (asyncpg) ---------- #
+
+_async_engine: AsyncEngine | None = None
+_AsyncSessionLocal: async_sessionmaker[AsyncSession] | None = None
+
+
+def get_async_engine() -> AsyncEngine:
+    """El engine asíncrono se crea en el primer uso para no importar asyncpg si no se necesita."""
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is None:
+        _async_engine = create_async_engine(
+            get_async_url(),
+            connect_args={"server_settings": {"application_name": application_name}},
+            **get_pool_options()
+        )
+        _AsyncSessionLocal = async_sessionmaker(bind=_async_engine, expire_on_commit=False)
+    return _async_engine
+
+
+@asynccontextmanager
+async def get_async_db_context() -> AsyncIterator[AsyncSession]:
+    get_async_engine()
+    assert _AsyncSessionLocal is not None
+    async with _AsyncSessionLocal() as db:
+        yield db
+
+
+async def dispose_engines() -> None:
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _AsyncSessionLocal = None
+    if _engine is not None:
+        _engine.dispose()
@@ -0,0 +1,3 @@
+from .runner import Migration, load_migrations, run_migrations
+
+__all__ = ["Migration", "load_migrations", "run_migrations"]
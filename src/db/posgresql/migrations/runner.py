@@ -0,0 +1,110 @@
+import importlib
+import pkgutil
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from loguru import logger
+from sqlalchemy import Connection, Engine, text
+
+from . import versions
+
+MIGRATIONS_TABLE = "public.schema_migrations"
+# Llave del advisory lock que serializa ejecuciones concurrentes del runner
+ADVISORY_LOCK_KEY = 720_250_005
+
+
+@dataclass(frozen=True)
+class Migration:
+    """
+    Una migración versionada. Cada módulo en `versions/` define `VERSION`,
+    `DESCRIPTION`, `upgrade(connection)` y opcionalmente `TRANSACTIONAL`
+    (False para sentencias como `CREATE INDEX CONCURRENTLY`).
+    """
+    version: int
+    description: str
+    upgrade: Callable[[Connection], None]
+    transactional: bool = True
+
+
+def load_migrations() -> list[Migration]:
+    migrations: list[Migration] = []
+    for module_info in pkgutil.iter_modules(versions.__path__):
+        module = importlib.import_module(f"{versions.__name__}.{module_info.name}")
+        migrations.append(Migration(
+            version=module.VERSION,
+            description=module.DESCRIPTION,
+            upgrade=module.upgrade,
+            transactional=getattr(module, "TRANSACTIONAL", True),
+        ))
+    migrations.sort(key=lambda migration: migration.version)
+    numbers = [migration.version for migration in migrations]
+    if len(numbers) != len(set(numbers)):
+        raise ValueError(f"Duplicated migration versions: {numbers}")
+    return migrations
+
+
+def _ensure_migrations_table(connection: Connection) -> None:
+    connection.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} (
+            version INTEGER PRIMARY KEY,
+            description VARCHAR NOT NULL,
+            applied_at TIMESTAMP NOT NULL DEFAULT now()
+        )
+    """))
+    connection.commit()
+
+
+def _applied_versions(connection: Connection) -> set[int]:
+    versions_applied = connection.scalars(text(f"SELECT version FROM {MIGRATIONS_TABLE}")).all()
+    connection.commit()
+    return set(versions_applied)
+
+
+def _record(connection: Connection, migration: Migration) -> None:
+    connection.execute(
+        text(f"INSERT INTO {MIGRATIONS_TABLE} (version, description) VALUES (:version, :description)"),
+        {"version": migration.version, "description": migration.description},
+    )
+
+
+def _apply(connection: Connection, migration: Migration) -> None:
+    if migration.transactional:
+        with connection.begin():
+            migration.upgrade(connection)
+            _record(connection, migration)
+        return
+
+    isolation_level = connection.default_isolation_level
+    connection.execution_options(isolation_level="AUTOCOMMIT")
+    try:
+        migration.upgrade(connection)
+        _record(connection, migration)
+    finally:
+        # En AUTOCOMMIT SQLAlchemy igual abre una transacción lógica que hay que cerrar
+        connection.commit()
+        connection.execution_options(isolation_level=isolation_level)
+
+
+def run_migrations(engine: Engine, target_version: int | None = None) -> list[int]:
+    """Aplica en orden las migraciones pendientes y devuelve las versiones aplicadas."""
+    applied: list[int] = []
+    with engine.connect() as connection:
+        connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": ADVISORY_LOCK_KEY})
+        connection.commit()
+        try:
+            _ensure_migrations_table(connection)
+            done = _applied_versions(connection)
+            for migration in load_migrations():
+                if migration.version in done:
+                    continue
+                if target_version is not None and migration.version > target_version:
+                    break
+                logger.info(f"Applying migration {migration.version:04d}: {migration.description}")
+                _apply(connection, migration)
+                applied.append(migration.version)
+        finally:
+            connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": ADVISORY_LOCK_KEY})
+            connection.commit()
+    if not applied:
+        logger.info("Database schema is up to date")
+    return applied
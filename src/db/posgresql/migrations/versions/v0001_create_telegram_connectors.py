@@ -0,0 +1,20 @@
+from sqlalchemy import Connection, text
+
+VERSION = 1
+DESCRIPTION = "Create telegram_connectors table"
+
+
+def upgrade(connection: Connection) -> None:
+    # Tablas creadas antes por create_tables.py ya existen: la migración es idempotente
+    connection.execute(text("""
+        CREATE TABLE IF NOT EXISTS public.telegram_connectors (
+            id UUID PRIMARY KEY,
+            created_at TIMESTAMP WITHOUT TIME ZONE,
+            updated_at TIMESTAMP WITHOUT TIME ZONE,
+            deleted_at TIMESTAMP WITHOUT TIME ZONE,
+            user_id UUID NOT NULL,
+            bot_user_name VARCHAR NOT NULL,
+            bot_token VARCHAR NOT NULL,
+            bot_token_secret VARCHAR NOT NULL
+        )
+    """))
@@ -0,0 +1,52 @@
+from sqlalchemy import Connection, text
+
+VERSION = 2
+DESCRIPTION = "Add telegram_connectors lookup indexes"
+# CREATE INDEX CONCURRENTLY no puede correr dentro de una transacción
+TRANSACTIONAL = False
+
+INDEXES = {
+    "uq_telegram_connectors_bot_user_name_active": (
+        "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_telegram_connectors_bot_user_name_active "
+        "ON public.telegram_connectors (bot_user_name) WHERE deleted_at IS NULL"
+    ),
+    "ix_telegram_connectors_user_id": (
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_telegram_connectors_user_id "
+        "ON public.telegram_connectors (user_id)"
+    ),
+    "ix_telegram_connectors_active_created_at_id": (
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_telegram_connectors_active_created_at_id "
+        "ON public.telegram_connectors (created_at, id) WHERE deleted_at IS NULL"
+    ),
+}
+
+
+def _check_duplicated_bots(connection: Connection) -> None:
+    duplicated = connection.scalars(text("""
+        SELECT bot_user_name FROM public.telegram_connectors
+        WHERE deleted_at IS NULL
+        GROUP BY bot_user_name HAVING count(*) > 1
+    """)).all()
+    if duplicated:
+        raise RuntimeError(
+            f"Active connectors share bot_user_name {list(duplicated)}; "
+            "soft-delete the duplicates (set deleted_at) before running this migration"
+        )
+
+
+def _drop_if_invalid(connection: Connection, index_name: str) -> None:
+    # Un CREATE INDEX CONCURRENTLY interrumpido deja un índice INVALID que IF NOT EXISTS no repara
+    invalid = connection.scalar(text("""
+        SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = 'public' AND c.relname = :name AND NOT i.indisvalid
+    """), {"name": index_name})
+    if invalid:
+        connection.execute(text(f"DROP INDEX CONCURRENTLY public.{index_name}"))
+
+
+def upgrade(connection: Connection) -> None:
+    _check_duplicated_bots(connection)
+    for index_name, statement in INDEXES.items():
+        _drop_if_invalid(connection, index_name)
+        connection.execute(text(statement))
@@ -0,0 +1,29 @@
+from sqlalchemy import Connection, text
+
+VERSION = 3
+DESCRIPTION = "Create forward_outbox table"
+
+
+def upgrade(connection: Connection) -> None:
+    # Tabla nueva: los índices se crean en la misma transacción, sin CONCURRENTLY
+    connection.execute(text("""
+        CREATE TABLE IF NOT EXISTS public.forward_outbox (
+            id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            user_id UUID NOT NULL,
+            connector_id UUID,
+            payload JSONB NOT NULL,
+            status VARCHAR(16) NOT NULL,
+            attempts INTEGER NOT NULL,
+            available_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            last_error VARCHAR
+        )
+    """))
+    connection.execute(text("""
+        CREATE INDEX IF NOT EXISTS ix_forward_outbox_pending_available_at
+        ON public.forward_outbox (available_at, id) WHERE status = 'pending'
+    """))
+    connection.execute(text("""
+        CREATE INDEX IF NOT EXISTS ix_forward_outbox_dead_user_id
+        ON public.forward_outbox (user_id, id) WHERE status = 'dead'
+    """))
@@ -0,0 +1,25 @@
+from sqlalchemy import Connection, text
+
+VERSION = 4
+DESCRIPTION = "Create telegram_messages archive partitioned by month"
+
+
+def upgrade(connection: Connection) -> None:
+    # Las particiones mensuales las crea `AsyncTelegramMessageRepository.ensure_partitions`
+    # al arrancar; la partición DEFAULT solo atrapa fechas fuera de ese rango
+    connection.execute(text("""
+        CREATE TABLE IF NOT EXISTS public.telegram_messages (
+            connector_id UUID NOT NULL,
+            chat_id BIGINT NOT NULL,
+            date TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            message_id BIGINT NOT NULL,
+            user_id UUID NOT NULL,
+            payload JSONB NOT NULL,
+            received_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            CONSTRAINT pk_telegram_messages PRIMARY KEY (connector_id, chat_id, date, message_id)
+        ) PARTITION BY RANGE (date)
+    """))
+    connection.execute(text("""
+        CREATE TABLE IF NOT EXISTS public.telegram_messages_default
+        PARTITION OF public.telegram_messages DEFAULT
+    """))
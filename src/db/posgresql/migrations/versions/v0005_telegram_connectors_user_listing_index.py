@@ -0,0 +1,18 @@
+from sqlalchemy import Connection, text
+
+from .v0002_telegram_connectors_indexes import _drop_if_invalid
+
+VERSION = 5
+DESCRIPTION = "Add telegram_connectors per-user keyset listing index"
+# CREATE INDEX CONCURRENTLY no puede correr dentro de una transacción
+TRANSACTIONAL = False
+
+INDEX_NAME = "ix_telegram_connectors_active_user_id_created_at_id"
+
+
+def upgrade(connection: Connection) -> None:
+    _drop_if_invalid(connection, INDEX_NAME)
+    connection.execute(text(
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {INDEX_NAME} "
+        "ON public.telegram_connectors (user_id, created_at, id) WHERE deleted_at IS NULL"
+    ))
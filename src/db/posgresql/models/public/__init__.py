@@ -1,3 +1,5 @@
 from .telegram_connectors import TelegramConnector
+from .forward_outbox import ForwardOutbox, OutboxStatus
+from .telegram_messages import TelegramMessage
 
-__all__ = ["TelegramConnector"]
\ No newline at end of file
+__all__ = ["TelegramConnector", "ForwardOutbox", "OutboxStatus", "TelegramMessage"]
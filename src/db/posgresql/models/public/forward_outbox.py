@@ -0,0 +1,47 @@
+from sqlalchemy import BigInteger, Column, DateTime, Identity, Index, Integer, String, func, text
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+from db.posgresql.base import Base, default_column_datetime
+
+
+class OutboxStatus:
+    PENDING = "pending"
+    DEAD = "dead"
+
+
+class ForwardOutbox(Base):
+    """
+    Mensajes pendientes de reenviar a `WEBHOOK_MESSAGE_RECEIVED`. Las filas
+    entregadas se borran, así que la tabla solo contiene trabajo pendiente y
+    el dead letter. Sin `BaseModel`: una llave BIGINT secuencial mantiene
+    compacto el índice por el que drenan los workers.
+    """
+
+    __tablename__ = "forward_outbox"
+    __table_args__ = (
+        # Creado en bases existentes por la migración 0003
+        Index(
+            "ix_forward_outbox_pending_available_at",
+            "available_at",
+            "id",
+            postgresql_where=text("status = 'pending'"),
+        ),
+        Index(
+            "ix_forward_outbox_dead_user_id",
+            "user_id",
+            "id",
+            postgresql_where=text("status = 'dead'"),
+        ),
+        {"schema": "public"},
+    )
+
+    id = Column(BigInteger, Identity(always=False), primary_key=True)
+    created_at = Column(DateTime, nullable=False, default=default_column_datetime)
+    user_id = Column(UUID(as_uuid=True), nullable=False)
+    connector_id = Column(UUID(as_uuid=True), nullable=True)
+    payload = Column(JSONB, nullable=False)
+    status = Column(String(16), nullable=False, default=OutboxStatus.PENDING)
+    attempts = Column(Integer, nullable=False, default=0)
+    # Siempre en UTC del reloj de la base: los workers comparan contra `now()`
+    available_at = Column(DateTime, nullable=False, default=func.timezone("utc", func.now()))
+    last_error = Column(String, nullable=True)
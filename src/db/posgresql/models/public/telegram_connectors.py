@@ -1,11 +1,35 @@
-from sqlalchemy import Column, String, ForeignKey
+from sqlalchemy import Column, String, ForeignKey, Index, text
 from sqlalchemy.orm import relationship
 from db.posgresql.base import Base, BaseModel
 from sqlalchemy.dialects.postgresql import UUID
 
 class TelegramConnector(Base, BaseModel):
     __tablename__ = "telegram_connectors"
-    __table_args__ = {"schema": "public"}
+    __table_args__ = (
+        # Índices creados en bases existentes por la migración 0002
+        Index(
+            "uq_telegram_connectors_bot_user_name_active",
+            "bot_user_name",
+            unique=True,
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+        Index("ix_telegram_connectors_user_id", "user_id"),
+        Index(
+            "ix_telegram_connectors_active_created_at_id",
+            "created_at",
+            "id",
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+        # Listado por usuario paginado por llave (migración 0005)
+        Index(
+            "ix_telegram_connectors_active_user_id_created_at_id",
+            "user_id",
+            "created_at",
+            "id",
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+        {"schema": "public"},
+    )
 
     user_id = Column(UUID, nullable=False)
     bot_user_name = Column(String, nullable=False)
@@ -0,0 +1,37 @@
+from sqlalchemy import DDL, BigInteger, Column, DateTime, PrimaryKeyConstraint, event
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+from db.posgresql.base import Base, default_column_datetime
+
+
+class TelegramMessage(Base):
+    """
+    Archivo de los mensajes recibidos, particionado por mes sobre `date`.
+    La llave primaria `(connector_id, chat_id, date, message_id)` es el
+    índice del historial de un chat: se recorre hacia atrás por
+    `(date, message_id)` y solo se leen las particiones de los meses pedidos.
+    Sin `BaseModel`: la tabla solo crece y no se edita ni se borra lógicamente.
+    """
+
+    __tablename__ = "telegram_messages"
+    __table_args__ = (
+        PrimaryKeyConstraint("connector_id", "chat_id", "date", "message_id", name="pk_telegram_messages"),
+        {"schema": "public", "postgresql_partition_by": "RANGE (date)"},
+    )
+
+    connector_id = Column(UUID(as_uuid=True), nullable=False)
+    chat_id = Column(BigInteger, nullable=False)
+    date = Column(DateTime, nullable=False)
+    message_id = Column(BigInteger, nullable=False)
+    user_id = Column(UUID(as_uuid=True), nullable=False)
+    # `WebhookMessageReceived` tal como se reenvió al backend destino
+    payload = Column(JSONB, nullable=False)
+    received_at = Column(DateTime, nullable=False, default=default_column_datetime)
+
+
+# Recibe lo que caiga fuera de las particiones mensuales (ver migración 0004)
+event.listen(
+    TelegramMessage.__table__,
+    "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS public.telegram_messages_default PARTITION OF public.telegram_messages DEFAULT"),
+)
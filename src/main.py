@@ -1,30 +1,66 @@
-from core.settings import settings
-from fastapi import FastAPI
-from mangum import Mangum
-from fastapi.openapi.utils import get_openapi
-import os
-from api.routers import api_v1_router
-from api.endpoints import index_router
-from typing import Any
-from core.settings import settings
-from shared.middlewares import (
-    CatcherExceptions,
-    CatcherExceptionsPydantic
-)
-from fastapi.middleware import Middleware
-
-app = FastAPI(
-    title=settings.PROJECT.NAME,
-    version=settings.PROJECT.VERSION,
-    description=settings.PROJECT.DESCRIPTION,
-    root_path=settings.ROOT_PATH,
-    middleware=[
-        Middleware(CatcherExceptions)
-    ]
-)
+from shared.startup import startup_timer
+
+with startup_timer.phase("settings"):
+    from core.settings import settings
+
+with startup_timer.phase("framework"):
+    import os
+    from fastapi import FastAPI
+    from mangum import Mangum
+    from fastapi.openapi.utils import get_openapi
+    from fastapi.middleware import Middleware
+    from typing import Any
+    from contextlib import asynccontextmanager
+    from collections.abc import AsyncIterator
+
+with startup_timer.phase("routers"):
+    from api.routers import api_v1_router
+    from api.endpoints import index_router
+    from shared.middlewares import (
+        CatcherExceptions,
+        CatcherExceptionsPydantic,
+        LogSamplingMiddleware,
+        MetricsMiddleware,
+        TracingMiddleware
+    )
+    from api.v1.telegram.archive import message_archive
+    from api.v1.telegram.client import TelegramClient
+    from api.v1.telegram.dedupe import update_deduplicator
+    from api.v1.telegram.forwarder import message_forwarder
+    from api.v1.telegram.media import media_relay
+    from api.v1.telegram.outbox import outbox_worker
+    from api.v1.telegram.broadcast import broadcast_scheduler
+    from api.v1.telegram.polling import polling_engine
+    from db.posgresql.connection import dispose_engines
+    from shared.tracing import tracer
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    with startup_timer.phase("lifespan"):
+        await message_forwarder.start()
+        if settings.ARCHIVE.ENABLED:
+            await message_archive.start()
+        if settings.OUTBOX.ENABLED and settings.OUTBOX.IN_PROCESS:
+            await outbox_worker.start()
+        if settings.POLLING.ENABLED and settings.POLLING.IN_PROCESS:
+            await polling_engine.start()
+    if settings.STARTUP.REPORT:
+        startup_timer.log()
+    yield
+    await polling_engine.stop()
+    await broadcast_scheduler.stop()
+    await outbox_worker.stop()
+    await message_forwarder.stop()
+    await media_relay.close()
+    await TelegramClient.close()
+    await update_deduplicator.close()
+    await dispose_engines()
+    tracer.stop()
 
 
 def custom_openapi() -> dict[str, Any]:
+    # El esquema se genera en la primera petición a /docs, no al arrancar
     if app.openapi_schema:
         return app.openapi_schema
     openapi_schema = get_openapi(
@@ -38,8 +74,31 @@ def custom_openapi() -> dict[str, Any]:
     app.openapi_schema = openapi_schema
     return app.openapi_schema
 
-app.openapi = custom_openapi # type: ignore
-app.include_router(api_v1_router)
-app.include_router(index_router)
-CatcherExceptionsPydantic(app)
-handler = Mangum(app)
+
+with startup_timer.phase("app"):
+    app = FastAPI(
+        title=settings.PROJECT.NAME,
+        version=settings.PROJECT.VERSION,
+        description=settings.PROJECT.DESCRIPTION,
+        root_path=settings.ROOT_PATH,
+        lifespan=lifespan,
+        middleware=[
+            # Por fuera del catcher para medir también las respuestas de error
+            Middleware(MetricsMiddleware),
+            *([Middleware(TracingMiddleware, header=settings.TRACING.HEADER)] if settings.TRACING.ENABLED else []),
+            *([Middleware(LogSamplingMiddleware, rates=settings.LOG.SAMPLE_RATES)] if settings.LOG.SAMPLE_RATES else []),
+            Middleware(CatcherExceptions)
+        ]
+    )
+    app.openapi = custom_openapi # type: ignore
+    app.include_router(api_v1_router)
+    app.include_router(index_router)
+    CatcherExceptionsPydantic(app)
+    # En Lambda Mangum correría el lifespan completo (arranque y cierre) en
+    # cada invocación: se desactiva y los recursos se crean en su primer uso
+    # y se conservan entre invocaciones en caliente
+    on_lambda = bool(os.environ.get("AWS_LAMBDA_FUNCTION_NAME"))
+    handler = Mangum(app, lifespan="off" if on_lambda else "auto")
+
+if on_lambda and settings.STARTUP.REPORT:
+    startup_timer.log()
@@ -1,4 +1,8 @@
 from contextvars import ContextVar
 
 ctx_trace_id = ContextVar("ctx_trace_id", default=None)
-ctx_caller_id = ContextVar("ctx_caller_id", default=None)
\ No newline at end of file
+# Span en curso de `tracer`; los spans que se abran dentro serán sus hijos
+ctx_span_id = ContextVar("ctx_span_id", default=None)
+ctx_caller_id = ContextVar("ctx_caller_id", default=None)
+# False si los logs debug/info de la petición en curso quedaron fuera de la muestra
+ctx_log_sampled = ContextVar("ctx_log_sampled", default=True)
@@ -1,9 +1,10 @@
 from typing import TypeVar, Any
 from pydantic import BaseModel
+from pydantic_core import to_jsonable_python
 from shared.base_contextvars import ctx_trace_id
 from fastapi.responses import JSONResponse
 import fastapi
-import json
+import orjson
 from shared.base_internal_codes import InternalCode
 from shared.base_internal_codes import CommonInternalCode as CC
 
@@ -29,39 +30,56 @@ class ErrorDetailResponse(BaseModel):
             details=details or {}
         ).model_dump()
 
+
+def _orjson_default(obj: Any) -> Any:
+    # UUID, datetime, enums y dataclasses los resuelve orjson; los modelos
+    # se vuelcan en modo JSON respetando sus field_serializer, y el resto
+    # (Url, Decimal, timedelta, bytes...) como lo haría pydantic
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    return to_jsonable_python(obj)
+
+
+class EnvelopeJSONResponse(JSONResponse):
+    """
+    Respuesta JSON serializada con orjson en una sola pasada: el envelope y
+    su `data` (modelos pydantic, UUID, datetime...) se codifican juntos.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=_orjson_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+        )
+
+
 def create_response_for_fast_api(
     status_code_http: int = fastapi.status.HTTP_200_OK,
     data: Any = None,
     error_code: T | None = CC.UNKNOWN,
     message: str | None = None
-) -> JSONResponse:
+) -> EnvelopeJSONResponse:
     success = 200 <= status_code_http < 300
     message = message or ("Operation successful" if success else "An error occurred")
 
-    if isinstance(data,list):
-        if len(data) == 0:
-            data = None
-        else:
-            first_element = data[0]
-            if isinstance(first_element,BaseModel):
-                data = [element.model_dump(mode="json") for element in data]
-                
-
-    elif isinstance(data, BaseModel):
-        data = data.model_dump_json()
-        data = json.loads(data)
+    if isinstance(data, list) and len(data) == 0:
+        data = None
 
     if not success:
+        if isinstance(data, BaseModel):
+            data = data.model_dump(mode="json")
         data = ErrorDetailResponse.from_error_code(error_code=error_code, details=data)
 
-    envelope_response = EnvelopeResponse(
-        success=success,
-        message=message,
-        data=data,
-        trace_id=ctx_trace_id.get()
-    )
-    
-    return JSONResponse(
-        content=envelope_response.model_dump(),
+    # Mismo formato que `EnvelopeResponse`, sin validar ni volcar el modelo
+    return EnvelopeJSONResponse(
+        content={
+            "success": success,
+            "message": message,
+            "data": data,
+            "trace_id": ctx_trace_id.get()
+        },
         status_code=status_code_http
-    )
\ No newline at end of file
+    )
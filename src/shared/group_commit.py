@@ -0,0 +1,56 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class GroupCommitter(Generic[T]):
+    """
+    Agrupa escrituras concurrentes (group commit). `submit` regresa cuando
+    el elemento quedó escrito; mientras una escritura está en curso, los
+    elementos que llegan esperan y se escriben juntos en la siguiente, en
+    lotes de hasta `max_batch_size`. Si la escritura falla, cada llamador
+    del lote recibe la excepción.
+
+    El estado es por event loop: lo pendiente de otro loop (tests, Mangum)
+    se descarta.
+    """
+
+    def __init__(self, write: Callable[[list[T]], Awaitable[object]], max_batch_size: int):
+        self.write = write
+        self.max_batch_size = max_batch_size
+        self._pending: list[tuple[T, asyncio.Future[None]]] = []
+        self._writer: asyncio.Task[None] | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self.written = 0
+        self.batches = 0
+
+    async def submit(self, item: T) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._pending = []
+            self._writer = None
+            self._loop = loop
+        future: asyncio.Future[None] = loop.create_future()
+        self._pending.append((item, future))
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._write_pending())
+        await future
+
+    async def _write_pending(self) -> None:
+        while self._pending:
+            batch = self._pending[:self.max_batch_size]
+            del self._pending[:len(batch)]
+            try:
+                await self.write([item for item, _ in batch])
+            except Exception as e:  # noqa: BLE001
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for _, future in batch:
+                if not future.done():
+                    future.set_result(None)
+            self.written += len(batch)
+            self.batches += 1
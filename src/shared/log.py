@@ -0,0 +1,205 @@
+import logging
+import queue
+import random
+import sys
+import threading
+import time
+import traceback
+from datetime import datetime
+from types import FrameType
+from typing import Any, BinaryIO
+
+import orjson
+from loguru import logger
+
+from shared.base_contextvars import ctx_log_sampled
+
+
+# `opt()` crea un Logger en cada llamada; este se reutiliza. `depth=1`
+# atribuye el log a quien llama a `hot_logger`, no a este módulo
+_caller_logger = logger.opt(depth=1)
+
+
+class SampledLogger:
+    """
+    Logger para los logs que se emiten en cada mensaje (webhook, reenvío).
+
+    `debug` e `info` se descartan antes de llegar a loguru (sin armar el
+    record ni formatear argumentos) si el nivel no alcanza o si la petición
+    no salió en la muestra de `LOG.SAMPLE_RATES`. `warning` y `error` se
+    emiten siempre. Los argumentos se pasan aparte, como en loguru:
+
+        hot_logger.info("Recibido message_id={} chat_id={}", message_id, chat_id)
+
+    Con `sink` (modo JSON) `debug` e `info` no pasan por loguru: se encolan
+    tal cual y el mensaje se formatea en el hilo del sink.
+    """
+
+    def __init__(self) -> None:
+        self.min_level = logging.INFO
+        self.sink: AsyncJsonSink | None = None
+
+    def enabled(self, level: int) -> bool:
+        return level >= self.min_level and ctx_log_sampled.get()
+
+    def debug(self, message: str, *args: Any) -> None:
+        if self.enabled(logging.DEBUG):
+            if self.sink is not None:
+                self.sink.submit("DEBUG", message, args, sys._getframe(1))
+            else:
+                _caller_logger.debug(message, *args)
+
+    def info(self, message: str, *args: Any) -> None:
+        if self.enabled(logging.INFO):
+            if self.sink is not None:
+                self.sink.submit("INFO", message, args, sys._getframe(1))
+            else:
+                _caller_logger.info(message, *args)
+
+    def warning(self, message: str, *args: Any) -> None:
+        _caller_logger.warning(message, *args)
+
+    def error(self, message: str, *args: Any) -> None:
+        _caller_logger.error(message, *args)
+
+
+hot_logger = SampledLogger()
+
+
+def _format(message: str, args: tuple[Any, ...]) -> str:
+    if not args:
+        return message
+    try:
+        return message.format(*args)
+    except Exception:
+        # Un log mal escrito no debe detener el hilo del sink
+        return f"{message} {args!r}"
+
+
+def sample_rate_for(path: str, rates: dict[str, float]) -> float:
+    """Tasa del prefijo más largo de `rates` que coincide con `path`; 1.0 si ninguno."""
+    match = max((prefix for prefix in rates if path.startswith(prefix)), key=len, default=None)
+    return 1.0 if match is None else rates[match]
+
+
+def sample(rate: float) -> bool:
+    return rate >= 1.0 or random.random() < rate
+
+
+class AsyncJsonSink:
+    """
+    Sink de loguru que escribe una línea JSON por log desde un hilo aparte.
+
+    En el hilo que loguea solo se copian los campos del record a una cola
+    (o, desde `hot_logger`, la plantilla y sus argumentos sin formatear);
+    el hilo del sink formatea, serializa con orjson y escribe en lotes. Con la
+    cola llena los logs por debajo de ERROR se descartan (y se cuentan) en
+    lugar de bloquear el event loop; los errores esperan lugar como mucho
+    `ERROR_PUT_TIMEOUT` segundos. Un log que no se puede serializar o
+    escribir se cuenta en `errors` y el hilo sigue.
+    """
+
+    BATCH_SIZE = 500
+    ERROR_PUT_TIMEOUT = 1.0
+
+    def __init__(self, stream: BinaryIO | None = None, max_queue_size: int = 10000):
+        self.stream = stream if stream is not None else sys.stdout.buffer
+        self._queue: queue.Queue[tuple[Any, ...] | None] = queue.Queue(max_queue_size)
+        self.dropped = 0
+        self.errors = 0
+        self._thread = threading.Thread(target=self._run, name="log-json-sink", daemon=True)
+        self._thread.start()
+
+    def write(self, message: Any) -> None:
+        """Entrada desde loguru, con el mensaje ya formateado."""
+        record = message.record
+        item = (
+            record["time"],
+            record["level"].name,
+            record["message"],
+            (),
+            record["name"],
+            record["function"],
+            record["line"],
+            record["extra"],
+            record["exception"],
+        )
+        if record["level"].no >= logging.ERROR:
+            try:
+                self._queue.put(item, timeout=self.ERROR_PUT_TIMEOUT)
+            except queue.Full:
+                self.dropped += 1
+            return
+        self._put(item)
+
+    def submit(self, level: str, message: str, args: tuple[Any, ...], frame: FrameType) -> None:
+        """Entrada directa de `hot_logger`: el formateo queda para el hilo del sink."""
+        self._put((
+            time.time(),
+            level,
+            message,
+            args,
+            frame.f_globals.get("__name__"),
+            frame.f_code.co_name,
+            frame.f_lineno,
+            None,
+            None,
+        ))
+
+    def _put(self, item: tuple[Any, ...]) -> None:
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    @staticmethod
+    def render(item: tuple[Any, ...]) -> bytes:
+        timestamp, level, message, args, name, function, line, extra, exception = item
+        if isinstance(timestamp, float):
+            timestamp = datetime.fromtimestamp(timestamp).astimezone()
+        data: dict[str, Any] = {
+            "time": timestamp,
+            "level": level,
+            "message": _format(message, args),
+            "logger": name,
+            "function": function,
+            "line": line,
+        }
+        if extra:
+            data["extra"] = extra
+        if exception is not None:
+            data["exception"] = "".join(traceback.format_exception(exception.type, exception.value, exception.traceback))
+        return orjson.dumps(data, default=str)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            while item is not None and len(batch) < self.BATCH_SIZE:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(item)
+            lines = []
+            for entry in batch:
+                if entry is None:
+                    continue
+                try:
+                    lines.append(self.render(entry))
+                except Exception:
+                    self.errors += 1
+            if lines:
+                try:
+                    self.stream.write(b"\n".join(lines) + b"\n")
+                    self.stream.flush()
+                except Exception:
+                    self.errors += len(lines)
+            if batch[-1] is None:
+                return
+
+    def stop(self) -> None:
+        """Escribe lo pendiente y detiene el hilo; loguru lo llama en `logger.remove` y al salir."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=5)
@@ -0,0 +1,304 @@
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from functools import wraps
+from inspect import iscoroutinefunction
+from typing import Any, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = tuple[str, ...]
+
+
+def _format_labels(names: tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric(ABC):
+    TYPE = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+
+    def _key(self, labels: tuple[Any, ...]) -> LabelValues:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} espera las etiquetas {self.labelnames}")
+        return tuple(str(label) for label in labels)
+
+    @abstractmethod
+    def samples(self) -> Iterator[str]:
+        """Líneas de muestras en formato de exposición de Prometheus."""
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.TYPE}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    TYPE = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, *labels: Any, amount: float = 1) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, *labels: Any) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> Iterator[str]:
+        for key, value in list(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(Metric):
+    TYPE = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {}
+        self._function: Callable[[], float] | None = None
+
+    def inc(self, *labels: Any, amount: float = 1) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, *labels: Any, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels: Any) -> None:
+        self._values[self._key(labels)] = value
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """El valor se calcula al exportar (p. ej. profundidad de una cola)."""
+        self._function = function
+
+    def value(self, *labels: Any) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    @contextmanager
+    def track_inprogress(self, *labels: Any) -> Iterator[None]:
+        self.inc(*labels)
+        try:
+            yield
+        finally:
+            self.dec(*labels)
+
+    def samples(self) -> Iterator[str]:
+        if self._function is not None:
+            yield f"{self.name} {_format_value(self._function())}"
+            return
+        for key, value in list(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class _HistogramSeries:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram(Metric):
+    """
+    Histograma de buckets fijos. Una observación es un `bisect` y tres sumas
+    sobre una lista, sin locks: pensado para un event loop, donde no hay
+    escrituras concurrentes. Los acumulados se calculan solo al exportar.
+    """
+
+    TYPE = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[LabelValues, _HistogramSeries] = {}
+
+    def observe(self, value: float, *labels: Any) -> None:
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = _HistogramSeries(len(self.buckets) + 1)
+        # El último slot es +Inf
+        series.counts[bisect_left(self.buckets, value)] += 1
+        series.sum += value
+        series.count += 1
+
+    @contextmanager
+    def time(self, *labels: Any) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def timed(self, *labels: Any) -> Callable[[F], F]:
+        """Decorador que mide funciones síncronas o corrutinas."""
+        def decorator(function: F) -> F:
+            if iscoroutinefunction(function):
+                @wraps(function)
+                async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                    with self.time(*labels):
+                        return await function(*args, **kwargs)
+                return async_wrapper  # type: ignore[return-value]
+
+            @wraps(function)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                with self.time(*labels):
+                    return function(*args, **kwargs)
+            return wrapper  # type: ignore[return-value]
+        return decorator
+
+    def count(self, *labels: Any) -> int:
+        series = self._series.get(self._key(labels))
+        return series.count if series is not None else 0
+
+    def samples(self) -> Iterator[str]:
+        for key, series in list(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series.counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(series.sum)}"
+            yield f"{self.name}_count{labels} {series.count}"
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Any:
+        if metric.name in self._metrics:
+            raise ValueError(f"Métrica duplicada: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """Exporta en el formato de texto de Prometheus (0.0.4)."""
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+registry = MetricsRegistry()
+
+# ---------- métricas de la aplicación ---------- #
+
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "Latencia de las peticiones HTTP por ruta",
+    ("method", "route", "status"),
+)
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight",
+    "Peticiones HTTP en curso",
+)
+telegram_request_duration = registry.histogram(
+    "telegram_api_request_duration_seconds",
+    "Latencia de las llamadas a la Bot API de Telegram por método",
+    ("method", "outcome"),
+)
+telegram_requests_in_flight = registry.gauge(
+    "telegram_api_requests_in_flight",
+    "Llamadas a la Bot API de Telegram en curso",
+)
+telegram_errors = registry.counter(
+    "telegram_api_errors_total",
+    "Errores de la Bot API de Telegram por método y causa",
+    ("method", "reason"),
+)
+db_query_duration = registry.histogram(
+    "db_query_duration_seconds",
+    "Latencia de las operaciones de repositorio en PostgreSQL",
+    ("repository", "operation"),
+)
+forward_duration = registry.histogram(
+    "forward_request_duration_seconds",
+    "Latencia de los envíos a WEBHOOK_MESSAGE_RECEIVED",
+    ("outcome",),
+)
+forward_messages = registry.counter(
+    "forward_messages_total",
+    "Mensajes reenviados a WEBHOOK_MESSAGE_RECEIVED por resultado",
+    ("outcome",),
+)
+forward_requests_in_flight = registry.gauge(
+    "forward_requests_in_flight",
+    "Envíos a WEBHOOK_MESSAGE_RECEIVED en curso",
+)
+forward_queue_depth = registry.gauge(
+    "forward_queue_depth",
+    "Mensajes en la cola de reenvío",
+)
+outbox_messages = registry.counter(
+    "outbox_messages_total",
+    "Mensajes del outbox de reenvío por resultado",
+    ("outcome",),
+)
+media_files = registry.counter(
+    "media_files_total",
+    "Archivos de Telegram retransmitidos a MEDIA.RELAY_URL por resultado",
+    ("outcome",),
+)
+media_bytes = registry.counter(
+    "media_bytes_total",
+    "Bytes retransmitidos de Telegram a MEDIA.RELAY_URL",
+)
+media_uploads = registry.counter(
+    "media_uploads_total",
+    "Archivos enviados a Telegram por resultado (subido o `file_id` reutilizado)",
+    ("outcome",),
+)
+media_upload_bytes = registry.counter(
+    "media_upload_bytes_total",
+    "Bytes subidos a Telegram con sendPhoto/sendDocument/sendVoice",
+)
+webhook_duplicate_updates = registry.counter(
+    "webhook_duplicate_updates_total",
+    "Updates de Telegram descartados por update_id repetido",
+)
@@ -1,4 +1,7 @@
 from .catcher_exceptions import CatcherExceptions
 from .catcher_pydantic_errors import CatcherExceptionsPydantic
+from .log_sampling import LogSamplingMiddleware
+from .metrics import MetricsMiddleware
+from .tracing import TracingMiddleware
 
-__all__ = ["CatcherExceptions", "CatcherExceptionsPydantic"]
+__all__ = ["CatcherExceptions", "CatcherExceptionsPydantic", "LogSamplingMiddleware", "MetricsMiddleware", "TracingMiddleware"]
@@ -1,42 +1,71 @@
-from fastapi import HTTPException, Request, status
+from fastapi import HTTPException, status
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm.exc import NoResultFound
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from shared.base_exceptions import BaseApiRestException
 from shared.base_responses import create_response_for_fast_api
 from shared.base_internal_codes import CommonInternalCode
 
-class CatcherExceptions(BaseHTTPMiddleware):
-    def _init_(self, app):
-        super()._init_(app)
 
-    async def dispatch(self, request: Request, call_next):
+def exception_to_response(e: Exception) -> JSONResponse:
+    internal_error = CommonInternalCode.UNKNOWN
+    error_message = None
+    error_data = None
+    status_code_http = status.HTTP_500_INTERNAL_SERVER_ERROR
+    if isinstance(e, HTTPException):
+        error_data = {"detail": str(e.detail)}
+        status_code_http = e.status_code
+    if isinstance(e, NoResultFound):
+        error_data = {"detail": f"No found: {e}"}
+        status_code_http = status.HTTP_404_NOT_FOUND
+    elif isinstance(e, BaseApiRestException):
+        error_data = e.data
+        error_message = e.message
+        status_code_http = e.status_code_http
+        internal_error = e.error_code
+    else:
+        error_data = {"detail": str(e)}
+        status_code_http = status.HTTP_500_INTERNAL_SERVER_ERROR
+
+    return create_response_for_fast_api(
+        status_code_http=status_code_http,
+        data=error_data,
+        error_code=internal_error,
+        message=error_message
+    )
+
+
+class CatcherExceptions:
+    """
+    Middleware ASGI puro que convierte las excepciones no manejadas en un
+    envelope de error.
+
+    A diferencia de `BaseHTTPMiddleware` no crea tareas ni envuelve el cuerpo
+    en un stream intermedio, así que las respuestas en streaming y las
+    background tasks pasan intactas. Si la respuesta ya empezó a enviarse no
+    se puede reemplazar y la excepción se propaga.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
         try:
-            return await call_next(request)
+            await self.app(scope, receive, send_wrapper)
         except Exception as e:  # noqa: BLE001
-            internal_error = CommonInternalCode.UNKNOWN
-            error_message = None
-            error_data = None
-            status_code_http = status.HTTP_500_INTERNAL_SERVER_ERROR
-            if isinstance(e, HTTPException):
-                error_data = {"detail": str(e.detail)}
-                status_code_http = e.status_code
-            if isinstance(e, NoResultFound):
-                error_data = {"detail": f"No found: {e}"}
-                status_code_http = status.HTTP_404_NOT_FOUND
-            elif isinstance(e, BaseApiRestException):
-                error_data = e.data
-                error_message = e.message
-                status_code_http = e.status_code_http
-                internal_error = e.error_code
-            else:
-                error_data = {"detail": str(e)}
-                status_code_http = status.HTTP_500_INTERNAL_SERVER_ERROR
-
-            return create_response_for_fast_api(
-                status_code_http=status_code_http,
-                data=error_data,
-                error_code=internal_error,
-                message=error_message
-            )
\ No newline at end of file
+            if response_started:
+                raise
+            await exception_to_response(e)(scope, receive, send)
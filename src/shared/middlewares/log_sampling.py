@@ -0,0 +1,32 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from shared.base_contextvars import ctx_log_sampled
+from shared.log import sample, sample_rate_for
+
+
+class LogSamplingMiddleware:
+    """
+    Middleware ASGI que decide al inicio de cada petición si sus logs
+    debug/info se emiten, según la tasa de `rates` para su ruta (prefijo,
+    sin `root_path`). La decisión queda en `ctx_log_sampled` y la aplica
+    `hot_logger`.
+    """
+
+    def __init__(self, app: ASGIApp, rates: dict[str, float]):
+        self.app = app
+        self.rates = rates
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        root_path = scope.get("root_path", "")
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path):]
+        token = ctx_log_sampled.set(sample(sample_rate_for(path, self.rates)))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            ctx_log_sampled.reset(token)
@@ -0,0 +1,51 @@
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from shared.base_contextvars import ctx_trace_id
+from shared.tracing import Tracer, tracer as default_tracer
+
+
+class TracingMiddleware:
+    """
+    Middleware ASGI que abre la traza de cada petición.
+
+    Toma el trace id del header `header` si viene y es válido (si no, genera
+    uno), lo deja en `ctx_trace_id` para los spans y las respuestas, y lo
+    devuelve en el mismo header. El span raíz se nombra con la plantilla de
+    la ruta, igual que en `MetricsMiddleware`.
+    """
+
+    def __init__(self, app: ASGIApp, header: str = "X-Trace-Id", tracer: Tracer = default_tracer):
+        self.app = app
+        self.header = header
+        self.header_key = header.lower().encode("latin-1")
+        self.tracer = tracer
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = next((value for key, value in scope["headers"] if key == self.header_key), None)
+        trace_id = self.tracer.accept_trace_id(incoming.decode("latin-1") if incoming is not None else None)
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message)[self.header] = trace_id
+            await send(message)
+
+        token = ctx_trace_id.set(trace_id)
+        try:
+            with self.tracer.span("http") as span:
+                try:
+                    await self.app(scope, receive, send_wrapper)
+                finally:
+                    if span is not None:
+                        route = scope.get("route")
+                        span.name = f"{scope['method']} {getattr(route, 'path', 'unmatched')}"
+                        span.set("status", status_code)
+        finally:
+            ctx_trace_id.reset(token)
@@ -18,8 +18,6 @@ LIST_PATH_TO_ADD: list[str] = [
 if LIST_PATH_TO_ADD:
     sys.path.extend(LIST_PATH_TO_ADD)
     logger.info(f"Added to sys.path: {LIST_PATH_TO_ADD}")
-else:
-    logger.info("No extra paths to add to sys.path")
 
 
 # Load base .env
@@ -28,10 +26,9 @@ ENVS_DIR = BASE_DIR.parent / ".envs"
 logger.debug(f"ENVS_DIR resolved to: {ENVS_DIR}")
 
 ENV_BASE_FILE_PATH = ENVS_DIR / ".env.base"
-logger.info(f"Loading base environment file from: {ENV_BASE_FILE_PATH}")
 if ENV_BASE_FILE_PATH.exists():
     load_dotenv(ENV_BASE_FILE_PATH)
-    logger.success(f"Loaded .env.base successfully")
+    logger.debug(f"Loaded base environment file: {ENV_BASE_FILE_PATH}")
 else:
     logger.warning(f".env.base not found at: {ENV_BASE_FILE_PATH}")
 
@@ -43,15 +40,12 @@ try:
 except KeyError:
     raise ValueError("ENVIRONMENT is not set")
 
-logger.info(f"Environment project: {APP_ENVIRONMENT}")
-
 
 # Validate environments values from .env.base
 # ----------------------------------------------------------------
 try:
     AppEnvironment.check_value(APP_ENVIRONMENT)
     ENVIRONMENT_ENUM = AppEnvironment(APP_ENVIRONMENT) # type: ignore
-    logger.success(f"Environment '{APP_ENVIRONMENT}' validated successfully")
 except ValueError as e:
     logger.critical(f"Invalid ENVIRONMENT value: {APP_ENVIRONMENT} — {e}")
     raise
@@ -60,10 +54,8 @@ except ValueError as e:
 # Load specific env file
 # ----------------------------------------------------------------
 ENV_FILE_PATH = ENVS_DIR / ENVIRONMENT_ENUM.get_file_name()
-logger.info(f"Loading environment-specific file from: {ENV_FILE_PATH}")
-
 if ENV_FILE_PATH.exists():
     load_dotenv(ENV_FILE_PATH)
-    logger.success(f"Loaded environment file for {APP_ENVIRONMENT} successfully")
+    logger.debug(f"Loaded environment file for {APP_ENVIRONMENT}: {ENV_FILE_PATH}")
 else:
     logger.warning(f"Environment file not found: {ENV_FILE_PATH}")
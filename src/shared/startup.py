@@ -0,0 +1,61 @@
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from loguru import logger
+
+# Presupuesto de `import main` en un proceso nuevo (ENVIRONMENT=testing).
+# En Lambda el import forma parte del cold start y cada cold start cae en el
+# p99 del webhook. `tests/common/test_startup.py` falla si vuelven a
+# importarse de forma ansiosa los subsistemas de LAZY_MODULES y, con
+# RUN_TIMING_TESTS=1, si se supera el presupuesto.
+IMPORT_BUDGET_SECONDS = 2.0
+
+# Módulos que `import main` no debe cargar: se importan en su primer uso
+LAZY_MODULES = (
+    "sentry_sdk",   # solo se inicializa en development, staging y production
+    "pymongo",      # db.mongo no forma parte del camino del webhook
+    "psycopg2",     # el engine síncrono se crea en la primera sesión
+    "asyncpg",      # el engine asíncrono se crea en la primera sesión
+    "redis",        # solo con DEDUPE__BACKEND=redis
+)
+
+
+class StartupTimer:
+    """
+    Mide las fases del arranque (settings, routers, app, lifespan...) desde
+    que se importa este módulo, que `main` importa antes que nada.
+    """
+
+    def __init__(self) -> None:
+        self.origin = time.perf_counter()
+        self.finished = self.origin
+        self.phases: dict[str, float] = {}
+        self.reported = False
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Solo cuenta la primera vez que se ejecuta cada fase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if name not in self.phases:
+                self.finished = time.perf_counter()
+                self.phases[name] = self.finished - start
+
+    def report(self) -> dict[str, float]:
+        """Duración de cada fase y el total hasta el fin de la última, en milisegundos."""
+        report = {name: round(seconds * 1000, 2) for name, seconds in self.phases.items()}
+        report["total"] = round((self.finished - self.origin) * 1000, 2)
+        return report
+
+    def log(self) -> None:
+        if self.reported:
+            return
+        self.reported = True
+        phases = " ".join(f"{name}={ms}ms" for name, ms in self.report().items())
+        logger.info(f"Startup: {phases}")
+
+
+startup_timer = StartupTimer()
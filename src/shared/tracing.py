@@ -0,0 +1,244 @@
+import queue
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from collections.abc import Iterable
+from contextlib import nullcontext
+from typing import Any
+
+import httpx
+from loguru import logger
+
+from core.settings import settings
+from core.settings.base import TracingSettings
+from shared.base_contextvars import ctx_span_id, ctx_trace_id
+
+# Trace id aceptado desde el header entrante; cualquier otro se reemplaza
+TRACE_ID_PATTERN = re.compile(r"[A-Za-z0-9._-]{8,64}")
+
+# (trace_id, span_id del padre) para continuar una traza fuera de su contexto
+TraceContext = tuple[str, str | None]
+
+
+def new_id() -> str:
+    return uuid.uuid4().hex
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "start", "duration_ms", "attributes", "error", "_t0")
+
+    def __init__(self, name: str, trace_id: str, parent_id: str | None, attributes: dict[str, Any]):
+        self.trace_id = trace_id
+        self.span_id = new_id()[:16]
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.error: str | None = None
+        self.start = time.time()
+        self.duration_ms = 0.0
+        self._t0 = time.perf_counter()
+
+    def set(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def finish(self) -> None:
+        self.duration_ms = (time.perf_counter() - self._t0) * 1000
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class _SpanScope:
+    """Context manager de un span: lo hace el span en curso mientras dura."""
+
+    __slots__ = ("tracer", "span", "_token")
+
+    def __init__(self, tracer: "Tracer", span: Span):
+        self.tracer = tracer
+        self.span = span
+
+    def __enter__(self) -> Span:
+        self._token = ctx_span_id.set(self.span.span_id)
+        return self.span
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        ctx_span_id.reset(self._token)
+        if exc_type is not None:
+            self.span.error = exc_type.__name__
+        self.span.finish()
+        self.tracer.record(self.span)
+
+
+class _FanOutScope:
+    """Un mismo tramo de trabajo registrado como span en varias trazas (lotes)."""
+
+    __slots__ = ("tracer", "spans")
+
+    def __init__(self, tracer: "Tracer", spans: list[Span]):
+        self.tracer = tracer
+        self.spans = spans
+
+    def __enter__(self) -> list[Span]:
+        return self.spans
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        for span in self.spans:
+            if exc_type is not None:
+                span.error = exc_type.__name__
+            span.finish()
+            self.tracer.record(span)
+
+
+_NO_SPAN = nullcontext()
+
+
+class Tracer:
+    """
+    Spans con su duración, agrupados por trace id.
+
+    La traza la abre `TracingMiddleware` (con el trace id entrante o uno
+    nuevo) y `span()` cuelga cada tramo del span en curso vía contextvars.
+    Sin traza activa o con `TRACING.ENABLED=False`, `span()` no registra
+    nada y cuesta una comparación.
+
+    Los spans terminados se encolan y un hilo los envía en lotes a
+    `EXPORT_URL`; con la cola llena se descartan y se cuentan.
+    """
+
+    def __init__(self, config: TracingSettings, service: str = ""):
+        self.config = config
+        self.service = service
+        self.recent: deque[Span] = deque(maxlen=config.RECENT_SIZE)
+        self._queue: queue.Queue[Span | None] = queue.Queue(config.QUEUE_SIZE)
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self.recorded = 0
+        self.dropped = 0
+        self.exported = 0
+        self.export_errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.config.ENABLED
+
+    # ---------- trazas y spans ---------- #
+
+    @staticmethod
+    def accept_trace_id(value: str | None) -> str:
+        if value and TRACE_ID_PATTERN.fullmatch(value):
+            return value
+        return new_id()
+
+    @staticmethod
+    def current() -> TraceContext | None:
+        """Contexto a guardar junto a un trabajo que se hará fuera de la petición."""
+        trace_id = ctx_trace_id.get()
+        return None if trace_id is None else (trace_id, ctx_span_id.get())
+
+    def span(self, name: str, **attributes: Any) -> Any:
+        if not self.enabled:
+            return _NO_SPAN
+        trace_id = ctx_trace_id.get()
+        if trace_id is None:
+            return _NO_SPAN
+        return _SpanScope(self, Span(name, trace_id, ctx_span_id.get(), attributes))
+
+    def fan_out(self, name: str, contexts: Iterable[TraceContext | None], **attributes: Any) -> Any:
+        """Un span por cada traza de `contexts`, con la misma duración (p. ej. un POST con un lote)."""
+        if not self.enabled:
+            return _NO_SPAN
+        spans = [
+            Span(name, trace_id, parent_id, dict(attributes))
+            for trace_id, parent_id in dict.fromkeys(c for c in contexts if c is not None)
+        ]
+        return _FanOutScope(self, spans) if spans else _NO_SPAN
+
+    def record(self, span: Span) -> None:
+        self.recorded += 1
+        self.recent.append(span)
+        if not self.config.EXPORT_URL:
+            return
+        self._ensure_exporter()
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    # ---------- exportación ---------- #
+
+    def _ensure_exporter(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._export_loop, name="tracing-exporter", daemon=True)
+                self._thread.start()
+
+    def _build_http_client(self) -> httpx.Client:
+        return httpx.Client(timeout=self.config.EXPORT_TIMEOUT)
+
+    def _export_loop(self) -> None:
+        with self._build_http_client() as client:
+            while True:
+                batch: list[Span] = []
+                deadline = time.monotonic() + self.config.EXPORT_INTERVAL
+                stop = False
+                while len(batch) < self.config.EXPORT_BATCH_SIZE:
+                    try:
+                        span = self._queue.get(timeout=max(deadline - time.monotonic(), 0.001))
+                    except queue.Empty:
+                        break
+                    if span is None:
+                        stop = True
+                        break
+                    batch.append(span)
+                if batch:
+                    self._export(client, batch)
+                if stop:
+                    return
+
+    def _export(self, client: httpx.Client, batch: list[Span]) -> None:
+        assert self.config.EXPORT_URL is not None
+        try:
+            response = client.post(
+                self.config.EXPORT_URL,
+                json={"service": self.service, "spans": [span.to_dict() for span in batch]}
+            )
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            self.export_errors += len(batch)
+            logger.warning(f"No se pudieron exportar {len(batch)} spans: {type(e).__name__}")
+            return
+        self.exported += len(batch)
+
+    def stop(self) -> None:
+        """Exporta lo pendiente y detiene el hilo."""
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            self._queue.put(None)
+            thread.join(timeout=self.config.EXPORT_TIMEOUT + self.config.EXPORT_INTERVAL)
+        self._thread = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "recorded": self.recorded,
+            "dropped": self.dropped,
+            "exported": self.exported,
+            "export_errors": self.export_errors,
+            "queue_depth": self._queue.qsize(),
+        }
+
+
+tracer = Tracer(settings.TRACING, service=settings.PROJECT.NAME)
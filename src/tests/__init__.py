@@ -2,7 +2,9 @@ from loguru import logger
 
 from core.settings import settings
 from db.posgresql.models.public import (  # import all models for create tables for database testing
-    TelegramConnector
+    TelegramConnector,
+    ForwardOutbox,
+    TelegramMessage
 )
 from shared.environment import AppEnvironment
 from tests.utils.create_databases import prepare_database
@@ -0,0 +1,98 @@
+import json
+import unittest
+from collections import defaultdict
+from datetime import datetime, timedelta
+from decimal import Decimal
+from uuid import UUID, uuid4
+
+from pydantic import BaseModel, HttpUrl, field_serializer
+
+from shared.base_internal_codes import CommonInternalCode
+from shared.base_responses import EnvelopeResponse, create_response_for_fast_api
+
+
+class Item(BaseModel):
+    id: UUID
+    created_at: datetime
+    tags: list[str] = []
+
+    @field_serializer("tags")
+    def serialize_tags(self, v: list[str], _info):
+        return ",".join(v)
+
+
+class Invoice(BaseModel):
+    url: HttpUrl
+    amount: Decimal
+    duration: timedelta
+    raw: bytes
+    issued_at: datetime
+
+    @field_serializer("issued_at", when_used="json")
+    def serialize_issued_at(self, v: datetime, _info):
+        return int(v.timestamp())
+
+
+class TestCreateResponseForFastApi(unittest.TestCase):
+
+    def body(self, response) -> dict:
+        return json.loads(response.body)
+
+    def test_model_is_serialized_in_one_pass(self):
+        item = Item(id=uuid4(), created_at=datetime(2025, 1, 2, 3, 4, 5, 678901), tags=["a", "b"])
+
+        response = create_response_for_fast_api(data=item)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.media_type, "application/json")
+        self.assertEqual(self.body(response), {
+            "success": True,
+            "message": "Operation successful",
+            "data": json.loads(item.model_dump_json()),
+            "trace_id": None
+        })
+
+    def test_types_outside_orjson_use_pydantic_json_mode(self):
+        invoice = Invoice(
+            url="https://example.com/i/1",
+            amount=Decimal("10.50"),
+            duration=timedelta(minutes=5),
+            raw=b"abc",
+            issued_at=datetime(2025, 1, 2, 3, 4, 5)
+        )
+
+        response = create_response_for_fast_api(data={"invoice": invoice, "total": Decimal("10.50")})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response)["data"], {
+            "invoice": json.loads(invoice.model_dump_json()),
+            "total": "10.50"
+        })
+
+    def test_envelope_matches_schema(self):
+        response = create_response_for_fast_api(data=[Item(id=uuid4(), created_at=datetime.now())])
+
+        envelope = EnvelopeResponse.model_validate_json(response.body)
+
+        self.assertTrue(envelope.success)
+        self.assertEqual(len(envelope.data), 1)
+
+    def test_empty_list_is_none(self):
+        self.assertIsNone(self.body(create_response_for_fast_api(data=[]))["data"])
+
+    def test_error_envelope(self):
+        details = defaultdict(list)
+        details["text"].append("Field required")
+
+        response = create_response_for_fast_api(
+            status_code_http=400,
+            data=details,
+            error_code=CommonInternalCode.PYDANTIC_VALIDATIONS_REQUEST
+        )
+
+        body = self.body(response)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(body["success"])
+        self.assertEqual(body["message"], "An error occurred")
+        self.assertEqual(body["data"]["internal_error"]["code"], 8001)
+        self.assertEqual(body["data"]["details"], {"text": ["Field required"]})
@@ -0,0 +1,131 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+
+from shared.cache import AsyncTTLCache
+
+
+class TestAsyncTTLCache(unittest.TestCase):
+
+    def test_get_or_load_caches_value(self):
+        cache: AsyncTTLCache[str, str] = AsyncTTLCache(max_size=10, ttl_seconds=60)
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            return "value"
+
+        async def run():
+            return await cache.get_or_load("k", loader), await cache.get_or_load("k", loader)
+
+        self.assertEqual(asyncio.run(run()), ("value", "value"))
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_concurrent_loads_are_coalesced(self):
+        cache: AsyncTTLCache[str, str] = AsyncTTLCache(max_size=10, ttl_seconds=60)
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "value"
+
+        async def run():
+            return await asyncio.gather(*(cache.get_or_load("k", loader) for _ in range(20)))
+
+        results = asyncio.run(run())
+
+        self.assertEqual(results, ["value"] * 20)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.stats()["coalesced"], 19)
+
+    def test_loader_error_propagates_to_waiters(self):
+        cache: AsyncTTLCache[str, str] = AsyncTTLCache(max_size=10, ttl_seconds=60)
+
+        async def loader():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("db down")
+
+        async def run():
+            return await asyncio.gather(*(cache.get_or_load("k", loader) for _ in range(3)), return_exceptions=True)
+
+        results = asyncio.run(run())
+
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in results))
+        self.assertEqual(cache.stats()["size"], 0)
+
+    def test_cancelled_loader_does_not_cancel_waiters(self):
+        cache: AsyncTTLCache[str, str] = AsyncTTLCache(max_size=10, ttl_seconds=60)
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "value"
+
+        async def run():
+            leader = asyncio.create_task(cache.get_or_load("k", loader))
+            await asyncio.sleep(0)
+            waiters = [asyncio.create_task(cache.get_or_load("k", loader)) for _ in range(3)]
+            await asyncio.sleep(0)
+            leader.cancel()
+            return await asyncio.gather(*waiters), leader.cancelled()
+
+        results, leader_cancelled = asyncio.run(run())
+
+        self.assertTrue(leader_cancelled)
+        self.assertEqual(results, ["value"] * 3)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(cache.get("k"), "value")
+
+    def test_none_is_not_cached(self):
+        cache: AsyncTTLCache[str, str] = AsyncTTLCache(max_size=10, ttl_seconds=60)
+
+        async def loader():
+            return None
+
+        async def run():
+            await cache.get_or_load("k", loader)
+            await cache.get_or_load("k", loader)
+
+        asyncio.run(run())
+
+        self.assertEqual(cache.stats()["misses"], 2)
+
+    def test_lru_eviction(self):
+        cache: AsyncTTLCache[str, int] = AsyncTTLCache(max_size=2, ttl_seconds=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")          # "b" queda como el menos usado
+        cache.set("c", 3)
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_ttl_expiration(self):
+        cache: AsyncTTLCache[str, int] = AsyncTTLCache(max_size=2, ttl_seconds=10)
+        with patch("shared.cache.time.monotonic", return_value=100.0):
+            cache.set("a", 1)
+        with patch("shared.cache.time.monotonic", return_value=111.0):
+            self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats()["expirations"], 1)
+
+    def test_invalidate_during_load_skips_stale_value(self):
+        cache: AsyncTTLCache[str, str] = AsyncTTLCache(max_size=10, ttl_seconds=60)
+
+        async def loader():
+            cache.invalidate("k")
+            return "stale"
+
+        asyncio.run(cache.get_or_load("k", loader))
+
+        self.assertIsNone(cache.get("k"))
+
+    def test_disabled_cache_stores_nothing(self):
+        cache: AsyncTTLCache[str, int] = AsyncTTLCache(max_size=10, ttl_seconds=0)
+        cache.set("a", 1)
+
+        self.assertIsNone(cache.get("a"))
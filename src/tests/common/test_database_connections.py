@@ -1,9 +1,15 @@
+import asyncio
 from unittest import TestCase
+from unittest.mock import patch
 from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
 # from pymongo import MongoClient
 # from redis import Redis
 # import os
 from core.settings import settings
+from core.settings.base import DatabaseSettings, PoolMode
+from db.posgresql import get_async_db_context
+from db.posgresql.connection import get_pool_options, get_async_url
 
 class TestDatabaseConnections(TestCase):
 
@@ -16,6 +22,29 @@ class TestDatabaseConnections(TestCase):
             self.assertTrue(result.fetchone()[0] == 1) # type: ignore
         engine.dispose()
 
+    def test_async_postgresql_connection(self) -> None:
+        async def select_one() -> int:
+            async with get_async_db_context() as session:
+                return (await session.execute(text("SELECT 1;"))).scalar_one()
+
+        self.assertEqual(asyncio.run(select_one()), 1)
+
+    def test_pool_options_queue_mode(self) -> None:
+        config = DatabaseSettings(POOL_MODE=PoolMode.QUEUE, POOL_SIZE=7, MAX_OVERFLOW=3, POOL_RECYCLE=60)
+        with patch.object(settings, "DATABASE", config):
+            options = get_pool_options()
+        self.assertEqual(options["pool_size"], 7)
+        self.assertEqual(options["max_overflow"], 3)
+        self.assertEqual(options["pool_recycle"], 60)
+        self.assertTrue(options["pool_pre_ping"])
+
+    def test_pool_options_null_mode(self) -> None:
+        with patch.object(settings, "DATABASE", DatabaseSettings(POOL_MODE=PoolMode.NULL)):
+            self.assertEqual(get_pool_options(), {"poolclass": NullPool})
+
+    def test_async_url_uses_asyncpg(self) -> None:
+        self.assertEqual(get_async_url().drivername, "postgresql+asyncpg")
+
     # def test_mongodb_connection(self) -> None:
     #     client = MongoClient(settings.MONGO_URL.unicode_string()) # type: ignore
     #     server_info = client.server_info()
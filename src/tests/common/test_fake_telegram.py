@@ -0,0 +1,112 @@
+import asyncio
+import random
+import unittest
+from unittest.mock import patch
+
+import httpx
+from fastapi.testclient import TestClient
+
+from api.v1.telegram.client import TelegramClient
+from core.settings import settings
+from benchmarks.fake_telegram import FaultConfig, create_app, parse_latency, sample_latency_ms
+
+TOKEN = "123456:FAKE_TOKEN"
+
+
+class TestFakeTelegramMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(FaultConfig(), seed=0)
+        self.client = TestClient(self.app)
+
+    def call(self, method, **payload):
+        return self.client.post(f"/bot{TOKEN}/{method}", json=payload)
+
+    def test_webhook_lifecycle(self):
+        self.assertTrue(self.call("setWebhook", url="http://api/webhook", secret_token="s").json()["ok"])
+        info = self.call("getWebhookInfo").json()["result"]
+        self.assertEqual(info["url"], "http://api/webhook")
+        self.assertEqual(self.client.get("/__fake__/webhooks").json()[TOKEN]["secret_token"], "s")
+
+        # Con webhook activo Telegram rechaza getUpdates
+        self.assertEqual(self.call("getUpdates").status_code, 409)
+
+        self.call("deleteWebhook")
+        self.assertEqual(self.call("getWebhookInfo").json()["result"]["url"], "")
+
+    def test_get_me_and_send_message(self):
+        self.assertEqual(self.call("getMe").json()["result"]["id"], 123456)
+        sent = self.call("sendMessage", chat_id=42, text="hola").json()["result"]
+        self.assertEqual(sent["chat"]["id"], 42)
+        self.assertEqual(self.call("sendMessage", chat_id=42).status_code, 400)
+        self.assertEqual(self.call("unknownMethod").status_code, 404)
+
+    def test_get_updates_offset_confirms_updates(self):
+        response = self.client.post("/__fake__/push", json={"bot_token": TOKEN, "rate": 1000, "count": 3})
+        self.assertEqual(response.status_code, 202)
+        updates = self.call("getUpdates", timeout=1).json()["result"]
+        self.assertEqual(len(updates), 3)
+
+        last = updates[-1]["update_id"]
+        self.assertEqual(self.call("getUpdates", offset=last).json()["result"], [updates[-1]])
+        self.assertEqual(self.call("getUpdates", offset=last + 1).json()["result"], [])
+
+    def test_get_file_and_download(self):
+        info = self.call("getFile", file_id="abc").json()["result"]
+        self.assertEqual(self.call("getFile", file_id="abc").json()["result"], info)
+
+        content = self.client.get(f"/file/bot{TOKEN}/{info['file_path']}").content
+        self.assertEqual(len(content), info["file_size"])
+        self.assertEqual(self.client.get(f"/file/bot{TOKEN}/documents/missing.bin").status_code, 404)
+
+
+class TestFakeTelegramFaults(unittest.TestCase):
+
+    def test_latency_distributions(self):
+        rng = random.Random(0)
+        self.assertEqual(sample_latency_ms("fixed:5", rng), 5)
+        self.assertTrue(1 <= sample_latency_ms("uniform:1,3", rng) <= 3)
+        self.assertGreater(sample_latency_ms("lognormal:10,0.5", rng), 0)
+        with self.assertRaises(ValueError):
+            parse_latency("uniform:1")
+
+    def test_rate_limit_injection(self):
+        client = TestClient(create_app(FaultConfig(rate_limit_probability=1, retry_after=7), seed=0))
+        response = client.post(f"/bot{TOKEN}/getMe")
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.json()["parameters"]["retry_after"], 7)
+        self.assertEqual(client.get("/__fake__/stats").json()["rate_limited"], 1)
+
+    def test_error_burst(self):
+        client = TestClient(create_app(FaultConfig(error_burst=3), seed=0))
+        self.assertEqual(client.post("/__fake__/config", json={"latency": "bogus"}).status_code, 400)
+        self.assertEqual(client.get("/__fake__/config").json()["latency"], "fixed:0")
+
+        # Con probabilidad 1 solo la primera llamada abre la ráfaga de 3
+        client.post("/__fake__/config", json={"error_probability": 1})
+        self.assertEqual(client.post(f"/bot{TOKEN}/getMe").status_code, 502)
+        client.post("/__fake__/config", json={"error_probability": 0})
+        statuses = [client.post(f"/bot{TOKEN}/getMe").status_code for _ in range(3)]
+        self.assertEqual(statuses, [502, 502, 200])
+
+
+class TestTelegramClientAgainstFake(unittest.TestCase):
+    """Test that TelegramClient honours the fake's flood control."""
+
+    def test_send_gives_up_after_persistent_rate_limit(self):
+        app = create_app(FaultConfig(rate_limit_probability=1, retry_after=0), seed=0)
+
+        def build_http_client():
+            return httpx.AsyncClient(base_url="http://fake", transport=httpx.ASGITransport(app=app))
+
+        async def send():
+            try:
+                return await TelegramClient.send("fake-telegram-test", TOKEN, "sendMessage", {"chat_id": 1, "text": "x"})
+            finally:
+                await TelegramClient.close()
+
+        with patch.object(TelegramClient, "_build_http_client", side_effect=build_http_client):
+            response = asyncio.run(send())
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(app.state.fake.stats["calls"]["sendMessage"], settings.TELEGRAM.MAX_RETRIES + 1)
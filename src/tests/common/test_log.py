@@ -0,0 +1,143 @@
+import io
+import logging
+import sys
+import unittest
+
+import orjson
+from fastapi import FastAPI
+from fastapi.middleware import Middleware
+from fastapi.testclient import TestClient
+from loguru import logger
+
+from shared.base_contextvars import ctx_log_sampled
+from shared.log import AsyncJsonSink, SampledLogger, sample_rate_for
+from shared.middlewares import LogSamplingMiddleware
+
+
+class TestSampledLogger(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.messages: list[str] = []
+        self.handler_id = logger.add(lambda message: self.messages.append(message.record["message"]), level="DEBUG")
+        self.log = SampledLogger()
+
+    def tearDown(self) -> None:
+        logger.remove(self.handler_id)
+
+    def test_info_formats_args(self):
+        self.log.info("Recibido message_id={} chat_id={}", 1, 2)
+        self.log.debug("no alcanza el nivel {}", 1)
+
+        self.assertEqual(self.messages, ["Recibido message_id=1 chat_id=2"])
+
+    def test_unsampled_request_keeps_warnings_and_errors(self):
+        token = ctx_log_sampled.set(False)
+        try:
+            self.assertFalse(self.log.enabled(logging.INFO))
+            self.log.info("fuera de la muestra")
+            self.log.warning("aviso {}", 1)
+            self.log.error("error")
+        finally:
+            ctx_log_sampled.reset(token)
+
+        self.assertEqual(self.messages, ["aviso 1", "error"])
+
+    def test_sample_rate_uses_longest_prefix(self):
+        rates = {"/v1/telegram": 0.5, "/v1/telegram/webhook": 0.01}
+
+        self.assertEqual(sample_rate_for("/v1/telegram/webhook/abc", rates), 0.01)
+        self.assertEqual(sample_rate_for("/v1/telegram/send/abc", rates), 0.5)
+        self.assertEqual(sample_rate_for("/health", rates), 1.0)
+
+
+class TestAsyncJsonSink(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.stream = io.BytesIO()
+        self.sink = AsyncJsonSink(self.stream)
+        self.handler_id = logger.add(self.sink, level="DEBUG", format="{message}")
+        self.log = SampledLogger()
+        self.log.min_level = logging.DEBUG
+        self.log.sink = self.sink
+
+    def tearDown(self) -> None:
+        logger.remove(self.handler_id)
+
+    def lines(self) -> list[dict]:
+        logger.remove(self.handler_id)
+        self.handler_id = logger.add(lambda _: None)
+        return [orjson.loads(line) for line in self.stream.getvalue().splitlines()]
+
+    def test_writes_one_json_line_per_log(self):
+        self.log.info("Recibido message_id={}", 7)
+        self.log.warning("aviso")
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.exception("falló")
+
+        first, second, third = self.lines()
+        self.assertEqual((first["level"], first["message"]), ("INFO", "Recibido message_id=7"))
+        self.assertEqual(first["function"], "test_writes_one_json_line_per_log")
+        self.assertEqual((second["level"], second["message"]), ("WARNING", "aviso"))
+        self.assertEqual(third["level"], "ERROR")
+        self.assertIn("ValueError: boom", third["exception"])
+
+    def test_bad_template_does_not_stop_the_sink(self):
+        self.log.info("faltan argumentos {} {}", 1)
+        self.log.info("sigue {}", "vivo")
+
+        self.assertEqual([line["message"] for line in self.lines()], ["faltan argumentos {} {} (1,)", "sigue vivo"])
+
+    def test_unformattable_args_do_not_stop_the_sink(self):
+        self.log.info("rate {:.2f}", None)
+        self.log.info("sigue {}", "vivo")
+
+        self.assertEqual([line["message"] for line in self.lines()], ["rate {:.2f} (None,)", "sigue vivo"])
+
+    def test_unwritable_stream_does_not_stop_the_sink(self):
+        class BrokenStream(io.BytesIO):
+            def write(self, data):
+                raise OSError("disco lleno")
+
+        sink = AsyncJsonSink(BrokenStream())
+        sink.submit("INFO", "uno", (), sys._getframe())
+        sink.stop()
+
+        self.assertEqual(sink.errors, 1)
+
+    def test_full_queue_drops_logs(self):
+        sink = AsyncJsonSink(io.BytesIO(), max_queue_size=1)
+        # Sin el hilo nadie vacía la cola
+        sink.stop()
+
+        sink.submit("INFO", "uno", (), sys._getframe())
+        sink.submit("INFO", "dos", (), sys._getframe())
+        self.assertEqual(sink.dropped, 1)
+
+        # Los errores esperan lugar, pero no indefinidamente
+        sink.ERROR_PUT_TIMEOUT = 0.01
+        handler_id = logger.add(sink, level="ERROR", format="{message}")
+        try:
+            logger.error("tres")
+        finally:
+            logger.remove(handler_id)
+        self.assertEqual(sink.dropped, 2)
+
+
+class TestLogSamplingMiddleware(unittest.TestCase):
+
+    def test_sampling_by_route(self):
+        app = FastAPI(middleware=[Middleware(LogSamplingMiddleware, rates={"/webhook": 0.0})])
+
+        @app.get("/webhook")
+        async def webhook():
+            return {"sampled": ctx_log_sampled.get()}
+
+        @app.get("/send")
+        async def send():
+            return {"sampled": ctx_log_sampled.get()}
+
+        client = TestClient(app)
+        self.assertFalse(client.get("/webhook").json()["sampled"])
+        self.assertTrue(client.get("/send").json()["sampled"])
@@ -0,0 +1,76 @@
+import asyncio
+import unittest
+
+from shared.metrics import MetricsRegistry
+
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.registry = MetricsRegistry()
+
+    def test_histogram_renders_cumulative_buckets(self):
+        histogram = self.registry.histogram("latency_seconds", "Latencia", ("route",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 5.0):
+            histogram.observe(value, "/send")
+
+        lines = self.registry.render().splitlines()
+
+        self.assertIn("# TYPE latency_seconds histogram", lines)
+        self.assertIn('latency_seconds_bucket{route="/send",le="0.1"} 1', lines)
+        self.assertIn('latency_seconds_bucket{route="/send",le="1.0"} 3', lines)
+        self.assertIn('latency_seconds_bucket{route="/send",le="+Inf"} 4', lines)
+        self.assertIn('latency_seconds_sum{route="/send"} 6.05', lines)
+        self.assertIn('latency_seconds_count{route="/send"} 4', lines)
+
+    def test_bucket_bound_is_inclusive(self):
+        histogram = self.registry.histogram("h", "h", buckets=(1.0,))
+        histogram.observe(1.0)
+
+        self.assertIn('h_bucket{le="1.0"} 1', self.registry.render().splitlines())
+
+    def test_timed_decorator_measures_sync_and_async(self):
+        histogram = self.registry.histogram("db_seconds", "db", ("operation",))
+
+        @histogram.timed("sync")
+        def sync_op():
+            return 1
+
+        @histogram.timed("async")
+        async def async_op():
+            return 2
+
+        self.assertEqual(sync_op(), 1)
+        self.assertEqual(asyncio.run(async_op()), 2)
+        self.assertEqual(histogram.count("sync"), 1)
+        self.assertEqual(histogram.count("async"), 1)
+
+    def test_counter_and_gauge(self):
+        counter = self.registry.counter("errors_total", "Errores", ("reason",))
+        gauge = self.registry.gauge("in_flight", "En curso")
+        counter.inc("timeout")
+        counter.inc("timeout", amount=2)
+        with gauge.track_inprogress():
+            self.assertEqual(gauge.value(), 1)
+
+        lines = self.registry.render().splitlines()
+
+        self.assertIn('errors_total{reason="timeout"} 3', lines)
+        self.assertIn("in_flight 0", lines)
+
+    def test_gauge_function_and_label_escaping(self):
+        gauge = self.registry.gauge("queue_depth", "Cola")
+        gauge.set_function(lambda: 7)
+        counter = self.registry.counter("c", "c", ("path",))
+        counter.inc('a"b')
+
+        lines = self.registry.render().splitlines()
+
+        self.assertIn("queue_depth 7", lines)
+        self.assertIn('c{path="a\\"b"} 1', lines)
+
+    def test_label_count_is_validated(self):
+        counter = self.registry.counter("c", "c", ("a", "b"))
+
+        with self.assertRaises(ValueError):
+            counter.inc("solo-una")
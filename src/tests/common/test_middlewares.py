@@ -0,0 +1,82 @@
+import unittest
+
+from fastapi import BackgroundTasks, FastAPI
+from fastapi.middleware import Middleware
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from shared.base_exceptions import BaseApiRestException
+from shared.base_internal_codes import CommonInternalCode
+from shared.middlewares import CatcherExceptions
+
+
+def build_app(tasks_done: list[str]) -> FastAPI:
+    app = FastAPI(middleware=[Middleware(CatcherExceptions)])
+
+    @app.get("/boom")
+    async def boom():
+        raise ValueError("boom")
+
+    @app.get("/api-error")
+    async def api_error():
+        raise BaseApiRestException(
+            status_code_http=409,
+            error_code=CommonInternalCode.UNKNOWN,
+            message="conflict",
+            data={"field": "value"}
+        )
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for i in range(3):
+                yield f"{i}\n".encode()
+        return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+    @app.get("/background")
+    async def background(background_tasks: BackgroundTasks):
+        background_tasks.add_task(tasks_done.append, "done")
+        return {"status": "ok"}
+
+    return app
+
+
+class TestCatcherExceptions(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tasks_done: list[str] = []
+        self.client = TestClient(build_app(self.tasks_done))
+
+    def test_unhandled_exception_envelope(self):
+        res = self.client.get("/boom")
+
+        self.assertEqual(res.status_code, 500)
+        self.assertEqual(res.json(), {
+            "success": False,
+            "message": "An error occurred",
+            "data": {
+                "internal_error": {"code": 100, "description": "Unknown error"},
+                "details": {"detail": "boom"}
+            },
+            "trace_id": None
+        })
+
+    def test_api_exception_envelope(self):
+        res = self.client.get("/api-error")
+
+        self.assertEqual(res.status_code, 409)
+        body = res.json()
+        self.assertEqual(body["message"], "conflict")
+        self.assertEqual(body["data"]["details"], {"field": "value"})
+
+    def test_streaming_response_passes_through(self):
+        with self.client.stream("GET", "/stream") as res:
+            lines = list(res.iter_lines())
+
+        self.assertEqual(lines, ["0", "1", "2"])
+
+    def test_background_tasks_run(self):
+        res = self.client.get("/background")
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(self.tasks_done, ["done"])
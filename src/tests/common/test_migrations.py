@@ -0,0 +1,78 @@
+from unittest import TestCase
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+
+from core.settings import settings
+from db.posgresql.migrations import load_migrations, run_migrations
+from db.posgresql.migrations.runner import MIGRATIONS_TABLE
+
+
+class TestMigrations(TestCase):
+
+    def setUp(self) -> None:
+        self.engine = create_engine(settings.POSTGRESQL_URL.unicode_string(), poolclass=NullPool)
+        self._drop_migrations_table()
+
+    def tearDown(self) -> None:
+        self._drop_migrations_table()
+        self.engine.dispose()
+
+    def _drop_migrations_table(self) -> None:
+        with self.engine.begin() as connection:
+            connection.execute(text(f"DROP TABLE IF EXISTS {MIGRATIONS_TABLE}"))
+
+    def test_migrations_are_ordered_and_unique(self) -> None:
+        versions = [migration.version for migration in load_migrations()]
+        self.assertEqual(versions, sorted(set(versions)))
+        self.assertEqual(versions[:2], [1, 2])
+
+    def test_run_migrations_is_idempotent(self) -> None:
+        applied = run_migrations(self.engine)
+        self.assertEqual(applied, [migration.version for migration in load_migrations()])
+
+        self.assertEqual(run_migrations(self.engine), [])
+
+        with self.engine.connect() as connection:
+            recorded = connection.scalars(text(f"SELECT version FROM {MIGRATIONS_TABLE} ORDER BY version")).all()
+        self.assertEqual(recorded, applied)
+
+    def test_target_version(self) -> None:
+        self.assertEqual(run_migrations(self.engine, target_version=1), [1])
+        self.assertEqual(run_migrations(self.engine, target_version=1), [])
+
+    def test_indexes_exist_after_migrations(self) -> None:
+        run_migrations(self.engine)
+        with self.engine.connect() as connection:
+            indexes = dict(connection.execute(text(
+                "SELECT indexname, indexdef FROM pg_indexes "
+                "WHERE schemaname = 'public' AND tablename = 'telegram_connectors'"
+            )).all())
+
+        self.assertIn("UNIQUE", indexes["uq_telegram_connectors_bot_user_name_active"])
+        self.assertIn("WHERE (deleted_at IS NULL)", indexes["uq_telegram_connectors_bot_user_name_active"])
+        self.assertIn("ix_telegram_connectors_user_id", indexes)
+        self.assertIn("WHERE (deleted_at IS NULL)", indexes["ix_telegram_connectors_active_created_at_id"])
+        self.assertIn("(user_id, created_at, id)", indexes["ix_telegram_connectors_active_user_id_created_at_id"])
+
+    def test_outbox_indexes_exist_after_migrations(self) -> None:
+        run_migrations(self.engine)
+        with self.engine.connect() as connection:
+            indexes = dict(connection.execute(text(
+                "SELECT indexname, indexdef FROM pg_indexes "
+                "WHERE schemaname = 'public' AND tablename = 'forward_outbox'"
+            )).all())
+
+        self.assertIn("WHERE ((status)::text = 'pending'::text)", indexes["ix_forward_outbox_pending_available_at"])
+        self.assertIn("WHERE ((status)::text = 'dead'::text)", indexes["ix_forward_outbox_dead_user_id"])
+
+    def test_archive_is_partitioned_after_migrations(self) -> None:
+        run_migrations(self.engine)
+        with self.engine.connect() as connection:
+            strategy = connection.scalar(text(
+                "SELECT partstrat FROM pg_partitioned_table "
+                "WHERE partrelid = 'public.telegram_messages'::regclass"
+            ))
+            default = connection.scalar(text("SELECT to_regclass('public.telegram_messages_default')"))
+
+        self.assertEqual(strategy, "r")
+        self.assertIsNotNone(default)
@@ -0,0 +1,176 @@
+import asyncio
+from unittest import TestCase
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from pymongo.errors import BulkWriteError
+
+from db.mongo import AsyncMongoBulkWriter, MongoBulkWriter
+from db.mongo.base import projection_model
+from db.mongo.models.public import AsyncBookMongoRepository, BookDocument, BookMongoRepository, BookType
+
+
+def book(title: str = "Rayuela") -> BookDocument:
+    return BookDocument(title=title, author="Cortázar", year=1963, type=BookType.FISICAL)
+
+
+class AsyncCursor:
+
+    def __init__(self, documents: list[dict]):
+        self.documents = iter(documents)
+        self.closed = False
+
+    def __aiter__(self) -> "AsyncCursor":
+        return self
+
+    async def __anext__(self) -> dict:
+        try:
+            return next(self.documents)
+        except StopIteration:
+            raise StopAsyncIteration from None
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class TestMongoBulkWriter(TestCase):
+
+    def test_flushes_unordered_when_full(self) -> None:
+        collection = MagicMock()
+        writer = MongoBulkWriter(collection, BookDocument, flush_size=2, flush_interval=60)
+
+        writer.add(book("a"))
+        collection.bulk_write.assert_not_called()
+        writer.add(book("b"))
+
+        operations = collection.bulk_write.call_args.args[0]
+        self.assertEqual(len(operations), 2)
+        self.assertEqual(collection.bulk_write.call_args.kwargs, {"ordered": False})
+        self.assertEqual(operations[0]._doc["title"], "a")
+        self.assertIn("_id", operations[0]._doc)
+        self.assertEqual(writer.stats(), {"buffered": 0, "written": 2, "duplicates": 0, "flushes": 1})
+
+    def test_flushes_remainder_on_exit(self) -> None:
+        collection = MagicMock()
+        with MongoBulkWriter(collection, BookDocument, flush_size=100, flush_interval=60) as writer:
+            for i in range(3):
+                writer.add(book(str(i)))
+        self.assertEqual(len(collection.bulk_write.call_args.args[0]), 3)
+
+    def test_flushes_when_interval_elapsed(self) -> None:
+        collection = MagicMock()
+        writer = MongoBulkWriter(collection, BookDocument, flush_size=100, flush_interval=0)
+        writer.add(book())
+        self.assertEqual(writer.written, 1)
+
+    def test_duplicates_are_counted_not_raised(self) -> None:
+        collection = MagicMock()
+        collection.bulk_write.side_effect = BulkWriteError({
+            "nInserted": 1,
+            "writeErrors": [{"index": 1, "code": 11000, "errmsg": "duplicate key"}],
+        })
+        writer = MongoBulkWriter(collection, BookDocument, flush_size=2, flush_interval=60)
+        writer.add(book("a"))
+        writer.add(book("b"))
+        self.assertEqual((writer.written, writer.duplicates), (1, 1))
+
+    def test_other_write_errors_are_raised(self) -> None:
+        collection = MagicMock()
+        collection.bulk_write.side_effect = BulkWriteError({
+            "nInserted": 0,
+            "writeErrors": [{"index": 0, "code": 121, "errmsg": "validation failed"}],
+        })
+        writer = MongoBulkWriter(collection, BookDocument, flush_size=1, flush_interval=60)
+        with self.assertRaises(BulkWriteError):
+            writer.add(book())
+
+    def test_rejects_other_documents(self) -> None:
+        writer = MongoBulkWriter(MagicMock(), BookDocument, flush_size=1, flush_interval=60)
+        with self.assertRaises(TypeError):
+            writer.add({"title": "a"})  # type: ignore[arg-type]
+
+
+class TestAsyncMongoBulkWriter(TestCase):
+
+    def test_timer_flushes_a_trickle(self) -> None:
+        collection = MagicMock()
+        collection.bulk_write = AsyncMock()
+
+        async def add_and_wait() -> AsyncMongoBulkWriter:
+            writer = AsyncMongoBulkWriter(collection, BookDocument, flush_size=100, flush_interval=0.01)
+            await writer.add(book())
+            await asyncio.sleep(0.05)
+            return writer
+
+        writer = asyncio.run(add_and_wait())
+        self.assertEqual(writer.written, 1)
+
+    def test_close_flushes_without_waiting_for_timer(self) -> None:
+        collection = MagicMock()
+        collection.bulk_write = AsyncMock()
+
+        async def add_and_close() -> AsyncMongoBulkWriter:
+            async with AsyncMongoBulkWriter(collection, BookDocument, flush_size=100, flush_interval=60) as writer:
+                await writer.add(book("a"))
+                await writer.add(book("b"))
+            return writer
+
+        writer = asyncio.run(asyncio.wait_for(add_and_close(), timeout=1))
+        self.assertEqual((writer.written, writer.flushes), (2, 1))
+
+
+class TestMongoRepositoryFind(TestCase):
+
+    def stored(self) -> dict:
+        return book().to_mongo()
+
+    @patch("db.mongo.base.MongoDBConnection.get_collection")
+    def test_find_yields_validated_documents_lazily(self, mock_get_collection) -> None:
+        cursor = MagicMock()
+        cursor.__iter__.return_value = iter([self.stored(), self.stored()])
+        mock_get_collection.return_value.find.return_value = cursor
+
+        documents = BookMongoRepository().find({"year": 1963}, batch_size=50)
+        mock_get_collection.return_value.find.assert_not_called()
+
+        result = list(documents)
+        self.assertEqual(len(result), 2)
+        self.assertIsInstance(result[0], BookDocument)
+        kwargs = mock_get_collection.return_value.find.call_args.kwargs
+        self.assertEqual((kwargs["filter"], kwargs["batch_size"]), ({"year": 1963}, 50))
+        cursor.close.assert_called_once()
+
+    @patch("db.mongo.base.MongoDBConnection.get_collection")
+    def test_find_with_projection(self, mock_get_collection) -> None:
+        stored = self.stored()
+        cursor = MagicMock()
+        cursor.__iter__.return_value = iter([{"_id": stored["_id"], "title": stored["title"]}])
+        mock_get_collection.return_value.find.return_value = cursor
+
+        (document,) = BookMongoRepository().find(projection=["title"])
+
+        self.assertEqual(mock_get_collection.return_value.find.call_args.kwargs["projection"], {"title": 1})
+        self.assertIsInstance(document, BookDocument)
+        self.assertEqual((document.title, document.author), ("Rayuela", None))
+        self.assertEqual(str(document.id), stored["_id"])
+
+    def test_projection_rejects_unknown_fields(self) -> None:
+        with self.assertRaises(ValueError):
+            projection_model(BookDocument, frozenset({"isbn"}))
+
+    @patch("db.mongo.base.AsyncMongoDBConnection.get_collection")
+    def test_async_find_and_add_many(self, mock_get_collection) -> None:
+        cursor = AsyncCursor([self.stored()])
+        collection = mock_get_collection.return_value
+        collection.find.return_value = cursor
+        collection.insert_many = AsyncMock(return_value=MagicMock(inserted_ids=[1, 2]))
+
+        async def run() -> tuple[list, int]:
+            repository = AsyncBookMongoRepository()
+            found = [document async for document in repository.find(projection=["title", "year"])]
+            return found, await repository.add_many([book("a"), book("b")])
+
+        found, inserted = asyncio.run(run())
+        self.assertEqual(found[0].year, 1963)
+        self.assertTrue(cursor.closed)
+        self.assertEqual(inserted, 2)
+        self.assertEqual(collection.insert_many.call_args.kwargs, {"ordered": False})
@@ -0,0 +1,70 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+from shared.startup import IMPORT_BUDGET_SECONDS, LAZY_MODULES, StartupTimer
+
+SRC_DIR = Path(__file__).resolve().parents[2]
+
+IMPORT_MAIN = """
+import json, sys, time
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    "elapsed": elapsed,
+    "loaded": [name for name in %r if name in sys.modules],
+    "phases": main.startup_timer.report(),
+    "lifespan": main.handler.lifespan,
+}))
+"""
+
+
+class TestImportBudget(unittest.TestCase):
+
+    def import_main(self, **env: str) -> dict:
+        result = subprocess.run(
+            [sys.executable, "-c", IMPORT_MAIN % (LAZY_MODULES,)],
+            cwd=SRC_DIR,
+            env={**os.environ, "ENVIRONMENT": "testing", **env},
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+    # Tiempo de pared: depende de la carga de la máquina, solo bajo demanda
+    @unittest.skipUnless(os.environ.get("RUN_TIMING_TESTS"), "RUN_TIMING_TESTS=1 para medir el import")
+    def test_import_main_within_budget(self):
+        # El primer import también compila .pyc; se mide el segundo proceso
+        self.import_main()
+        result = self.import_main()
+        self.assertLess(result["elapsed"], IMPORT_BUDGET_SECONDS, result["phases"])
+
+    def test_lazy_subsystems_are_not_imported(self):
+        self.assertEqual(self.import_main()["loaded"], [])
+
+    def test_phases_are_reported(self):
+        phases = self.import_main()["phases"]
+        self.assertEqual(list(phases), ["settings", "framework", "routers", "app", "total"])
+
+    def test_lifespan_is_off_under_lambda(self):
+        """Test en Lambda Mangum no repite el arranque y el cierre en cada invocación"""
+        self.assertEqual(self.import_main()["lifespan"], "auto")
+        self.assertEqual(self.import_main(AWS_LAMBDA_FUNCTION_NAME="webhook")["lifespan"], "off")
+
+
+class TestStartupTimer(unittest.TestCase):
+
+    def test_phase_is_recorded_once(self):
+        timer = StartupTimer()
+        with timer.phase("lifespan"):
+            pass
+        first = timer.phases["lifespan"]
+        with timer.phase("lifespan"):
+            sum(range(10000))
+        self.assertEqual(timer.phases["lifespan"], first)
+        self.assertGreaterEqual(timer.report()["total"], timer.report()["lifespan"])
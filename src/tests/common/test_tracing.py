@@ -0,0 +1,163 @@
+import asyncio
+import unittest
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+from fastapi import FastAPI
+from fastapi.middleware import Middleware
+from fastapi.testclient import TestClient
+
+from api.v1.telegram.forwarder import MessageForwarder
+from api.v1.telegram.schema import WebhookMessageReceived
+from benchmarks import fake_collector
+from core.settings.base import ForwarderSettings, TracingSettings
+from shared.base_contextvars import ctx_span_id, ctx_trace_id
+from shared.middlewares import TracingMiddleware
+from shared.tracing import Tracer
+
+
+class TestTracer(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tracer = Tracer(TracingSettings(ENABLED=True))
+        self.token = ctx_trace_id.set("trace-0001")
+
+    def tearDown(self) -> None:
+        ctx_trace_id.reset(self.token)
+        self.tracer.stop()
+
+    def test_nested_spans(self):
+        with self.tracer.span("outer") as outer:
+            with self.tracer.span("inner", step=1) as inner:
+                self.assertEqual(ctx_span_id.get(), inner.span_id)
+            self.assertEqual(ctx_span_id.get(), outer.span_id)
+
+        self.assertIsNone(ctx_span_id.get())
+        self.assertEqual([span.name for span in self.tracer.recent], ["inner", "outer"])
+        self.assertEqual(inner.parent_id, outer.span_id)
+        self.assertIsNone(outer.parent_id)
+        self.assertEqual((inner.trace_id, inner.attributes), ("trace-0001", {"step": 1}))
+        self.assertGreaterEqual(outer.duration_ms, inner.duration_ms)
+
+    def test_error_is_recorded(self):
+        with self.assertRaises(ValueError):
+            with self.tracer.span("falla"):
+                raise ValueError("boom")
+
+        self.assertEqual(self.tracer.recent[-1].error, "ValueError")
+
+    def test_disabled_or_without_trace_records_nothing(self):
+        disabled = Tracer(TracingSettings(ENABLED=False))
+        with disabled.span("a") as span:
+            self.assertIsNone(span)
+
+        ctx_trace_id.set(None)
+        with self.tracer.span("b") as span:
+            self.assertIsNone(span)
+
+        self.assertEqual((disabled.recorded, self.tracer.recorded), (0, 0))
+
+    def test_fan_out_one_span_per_trace(self):
+        contexts = [("trace-a-0001", "p1"), ("trace-a-0001", "p1"), ("trace-b-0001", None), None]
+        with self.tracer.fan_out("forward", contexts, messages=4) as spans:
+            self.assertEqual(len(spans), 2)
+
+        self.assertEqual(
+            [(span.trace_id, span.parent_id) for span in self.tracer.recent],
+            [("trace-a-0001", "p1"), ("trace-b-0001", None)]
+        )
+
+    def test_accept_trace_id(self):
+        self.assertEqual(Tracer.accept_trace_id("4bf92f3577b34da6a3ce929d0e0e4736"), "4bf92f3577b34da6a3ce929d0e0e4736")
+        for value in (None, "", "corto", "con espacios 123", "x" * 65, "a\r\nSet-Cookie: x"):
+            replaced = Tracer.accept_trace_id(value)
+            self.assertNotEqual(replaced, value)
+            self.assertRegex(replaced, "^[0-9a-f]{32}$")
+
+    def test_exports_to_collector(self):
+        tracer = Tracer(TracingSettings(ENABLED=True, EXPORT_URL="http://collector/v1/spans", EXPORT_INTERVAL=0.01), service="tests")
+        trace_id = uuid4().hex
+        ctx_trace_id.set(trace_id)
+
+        with patch.object(tracer, "_build_http_client", return_value=TestClient(fake_collector.app)):
+            with tracer.span("raiz"):
+                with tracer.span("hijo"):
+                    pass
+            tracer.stop()
+
+        self.assertEqual((tracer.exported, tracer.export_errors), (2, 0))
+        res = TestClient(fake_collector.app).get(f"/traces/{trace_id}")
+        self.assertEqual(res.status_code, 200)
+        spans = res.json()["spans"]
+        self.assertEqual({span["name"] for span in spans}, {"raiz", "hijo"})
+        self.assertEqual({span["service"] for span in spans}, {"tests"})
+
+
+class TestTracingMiddleware(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tracer = Tracer(TracingSettings(ENABLED=True))
+        app = FastAPI(middleware=[Middleware(TracingMiddleware, tracer=self.tracer)])
+
+        @app.get("/items/{item_id}")
+        async def item(item_id: int):
+            with self.tracer.span("lookup"):
+                return {"trace_id": ctx_trace_id.get()}
+
+        self.client = TestClient(app)
+
+    def test_accepts_incoming_trace_id(self):
+        res = self.client.get("/items/1", headers={"X-Trace-Id": "incoming-trace-01"})
+
+        self.assertEqual(res.headers["X-Trace-Id"], "incoming-trace-01")
+        self.assertEqual(res.json()["trace_id"], "incoming-trace-01")
+        lookup, root = self.tracer.recent
+        self.assertEqual((root.name, root.attributes), ("GET /items/{item_id}", {"status": 200}))
+        self.assertEqual(lookup.parent_id, root.span_id)
+
+    def test_invalid_trace_id_is_replaced(self):
+        res = self.client.get("/items/1", headers={"X-Trace-Id": "mal"})
+
+        self.assertNotEqual(res.headers["X-Trace-Id"], "mal")
+        self.assertEqual(res.json()["trace_id"], res.headers["X-Trace-Id"])
+
+
+class TestForwarderTracing(unittest.TestCase):
+
+    URL = "https://fake-host/dev/webhook/message-received"
+
+    @staticmethod
+    def message(user_id) -> WebhookMessageReceived:
+        return WebhookMessageReceived(
+            date=datetime.now(), message_id=1, chat_id=1, text="Hola",
+            user_id=user_id, bot_user_name="test_bot", connector_id=uuid4()
+        )
+
+    @patch("httpx.AsyncClient.post", new_callable=AsyncMock)
+    def test_batch_forwards_trace_ids(self, mock_post):
+        mock_post.return_value = MagicMock(status_code=200)
+        tracer = Tracer(TracingSettings(ENABLED=True))
+        forwarder = MessageForwarder(ForwarderSettings(WORKERS=1, BATCH_MAX_SIZE=10, BATCH_MAX_WAIT=0.05), self.URL)
+        user_id = uuid4()
+
+        async def run():
+            for trace_id in ("trace-one-01", "trace-two-01"):
+                token = ctx_trace_id.set(trace_id)
+                try:
+                    with tracer.span("webhook.process"):
+                        await forwarder.enqueue(self.message(user_id))
+                finally:
+                    ctx_trace_id.reset(token)
+            await forwarder.stop()
+
+        with patch("api.v1.telegram.forwarder.tracer", tracer):
+            asyncio.run(run())
+
+        mock_post.assert_called_once()
+        headers = mock_post.call_args.kwargs["headers"]
+        self.assertEqual(headers, {"X-User-Id": str(user_id), "X-Trace-Id": "trace-one-01,trace-two-01"})
+        forwards = [span for span in tracer.recent if span.name == "forward"]
+        parents = {span.trace_id: span.span_id for span in tracer.recent if span.name == "webhook.process"}
+        self.assertEqual({(span.trace_id, span.parent_id) for span in forwards}, set(parents.items()))
+        self.assertEqual(forwards[0].attributes, {"messages": 2, "status": 200})
@@ -0,0 +1,240 @@
+import asyncio
+import unittest
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from unittest.mock import patch, AsyncMock
+
+from sqlalchemy import text
+
+from api.v1.telegram.archive import MessageArchive
+from api.v1.telegram.repositories import AsyncTelegramMessageRepository
+from api.v1.telegram.schema import WebhookMessageReceived
+from core.settings import settings
+from db.posgresql import get_db_context
+from .utils import TelegramDBMixin
+
+
+class ArchiveDBMixin(TelegramDBMixin):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self._truncate_archive()
+
+    def tearDown(self) -> None:
+        self._truncate_archive()
+        super().tearDown()
+
+    @staticmethod
+    def _truncate_archive() -> None:
+        with get_db_context() as session:
+            session.execute(text("TRUNCATE TABLE public.telegram_messages, public.forward_outbox"))
+            session.commit()
+
+    @staticmethod
+    def archived_rows() -> list:
+        with get_db_context() as session:
+            return session.execute(text(
+                "SELECT chat_id, message_id, payload, tableoid::regclass::text AS partition "
+                "FROM public.telegram_messages ORDER BY date, message_id"
+            )).all()
+
+    def archive(self, connector_id: uuid.UUID, chat_id: int, count: int, start: datetime = datetime(2024, 1, 1)) -> None:
+        rows = [
+            MessageArchive.row(WebhookMessageReceived(
+                user_id=uuid.UUID(self.test_user_id),
+                bot_user_name="test_bot",
+                message_id=i,
+                date=start + timedelta(minutes=i),
+                chat_id=chat_id,
+                text=f"mensaje {i}",
+                connector_id=connector_id
+            ))
+            for i in range(count)
+        ]
+        asyncio.run(AsyncTelegramMessageRepository.add_many(rows))
+
+
+# ─────────────────────────  TESTS ESCRITURA  ────────────────────────── #
+
+class TestMessageArchiveWrites(ArchiveDBMixin, unittest.TestCase):
+
+    @patch('api.v1.telegram.forwarder.MessageForwarder.enqueue', new_callable=AsyncMock)
+    def test_webhook_archives_message(self, mock_enqueue):
+        """Test con ARCHIVE.ENABLED el webhook guarda el mensaje y además lo reenvía"""
+        connector = self.create_test_connector()
+
+        with patch.object(settings.ARCHIVE, "ENABLED", True):
+            res = self.client.post(
+                f"/v1/telegram/webhook/{connector.id}",
+                json=self.telegram_webhook_message(),
+                headers=self.webhook_headers(connector.bot_token_secret)
+            )
+
+        self.assertEqual(res.json()["status"], "ok")
+        mock_enqueue.assert_called_once()
+        (row,) = self.archived_rows()
+        self.assertEqual((row.chat_id, row.message_id), (12345, 123))
+        self.assertEqual(row.payload["text"], "Hola desde el webhook")
+
+    def test_archive_disabled_by_default(self):
+        """Test sin ARCHIVE.ENABLED no se escribe nada"""
+        connector = self.create_test_connector()
+
+        with patch('api.v1.telegram.forwarder.MessageForwarder.enqueue', new_callable=AsyncMock):
+            self.client.post(
+                f"/v1/telegram/webhook/{connector.id}",
+                json=self.telegram_webhook_message(),
+                headers=self.webhook_headers(connector.bot_token_secret)
+            )
+
+        self.assertEqual(self.archived_rows(), [])
+
+    def test_outbox_and_archive_share_transaction(self):
+        """Test con outbox el archivo se escribe en la misma transacción que la entrada del outbox"""
+        connector = self.create_test_connector()
+
+        with patch.object(settings.ARCHIVE, "ENABLED", True), \
+                patch.object(settings.OUTBOX, "ENABLED", True), \
+                patch('api.v1.telegram.repositories.AsyncTelegramMessageRepository.upsert', side_effect=RuntimeError("archive down")):
+            res = self.client.post(
+                f"/v1/telegram/webhook/{connector.id}",
+                json=self.telegram_webhook_message(),
+                headers=self.webhook_headers(connector.bot_token_secret)
+            )
+        self.assertEqual(res.status_code, 500)
+
+        with get_db_context() as session:
+            outbox = session.scalar(text("SELECT count(*) FROM public.forward_outbox"))
+        self.assertEqual(outbox, 0)
+
+        with patch.object(settings.ARCHIVE, "ENABLED", True), patch.object(settings.OUTBOX, "ENABLED", True):
+            self.client.post(
+                f"/v1/telegram/webhook/{connector.id}",
+                json=self.telegram_webhook_message(update_id=2),
+                headers=self.webhook_headers(connector.bot_token_secret)
+            )
+
+        with get_db_context() as session:
+            outbox = session.scalar(text("SELECT count(*) FROM public.forward_outbox"))
+        self.assertEqual(outbox, 1)
+        self.assertEqual(len(self.archived_rows()), 1)
+
+    def test_edited_message_replaces_payload(self):
+        """Test un mensaje editado (misma llave) reemplaza el payload, también dentro de un mismo lote"""
+        message = WebhookMessageReceived(
+            user_id=uuid.UUID(self.test_user_id),
+            bot_user_name="test_bot",
+            message_id=1,
+            date=datetime(2024, 1, 1),
+            chat_id=1,
+            text="original",
+            connector_id=uuid.uuid4()
+        )
+        edited = message.model_copy(update={"text": "editado"})
+        again = message.model_copy(update={"text": "otra vez"})
+
+        asyncio.run(AsyncTelegramMessageRepository.add_many([MessageArchive.row(message), MessageArchive.row(edited)]))
+        self.assertEqual(self.archived_rows()[0].payload["text"], "editado")
+
+        asyncio.run(AsyncTelegramMessageRepository.add_many([MessageArchive.row(again)]))
+        (row,) = self.archived_rows()
+        self.assertEqual(row.payload["text"], "otra vez")
+
+    def test_ensure_partitions_routes_rows_by_month(self):
+        """Test se crean las particiones mensuales y cada fila cae en la de su mes"""
+        try:
+            _, created = asyncio.run(AsyncTelegramMessageRepository.ensure_partitions(date(2099, 1, 15), 1))
+            self.assertEqual(created, ["telegram_messages_p209901", "telegram_messages_p209902"])
+            _, created = asyncio.run(AsyncTelegramMessageRepository.ensure_partitions(date(2099, 1, 15), 1))
+            self.assertEqual(created, [])
+
+            self.archive(uuid.uuid4(), 1, 1, start=datetime(2099, 2, 28, 23, 59))
+            self.archive(uuid.uuid4(), 1, 1, start=datetime(2099, 3, 1))
+            partitions = [row.partition for row in self.archived_rows()]
+            self.assertEqual(partitions, ["telegram_messages_p209902", "telegram_messages_default"])
+        finally:
+            self._truncate_archive()
+            with get_db_context() as session:
+                session.execute(text("DROP TABLE IF EXISTS public.telegram_messages_p209901, public.telegram_messages_p209902"))
+                session.commit()
+
+    @patch('api.v1.telegram.repositories.AsyncTelegramMessageRepository.ensure_partitions', new_callable=AsyncMock)
+    def test_partitions_follow_month_rollover(self, mock_ensure):
+        """Test las particiones se crean al arrancar y otra vez cuando cambia el mes UTC, no en cada escritura"""
+        mock_ensure.return_value = (True, [])
+        archive = MessageArchive(settings.ARCHIVE.model_copy(update={"ENABLED": True}))
+
+        class FakeDatetime(datetime):
+            now_value = datetime(2099, 1, 31, 23, 0, tzinfo=timezone.utc)
+
+            @classmethod
+            def now(cls, tz=None):
+                return cls.now_value
+
+        async def run():
+            await archive.start()
+            await archive.ensure_partitions()
+            FakeDatetime.now_value = datetime(2099, 2, 1, 0, 5, tzinfo=timezone.utc)
+            await archive.ensure_partitions()
+
+        with patch('api.v1.telegram.archive.datetime', FakeDatetime):
+            asyncio.run(run())
+
+        self.assertEqual(
+            [call.args for call in mock_ensure.call_args_list],
+            [(date(2099, 1, 1), settings.ARCHIVE.PARTITION_MONTHS_AHEAD), (date(2099, 2, 1), settings.ARCHIVE.PARTITION_MONTHS_AHEAD)]
+        )
+
+    def test_row_date_is_utc(self):
+        """Test la fecha archivada (llave de partición) se guarda en UTC"""
+        message = WebhookMessageReceived(
+            user_id=uuid.UUID(self.test_user_id),
+            bot_user_name="test_bot",
+            message_id=1,
+            date=datetime(2099, 3, 1, 1, 0, tzinfo=timezone(timedelta(hours=6))),
+            chat_id=1,
+            connector_id=uuid.uuid4()
+        )
+
+        self.assertEqual(MessageArchive.row(message)["date"], datetime(2099, 2, 28, 19, 0))
+
+
+# ─────────────────────────  TESTS HISTORIAL  ────────────────────────── #
+
+class TestChatHistory(ArchiveDBMixin, unittest.TestCase):
+
+    def test_history_pages_newest_first(self):
+        """Test el historial pagina por cursor del más reciente al más antiguo y solo del chat pedido"""
+        connector = self.create_test_connector()
+        self.archive(connector.id, 100, 5)
+        self.archive(connector.id, 200, 3)
+
+        pages: list[list[int]] = []
+        cursor = None
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            res = self.client.get(f"/v1/telegram/history/{connector.id}/100", params=params, headers=self.headers_for_user())
+            self.assertEqual(res.status_code, 200)
+            data = res.json()["data"]
+            pages.append([message["message_id"] for message in data["messages"]])
+            cursor = data["next_cursor"]
+            if cursor is None:
+                break
+
+        self.assertEqual(pages, [[4, 3], [2, 1], [0]])
+
+    def test_history_requires_owner(self):
+        """Test el historial de un conector de otro usuario se rechaza"""
+        connector = self.create_test_connector()
+        res = self.client.get(f"/v1/telegram/history/{connector.id}/100", headers=self.headers_for_user(str(uuid.uuid4())))
+        self.assertEqual(res.status_code, 403)
+
+    def test_history_rejects_invalid_cursor(self):
+        """Test un cursor mal formado responde 400"""
+        connector = self.create_test_connector()
+        res = self.client.get(
+            f"/v1/telegram/history/{connector.id}/100",
+            params={"cursor": "no-es-un-cursor"},
+            headers=self.headers_for_user()
+        )
+        self.assertEqual(res.status_code, 400)
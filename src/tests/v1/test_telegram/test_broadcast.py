@@ -0,0 +1,309 @@
+import asyncio
+import time
+import unittest
+import uuid
+from unittest.mock import patch, MagicMock, AsyncMock
+
+from api.v1.telegram.broadcast import (
+    BroadcastJob,
+    BroadcastRecipient,
+    BroadcastScheduler,
+    JobStatus,
+    RecipientStatus,
+    broadcast_scheduler
+)
+from api.v1.telegram.rate_limit import RateLimitExceeded, TokenBucket, TelegramRateLimiter
+from core.settings.base import BroadcastSettings
+from .utils import TelegramDBMixin
+
+
+def telegram_ok(message_id: int = 1) -> MagicMock:
+    response = MagicMock(status_code=200)
+    response.json.return_value = {"ok": True, "result": {"message_id": message_id}}
+    return response
+
+
+# ─────────────────────────  TESTS RATE LIMITER  ────────────────────────── #
+
+class TestRateLimiter(unittest.TestCase):
+
+    def test_bucket_allows_burst_up_to_capacity(self):
+        """Test el bucket permite una ráfaga igual a su capacidad sin esperar"""
+        bucket = TokenBucket(rate=10, capacity=3)
+
+        delays = [bucket.reserve() for _ in range(4)]
+
+        self.assertEqual(delays[:3], [0.0, 0.0, 0.0])
+        self.assertAlmostEqual(delays[3], 0.1, places=2)
+
+    def test_chat_rate_paces_sends(self):
+        """Test los envíos al mismo chat se espacian según el límite por chat"""
+        limiter = TelegramRateLimiter(bot_rate=1000, chat_rate=20)
+
+        async def send_three():
+            start = time.monotonic()
+            for _ in range(3):
+                await limiter.acquire("bot", 1)
+            return time.monotonic() - start
+
+        elapsed = asyncio.run(send_three())
+
+        self.assertGreaterEqual(elapsed, 0.09)
+
+    def test_different_chats_do_not_wait(self):
+        """Test chats distintos no comparten el límite por chat"""
+        limiter = TelegramRateLimiter(bot_rate=1000, chat_rate=1)
+
+        async def send_many():
+            return [await limiter.acquire("bot", chat_id) for chat_id in range(5)]
+
+        self.assertEqual(asyncio.run(send_many()), [0.0] * 5)
+
+    def test_penalize_delays_next_send(self):
+        """Test un retry_after de Telegram frena los siguientes envíos del bot"""
+        limiter = TelegramRateLimiter(bot_rate=1000, chat_rate=1000)
+        limiter.penalize("bot", 0.05)
+
+        waited = asyncio.run(limiter.acquire("bot", 1))
+
+        self.assertGreaterEqual(waited, 0.04)
+        self.assertEqual(limiter.stats()["throttled"], 1)
+
+    def test_penalty_is_capped_and_long_waits_fail_fast(self):
+        """Test un retry_after enorme se acota a max_wait y no deja envíos dormidos"""
+        limiter = TelegramRateLimiter(bot_rate=1000, chat_rate=1000, max_wait=0.05)
+        limiter.penalize("bot", 3600)
+
+        waited = asyncio.run(limiter.acquire("bot"))
+        self.assertLess(waited, 0.1)
+
+        limiter.penalize("bot", 0.05)
+        limiter._bot_bucket("bot").tokens -= 100
+        with self.assertRaises(RateLimitExceeded):
+            asyncio.run(limiter.acquire("bot"))
+        self.assertEqual(limiter.stats()["rejected"], 1)
+
+    def test_chat_buckets_are_bounded(self):
+        """Test los buckets por chat se acotan con LRU"""
+        limiter = TelegramRateLimiter(bot_rate=1000, chat_rate=1, max_chat_buckets=2)
+
+        async def send_many():
+            for chat_id in range(5):
+                await limiter.acquire("bot", chat_id)
+
+        asyncio.run(send_many())
+
+        self.assertEqual(len(limiter._chats), 2)
+
+
+# ─────────────────────────  TESTS BROADCAST SCHEDULER  ────────────────────────── #
+
+class TestBroadcastScheduler(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.scheduler = BroadcastScheduler(BroadcastSettings(CONCURRENCY=3, MAX_JOBS=2))
+
+    def run_job(self, recipients: list[BroadcastRecipient]) -> BroadcastJob:
+        async def run():
+            job = self.scheduler.submit(BroadcastJob(uuid.uuid4(), uuid.uuid4(), recipients), "123:ABC")
+            await asyncio.gather(*self.scheduler._tasks.values())
+            return job
+
+        return asyncio.run(run())
+
+    @patch('httpx.AsyncClient.post', new_callable=AsyncMock)
+    def test_sends_to_every_recipient(self, mock_post):
+        """Test el job envía a todos los destinatarios y registra el resultado de cada uno"""
+        mock_post.return_value = telegram_ok(99)
+
+        job = self.run_job([BroadcastRecipient(chat_id, "hola") for chat_id in range(10)])
+
+        self.assertEqual(job.status, JobStatus.COMPLETED)
+        self.assertEqual((job.sent, job.failed, job.pending), (10, 0, 0))
+        self.assertEqual(mock_post.call_count, 10)
+        self.assertTrue(all(r.telegram_message_id == 99 for r in job.recipients))
+        self.assertIsNotNone(job.finished_at)
+
+    @patch('httpx.AsyncClient.post', new_callable=AsyncMock)
+    def test_records_failed_recipients(self, mock_post):
+        """Test los errores de Telegram quedan registrados por destinatario"""
+        failed = MagicMock(status_code=400)
+        failed.json.return_value = {"ok": False, "description": "Bad Request: chat not found"}
+        mock_post.side_effect = [telegram_ok(), failed]
+
+        job = self.run_job([BroadcastRecipient(1, "hola"), BroadcastRecipient(2, "hola")])
+
+        self.assertEqual((job.sent, job.failed), (1, 1))
+        statuses = {r.chat_id: (r.status, r.error) for r in job.recipients}
+        self.assertEqual(statuses[2], (RecipientStatus.FAILED, "Bad Request: chat not found"))
+
+    @patch('httpx.AsyncClient.post', new_callable=AsyncMock)
+    def test_rate_limited_recipients_are_retried(self, mock_post):
+        """Test un 429 a mitad del job hace esperar a los workers, sin marcar destinatarios como fallidos"""
+        flood = MagicMock(status_code=429, headers={})
+        flood.json.return_value = {
+            "ok": False,
+            "error_code": 429,
+            "description": "Too Many Requests: retry after 1",
+            "parameters": {"retry_after": 1}
+        }
+        mock_post.side_effect = [telegram_ok()] * 5 + [flood] + [telegram_ok()] * 30
+        limiter = TelegramRateLimiter(bot_rate=1000, chat_rate=1000, max_wait=0.05)
+
+        with patch('api.v1.telegram.client.telegram_rate_limiter', limiter), \
+                patch('api.v1.telegram.client.settings.TELEGRAM.MAX_RETRIES', 0):
+            job = self.run_job([BroadcastRecipient(chat_id, "hola") for chat_id in range(30)])
+
+        self.assertEqual((job.sent, job.failed, job.pending), (30, 0, 0))
+        self.assertTrue(all(r.status == RecipientStatus.SENT for r in job.recipients))
+        self.assertEqual(mock_post.call_count, 31)
+        self.assertGreater(limiter.rejected, 0)
+
+    def test_to_schema_paginates_results(self):
+        """Test to_schema solo incluye resultados cuando se pide un límite"""
+        job = BroadcastJob(uuid.uuid4(), uuid.uuid4(), [BroadcastRecipient(i, "hola") for i in range(5)])
+
+        self.assertIsNone(job.to_schema().results)
+        page = job.to_schema(offset=3, limit=10).results
+        self.assertEqual([r.chat_id for r in page], [3, 4])
+
+    @patch('httpx.AsyncClient.post', new_callable=AsyncMock)
+    def test_evicts_finished_jobs(self, mock_post):
+        """Test se descartan los jobs terminados más antiguos al superar MAX_JOBS"""
+        mock_post.return_value = telegram_ok()
+
+        jobs = [self.run_job([BroadcastRecipient(1, "hola")]) for _ in range(3)]
+
+        self.assertIsNone(self.scheduler.get(jobs[0].id))
+        self.assertIs(self.scheduler.get(jobs[2].id), jobs[2])
+
+
+# ─────────────────────────  TESTS BROADCAST ENDPOINTS  ────────────────────────── #
+
+class TestBroadcastEndpoints(TelegramDBMixin, unittest.TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        submit = patch.object(broadcast_scheduler, "submit", side_effect=lambda job, bot_token: job)
+        self.mock_submit = submit.start()
+        self.addCleanup(submit.stop)
+
+    def test_broadcast_json(self):
+        """Test crear una difusión con cuerpo JSON"""
+        connector = self.create_test_connector()
+
+        res = self.client.post(
+            f"/v1/telegram/broadcast/{connector.id}",
+            json={"chat_ids": [1, 2, 3], "text": "hola"},
+            headers=self.headers_for_user()
+        )
+
+        self.assertEqual(res.status_code, 202)
+        data = res.json()["data"]
+        uuid.UUID(data["job_id"])
+        self.assertEqual((data["total"], data["pending"], data["status"]), (3, 3, "running"))
+        job, = self.mock_submit.call_args.args
+        self.assertEqual(self.mock_submit.call_args.kwargs["bot_token"], connector.bot_token)
+        self.assertEqual([r.chat_id for r in job.recipients], [1, 2, 3])
+
+    def test_broadcast_ndjson(self):
+        """Test crear una difusión con cuerpo NDJSON, un mensaje por línea"""
+        connector = self.create_test_connector()
+        body = b'{"chat_id": 1, "text": "uno"}\n{"chat_id": 2, "text": "dos"}\n'
+
+        res = self.client.post(
+            f"/v1/telegram/broadcast/{connector.id}",
+            content=body,
+            headers={**self.headers_for_user(), "Content-Type": "application/x-ndjson"}
+        )
+
+        self.assertEqual(res.status_code, 202)
+        job, = self.mock_submit.call_args.args
+        self.assertEqual([(r.chat_id, r.text) for r in job.recipients], [(1, "uno"), (2, "dos")])
+
+    def test_broadcast_ndjson_invalid_line(self):
+        """Test una línea NDJSON inválida se rechaza indicando su número"""
+        connector = self.create_test_connector()
+        body = b'{"chat_id": 1, "text": "uno"}\n{"chat_id": 2, "text": ""}\n'
+
+        res = self.client.post(
+            f"/v1/telegram/broadcast/{connector.id}",
+            content=body,
+            headers={**self.headers_for_user(), "Content-Type": "application/x-ndjson"}
+        )
+
+        self.assertEqual(res.status_code, 400)
+        self.mock_submit.assert_not_called()
+
+    def test_broadcast_ndjson_line_too_long(self):
+        """Test una línea NDJSON mayor a MAX_LINE_SIZE se rechaza, termine o no en salto de línea"""
+        connector = self.create_test_connector()
+        long_line = b'{"chat_id": 1, "text": "' + b"a" * 200 + b'"}'
+
+        with patch("core.settings.settings.BROADCAST.MAX_LINE_SIZE", 100):
+            for body in (long_line + b"\n", long_line):
+                res = self.client.post(
+                    f"/v1/telegram/broadcast/{connector.id}",
+                    content=body,
+                    headers={**self.headers_for_user(), "Content-Type": "application/x-ndjson"}
+                )
+                self.assertEqual(res.status_code, 413)
+        self.mock_submit.assert_not_called()
+
+    def test_broadcast_unavailable_under_lambda(self):
+        """Test en Lambda o con IN_PROCESS=False los broadcasts se rechazan en lugar de perderse"""
+        connector = self.create_test_connector()
+        send = lambda: self.client.post(
+            f"/v1/telegram/broadcast/{connector.id}",
+            json={"chat_ids": [1], "text": "hola"},
+            headers=self.headers_for_user()
+        )
+
+        with patch.dict("os.environ", {"AWS_LAMBDA_FUNCTION_NAME": "telegram-connector"}):
+            self.assertEqual(send().status_code, 503)
+        with patch("core.settings.settings.BROADCAST.IN_PROCESS", False):
+            self.assertEqual(send().status_code, 503)
+        self.mock_submit.assert_not_called()
+
+    def test_broadcast_too_many_recipients(self):
+        """Test se rechaza una difusión que supera MAX_RECIPIENTS"""
+        connector = self.create_test_connector()
+
+        with patch("core.settings.settings.BROADCAST.MAX_RECIPIENTS", 2):
+            res = self.client.post(
+                f"/v1/telegram/broadcast/{connector.id}",
+                json={"chat_ids": [1, 2, 3], "text": "hola"},
+                headers=self.headers_for_user()
+            )
+
+        self.assertEqual(res.status_code, 413)
+
+    def test_broadcast_wrong_user(self):
+        """Test solo el dueño del conector puede difundir"""
+        connector = self.create_test_connector()
+
+        res = self.client.post(
+            f"/v1/telegram/broadcast/{connector.id}",
+            json={"chat_ids": [1], "text": "hola"},
+            headers=self.headers_for_user(str(uuid.uuid4()))
+        )
+
+        self.assertEqual(res.status_code, 403)
+
+    def test_broadcast_status(self):
+        """Test consultar el progreso y los resultados de un job"""
+        job = BroadcastJob(uuid.uuid4(), uuid.UUID(self.test_user_id), [BroadcastRecipient(1, "hola")])
+        job.recipients[0].status = RecipientStatus.SENT
+        job.sent = 1
+        broadcast_scheduler._jobs[job.id] = job
+        self.addCleanup(broadcast_scheduler._jobs.pop, job.id, None)
+
+        res = self.client.get(f"/v1/telegram/broadcast/jobs/{job.id}?limit=10", headers=self.headers_for_user())
+
+        self.assertEqual(res.status_code, 200)
+        data = res.json()["data"]
+        self.assertEqual((data["sent"], data["pending"]), (1, 0))
+        self.assertEqual(data["results"][0]["status"], "sent")
+
+        other = self.client.get(f"/v1/telegram/broadcast/jobs/{job.id}", headers=self.headers_for_user(str(uuid.uuid4())))
+        self.assertEqual(other.status_code, 404)
@@ -0,0 +1,149 @@
+import asyncio
+import time
+import uuid
+import unittest
+from unittest.mock import patch, MagicMock, AsyncMock
+
+from api.v1.telegram.client import TelegramClient
+from core.settings import settings
+
+
+# ─────────────────────────  TESTS TELEGRAM CLIENT  ────────────────────────── #
+
+class TestTelegramClient(unittest.TestCase):
+
+    def tearDown(self) -> None:
+        TelegramClient._http_client = None
+        TelegramClient._loop = None
+
+    def test_reuses_client_in_same_loop(self):
+        """Test el cliente HTTP se comparte dentro del mismo event loop"""
+        async def get_twice():
+            return TelegramClient.get_http_client(), TelegramClient.get_http_client()
+
+        first, second = asyncio.run(get_twice())
+
+        self.assertIs(first, second)
+
+    def test_new_client_for_new_loop(self):
+        """Test se crea un cliente nuevo cuando cambia el event loop"""
+        async def get_client():
+            return TelegramClient.get_http_client()
+
+        first = asyncio.run(get_client())
+        second = asyncio.run(get_client())
+
+        self.assertIsNot(first, second)
+
+    def test_client_uses_settings(self):
+        """Test el cliente usa la URL base y timeouts configurados"""
+        async def get_client():
+            return TelegramClient.get_http_client()
+
+        client = asyncio.run(get_client())
+
+        self.assertEqual(str(client.base_url).rstrip("/"), settings.TELEGRAM.API_BASE_URL)
+        self.assertEqual(client.timeout.read, settings.TELEGRAM.READ_TIMEOUT)
+        self.assertEqual(client.timeout.connect, settings.TELEGRAM.CONNECT_TIMEOUT)
+
+    @patch('httpx.AsyncClient.post', new_callable=AsyncMock)
+    def test_post_builds_method_path(self, mock_post):
+        """Test post llama al método de la Bot API con el token del bot"""
+        mock_post.return_value = MagicMock(status_code=200)
+
+        asyncio.run(TelegramClient.post("123:ABC", "sendMessage", {"chat_id": 1, "text": "hola"}))
+
+        args, kwargs = mock_post.call_args
+        self.assertEqual(args[0], "/bot123:ABC/sendMessage")
+        self.assertEqual(kwargs["json"], {"chat_id": 1, "text": "hola"})
+
+    def test_close_resets_client(self):
+        """Test close libera el cliente compartido"""
+        async def open_and_close():
+            TelegramClient.get_http_client()
+            await TelegramClient.close()
+
+        asyncio.run(open_and_close())
+
+        self.assertIsNone(TelegramClient._http_client)
+
+    @patch('httpx.AsyncClient.post', new_callable=AsyncMock)
+    def test_send_retries_on_429(self, mock_post):
+        """Test send espera retry_after y reintenta ante un 429 de flood control"""
+        mock_post.side_effect = [too_many_requests(0.05), MagicMock(status_code=200)]
+        retries = TelegramClient.retries
+
+        async def send():
+            start = time.monotonic()
+            response = await TelegramClient.send(uuid.uuid4(), "123:ABC", "sendMessage", {"chat_id": 1}, chat_id=1)
+            return response, time.monotonic() - start
+
+        response, elapsed = asyncio.run(send())
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(mock_post.call_count, 2)
+        self.assertGreaterEqual(elapsed, 0.05)
+        self.assertEqual(TelegramClient.retries, retries + 1)
+
+    @patch('httpx.AsyncClient.post', new_callable=AsyncMock)
+    def test_send_gives_up_after_max_retries(self, mock_post):
+        """Test send devuelve el 429 cuando se agotan los reintentos"""
+        mock_post.return_value = too_many_requests(0.01)
+        exhausted = TelegramClient.retries_exhausted
+
+        with patch.object(settings.TELEGRAM, "MAX_RETRIES", 2):
+            response = asyncio.run(TelegramClient.send(uuid.uuid4(), "123:ABC", "sendMessage"))
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(mock_post.call_count, 3)
+        self.assertEqual(TelegramClient.retries_exhausted, exhausted + 1)
+
+    @patch('httpx.AsyncClient.post', new_callable=AsyncMock)
+    def test_send_does_not_wait_long_retry_after(self, mock_post):
+        """Test un retry_after mayor que MAX_RETRY_AFTER no se espera"""
+        mock_post.return_value = too_many_requests(3600)
+
+        response = asyncio.run(TelegramClient.send(uuid.uuid4(), "123:ABC", "sendMessage"))
+
+        self.assertEqual(response.status_code, 429)
+        mock_post.assert_called_once()
+
+    @patch('httpx.AsyncClient.post', new_callable=AsyncMock)
+    def test_long_retry_after_does_not_block_later_sends(self, mock_post):
+        """Test tras un retry_after enorme los siguientes envíos del bot responden 429 sin esperar"""
+        mock_post.return_value = too_many_requests(3600)
+        bot_key = uuid.uuid4()
+
+        async def send_twice():
+            await TelegramClient.send(bot_key, "123:ABC", "sendMessage", chat_id=1)
+            start = time.monotonic()
+            response = await TelegramClient.send(bot_key, "123:ABC", "sendMessage", chat_id=2)
+            return response, time.monotonic() - start
+
+        with patch.object(settings.TELEGRAM, "MAX_RETRY_AFTER", 0.05), \
+                patch("api.v1.telegram.client.telegram_rate_limiter.max_wait", 0.05):
+            response, elapsed = asyncio.run(send_twice())
+
+        self.assertLess(elapsed, 0.2)
+        self.assertEqual(response.status_code, 429)
+        self.assertIsNotNone(TelegramClient.retry_after(response))
+
+    def test_retry_after_parsing(self):
+        """Test retry_after solo aplica a respuestas 429"""
+        self.assertEqual(TelegramClient.retry_after(too_many_requests(7)), 7.0)
+        self.assertIsNone(TelegramClient.retry_after(MagicMock(status_code=400)))
+
+        response = MagicMock(status_code=429, headers={"Retry-After": "pronto"})
+        response.json.side_effect = ValueError
+        self.assertEqual(TelegramClient.retry_after(response), 1.0)
+
+
+def too_many_requests(retry_after: float) -> MagicMock:
+    response = MagicMock(status_code=429, headers={})
+    response.json.return_value = {
+        "ok": False,
+        "error_code": 429,
+        "description": f"Too Many Requests: retry after {retry_after}",
+        "parameters": {"retry_after": retry_after}
+    }
+    return response
@@ -0,0 +1,105 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from api.v1.telegram.dedupe import MemoryUpdateWindow, UpdateDeduplicator, extract_update_id
+from core.settings.base import DedupeBackend, DedupeSettings
+
+
+# ─────────────────────────  TESTS UPDATE DEDUPE  ────────────────────────── #
+
+class TestExtractUpdateId(unittest.TestCase):
+
+    def test_reads_leading_update_id(self):
+        """Test lee el update_id de un Update serializado por Telegram"""
+        self.assertEqual(extract_update_id(b'{"update_id":42,"message":{"text":"hola"}}'), 42)
+        self.assertEqual(extract_update_id(b' { "update_id" : 7 }'), 7)
+
+    def test_falls_back_when_not_leading(self):
+        """Test devuelve None si update_id no es la primera llave o no es entero"""
+        self.assertIsNone(extract_update_id(b'{"message":{},"update_id":42}'))
+        self.assertIsNone(extract_update_id(b'{"update_id":"42"}'))
+        self.assertIsNone(extract_update_id(b'{"update_id":42x}'))
+        self.assertIsNone(extract_update_id(b''))
+
+
+class TestMemoryUpdateWindow(unittest.TestCase):
+
+    def test_window_is_bounded_per_connector(self):
+        """Test la ventana olvida los update_id más viejos y no mezcla conectores"""
+        window = MemoryUpdateWindow(window_size=2, max_connectors=10)
+
+        self.assertTrue(window.claim("a", 1))
+        self.assertFalse(window.claim("a", 1))
+        self.assertTrue(window.claim("b", 1))
+        window.claim("a", 2)
+        window.claim("a", 3)
+
+        self.assertTrue(window.claim("a", 1))
+        self.assertEqual(window.size(), 3)
+
+    def test_connectors_are_evicted_lru(self):
+        """Test se expulsa el conector usado hace más tiempo"""
+        window = MemoryUpdateWindow(window_size=10, max_connectors=2)
+        window.claim("a", 1)
+        window.claim("b", 1)
+        window.claim("a", 2)
+        window.claim("c", 1)
+
+        self.assertFalse(window.claim("a", 1))
+        self.assertTrue(window.claim("b", 1))
+
+    def test_release_allows_reprocessing(self):
+        """Test un update liberado vuelve a aceptarse"""
+        window = MemoryUpdateWindow(window_size=10, max_connectors=10)
+        window.claim("a", 1)
+        window.release("a", 1)
+
+        self.assertTrue(window.claim("a", 1))
+
+
+class TestUpdateDeduplicator(unittest.TestCase):
+
+    def test_disabled_accepts_everything(self):
+        """Test con ENABLED=False nunca se descarta un update"""
+        deduplicator = UpdateDeduplicator(DedupeSettings(ENABLED=False))
+
+        self.assertTrue(asyncio.run(deduplicator.claim("a", 1)))
+        self.assertTrue(asyncio.run(deduplicator.claim("a", 1)))
+
+    def test_redis_backend_requires_url(self):
+        """Test BACKEND=redis sin REDIS_URL es un error de configuración"""
+        with self.assertRaises(ValueError):
+            UpdateDeduplicator(DedupeSettings(BACKEND=DedupeBackend.REDIS))
+
+    def test_redis_backend_uses_set_nx(self):
+        """Test el backend Redis reclama con SET NX EX y libera con DEL"""
+        deduplicator = UpdateDeduplicator(DedupeSettings(BACKEND=DedupeBackend.REDIS, TTL_SECONDS=60), "redis://localhost:6379/0")
+        client = MagicMock()
+        client.set = AsyncMock(side_effect=[True, None])
+        client.delete = AsyncMock()
+
+        async def scenario():
+            with patch.object(deduplicator.redis, "get_client", return_value=client):
+                first = await deduplicator.claim("a", 1)
+                second = await deduplicator.claim("a", 1)
+                await deduplicator.release("a", 1)
+            return first, second
+
+        self.assertEqual(asyncio.run(scenario()), (True, False))
+        client.set.assert_awaited_with("telegram:update:a:1", 1, nx=True, ex=60)
+        client.delete.assert_awaited_once_with("telegram:update:a:1")
+        self.assertEqual(deduplicator.stats()["duplicates"], 1)
+
+    def test_redis_failure_falls_back_to_memory(self):
+        """Test si Redis falla se deduplica en memoria sin rechazar el webhook"""
+        deduplicator = UpdateDeduplicator(DedupeSettings(BACKEND=DedupeBackend.REDIS), "redis://localhost:6379/0")
+        client = MagicMock()
+        client.set = AsyncMock(side_effect=ConnectionError("down"))
+
+        async def scenario():
+            with patch.object(deduplicator.redis, "get_client", return_value=client):
+                return [await deduplicator.claim("a", 1), await deduplicator.claim("a", 1)]
+
+        self.assertEqual(asyncio.run(scenario()), [True, False])
+        self.assertEqual(deduplicator.stats()["backend_errors"], 2)
@@ -1,7 +1,8 @@
 import uuid
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 from .utils import TelegramDBMixin
+from api.v1.telegram.webhook_secret import derive_secret
 
 
 # ─────────────────────────  TESTS TELEGRAM ENDPOINTS  ────────────────────────── #
@@ -9,7 +10,7 @@ from .utils import TelegramDBMixin
 class TestTelegramEndpoints(TelegramDBMixin, unittest.TestCase):
 
     # ---------- POST /telegram/connect ---------- #
-    @patch('requests.post')
+    @patch('httpx.AsyncClient.post', new_callable=AsyncMock)
     def test_connect_telegram_success(self, mock_post):
         # Mock de la respuesta de Telegram API
         mock_response = MagicMock()
@@ -34,6 +35,8 @@ class TestTelegramEndpoints(TelegramDBMixin, unittest.TestCase):
         
         # Verificar que se llamó al API de Telegram
         mock_post.assert_called_once()
+        # El secret del webhook se deriva del id del conector
+        self.assertEqual(mock_post.call_args.kwargs["json"]["secret_token"], derive_secret(uuid.UUID(data["id"])))
 
     def test_connect_telegram_missing_api_key(self):
         payload = self.connector_payload()
@@ -62,7 +65,7 @@ class TestTelegramEndpoints(TelegramDBMixin, unittest.TestCase):
         
         self.assertEqual(res.status_code, 400)
 
-    @patch('requests.post')
+    @patch('httpx.AsyncClient.post', new_callable=AsyncMock)
     def test_connect_telegram_api_error(self, mock_post):
         # Mock de error en Telegram API
         mock_response = MagicMock()
@@ -77,6 +80,31 @@ class TestTelegramEndpoints(TelegramDBMixin, unittest.TestCase):
         
         self.assertEqual(res.status_code, 500)
 
+    @patch('httpx.AsyncClient.post', new_callable=AsyncMock)
+    def test_connect_telegram_duplicated_bot(self, mock_post):
+        mock_post.return_value = MagicMock(status_code=200)
+        self.create_test_connector(bot_user_name="test_bot")
+
+        res = self.client.post("/v1/telegram/connect", json=self.connector_payload(), headers=self.headers_for_user())
+
+        self.assertEqual(res.status_code, 409)
+        mock_post.assert_not_called()
+
+    @patch('httpx.AsyncClient.post', new_callable=AsyncMock)
+    def test_connect_telegram_api_error_releases_bot(self, mock_post):
+        mock_post.side_effect = [
+            MagicMock(status_code=400, text="Bad Request"),
+            MagicMock(status_code=200),
+        ]
+        payload = self.connector_payload()
+        headers = self.headers_for_user()
+
+        first = self.client.post("/v1/telegram/connect", json=payload, headers=headers)
+        second = self.client.post("/v1/telegram/connect", json=payload, headers=headers)
+
+        self.assertEqual(first.status_code, 500)
+        self.assertEqual(second.status_code, 200)
+
     def test_connect_telegram_missing_fields(self):
         payload = {"bot_user_name": "test_bot"}  # Sin bot_token
         headers = self.headers_for_user()
@@ -86,15 +114,12 @@ class TestTelegramEndpoints(TelegramDBMixin, unittest.TestCase):
         self.assertEqual(res.status_code, 400)
 
     # ---------- POST /telegram/webhook/{telegram_connector_id} ---------- #
-    @patch('requests.post')
-    def test_webhook_success(self, mock_post):
+    @patch('api.v1.telegram.forwarder.MessageForwarder.enqueue', new_callable=AsyncMock)
+    def test_webhook_success(self, mock_enqueue):
         # Crear conector de prueba
         connector = self.create_test_connector()
         
-        # Mock de la respuesta del webhook destino
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_post.return_value = mock_response
+        mock_enqueue.return_value = True
 
         webhook_payload = self.telegram_webhook_message()
         headers = self.webhook_headers(connector.bot_token_secret)
@@ -109,13 +134,59 @@ class TestTelegramEndpoints(TelegramDBMixin, unittest.TestCase):
         response_data = res.json()
         self.assertEqual(response_data["status"], "ok")
         
-        # Verificar que se llamó al webhook destino
-        mock_post.assert_called_once()
+        # Verificar que se encoló el reenvío al webhook destino
+        mock_enqueue.assert_called_once()
+
+    @patch('api.v1.telegram.forwarder.MessageForwarder.enqueue', new_callable=AsyncMock)
+    def test_webhook_duplicate_update_is_dropped(self, mock_enqueue):
+        """Test un update reenviado por Telegram (mismo update_id) no se reenvía dos veces"""
+        connector = self.create_test_connector()
+        mock_enqueue.return_value = True
+        webhook_payload = {"update_id": 9001, **self.telegram_webhook_message()}
+        headers = self.webhook_headers(connector.bot_token_secret)
+
+        first = self.client.post(f"/v1/telegram/webhook/{connector.id}", json=webhook_payload, headers=headers)
+        second = self.client.post(f"/v1/telegram/webhook/{connector.id}", json=webhook_payload, headers=headers)
+
+        self.assertEqual(first.json()["status"], "ok")
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.json()["status"], "duplicate")
+        mock_enqueue.assert_called_once()
+
+    @patch('api.v1.telegram.forwarder.MessageForwarder.enqueue', new_callable=AsyncMock)
+    def test_webhook_failed_update_is_released(self, mock_enqueue):
+        """Test si el procesamiento falla el reintento de Telegram sí se procesa"""
+        connector = self.create_test_connector()
+        mock_enqueue.side_effect = [RuntimeError("boom"), True]
+        webhook_payload = {"update_id": 9002, **self.telegram_webhook_message()}
+        headers = self.webhook_headers(connector.bot_token_secret)
+
+        first = self.client.post(f"/v1/telegram/webhook/{connector.id}", json=webhook_payload, headers=headers)
+        retry = self.client.post(f"/v1/telegram/webhook/{connector.id}", json=webhook_payload, headers=headers)
+
+        self.assertEqual(first.status_code, 500)
+        self.assertEqual(retry.json()["status"], "ok")
+        self.assertEqual(mock_enqueue.call_count, 2)
+
+    @patch('api.v1.telegram.forwarder.MessageForwarder.enqueue', new_callable=AsyncMock)
+    def test_webhook_full_queue_is_retried(self, mock_enqueue):
+        """Test con la cola de reenvío llena se responde 503 y el reintento de Telegram se procesa"""
+        connector = self.create_test_connector()
+        mock_enqueue.side_effect = [False, True]
+        webhook_payload = {"update_id": 9003, **self.telegram_webhook_message()}
+        headers = self.webhook_headers(connector.bot_token_secret)
+
+        first = self.client.post(f"/v1/telegram/webhook/{connector.id}", json=webhook_payload, headers=headers)
+        retry = self.client.post(f"/v1/telegram/webhook/{connector.id}", json=webhook_payload, headers=headers)
+
+        self.assertEqual(first.status_code, 503)
+        self.assertEqual(retry.json()["status"], "ok")
+        self.assertEqual(mock_enqueue.call_count, 2)
 
     def test_webhook_invalid_connector_id(self):
-        fake_id = str(uuid.uuid4())
+        fake_id = uuid.uuid4()
         webhook_payload = self.telegram_webhook_message()
-        headers = self.webhook_headers("any_secret")
+        headers = self.webhook_headers(derive_secret(fake_id))
         
         res = self.client.post(
             f"/v1/telegram/webhook/{fake_id}", 
@@ -138,6 +209,41 @@ class TestTelegramEndpoints(TelegramDBMixin, unittest.TestCase):
         
         self.assertEqual(res.status_code, 403)
 
+    @patch('api.v1.telegram.repositories.AsyncTelegramConnectorRepository.get_by_id_cached', new_callable=AsyncMock)
+    def test_webhook_forged_secret_skips_database(self, mock_get):
+        """Test un secret derivado de otro conector se rechaza sin consultar la base"""
+        connector_id = uuid.uuid4()
+        headers = self.webhook_headers(derive_secret(uuid.uuid4()))
+
+        res = self.client.post(
+            f"/v1/telegram/webhook/{connector_id}",
+            json=self.telegram_webhook_message(),
+            headers=headers
+        )
+
+        self.assertEqual(res.status_code, 403)
+        mock_get.assert_not_called()
+
+    @patch('api.v1.telegram.forwarder.MessageForwarder.enqueue', new_callable=AsyncMock)
+    def test_webhook_legacy_secret(self, mock_enqueue):
+        """Test los conectores con secret aleatorio (token_urlsafe) siguen funcionando"""
+        connector = self.create_test_connector(legacy_secret=True)
+
+        ok = self.client.post(
+            f"/v1/telegram/webhook/{connector.id}",
+            json=self.telegram_webhook_message(),
+            headers=self.webhook_headers(connector.bot_token_secret)
+        )
+        wrong = self.client.post(
+            f"/v1/telegram/webhook/{connector.id}",
+            json=self.telegram_webhook_message(),
+            headers=self.webhook_headers(connector.bot_token_secret[::-1])
+        )
+
+        self.assertEqual(ok.status_code, 200)
+        self.assertEqual(wrong.status_code, 403)
+        mock_enqueue.assert_called_once()
+
     def test_webhook_missing_secret_token(self):
         connector = self.create_test_connector()
         webhook_payload = self.telegram_webhook_message()
@@ -149,8 +255,8 @@ class TestTelegramEndpoints(TelegramDBMixin, unittest.TestCase):
         
         self.assertEqual(res.status_code, 403)
 
-    @patch('requests.post')
-    def test_webhook_no_message(self, mock_post):
+    @patch('api.v1.telegram.forwarder.MessageForwarder.enqueue', new_callable=AsyncMock)
+    def test_webhook_no_message(self, mock_enqueue):
         connector = self.create_test_connector()
         webhook_payload = {"update_id": 123}  # Sin mensaje
         headers = self.webhook_headers(connector.bot_token_secret)
@@ -166,16 +272,13 @@ class TestTelegramEndpoints(TelegramDBMixin, unittest.TestCase):
         self.assertEqual(response_data["status"], "ignored")
         
         # No debería llamar al webhook destino
-        mock_post.assert_not_called()
+        mock_enqueue.assert_not_called()
 
-    @patch('requests.post')
-    def test_webhook_edited_message(self, mock_post):
+    @patch('api.v1.telegram.forwarder.MessageForwarder.enqueue', new_callable=AsyncMock)
+    def test_webhook_edited_message(self, mock_enqueue):
         connector = self.create_test_connector()
         
-        # Mock de la respuesta del webhook destino
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_post.return_value = mock_response
+        mock_enqueue.return_value = True
 
         # Mensaje editado
         webhook_payload = {
@@ -200,7 +303,7 @@ class TestTelegramEndpoints(TelegramDBMixin, unittest.TestCase):
         self.assertEqual(response_data["status"], "ok")
 
     # ---------- POST /telegram/send/{telegram_connector_id} ---------- #
-    @patch('requests.post')
+    @patch('httpx.AsyncClient.post', new_callable=AsyncMock)
     def test_send_message_success(self, mock_post):
         connector = self.create_test_connector()
         
@@ -292,7 +395,7 @@ class TestTelegramEndpoints(TelegramDBMixin, unittest.TestCase):
         
         self.assertEqual(res.status_code, 400)
 
-    @patch('requests.post')
+    @patch('httpx.AsyncClient.post', new_callable=AsyncMock)
     def test_send_message_telegram_api_error(self, mock_post):
         connector = self.create_test_connector()
         
@@ -316,6 +419,31 @@ class TestTelegramEndpoints(TelegramDBMixin, unittest.TestCase):
         
         self.assertEqual(res.status_code, 502)
 
+    @patch('httpx.AsyncClient.post', new_callable=AsyncMock)
+    def test_send_message_flood_control(self, mock_post):
+        """Test un 429 persistente de Telegram se devuelve como 429 con Retry-After"""
+        connector = self.create_test_connector()
+
+        mock_response = MagicMock()
+        mock_response.status_code = 429
+        mock_response.json.return_value = {
+            "ok": False,
+            "error_code": 429,
+            "description": "Too Many Requests: retry after 120",
+            "parameters": {"retry_after": 120}
+        }
+        mock_post.return_value = mock_response
+
+        res = self.client.post(
+            f"/v1/telegram/send/{connector.id}",
+            json=self.send_message_payload(),
+            headers=self.headers_for_user()
+        )
+
+        self.assertEqual(res.status_code, 429)
+        self.assertEqual(res.headers["Retry-After"], "120")
+        mock_post.assert_called_once()
+
     def test_send_message_invalid_payload(self):
         connector = self.create_test_connector()
         payload = {"chat_id": "invalid"}  # chat_id debe ser int
@@ -359,4 +487,63 @@ class TestTelegramEndpoints(TelegramDBMixin, unittest.TestCase):
             headers=headers
         )
         
-        self.assertEqual(res.status_code, 400) 
\ No newline at end of file
+        self.assertEqual(res.status_code, 400) 
+
+    # ---------- GET /telegram/stats ---------- #
+    def test_stats_success(self):
+        res = self.client.get("/v1/telegram/stats", headers=self.headers_for_user())
+
+        self.assertEqual(res.status_code, 200)
+        forwarder = res.json()["data"]["forwarder"]
+        self.assertIn("queue_depth", forwarder)
+        self.assertIn("dropped", forwarder)
+        self.assertIn("routers", res.json()["data"]["startup"])
+
+    @patch('httpx.AsyncClient.post', new_callable=AsyncMock)
+    def test_metrics_exposes_route_and_telegram_latency(self, mock_post):
+        """Test /metrics reporta la latencia por ruta (plantilla) y por método de Telegram"""
+        connector = self.create_test_connector()
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {"ok": True, "result": {"message_id": 1}}
+        mock_post.return_value = mock_response
+        self.client.post(f"/v1/telegram/send/{connector.id}", json=self.send_message_payload(), headers=self.headers_for_user())
+
+        res = self.client.get("/metrics")
+
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res.headers["content-type"].startswith("text/plain; version=0.0.4"))
+        self.assertIn('route="/v1/telegram/send/{telegram_connector_id}",status="200"', res.text)
+        self.assertNotIn(str(connector.id), res.text)
+        self.assertIn('telegram_api_request_duration_seconds_count{method="sendMessage",outcome="ok"}', res.text)
+        self.assertIn('db_query_duration_seconds_count{repository="AsyncTelegramConnectorRepository",operation="get_by_id"}', res.text)
+
+    def test_list_connectors_pages_by_cursor(self):
+        """Test el listado pagina por cursor, solo incluye conectores del usuario y nunca el token"""
+        created = [self.create_test_connector() for _ in range(3)]
+        self.create_test_connector(user_id=str(uuid.uuid4()))
+
+        res = self.client.get("/v1/telegram/connectors", params={"limit": 2}, headers=self.headers_for_user())
+        self.assertEqual(res.status_code, 200)
+        first = res.json()["data"]
+        res = self.client.get(
+            "/v1/telegram/connectors",
+            params={"limit": 2, "cursor": first["next_cursor"]},
+            headers=self.headers_for_user()
+        )
+        second = res.json()["data"]
+
+        ids = [connector["id"] for connector in first["connectors"] + second["connectors"]]
+        self.assertEqual(ids, [str(connector.id) for connector in created])
+        self.assertIsNone(second["next_cursor"])
+        self.assertNotIn("bot_token", first["connectors"][0])
+
+    def test_list_connectors_invalid_cursor(self):
+        res = self.client.get("/v1/telegram/connectors", params={"cursor": "x"}, headers=self.headers_for_user())
+
+        self.assertEqual(res.status_code, 400)
+
+    def test_stats_invalid_api_key(self):
+        res = self.client.get("/v1/telegram/stats", headers={"X-Api-Key": "invalid_key"})
+
+        self.assertEqual(res.status_code, 400)
@@ -0,0 +1,194 @@
+import asyncio
+import unittest
+from datetime import datetime
+from unittest.mock import patch, MagicMock, AsyncMock
+from uuid import uuid4
+
+import httpx
+
+from api.v1.telegram.forwarder import MessageForwarder
+from api.v1.telegram.schema import WebhookMessageReceived
+from core.settings.base import ForwarderSettings
+
+
+# ─────────────────────────  TESTS MESSAGE FORWARDER  ────────────────────────── #
+
+class TestMessageForwarder(unittest.TestCase):
+
+    URL = "https://fake-host/dev/webhook/message-received"
+
+    @staticmethod
+    def message(**overrides) -> WebhookMessageReceived:
+        data = {
+            "date": datetime.now(),
+            "message_id": 123,
+            "chat_id": 12345,
+            "text": "Hola",
+            "user_id": uuid4(),
+            "bot_user_name": "test_bot",
+            "connector_id": uuid4()
+        }
+        data.update(overrides)
+        return WebhookMessageReceived(**data)
+
+    @patch('httpx.AsyncClient.post', new_callable=AsyncMock)
+    def test_enqueue_delivers_in_background(self, mock_post):
+        """Test el mensaje se encola y un worker lo entrega"""
+        mock_post.return_value = MagicMock(status_code=200)
+        forwarder = MessageForwarder(ForwarderSettings(WORKERS=2), self.URL)
+        message = self.message()
+
+        async def run():
+            accepted = await forwarder.enqueue(message)
+            await forwarder.stop()
+            return accepted
+
+        self.assertTrue(asyncio.run(run()))
+        self.assertEqual(forwarder.enqueued, 1)
+        self.assertEqual(forwarder.delivered, 1)
+        args, kwargs = mock_post.call_args
+        self.assertEqual(args[0], self.URL)
+        self.assertEqual(kwargs["headers"], {"X-User-Id": str(message.user_id)})
+        self.assertEqual(kwargs["json"]["message_id"], 123)
+
+    @patch('httpx.AsyncClient.post', new_callable=AsyncMock)
+    def test_queue_full_drops_message(self, mock_post):
+        """Test con la cola llena el mensaje se descarta y se cuenta"""
+        forwarder = MessageForwarder(ForwarderSettings(WORKERS=1, QUEUE_MAX_SIZE=1), self.URL)
+
+        async def run():
+            # Sin ceder el loop, el worker no consume: el segundo no cabe
+            first = await forwarder.enqueue(self.message())
+            second = await forwarder.enqueue(self.message())
+            stats = forwarder.stats()
+            await forwarder.stop()
+            return first, second, stats
+
+        first, second, stats = asyncio.run(run())
+
+        self.assertTrue(first)
+        self.assertFalse(second)
+        self.assertEqual(stats["queue_depth"], 1)
+        self.assertEqual(stats["dropped"], 1)
+
+    @patch('httpx.AsyncClient.post', new_callable=AsyncMock)
+    def test_inline_mode_delivers_before_returning(self, mock_post):
+        """Test con WORKERS=0 la entrega ocurre en línea"""
+        mock_post.return_value = MagicMock(status_code=200)
+        forwarder = MessageForwarder(ForwarderSettings(WORKERS=0), self.URL)
+
+        result = asyncio.run(forwarder.enqueue(self.message()))
+
+        self.assertTrue(result)
+        mock_post.assert_called_once()
+        self.assertEqual(forwarder.stats()["workers"], 0)
+
+    @patch('httpx.AsyncClient.post', new_callable=AsyncMock)
+    def test_failed_delivery_is_counted(self, mock_post):
+        """Test errores del backend destino y de red se cuentan como fallidos"""
+        mock_post.side_effect = [
+            MagicMock(status_code=500, text="error"),
+            httpx.ConnectTimeout("timeout"),
+        ]
+        forwarder = MessageForwarder(ForwarderSettings(WORKERS=0), self.URL)
+
+        async def run():
+            await forwarder.enqueue(self.message())
+            await forwarder.enqueue(self.message())
+
+        asyncio.run(run())
+
+        self.assertEqual(forwarder.failed, 2)
+        self.assertEqual(forwarder.delivered, 0)
+
+    @patch('httpx.AsyncClient.post', new_callable=AsyncMock)
+    def test_batches_grouped_by_user(self, mock_post):
+        """Test en modo batch los mensajes se entregan como arreglo, un POST por usuario"""
+        mock_post.return_value = MagicMock(status_code=200)
+        forwarder = MessageForwarder(ForwarderSettings(WORKERS=1, BATCH_MAX_SIZE=10, BATCH_MAX_WAIT=0.05), self.URL)
+        user_a, user_b = uuid4(), uuid4()
+
+        async def run():
+            for user_id in (user_a, user_b, user_a, user_a):
+                await forwarder.enqueue(self.message(user_id=user_id))
+            await forwarder.stop()
+
+        asyncio.run(run())
+
+        self.assertEqual(mock_post.call_count, 2)
+        sizes = {c.kwargs["headers"]["X-User-Id"]: len(c.kwargs["json"]) for c in mock_post.call_args_list}
+        self.assertEqual(sizes, {str(user_a): 3, str(user_b): 1})
+        self.assertEqual(forwarder.delivered, 4)
+        stats = forwarder.stats()
+        self.assertEqual(stats["requests"], 2)
+        self.assertEqual(stats["batch_size"]["max"], 4)
+        self.assertIn("p99", stats["latency_ms"])
+
+    @patch('httpx.AsyncClient.post', new_callable=AsyncMock)
+    def test_batch_respects_max_size(self, mock_post):
+        """Test un lote no supera BATCH_MAX_SIZE"""
+        mock_post.return_value = MagicMock(status_code=200)
+        forwarder = MessageForwarder(ForwarderSettings(WORKERS=1, BATCH_MAX_SIZE=2, BATCH_MAX_WAIT=0.05), self.URL)
+        user_id = uuid4()
+
+        async def run():
+            for _ in range(5):
+                await forwarder.enqueue(self.message(user_id=user_id))
+            await forwarder.stop()
+
+        asyncio.run(run())
+
+        self.assertEqual([len(c.kwargs["json"]) for c in mock_post.call_args_list], [2, 2, 1])
+
+    @patch('httpx.AsyncClient.post', new_callable=AsyncMock)
+    def test_batch_failure_counts_every_message(self, mock_post):
+        """Test un lote fallido cuenta todos sus mensajes como fallidos"""
+        mock_post.side_effect = httpx.ConnectError("boom")
+        forwarder = MessageForwarder(ForwarderSettings(WORKERS=1, BATCH_MAX_SIZE=10, BATCH_MAX_WAIT=0.01), self.URL)
+        user_id = uuid4()
+
+        async def run():
+            for _ in range(3):
+                await forwarder.enqueue(self.message(user_id=user_id))
+            await forwarder.stop()
+
+        asyncio.run(run())
+
+        self.assertEqual(forwarder.failed, 3)
+        mock_post.assert_called_once()
+
+    @patch('httpx.AsyncClient.post', new_callable=AsyncMock)
+    def test_unexpected_error_does_not_stop_worker(self, mock_post):
+        """Test un error que no es de HTTP cuenta como fallo y el worker sigue entregando"""
+        mock_post.side_effect = [RuntimeError("boom"), MagicMock(status_code=200)]
+        forwarder = MessageForwarder(ForwarderSettings(WORKERS=1), self.URL)
+
+        async def run():
+            await forwarder.enqueue(self.message())
+            await forwarder.enqueue(self.message())
+            await forwarder.stop()
+
+        asyncio.run(run())
+
+        self.assertEqual((forwarder.failed, forwarder.delivered), (1, 1))
+
+    @patch('httpx.AsyncClient.post', new_callable=AsyncMock)
+    def test_dead_worker_is_restarted(self, mock_post):
+        """Test start reemplaza un worker que terminó inesperadamente"""
+        mock_post.return_value = MagicMock(status_code=200)
+        forwarder = MessageForwarder(ForwarderSettings(WORKERS=1), self.URL)
+
+        async def crash():
+            raise RuntimeError("boom")
+
+        async def run():
+            await forwarder.start()
+            forwarder._workers[0].cancel()
+            forwarder._workers[0] = asyncio.create_task(crash())
+            await asyncio.sleep(0)
+            await forwarder.enqueue(self.message())
+            await forwarder.stop()
+
+        asyncio.run(run())
+
+        self.assertEqual(forwarder.delivered, 1)
@@ -0,0 +1,202 @@
+import asyncio
+import unittest
+from unittest.mock import patch, MagicMock, AsyncMock
+from uuid import uuid4
+
+import httpx
+
+from api.v1.telegram.client import TelegramClient
+from api.v1.telegram.media import MediaRelay, media_files_of
+from benchmarks.fake_telegram import FaultConfig, create_app
+from core.settings.base import MediaSettings
+
+
+# ─────────────────────────  TESTS MEDIA RELAY  ────────────────────────── #
+
+class TestMediaRelay(unittest.TestCase):
+
+    RELAY_URL = "http://object-store/media/"
+    BOT_TOKEN = "123:abc"
+
+    def setUp(self) -> None:
+        self.telegram = create_app(FaultConfig(), seed=1)
+        self.uploads: list[tuple[str, bytes, httpx.Headers]] = []
+        self.upload_status = 200
+        self.get_file_calls = 0
+
+        def build_telegram_client() -> httpx.AsyncClient:
+            return httpx.AsyncClient(base_url="http://fake", transport=httpx.ASGITransport(app=self.telegram))
+
+        self.patches = [
+            patch.object(TelegramClient, "_build_http_client", side_effect=build_telegram_client),
+            patch(
+                'api.v1.telegram.repositories.AsyncTelegramConnectorRepository.get_by_id_cached',
+                new_callable=AsyncMock,
+                return_value=(True, MagicMock(bot_token=self.BOT_TOKEN))
+            ),
+        ]
+        for p in self.patches:
+            p.start()
+
+        original_post = TelegramClient.post
+
+        async def counting_post(bot_token, method, payload):
+            if method == "getFile":
+                self.get_file_calls += 1
+            return await original_post(bot_token, method, payload)
+
+        self.patches.append(patch.object(TelegramClient, "post", side_effect=counting_post))
+        self.patches[-1].start()
+
+    def tearDown(self) -> None:
+        for p in reversed(self.patches):
+            p.stop()
+
+    def relay(self, **overrides) -> MediaRelay:
+        relay = MediaRelay(MediaSettings(ENABLED=True, RELAY_URL=self.RELAY_URL, **overrides))
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            self.uploads.append((str(request.url), await request.aread(), request.headers))
+            return httpx.Response(self.upload_status)
+
+        relay._get_http_client = lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        return relay
+
+    @staticmethod
+    def payload(**media) -> dict:
+        return {"connector_id": str(uuid4()), "user_id": "user-1", "message_id": 1, **media}
+
+    def run_attach(self, relay: MediaRelay, payloads) -> None:
+        async def run():
+            await relay.attach(payloads)
+            await TelegramClient.close()
+
+        asyncio.run(run())
+
+    def test_media_files_of_picks_largest_photo(self):
+        """Test de la foto solo se toma el tamaño mayor, junto con documento y sticker"""
+        small, large = {"file_id": "s", "file_unique_id": "us"}, {"file_id": "l", "file_unique_id": "ul"}
+        document = {"file_id": "d", "file_unique_id": "ud"}
+        files = media_files_of({"photo": [small, large], "document": document})
+        self.assertEqual(files, [("photo", large), ("document", document)])
+        self.assertEqual(media_files_of({"text": "hola"}), [])
+
+    def test_attach_streams_file_to_relay(self):
+        """Test el archivo se descarga de Telegram, se sube al relay y se agrega en `media`"""
+        relay = self.relay(CHUNK_SIZE=1000)
+        document = {"file_id": "doc-1", "file_unique_id": "U1", "mime_type": "application/pdf"}
+        payload = self.payload(document=document)
+
+        self.run_attach(relay, payload)
+
+        ((url, body, headers),) = self.uploads
+        self.assertEqual(url, "http://object-store/media/user-1/U1")
+        self.assertEqual(headers["x-user-id"], "user-1")
+        self.assertEqual(headers["content-type"], "application/pdf")
+        self.assertEqual(int(headers["content-length"]), len(body))
+        (media,) = payload["media"]
+        self.assertEqual(media["kind"], "document")
+        self.assertEqual(media["url"], url)
+        self.assertEqual(media["size"], len(body))
+        self.assertEqual(relay.stats()["bytes"], len(body))
+
+    def test_same_file_is_relayed_once(self):
+        """Test mensajes concurrentes con el mismo file_unique_id suben el archivo una sola vez"""
+        relay = self.relay()
+        photo = [{"file_id": "photo-1", "file_unique_id": "P1"}]
+        payloads = [self.payload(photo=photo) for _ in range(5)]
+
+        self.run_attach(relay, payloads)
+        self.run_attach(relay, [self.payload(photo=photo)])
+
+        self.assertEqual(len(self.uploads), 1)
+        self.assertEqual(self.get_file_calls, 1)
+        self.assertTrue(all(p["media"][0]["file_unique_id"] == "P1" for p in payloads))
+        stats = relay.stats()["relayed"]
+        self.assertEqual(stats["hits"] + stats["coalesced"], 5)
+
+    def test_same_file_is_relayed_per_user(self):
+        """Test el mismo file_unique_id de dos usuarios se sube para cada uno en su propia ruta"""
+        relay = self.relay()
+        document = {"file_id": "doc-3", "file_unique_id": "U3"}
+        first, second = self.payload(document=document), {**self.payload(document=document), "user_id": "user-2"}
+
+        self.run_attach(relay, [first, second])
+
+        uploads = sorted((url, headers["x-user-id"]) for url, _, headers in self.uploads)
+        self.assertEqual(uploads, [
+            ("http://object-store/media/user-1/U3", "user-1"),
+            ("http://object-store/media/user-2/U3", "user-2"),
+        ])
+        self.assertEqual(second["media"][0]["url"], "http://object-store/media/user-2/U3")
+
+    def test_file_path_is_cached(self):
+        """Test getFile se llama una vez por file_id aunque el archivo se retransmita de nuevo"""
+        relay = self.relay()
+        document = {"file_id": "doc-2", "file_unique_id": "U2"}
+
+        self.run_attach(relay, self.payload(document=document))
+        relay.relayed.clear()
+        self.run_attach(relay, self.payload(document=document))
+
+        self.assertEqual(len(self.uploads), 2)
+        self.assertEqual(self.get_file_calls, 1)
+
+    def test_oversized_file_is_skipped(self):
+        """Test un archivo mayor a MAX_FILE_SIZE no se descarga"""
+        relay = self.relay(MAX_FILE_SIZE=1000)
+        payload = self.payload(document={"file_id": "big", "file_unique_id": "B", "file_size": 5000})
+
+        self.run_attach(relay, payload)
+
+        self.assertEqual(self.uploads, [])
+        self.assertEqual(self.get_file_calls, 0)
+        self.assertEqual(payload["media"], [])
+        self.assertEqual(relay.stats()["skipped"], 1)
+
+    def test_upload_failure_keeps_message(self):
+        """Test si la subida falla el mensaje sigue sin el archivo y no se guarda en caché"""
+        relay = self.relay()
+        self.upload_status = 503
+        payload = self.payload(document={"file_id": "doc-3", "file_unique_id": "U3"})
+
+        self.run_attach(relay, payload)
+        self.assertEqual(payload["media"], [])
+        self.assertEqual(relay.stats()["errors"], 1)
+
+        self.upload_status = 200
+        self.run_attach(relay, payload)
+        self.assertEqual(payload["media"][0]["file_unique_id"], "U3")
+
+    def test_unexpected_failures_keep_message(self):
+        """Test una respuesta de getFile sin JSON o un error al buscar el conector no impiden la entrega"""
+        relay = self.relay()
+        payload = self.payload(document={"file_id": "doc-5", "file_unique_id": "U5"})
+
+        with patch.object(TelegramClient, "post", new=AsyncMock(return_value=httpx.Response(502, text="Bad Gateway"))):
+            self.run_attach(relay, payload)
+        self.assertEqual(payload["media"], [])
+
+        with patch(
+            'api.v1.telegram.repositories.AsyncTelegramConnectorRepository.get_by_id_cached',
+            new=AsyncMock(side_effect=RuntimeError("db caída"))
+        ):
+            self.run_attach(relay, self.payload(document={"file_id": "doc-6", "file_unique_id": "U6"}))
+
+        self.assertEqual(relay.stats()["errors"], 2)
+        self.assertEqual(self.uploads, [])
+
+    def test_disabled_relay_is_noop(self):
+        """Test sin MEDIA.ENABLED no se toca el payload"""
+        relay = MediaRelay(MediaSettings())
+        payload = self.payload(document={"file_id": "doc-4", "file_unique_id": "U4"})
+
+        self.run_attach(relay, payload)
+
+        self.assertNotIn("media", payload)
+        self.assertEqual(self.uploads, [])
+
+    def test_enabled_requires_relay_url(self):
+        """Test MEDIA.ENABLED sin RELAY_URL es un error de configuración"""
+        with self.assertRaises(ValueError):
+            MediaRelay(MediaSettings(ENABLED=True))
@@ -0,0 +1,244 @@
+import asyncio
+import unittest
+import uuid
+from datetime import datetime
+from unittest.mock import patch, AsyncMock
+
+from sqlalchemy import text
+
+from api.v1.telegram.outbox import OutboxWorker
+from api.v1.telegram.repositories import AsyncForwardOutboxRepository
+from api.v1.telegram.schema import WebhookMessageReceived
+from core.settings import settings
+from core.settings.base import OutboxSettings
+from db.posgresql import get_db_context
+from .utils import TelegramDBMixin
+
+
+class OutboxDBMixin(TelegramDBMixin):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self._truncate_outbox()
+
+    def tearDown(self) -> None:
+        self._truncate_outbox()
+        super().tearDown()
+
+    @staticmethod
+    def _truncate_outbox() -> None:
+        with get_db_context() as session:
+            session.execute(text("TRUNCATE TABLE public.forward_outbox RESTART IDENTITY"))
+            session.commit()
+
+    @staticmethod
+    def outbox_rows() -> list:
+        with get_db_context() as session:
+            return session.execute(text(
+                "SELECT id, status, attempts, available_at > timezone('utc', now()) AS delayed, last_error "
+                "FROM public.forward_outbox ORDER BY id"
+            )).all()
+
+    def add_entries(self, count: int, user_id: str | None = None) -> list[int]:
+        async def add():
+            return [
+                (await AsyncForwardOutboxRepository.add(uuid.UUID(user_id or self.test_user_id), None, {"n": i}))[1]
+                for i in range(count)
+            ]
+        return asyncio.run(add())
+
+
+# ─────────────────────────  TESTS OUTBOX WORKER  ────────────────────────── #
+
+class TestOutboxWorker(OutboxDBMixin, unittest.TestCase):
+
+    def worker(self, **overrides) -> OutboxWorker:
+        return OutboxWorker(OutboxSettings(**{"ENABLED": True, "BATCH_SIZE": 10, "MAX_ATTEMPTS": 2, **overrides}))
+
+    @patch('api.v1.telegram.forwarder.MessageForwarder.deliver', new_callable=AsyncMock)
+    def test_drain_deletes_delivered_rows(self, mock_deliver):
+        """Test los mensajes entregados salen del outbox"""
+        mock_deliver.return_value = True
+        self.add_entries(3)
+
+        claimed = asyncio.run(self.worker().drain_once())
+
+        self.assertEqual(claimed, 3)
+        self.assertEqual(mock_deliver.call_count, 3)
+        self.assertEqual(mock_deliver.call_args.args[1], self.test_user_id)
+        self.assertEqual(self.outbox_rows(), [])
+
+    @patch('api.v1.telegram.forwarder.MessageForwarder.deliver', new_callable=AsyncMock)
+    def test_failures_back_off_then_go_to_dead_letter(self, mock_deliver):
+        """Test un envío fallido se reprograma con backoff y tras MAX_ATTEMPTS queda en dead"""
+        mock_deliver.return_value = False
+        self.add_entries(1)
+        worker = self.worker(BACKOFF_BASE=0)
+
+        asyncio.run(worker.drain_once())
+        (row,) = self.outbox_rows()
+        self.assertEqual((row.status, row.attempts, row.last_error), ("pending", 1, "delivery failed"))
+
+        asyncio.run(worker.drain_once())
+        (row,) = self.outbox_rows()
+        self.assertEqual((row.status, row.attempts), ("dead", 2))
+        self.assertEqual(worker.stats()["dead"], 1)
+
+        # Una fila muerta ya no se reclama
+        self.assertEqual(asyncio.run(worker.drain_once()), 0)
+
+    @patch('api.v1.telegram.forwarder.MessageForwarder.deliver', new_callable=AsyncMock)
+    def test_backoff_delays_next_attempt(self, mock_deliver):
+        """Test tras un fallo la fila no vuelve a reclamarse hasta que vence el backoff"""
+        mock_deliver.return_value = False
+        self.add_entries(1)
+        worker = self.worker(BACKOFF_BASE=60)
+
+        asyncio.run(worker.drain_once())
+
+        self.assertTrue(self.outbox_rows()[0].delayed)
+        self.assertEqual(asyncio.run(worker.drain_once()), 0)
+
+    @patch('api.v1.telegram.forwarder.MessageForwarder.deliver', new_callable=AsyncMock)
+    def test_delivery_exception_goes_through_fail(self, mock_deliver):
+        """Test una excepción al entregar reprograma la fila con backoff en vez de dejarla en su lease"""
+        mock_deliver.side_effect = [RuntimeError("boom"), True]
+        self.add_entries(2)
+        worker = self.worker(BACKOFF_BASE=60)
+
+        self.assertEqual(asyncio.run(worker.drain_once()), 2)
+
+        failed, = self.outbox_rows()
+        self.assertEqual((failed.status, failed.attempts, failed.last_error), ("pending", 1, "delivery failed"))
+        self.assertTrue(failed.delayed)
+
+    def test_expired_lease_with_exhausted_attempts_goes_to_dead_letter(self):
+        """Test una fila reclamada MAX_ATTEMPTS veces cuyo lease vence sin confirmarse pasa a dead"""
+        self.add_entries(1)
+        worker = self.worker(LEASE_SECONDS=0)
+
+        async def claim_and_crash():
+            # Dos reclamos sin entregar ni fallar, como un worker que cae a mitad del lote
+            for _ in range(2):
+                await AsyncForwardOutboxRepository.claim(10, 0, 2)
+
+        asyncio.run(claim_and_crash())
+        self.assertEqual(asyncio.run(worker.drain_once()), 0)
+
+        (row,) = self.outbox_rows()
+        self.assertEqual((row.status, row.attempts, row.last_error), ("dead", 2, "lease expired"))
+        self.assertEqual(worker.stats()["dead"], 1)
+
+    def test_concurrent_claims_do_not_overlap(self):
+        """Test dos workers que reclaman a la vez reciben lotes disjuntos (SKIP LOCKED)"""
+        self.add_entries(20)
+
+        async def claim_twice():
+            return await asyncio.gather(
+                AsyncForwardOutboxRepository.claim(10, 60, 5),
+                AsyncForwardOutboxRepository.claim(10, 60, 5),
+            )
+
+        (_, first), (_, second) = asyncio.run(claim_twice())
+        first_ids = {row.id for row in first}
+        second_ids = {row.id for row in second}
+
+        self.assertEqual(len(first_ids | second_ids), 20)
+        self.assertFalse(first_ids & second_ids)
+
+    @patch('api.v1.telegram.forwarder.MessageForwarder.deliver', new_callable=AsyncMock)
+    def test_batching_groups_by_user(self, mock_deliver):
+        """Test con el forwarder en lotes se hace un POST por usuario con un arreglo"""
+        mock_deliver.return_value = True
+        other_user = str(uuid.uuid4())
+        self.add_entries(2)
+        self.add_entries(1, user_id=other_user)
+
+        with patch.object(settings.FORWARDER, "BATCH_MAX_SIZE", 50):
+            asyncio.run(self.worker().drain_once())
+
+        sizes = sorted(len(call.args[0]) for call in mock_deliver.call_args_list)
+        self.assertEqual(sizes, [1, 2])
+
+    def test_concurrent_enqueues_share_commits(self):
+        """Test los webhooks concurrentes se insertan juntos (group commit) y todos quedan persistidos"""
+        worker = self.worker()
+        connector_id = uuid.uuid4()
+
+        async def enqueue_many():
+            await asyncio.gather(*(
+                worker.enqueue(self.webhook_message_received(i, connector_id)) for i in range(25)
+            ))
+
+        asyncio.run(enqueue_many())
+
+        self.assertEqual(len(self.outbox_rows()), 25)
+        self.assertEqual(worker.stats()["enqueued"], 25)
+        self.assertLess(worker.stats()["write_batches"], 25)
+
+    def test_enqueue_propagates_insert_errors(self):
+        """Test si la inserción falla el webhook recibe el error y Telegram reintenta"""
+        worker = self.worker()
+
+        with patch('api.v1.telegram.repositories.AsyncForwardOutboxRepository.add_many', new_callable=AsyncMock) as mock_add:
+            mock_add.side_effect = RuntimeError("db down")
+            with self.assertRaises(RuntimeError):
+                asyncio.run(worker.enqueue(self.webhook_message_received(1, uuid.uuid4())))
+
+    def webhook_message_received(self, message_id: int, connector_id: uuid.UUID) -> WebhookMessageReceived:
+        return WebhookMessageReceived(
+            user_id=uuid.UUID(self.test_user_id),
+            bot_user_name="test_bot",
+            message_id=message_id,
+            date=datetime(2024, 1, 1),
+            chat_id=12345,
+            text="hola",
+            connector_id=connector_id
+        )
+
+
+class TestOutboxEndpoints(OutboxDBMixin, unittest.TestCase):
+
+    @patch('api.v1.telegram.forwarder.MessageForwarder.enqueue', new_callable=AsyncMock)
+    def test_webhook_writes_to_outbox(self, mock_enqueue):
+        """Test con OUTBOX.ENABLED el webhook persiste el mensaje en lugar de encolarlo en memoria"""
+        connector = self.create_test_connector()
+
+        with patch.object(settings.OUTBOX, "ENABLED", True):
+            res = self.client.post(
+                f"/v1/telegram/webhook/{connector.id}",
+                json=self.telegram_webhook_message(),
+                headers=self.webhook_headers(connector.bot_token_secret)
+            )
+
+        self.assertEqual(res.json()["status"], "ok")
+        mock_enqueue.assert_not_called()
+        (row,) = self.outbox_rows()
+        self.assertEqual(row.status, "pending")
+
+    def test_dead_letter_listing_and_redrive(self):
+        """Test se listan y reencolan solo los mensajes muertos del usuario"""
+        ids = self.add_entries(3)
+        other = self.add_entries(1, user_id=str(uuid.uuid4()))
+        with get_db_context() as session:
+            session.execute(text("UPDATE public.forward_outbox SET status = 'dead', attempts = 10"))
+            session.commit()
+
+        res = self.client.get("/v1/telegram/outbox/dead?limit=2", headers=self.headers_for_user())
+        self.assertEqual([entry["id"] for entry in res.json()["data"]], ids[:2])
+        res = self.client.get(f"/v1/telegram/outbox/dead?after_id={ids[1]}", headers=self.headers_for_user())
+        self.assertEqual([entry["id"] for entry in res.json()["data"]], ids[2:])
+
+        res = self.client.post("/v1/telegram/outbox/redrive", json={"ids": [ids[0], other[0]]}, headers=self.headers_for_user())
+        self.assertEqual(res.json()["data"]["redriven"], 1)
+        res = self.client.post("/v1/telegram/outbox/redrive", json={}, headers=self.headers_for_user())
+        self.assertEqual(res.json()["data"]["redriven"], 2)
+
+        statuses = {row.id: (row.status, row.attempts) for row in self.outbox_rows()}
+        self.assertEqual(statuses[ids[0]], ("pending", 0))
+        self.assertEqual(statuses[other[0]], ("dead", 10))
+
+    def test_outbox_requires_api_key(self):
+        """Test el API del outbox exige API key"""
+        res = self.client.get("/v1/telegram/outbox/dead", headers={"X-Api-Key": "invalid", "X-User-Id": self.test_user_id})
+        self.assertEqual(res.status_code, 400)
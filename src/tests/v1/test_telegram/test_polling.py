@@ -0,0 +1,186 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock, AsyncMock
+from uuid import uuid4
+
+from api.v1.telegram.polling import LongPollingEngine
+from core.settings import settings
+from core.settings.base import PollingSettings
+from .utils import TelegramDBMixin
+
+
+def telegram_result(result) -> MagicMock:
+    response = MagicMock(status_code=200)
+    response.json.return_value = {"ok": True, "result": result}
+    return response
+
+
+def update(update_id: int, text: str = "hola") -> dict:
+    return {
+        "update_id": update_id,
+        "message": {"message_id": update_id, "date": 1640995200, "chat": {"id": 12345}, "text": text}
+    }
+
+
+def fake_connector() -> SimpleNamespace:
+    return SimpleNamespace(id=uuid4(), user_id=uuid4(), bot_user_name="test_bot", bot_token="123:ABC")
+
+
+# ─────────────────────────  TESTS LONG POLLING  ────────────────────────── #
+
+class TestLongPollingEngine(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.engine = LongPollingEngine(PollingSettings(ENABLED=True, TIMEOUT=1, MAX_BACKOFF=0.01))
+
+    def poll_until(self, connector, mock_post, rounds: int) -> None:
+        """Ejecuta el polling de un conector hasta que se hayan hecho `rounds` llamadas a getUpdates."""
+        async def run():
+            done = asyncio.Event()
+            responses = iter(mock_post.side_effect)
+            polls = 0
+
+            async def post(url, **kwargs):
+                nonlocal polls
+                if url.endswith("/getUpdates"):
+                    polls += 1
+                    if polls > rounds:
+                        done.set()
+                        await asyncio.sleep(3600)
+                return next(responses)
+
+            mock_post.side_effect = post
+            self.engine.add(connector)
+            await asyncio.wait_for(done.wait(), timeout=5)
+            self.engine.remove(connector.id)
+
+        asyncio.run(run())
+
+    @patch('api.v1.telegram.forwarder.MessageForwarder.enqueue', new_callable=AsyncMock)
+    @patch('httpx.AsyncClient.post', new_callable=AsyncMock)
+    def test_updates_feed_webhook_processing(self, mock_post, mock_enqueue):
+        """Test los updates de getUpdates pasan por el mismo procesamiento que el webhook"""
+        connector = fake_connector()
+        mock_post.side_effect = [
+            telegram_result(True),
+            telegram_result([update(10, "uno"), update(11, "dos"), {"update_id": 12}]),
+        ]
+
+        self.poll_until(connector, mock_post, rounds=1)
+
+        self.assertEqual([c.args[0].text for c in mock_enqueue.call_args_list], ["uno", "dos"])
+        self.assertEqual(mock_enqueue.call_args_list[0].args[0].connector_id, connector.id)
+        self.assertEqual(self.engine.stats()["updates"], 3)
+
+    @patch('api.v1.telegram.forwarder.MessageForwarder.enqueue', new_callable=AsyncMock)
+    @patch('httpx.AsyncClient.post', new_callable=AsyncMock)
+    def test_offset_tracking(self, mock_post, mock_enqueue):
+        """Test cada getUpdates confirma los updates anteriores con offset"""
+        connector = fake_connector()
+        mock_post.side_effect = [
+            telegram_result(True),
+            telegram_result([update(10), update(11)]),
+            telegram_result([]),
+        ]
+
+        self.poll_until(connector, mock_post, rounds=2)
+
+        methods = [c.args[0].rsplit("/", 1)[1] for c in mock_post.call_args_list]
+        self.assertEqual(methods[:3], ["deleteWebhook", "getUpdates", "getUpdates"])
+        first, second = mock_post.call_args_list[1].kwargs["json"], mock_post.call_args_list[2].kwargs["json"]
+        self.assertNotIn("offset", first)
+        self.assertEqual(first["limit"], settings.POLLING.LIMIT)
+        self.assertEqual(second["offset"], 12)
+
+    @patch('api.v1.telegram.forwarder.MessageForwarder.enqueue', new_callable=AsyncMock)
+    @patch('httpx.AsyncClient.post', new_callable=AsyncMock)
+    def test_retries_after_error(self, mock_post, mock_enqueue):
+        """Test un error de Telegram no detiene el polling del conector"""
+        connector = fake_connector()
+        conflict = MagicMock(status_code=409)
+        conflict.json.return_value = {"ok": False, "description": "Conflict: terminated by other getUpdates request"}
+        mock_post.side_effect = [telegram_result(True), conflict, telegram_result([update(1)])]
+
+        self.poll_until(connector, mock_post, rounds=2)
+
+        self.assertEqual(self.engine.stats()["errors"], 1)
+        mock_enqueue.assert_called_once()
+
+
+    @patch('api.v1.telegram.forwarder.MessageForwarder.enqueue', new_callable=AsyncMock)
+    @patch('httpx.AsyncClient.post', new_callable=AsyncMock)
+    def test_failed_update_is_retried_before_advancing(self, mock_post, mock_enqueue):
+        """Test un update que falla se reintenta y el offset no avanza hasta procesarlo"""
+        connector = fake_connector()
+        mock_enqueue.side_effect = [RuntimeError("db down"), True, True]
+        mock_post.side_effect = [
+            telegram_result(True),
+            telegram_result([update(10, "uno"), update(11, "dos")]),
+            telegram_result([]),
+        ]
+
+        self.poll_until(connector, mock_post, rounds=2)
+
+        self.assertEqual([c.args[0].text for c in mock_enqueue.call_args_list], ["uno", "uno", "dos"])
+        self.assertEqual(mock_post.call_args_list[2].kwargs["json"]["offset"], 12)
+        self.assertEqual((self.engine.stats()["errors"], self.engine.stats()["dropped"]), (1, 0))
+
+    @patch('api.v1.telegram.forwarder.MessageForwarder.enqueue', new_callable=AsyncMock)
+    @patch('httpx.AsyncClient.post', new_callable=AsyncMock)
+    def test_update_is_dropped_after_max_attempts(self, mock_post, mock_enqueue):
+        """Test un update que siempre falla se descarta tras MAX_UPDATE_ATTEMPTS sin atascar al conector"""
+        self.engine = LongPollingEngine(PollingSettings(ENABLED=True, MAX_BACKOFF=0.01, MAX_UPDATE_ATTEMPTS=2))
+        connector = fake_connector()
+        mock_enqueue.side_effect = [RuntimeError("boom"), RuntimeError("boom"), True]
+        mock_post.side_effect = [
+            telegram_result(True),
+            telegram_result([update(10, "uno"), update(11, "dos")]),
+            telegram_result([]),
+        ]
+
+        self.poll_until(connector, mock_post, rounds=2)
+
+        self.assertEqual([c.args[0].text for c in mock_enqueue.call_args_list], ["uno", "uno", "dos"])
+        self.assertEqual(mock_post.call_args_list[2].kwargs["json"]["offset"], 12)
+        self.assertEqual(self.engine.stats()["dropped"], 1)
+
+    def test_remove_forgets_offset(self):
+        """Test quitar un conector descarta su offset"""
+        connector_id = uuid4()
+        self.engine._offsets[connector_id] = 42
+
+        self.engine.remove(connector_id)
+
+        self.assertNotIn(connector_id, self.engine._offsets)
+
+
+class TestLongPollingSync(TelegramDBMixin, unittest.TestCase):
+
+    def test_sync_follows_active_connectors(self):
+        """Test sync arranca el polling de los conectores activos y detiene los borrados"""
+        connector = self.create_test_connector()
+        engine = LongPollingEngine(PollingSettings(ENABLED=True))
+        stale_id = uuid4()
+
+        async def run():
+            engine._tasks[stale_id] = asyncio.create_task(asyncio.sleep(3600))
+            with patch.object(LongPollingEngine, "_poll", new=AsyncMock()):
+                await engine.sync()
+                return set(engine._tasks)
+
+        self.assertEqual(asyncio.run(run()), {connector.id})
+
+
+class TestConnectWithPolling(TelegramDBMixin, unittest.TestCase):
+
+    @patch('api.v1.telegram.polling.LongPollingEngine.add')
+    @patch('httpx.AsyncClient.post', new_callable=AsyncMock)
+    def test_connect_skips_set_webhook(self, mock_post, mock_add):
+        """Test con POLLING.ENABLED el conector no registra webhook y se agrega al motor"""
+        with patch.object(settings.POLLING, "ENABLED", True):
+            res = self.client.post("/v1/telegram/connect", json=self.connector_payload(), headers=self.headers_for_user())
+
+        self.assertEqual(res.status_code, 200)
+        mock_post.assert_not_called()
+        mock_add.assert_called_once()
@@ -1,10 +1,15 @@
 import uuid
+import asyncio
 import unittest
+from unittest.mock import patch
 from uuid import UUID
 
 from .utils import TelegramDBMixin
-from api.v1.telegram.repositories import TelegramConnectorRepository
+from api.v1.telegram.repositories import TelegramConnectorRepository, AsyncTelegramConnectorRepository, connector_cache
 from api.v1.telegram.schema import TelegramConnectorCreateSchema
+from db.posgresql import get_db_context
+from sqlalchemy.exc import IntegrityError
+from db.posgresql.models.public import TelegramConnector
 
 
 # ─────────────────────────  TESTS TELEGRAM REPOSITORIES  ────────────────────────── #
@@ -177,4 +182,162 @@ class TestTelegramConnectorRepository(TelegramDBMixin, unittest.TestCase):
         success, found_connector2 = TelegramConnectorRepository.get_by_id(connector2.id)
         self.assertTrue(success)
         self.assertIsNotNone(found_connector2)
-        self.assertEqual(found_connector2.id, connector2.id) 
\ No newline at end of file
+        self.assertEqual(found_connector2.id, connector2.id) 
+    def test_get_by_id_cached_hits_cache(self):
+        """Test get_by_id_cached solo consulta la base de datos una vez"""
+        connector = self.create_test_connector()
+
+        with patch.object(AsyncTelegramConnectorRepository, "get_by_id", wraps=AsyncTelegramConnectorRepository.get_by_id) as spy:
+            success, first = asyncio.run(AsyncTelegramConnectorRepository.get_by_id_cached(connector.id))
+            success, second = asyncio.run(AsyncTelegramConnectorRepository.get_by_id_cached(str(connector.id)))
+
+        self.assertTrue(success)
+        self.assertEqual(first.id, connector.id)
+        self.assertIs(first, second)
+        self.assertEqual(spy.call_count, 1)
+
+    def test_get_by_id_cached_invalid_id(self):
+        """Test get_by_id_cached con un ID que no es UUID"""
+        success, connector = asyncio.run(AsyncTelegramConnectorRepository.get_by_id_cached("not-a-uuid"))
+
+        self.assertTrue(success)
+        self.assertIsNone(connector)
+
+    def test_delete_invalidates_cache(self):
+        """Test delete elimina el conector de la caché"""
+        connector = self.create_test_connector()
+        asyncio.run(AsyncTelegramConnectorRepository.get_by_id_cached(connector.id))
+        self.assertIsNotNone(connector_cache.get(connector.id))
+
+        TelegramConnectorRepository.delete(connector.bot_user_name)
+
+        self.assertIsNone(connector_cache.get(connector.id))
+        success, found_connector = asyncio.run(AsyncTelegramConnectorRepository.get_by_id_cached(connector.id))
+        self.assertIsNone(found_connector)
+
+    def test_async_create_and_get_by_user_id(self):
+        """Test crear y listar conectores con la sesión asíncrona"""
+        user_id = UUID(self.test_user_id)
+        schema = TelegramConnectorCreateSchema(
+            user_id=user_id,
+            bot_user_name="async_bot",
+            bot_token="123456:ABC-DEF",
+            bot_token_secret="secret_token_123"
+        )
+
+        async def run():
+            created = await AsyncTelegramConnectorRepository.create(schema)
+            listed = await AsyncTelegramConnectorRepository.get_by_user_id(user_id)
+            return created, listed
+
+        (success, connector), (_, connectors) = asyncio.run(run())
+
+        self.assertTrue(success)
+        self.assertEqual(connector.bot_user_name, "async_bot")
+        self.assertIsNotNone(connector.created_at)
+        self.assertEqual([c.id for c in connectors], [connector.id])
+
+    def test_async_delete(self):
+        """Test eliminar un conector con la sesión asíncrona"""
+        connector = self.create_test_connector()
+
+        success, _ = asyncio.run(AsyncTelegramConnectorRepository.delete(connector.bot_user_name))
+        self.assertTrue(success)
+
+        success, found_connector = TelegramConnectorRepository.get_by_id(connector.id)
+        self.assertIsNone(found_connector)
+
+        success, _ = asyncio.run(AsyncTelegramConnectorRepository.delete(connector.bot_user_name))
+        self.assertFalse(success)
+
+    def test_get_page_is_keyset_and_projected(self):
+        """Test get_page pagina por (created_at, id) sin cargar los tokens"""
+        user_id = UUID(self.test_user_id)
+        created = [self.create_test_connector() for _ in range(5)]
+        self.create_test_connector(user_id=str(uuid.uuid4()))
+
+        success, first = TelegramConnectorRepository.get_page(2, user_id=user_id)
+        last = first[-1]
+        success, rest = TelegramConnectorRepository.get_page(10, user_id=user_id, after=(last.created_at, last.id))
+
+        self.assertTrue(success)
+        self.assertEqual([row.id for row in first + rest], [connector.id for connector in created])
+        self.assertNotIn("bot_token", first[0]._fields)
+        self.assertNotIn("bot_token_secret", first[0]._fields)
+
+    def test_iter_listing_streams_all_rows(self):
+        """Test iter_listing y stream_listing recorren todos los conectores activos en orden"""
+        created = [self.create_test_connector() for _ in range(5)]
+        TelegramConnectorRepository.delete(created[0].bot_user_name)
+
+        streamed = [row.id for row in TelegramConnectorRepository.iter_listing(batch_size=2)]
+
+        async def stream():
+            return [row.id async for row in AsyncTelegramConnectorRepository.stream_listing(UUID(self.test_user_id), batch_size=2)]
+
+        self.assertEqual(streamed, [connector.id for connector in created[1:]])
+        self.assertEqual(asyncio.run(stream()), streamed)
+
+    def test_create_duplicated_bot_user_name(self):
+        """Test no se permiten dos conectores activos para el mismo bot"""
+        self.create_test_connector(bot_user_name="dup_bot")
+        schema = TelegramConnectorCreateSchema(
+            user_id=uuid.uuid4(),
+            bot_user_name="dup_bot",
+            bot_token="123456:ABC-DEF",
+            bot_token_secret="secret_token_123"
+        )
+
+        success, connector = TelegramConnectorRepository.create(schema)
+
+        self.assertFalse(success)
+        self.assertIsNone(connector)
+
+    def test_async_create_duplicated_bot_user_name(self):
+        """Test el duplicado también se detecta con la sesión asíncrona"""
+        self.create_test_connector(bot_user_name="dup_async_bot")
+        schema = TelegramConnectorCreateSchema(
+            user_id=uuid.uuid4(),
+            bot_user_name="dup_async_bot",
+            bot_token="123456:ABC-DEF",
+            bot_token_secret="secret_token_123"
+        )
+
+        self.assertEqual(asyncio.run(AsyncTelegramConnectorRepository.create(schema)), (False, None))
+
+    def test_create_other_integrity_errors_are_raised(self):
+        """Test una violación que no es de unicidad (NOT NULL) no se reporta como duplicado"""
+        schema = TelegramConnectorCreateSchema.model_construct(
+            id=uuid.uuid4(),
+            user_id=uuid.uuid4(),
+            bot_user_name="null_token_bot",
+            bot_token=None,
+            bot_token_secret="secret_token_123"
+        )
+
+        with self.assertRaises(IntegrityError):
+            TelegramConnectorRepository.create(schema)
+        with self.assertRaises(IntegrityError):
+            asyncio.run(AsyncTelegramConnectorRepository.create(schema))
+
+    def test_delete_is_soft_and_frees_bot_user_name(self):
+        """Test delete marca deleted_at y permite volver a conectar el bot"""
+        connector = self.create_test_connector(bot_user_name="reused_bot")
+
+        TelegramConnectorRepository.delete("reused_bot")
+
+        with get_db_context() as session:
+            row = session.get(TelegramConnector, connector.id)
+            self.assertIsNotNone(row.deleted_at)
+
+        success, connectors = TelegramConnectorRepository.get_by_user_id(connector.user_id)
+        self.assertEqual(connectors, [])
+
+        success, recreated = TelegramConnectorRepository.create(TelegramConnectorCreateSchema(
+            user_id=connector.user_id,
+            bot_user_name="reused_bot",
+            bot_token="123456:ABC-DEF",
+            bot_token_secret="secret_token_123"
+        ))
+        self.assertTrue(success)
+        self.assertNotEqual(recreated.id, connector.id)
@@ -328,8 +328,11 @@ class TestWebhookMessageReceived(unittest.TestCase):
             "message_id": 123,
             "chat_id": 12345,
             "caption": "Pie de foto",
-            "photo": ["photo1.jpg", "photo2.jpg"],
-            "sticker": "sticker_id",
+            "photo": [
+                {"file_id": "small", "file_unique_id": "u-small", "width": 90, "height": 90, "file_size": 1200},
+                {"file_id": "large", "file_unique_id": "u-large", "width": 1280, "height": 1280}
+            ],
+            "sticker": {"file_id": "sticker_id", "file_unique_id": "u-sticker", "width": 512, "height": 512, "type": "regular"},
             "user_id": user_id,
             "bot_user_name": "test_bot",
             "connector_id": connector_id
@@ -339,8 +342,10 @@ class TestWebhookMessageReceived(unittest.TestCase):
         
         self.assertIsNone(schema.text)
         self.assertEqual(schema.caption, "Pie de foto")
-        self.assertEqual(schema.photo, ["photo1.jpg", "photo2.jpg"])
-        self.assertEqual(schema.sticker, "sticker_id")
+        self.assertEqual([photo.file_id for photo in schema.photo], ["small", "large"])
+        self.assertIsNone(schema.photo[1].file_size)
+        self.assertEqual(schema.sticker.file_unique_id, "u-sticker")
+        self.assertIsNone(schema.document)
 
     def test_serialization(self):
         """Test serialización de UUIDs"""
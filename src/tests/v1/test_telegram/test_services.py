@@ -1,3 +1,4 @@
+import json
 import uuid
 import unittest
 import asyncio
@@ -8,13 +9,14 @@ from uuid import UUID
 from .utils import TelegramDBMixin
 from api.v1.telegram.services import ConnectTelegramService, TelegramWebhookService, SendMessageService
 from api.v1.telegram.schema import RequestTelegramConnectorCreateSchema, SendMessageIn
+from api.v1.telegram.webhook_secret import derive_secret
 
 
 # ─────────────────────────  TESTS TELEGRAM SERVICES  ────────────────────────── #
 
 class TestConnectTelegramService(TelegramDBMixin, unittest.TestCase):
 
-    @patch('requests.post')
+    @patch('httpx.AsyncClient.post', new_callable=AsyncMock)
     def test_connect_success(self, mock_post):
         """Test conexión exitosa con Telegram"""
         # Mock de la respuesta de Telegram API
@@ -95,7 +97,7 @@ class TestConnectTelegramService(TelegramDBMixin, unittest.TestCase):
         
         self.assertEqual(context.exception.status_code, 400)
 
-    @patch('requests.post')
+    @patch('httpx.AsyncClient.post', new_callable=AsyncMock)
     def test_connect_telegram_api_error(self, mock_post):
         """Test error en API de Telegram"""
         # Mock de error en Telegram API
@@ -123,20 +125,18 @@ class TestConnectTelegramService(TelegramDBMixin, unittest.TestCase):
 
 class TestTelegramWebhookService(TelegramDBMixin, unittest.TestCase):
 
-    @patch('requests.post')
-    def test_webhook_success(self, mock_post):
+    @patch('api.v1.telegram.forwarder.MessageForwarder.enqueue', new_callable=AsyncMock)
+    def test_webhook_success(self, mock_enqueue):
         """Test procesamiento exitoso de webhook"""
         # Crear conector de prueba
         connector = self.create_test_connector()
         
-        # Mock de la respuesta del webhook destino
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_post.return_value = mock_response
+        mock_enqueue.return_value = True
 
         # Mock request
         request = MagicMock(spec=Request)
         request.json = AsyncMock(return_value=self.telegram_webhook_message())
+        request.body = AsyncMock(return_value=json.dumps(self.telegram_webhook_message()).encode())
 
         result = asyncio.run(TelegramWebhookService.webhook(
             request, 
@@ -145,17 +145,18 @@ class TestTelegramWebhookService(TelegramDBMixin, unittest.TestCase):
         ))
 
         self.assertEqual(result["status"], "ok")
-        mock_post.assert_called_once()
+        mock_enqueue.assert_called_once()
 
     def test_webhook_invalid_connector(self):
         """Test webhook con ID de conector inválido"""
-        fake_id = str(uuid.uuid4())
+        fake_id = uuid.uuid4()
         
         request = MagicMock(spec=Request)
         request.json = AsyncMock(return_value=self.telegram_webhook_message())
+        request.body = AsyncMock(return_value=json.dumps(self.telegram_webhook_message()).encode())
 
         with self.assertRaises(HTTPException) as context:
-            asyncio.run(TelegramWebhookService.webhook(request, fake_id, "any_secret"))
+            asyncio.run(TelegramWebhookService.webhook(request, str(fake_id), derive_secret(fake_id)))
         
         self.assertEqual(context.exception.status_code, 404)
 
@@ -165,6 +166,7 @@ class TestTelegramWebhookService(TelegramDBMixin, unittest.TestCase):
         
         request = MagicMock(spec=Request)
         request.json = AsyncMock(return_value=self.telegram_webhook_message())
+        request.body = AsyncMock(return_value=json.dumps(self.telegram_webhook_message()).encode())
 
         with self.assertRaises(HTTPException) as context:
             asyncio.run(TelegramWebhookService.webhook(
@@ -175,13 +177,14 @@ class TestTelegramWebhookService(TelegramDBMixin, unittest.TestCase):
         
         self.assertEqual(context.exception.status_code, 403)
 
-    @patch('requests.post')
-    def test_webhook_no_message(self, mock_post):
+    @patch('api.v1.telegram.forwarder.MessageForwarder.enqueue', new_callable=AsyncMock)
+    def test_webhook_no_message(self, mock_enqueue):
         """Test webhook sin mensaje (update ignorado)"""
         connector = self.create_test_connector()
         
         request = MagicMock(spec=Request)
         request.json = AsyncMock(return_value={"update_id": 123})
+        request.body = AsyncMock(return_value=json.dumps({"update_id": 123}).encode())
 
         result = asyncio.run(TelegramWebhookService.webhook(
             request, 
@@ -190,17 +193,14 @@ class TestTelegramWebhookService(TelegramDBMixin, unittest.TestCase):
         ))
 
         self.assertEqual(result["status"], "ignored")
-        mock_post.assert_not_called()
+        mock_enqueue.assert_not_called()
 
-    @patch('requests.post')
-    def test_webhook_edited_message(self, mock_post):
+    @patch('api.v1.telegram.forwarder.MessageForwarder.enqueue', new_callable=AsyncMock)
+    def test_webhook_edited_message(self, mock_enqueue):
         """Test webhook con mensaje editado"""
         connector = self.create_test_connector()
         
-        # Mock de la respuesta del webhook destino
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_post.return_value = mock_response
+        mock_enqueue.return_value = True
 
         # Mensaje editado
         webhook_data = {
@@ -215,6 +215,7 @@ class TestTelegramWebhookService(TelegramDBMixin, unittest.TestCase):
 
         request = MagicMock(spec=Request)
         request.json = AsyncMock(return_value=webhook_data)
+        request.body = AsyncMock(return_value=json.dumps(webhook_data).encode())
 
         result = asyncio.run(TelegramWebhookService.webhook(
             request, 
@@ -223,12 +224,12 @@ class TestTelegramWebhookService(TelegramDBMixin, unittest.TestCase):
         ))
 
         self.assertEqual(result["status"], "ok")
-        mock_post.assert_called_once()
+        mock_enqueue.assert_called_once()
 
 
 class TestSendMessageService(TelegramDBMixin, unittest.TestCase):
 
-    @patch('requests.post')
+    @patch('httpx.AsyncClient.post', new_callable=AsyncMock)
     def test_send_message_success(self, mock_post):
         """Test envío exitoso de mensaje"""
         connector = self.create_test_connector()
@@ -322,7 +323,7 @@ class TestSendMessageService(TelegramDBMixin, unittest.TestCase):
         
         self.assertEqual(context.exception.status_code, 400)
 
-    @patch('requests.post')
+    @patch('httpx.AsyncClient.post', new_callable=AsyncMock)
     def test_send_message_telegram_api_error(self, mock_post):
         """Test error en API de Telegram"""
         connector = self.create_test_connector()
@@ -0,0 +1,72 @@
+import unittest
+from unittest.mock import AsyncMock, patch
+
+import httpx
+from fastapi.testclient import TestClient
+
+from api.v1.telegram.client import TelegramClient
+from benchmarks.fake_telegram import FaultConfig, create_app
+from core.settings import settings
+from main import app
+from shared.middlewares import TracingMiddleware
+from shared.tracing import Span, tracer
+from .utils import TelegramDBMixin
+
+
+class TestRequestTracing(TelegramDBMixin, unittest.TestCase):
+
+    TRACE_ID = "0af7651916cd43dd8448eb211c80319c"
+
+    def setUp(self) -> None:
+        super().setUp()
+        # El middleware solo se instala con TRACING.ENABLED al crear la app
+        self.client = TestClient(TracingMiddleware(app, header=settings.TRACING.HEADER))
+        self.enabled = patch.object(settings.TRACING, "ENABLED", True)
+        self.enabled.start()
+        tracer.recent.clear()
+
+    def tearDown(self) -> None:
+        self.enabled.stop()
+        super().tearDown()
+
+    def spans(self, trace_id: str) -> dict[str, Span]:
+        return {span.name: span for span in tracer.recent if span.trace_id == trace_id}
+
+    @patch('api.v1.telegram.forwarder.MessageForwarder.enqueue', new_callable=AsyncMock)
+    def test_webhook_spans(self, mock_enqueue):
+        """Test el webhook continúa el trace id entrante y registra un span por etapa"""
+        connector = self.create_test_connector()
+
+        res = self.client.post(
+            f"/v1/telegram/webhook/{connector.id}",
+            json={"update_id": 77, **self.telegram_webhook_message()},
+            headers={**self.webhook_headers(connector.bot_token_secret), "X-Trace-Id": self.TRACE_ID}
+        )
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.headers["X-Trace-Id"], self.TRACE_ID)
+        spans = self.spans(self.TRACE_ID)
+        root = spans["POST /v1/telegram/webhook/{telegram_connector_id}"]
+        for name in ("webhook.secret_check", "webhook.connector_lookup", "webhook.parse", "webhook.dedupe", "webhook.process"):
+            self.assertEqual(spans[name].parent_id, root.span_id, name)
+
+    def test_send_message_spans_telegram_call(self):
+        """Test el envío registra la llamada a Telegram y la respuesta lleva el trace id"""
+        connector = self.create_test_connector()
+        telegram = create_app(FaultConfig(), seed=1)
+
+        with patch.object(
+            TelegramClient,
+            "_build_http_client",
+            side_effect=lambda: httpx.AsyncClient(base_url="http://fake", transport=httpx.ASGITransport(app=telegram))
+        ):
+            res = self.client.post(
+                f"/v1/telegram/send/{connector.id}",
+                json=self.send_message_payload(),
+                headers=self.headers_for_user()
+            )
+
+        self.assertEqual(res.status_code, 200, res.text)
+        trace_id = res.headers["X-Trace-Id"]
+        self.assertEqual(res.json()["trace_id"], trace_id)
+        self.assertEqual(self.spans(trace_id)["telegram.sendMessage"].attributes, {"status": 200})
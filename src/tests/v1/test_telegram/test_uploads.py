@@ -0,0 +1,183 @@
+import asyncio
+import hashlib
+import unittest
+from unittest.mock import patch
+
+import httpx
+
+from api.v1.telegram.client import TelegramClient
+from api.v1.telegram.uploads import SpooledUpload, UploadError, read_multipart
+from benchmarks.fake_telegram import FaultConfig, create_app
+from core.settings import settings
+from core.settings.base import UploadSettings
+from .utils import TelegramDBMixin
+
+
+def multipart_body(boundary: str, fields: dict[str, str], file_field: str, content: bytes) -> bytes:
+    parts = [
+        f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+        for name, value in fields.items()
+    ]
+    parts.append(
+        f'--{boundary}\r\nContent-Disposition: form-data; name="{file_field}"; filename="informe.pdf"\r\n'
+        f'Content-Type: application/pdf\r\n\r\n'.encode() + content + b"\r\n"
+    )
+    return b"".join(parts) + f"--{boundary}--\r\n".encode()
+
+
+async def chunked(body: bytes, size: int):
+    for i in range(0, len(body), size):
+        yield body[i:i + size]
+
+
+# ─────────────────────────  TESTS LECTURA  ────────────────────────── #
+
+class TestUploadReading(unittest.TestCase):
+
+    BOUNDARY = "xYzZy"
+
+    def read(self, body: bytes, chunk_size: int, config: UploadSettings | None = None) -> SpooledUpload:
+        upload = SpooledUpload(config or UploadSettings())
+        asyncio.run(read_multipart(
+            chunked(body, chunk_size), f"multipart/form-data; boundary={self.BOUNDARY}", upload, "document"
+        ))
+        return upload
+
+    def test_multipart_any_chunking(self):
+        """Test el archivo y los campos se leen igual sin importar cómo llegan partidos los bloques"""
+        content = bytes(range(256)) * 40 + b"\r\n--xYz casi un delimitador"
+        body = multipart_body(self.BOUNDARY, {"chat_id": "42", "caption": "hola"}, "document", content)
+
+        for chunk_size in (1, 7, len(self.BOUNDARY) + 4, 1000, len(body)):
+            upload = self.read(body, chunk_size)
+            upload.file.seek(0)
+            self.assertEqual(upload.file.read(), content, chunk_size)
+            self.assertEqual(upload.fields, {"chat_id": "42", "caption": "hola"})
+            self.assertEqual((upload.filename, upload.content_type), ("informe.pdf", "application/pdf"))
+            self.assertEqual(upload.sha256, hashlib.sha256(content).hexdigest())
+
+    def test_large_file_spools_to_disk(self):
+        """Test pasado SPOOL_MAX_MEMORY el archivo se escribe en disco"""
+        content = b"a" * 5000
+        body = multipart_body(self.BOUNDARY, {}, "document", content)
+        upload = self.read(body, 512, UploadSettings(SPOOL_MAX_MEMORY=1024))
+
+        self.assertFalse(upload.in_memory)
+        upload.file.seek(0)
+        self.assertEqual(upload.file.read(), content)
+        upload.close()
+
+    def test_rejects_oversized_and_incomplete(self):
+        """Test un archivo mayor a MAX_SIZE o un multipart truncado se rechazan"""
+        body = multipart_body(self.BOUNDARY, {}, "document", b"a" * 100)
+        with self.assertRaises(UploadError) as ctx:
+            self.read(body, 16, UploadSettings(MAX_SIZE=50))
+        self.assertEqual(ctx.exception.status_code, 413)
+
+        with self.assertRaises(UploadError):
+            self.read(body[:-20], 16)
+        with self.assertRaises(UploadError):
+            self.read(multipart_body(self.BOUNDARY, {"chat_id": "1"}, "photo", b"x"), 16)
+
+
+# ─────────────────────────  TESTS ENDPOINT  ────────────────────────── #
+
+class TestSendMediaEndpoint(TelegramDBMixin, unittest.TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.telegram = create_app(FaultConfig(), seed=1)
+        self.patcher = patch.object(
+            TelegramClient,
+            "_build_http_client",
+            side_effect=lambda: httpx.AsyncClient(base_url="http://fake", transport=httpx.ASGITransport(app=self.telegram))
+        )
+        self.patcher.start()
+
+    def tearDown(self) -> None:
+        self.patcher.stop()
+        super().tearDown()
+
+    def uploaded_bytes(self) -> int:
+        return self.telegram.state.fake.stats["uploaded_bytes"]
+
+    def test_send_document_multipart(self):
+        """Test un documento en multipart se sube a Telegram con sus campos"""
+        connector = self.create_test_connector()
+        content = b"%PDF" + b"0" * 3000
+
+        res = self.client.post(
+            f"/v1/telegram/send/{connector.id}/document",
+            files={"document": ("informe.pdf", content, "application/pdf")},
+            data={"chat_id": "12345", "caption": "Informe"},
+            headers=self.headers_for_user()
+        )
+
+        self.assertEqual(res.status_code, 200, res.text)
+        data = res.json()["data"]
+        self.assertTrue(data["uploaded"])
+        self.assertTrue(data["file_id"].startswith("document-"))
+        self.assertEqual(self.uploaded_bytes(), len(content))
+
+    def test_resend_reuses_file_id(self):
+        """Test reenviar el mismo archivo con el mismo bot reutiliza el file_id sin subirlo"""
+        connector = self.create_test_connector()
+        content = b"\xff\xd8" + b"1" * 2000
+
+        first, second = (
+            self.client.post(
+                f"/v1/telegram/send/{connector.id}/photo",
+                params={"chat_id": chat_id},
+                content=content,
+                headers={**self.headers_for_user(), "Content-Type": "image/jpeg"}
+            )
+            for chat_id in (1, 2)
+        )
+
+        self.assertEqual(first.status_code, 200, first.text)
+        self.assertEqual(second.status_code, 200, second.text)
+        self.assertTrue(first.json()["data"]["uploaded"])
+        self.assertFalse(second.json()["data"]["uploaded"])
+        self.assertEqual(first.json()["data"]["file_id"], second.json()["data"]["file_id"])
+        self.assertEqual(self.uploaded_bytes(), len(content))
+
+    def test_rejected_file_id_uploads_again(self):
+        """Test si Telegram ya no reconoce el file_id guardado el archivo se sube otra vez"""
+        connector = self.create_test_connector()
+        send = lambda: self.client.post(
+            f"/v1/telegram/send/{connector.id}/voice",
+            params={"chat_id": 1},
+            content=b"OggS" + b"2" * 500,
+            headers=self.headers_for_user()
+        )
+
+        self.assertTrue(send().json()["data"]["uploaded"])
+        self.telegram.state.fake.bots.clear()
+        res = send()
+
+        self.assertEqual(res.status_code, 200, res.text)
+        self.assertTrue(res.json()["data"]["uploaded"])
+
+    def test_send_media_validation(self):
+        """Test sin chat_id, con cuerpo vacío o demasiado grande la petición se rechaza antes de llamar a Telegram"""
+        connector = self.create_test_connector()
+        url = f"/v1/telegram/send/{connector.id}/document"
+
+        self.assertEqual(self.client.post(url, content=b"abc", headers=self.headers_for_user()).status_code, 400)
+        self.assertEqual(self.client.post(url, params={"chat_id": 1}, content=b"", headers=self.headers_for_user()).status_code, 400)
+        with patch.object(settings.UPLOAD, "MAX_SIZE", 10):
+            res = self.client.post(url, params={"chat_id": 1}, content=b"a" * 11, headers=self.headers_for_user())
+        self.assertEqual(res.status_code, 413)
+        self.assertEqual(self.client.post(f"/v1/telegram/send/{connector.id}/video", params={"chat_id": 1}, content=b"a", headers=self.headers_for_user()).status_code, 400)
+        self.assertEqual(self.uploaded_bytes(), 0)
+
+    def test_send_media_wrong_user(self):
+        """Test un conector de otro usuario se rechaza"""
+        connector = self.create_test_connector()
+        res = self.client.post(
+            f"/v1/telegram/send/{connector.id}/document",
+            params={"chat_id": 1},
+            content=b"abc",
+            headers=self.headers_for_user("00000000-0000-0000-0000-000000000000")
+        )
+        self.assertEqual(res.status_code, 403)
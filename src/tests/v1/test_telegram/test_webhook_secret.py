@@ -0,0 +1,47 @@
+import secrets
+import unittest
+from unittest.mock import patch
+from uuid import uuid4
+
+from api.v1.telegram.webhook_secret import SecretCheck, check_secret, derive_secret
+from core.settings import settings
+
+
+# ─────────────────────────  TESTS WEBHOOK SECRET  ────────────────────────── #
+
+class TestWebhookSecret(unittest.TestCase):
+
+    def test_derived_secret_is_valid_for_telegram(self):
+        """Test el secret derivado cumple el formato de Telegram (1-256 caracteres A-Z a-z 0-9 _ -)"""
+        secret = derive_secret(uuid4())
+
+        self.assertRegex(secret, r"^[A-Za-z0-9_-]{1,256}$")
+
+    def test_derived_secret_verifies_only_its_connector(self):
+        """Test el secret derivado solo es válido para su propio conector"""
+        connector_id = uuid4()
+        secret = derive_secret(connector_id)
+
+        self.assertEqual(check_secret(str(connector_id), secret), SecretCheck.VALID)
+        self.assertEqual(check_secret(str(uuid4()), secret), SecretCheck.INVALID)
+        self.assertEqual(check_secret("not-a-uuid", secret), SecretCheck.INVALID)
+
+    def test_derived_secret_depends_on_key(self):
+        """Test cambiar WEBHOOK_SECRET_KEY invalida los secrets derivados"""
+        connector_id = uuid4()
+        secret = derive_secret(connector_id)
+
+        with patch.object(settings, "WEBHOOK_SECRET_KEY", "other-key"):
+            self.assertEqual(check_secret(str(connector_id), secret), SecretCheck.INVALID)
+
+    def test_legacy_secret_needs_database(self):
+        """Test un secret con formato token_urlsafe(192) se compara contra la base"""
+        self.assertEqual(check_secret(str(uuid4()), secrets.token_urlsafe(192)), SecretCheck.LEGACY)
+
+        with patch.object(settings, "WEBHOOK_LEGACY_SECRETS", False):
+            self.assertEqual(check_secret(str(uuid4()), secrets.token_urlsafe(192)), SecretCheck.INVALID)
+
+    def test_junk_secret_is_invalid(self):
+        """Test secrets vacíos o con formato desconocido se rechazan"""
+        for secret in (None, "", "wrong_secret", "v1_" + "x" * 43, "a" * 255, "!" * 256):
+            self.assertEqual(check_secret(str(uuid4()), secret), SecretCheck.INVALID, secret)
@@ -1,3 +1,4 @@
+import secrets
 from typing import Any
 from uuid import UUID, uuid4
 from unittest.mock import patch, MagicMock
@@ -8,12 +9,14 @@ from sqlalchemy import text
 from main import app
 from db.posgresql import get_db_context
 from db.posgresql.models.public import TelegramConnector
+from api.v1.telegram.repositories import connector_cache
 from api.v1.telegram.schema import (
     RequestTelegramConnectorCreateSchema,
     TelegramConnectorCreateSchema,
     SendMessageIn,
     WebhookMessageReceived
 )
+from api.v1.telegram.webhook_secret import derive_secret
 from core.settings import settings
 
 
@@ -30,6 +33,7 @@ class TelegramDBMixin:
 
     def setUp(self) -> None:     # se ejecuta antes de *cada* test
         self._truncate_telegram_connectors()
+        connector_cache.clear()
         self.client = TestClient(app)
         self.test_user_id = str(uuid4())
         self.test_api_key = settings.API_KEY
@@ -89,14 +93,19 @@ class TelegramDBMixin:
         data.update(overrides)
         return data
 
-    def create_test_connector(self, user_id: str = None) -> TelegramConnector:
+    def create_test_connector(self, user_id: str = None, bot_user_name: str = None, legacy_secret: bool = False) -> TelegramConnector:
         """Crea un conector de prueba en la base de datos"""
         user_id = user_id or self.test_user_id
+        # bot_user_name es único entre conectores activos
+        bot_user_name = bot_user_name or f"test_bot_{uuid4().hex[:8]}"
+        connector_id = uuid4()
         schema = TelegramConnectorCreateSchema(
+            id=connector_id,
             user_id=UUID(user_id),
-            bot_user_name="test_bot",
+            bot_user_name=bot_user_name,
             bot_token="1234567890:TEST_BOT_TOKEN",
-            bot_token_secret="test_secret_token_123"
+            # Los conectores previos a WEBHOOK_SECRET_KEY tienen un secret aleatorio
+            bot_token_secret=secrets.token_urlsafe(192) if legacy_secret else derive_secret(connector_id)
         )
         
         with get_db_context() as session: